@@ -9,7 +9,16 @@ from ._client import Client, Stream, Timeout, Transport, AsyncClient, AsyncStrea
 from ._models import BaseModel
 from ._version import __title__, __version__
 from ._response import APIResponse as APIResponse, AsyncAPIResponse as AsyncAPIResponse
-from ._constants import DEFAULT_TIMEOUT, DEFAULT_MAX_RETRIES, DEFAULT_CONNECTION_LIMITS
+from ._constants import DEFAULT_TIMEOUT, DEFAULT_MAX_RETRIES, DEFAULT_CONNECTION_LIMITS, DEFAULT_HTTP2_CONNECTION_LIMITS
+from ._rerank_cache import RerankCache
+from ._json import JSONCodec
+from ._hooks import RequestHooks, RequestTimings
+from ._metrics import MetricsRegistry
+from ._http_cache import HTTPCache
+from ._tracing import RecordedSpan, SpanRecorder, get_tracer, set_tracer
+from ._compression import RequestCompression
+from ._rate_limiter import AdaptiveRateLimiter
+from ._retry_policy import RetryBudget, RetryPolicy
 from ._exceptions import (
     APIError,
     ClientError,
@@ -64,9 +73,24 @@ __all__ = [
     "DEFAULT_TIMEOUT",
     "DEFAULT_MAX_RETRIES",
     "DEFAULT_CONNECTION_LIMITS",
+    "DEFAULT_HTTP2_CONNECTION_LIMITS",
     "DefaultHttpxClient",
     "DefaultAsyncHttpxClient",
     "DefaultAioHttpClient",
+    "RerankCache",
+    "RetryBudget",
+    "RetryPolicy",
+    "AdaptiveRateLimiter",
+    "JSONCodec",
+    "RequestCompression",
+    "RequestHooks",
+    "RequestTimings",
+    "MetricsRegistry",
+    "HTTPCache",
+    "RecordedSpan",
+    "SpanRecorder",
+    "get_tracer",
+    "set_tracer",
 ]
 
 if not _t.TYPE_CHECKING:
@@ -17,6 +17,9 @@ from typing import (
     Any,
     Dict,
     Type,
+    Hashable,
+    Callable,
+    ClassVar,
     Union,
     Generic,
     Mapping,
@@ -24,6 +27,7 @@ from typing import (
     Iterable,
     Iterator,
     Optional,
+    Sequence,
     Generator,
     AsyncIterator,
     cast,
@@ -59,6 +63,7 @@ from ._types import (
     ModelBuilderProtocol,
 )
 from ._utils import is_dict, is_list, asyncify, is_given, lru_cache, is_mapping
+from ._utils._transform import take_transform_time
 from ._compat import PYDANTIC_V2, model_copy, model_dump
 from ._models import GenericModel, FinalRequestOptions, validate_type, construct_type
 from ._response import (
@@ -75,8 +80,18 @@ from ._constants import (
     RAW_RESPONSE_HEADER,
     OVERRIDE_CAST_TO_HEADER,
     DEFAULT_CONNECTION_LIMITS,
+    DEFAULT_HTTP2_CONNECTION_LIMITS,
 )
 from ._streaming import Stream, SSEDecoder, AsyncStream, SSEBytesDecoder
+from ._json import JSONCodec, get_json_codec
+from ._hooks import RequestHooks, RequestTimings
+from ._metrics import MetricsRegistry
+from ._http_cache import HTTPCache, CacheLookup
+from ._coalescing import SingleFlight, AsyncSingleFlight, request_key, share_response
+from ._tracing import trace_request, current_request_span
+from ._compression import RequestCompression
+from ._rate_limiter import AdaptiveRateLimiter
+from ._retry_policy import RetryPolicy, RetryState
 from ._exceptions import (
     APIStatusError,
     APITimeoutError,
@@ -92,6 +107,7 @@ AsyncPageT = TypeVar("AsyncPageT", bound="BaseAsyncPage[Any]")
 
 
 _T = TypeVar("_T")
+_ExceptionT = TypeVar("_ExceptionT", bound=Exception)
 _T_co = TypeVar("_T_co", covariant=True)
 
 _StreamT = TypeVar("_StreamT", bound=Stream[Any])
@@ -355,16 +371,29 @@ class BaseAsyncPage(BasePage[_T], Generic[_T]):
 _HttpxClientT = TypeVar("_HttpxClientT", bound=Union[httpx.Client, httpx.AsyncClient])
 _DefaultStreamT = TypeVar("_DefaultStreamT", bound=Union[Stream[Any], AsyncStream[Any]])
 
+# upper bound on the merged request URLs each client keeps around
+_MAX_PREPARED_URLS = 256
+
 
 class BaseClient(Generic[_HttpxClientT, _DefaultStreamT]):
     _client: _HttpxClientT
     _version: str
     _base_url: URL
     max_retries: int
+    retry_policy: RetryPolicy | None
+    rate_limiter: AdaptiveRateLimiter | None
+    json_codec: JSONCodec
+    compression: RequestCompression | None
+    hooks: tuple[RequestHooks, ...]
+    metrics_registry: MetricsRegistry | None
+    coalesce_requests: bool
+    http_cache: HTTPCache | None
     timeout: Union[float, Timeout, None]
     _strict_response_validation: bool
     _idempotency_header: str | None
     _default_stream_cls: type[_DefaultStreamT] | None = None
+    # attributes `default_headers` is built from; assigning one of them drops the cached default headers
+    _default_headers_attributes: ClassVar[frozenset[str]] = frozenset({"_custom_headers"})
 
     def __init__(
         self,
@@ -376,10 +405,31 @@ class BaseClient(Generic[_HttpxClientT, _DefaultStreamT]):
         timeout: float | Timeout | None = DEFAULT_TIMEOUT,
         custom_headers: Mapping[str, str] | None = None,
         custom_query: Mapping[str, object] | None = None,
+        retry_policy: RetryPolicy | None = None,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+        json_codec: str | JSONCodec = "json",
+        compression: RequestCompression | None = None,
+        hooks: Sequence[RequestHooks] | None = None,
+        metrics_registry: MetricsRegistry | None = None,
+        coalesce_requests: bool = True,
+        http_cache: HTTPCache | None = None,
     ) -> None:
         self._version = version
+        # request state that only depends on the client's configuration, reused across requests
+        self._prepared_urls: dict[str, URL] = {}
+        self._default_headers_cache: httpx.Headers | None = None
         self._base_url = self._enforce_trailing_slash(URL(base_url))
         self.max_retries = max_retries
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.json_codec = get_json_codec(json_codec)
+        self.compression = compression
+        self.hooks = tuple(hooks) if hooks else ()
+        self.metrics_registry = metrics_registry
+        if metrics_registry is not None:
+            metrics_registry._track_client(self)
+        self.coalesce_requests = coalesce_requests
+        self.http_cache = http_cache
         self.timeout = timeout
         self._custom_headers = custom_headers or {}
         self._custom_query = custom_query or {}
@@ -430,11 +480,14 @@ class BaseClient(Generic[_HttpxClientT, _DefaultStreamT]):
 
     def _build_headers(self, options: FinalRequestOptions, *, retries_taken: int = 0) -> httpx.Headers:
         custom_headers = options.headers or {}
-        headers_dict = _merge_mappings(self.default_headers, custom_headers)
-        self._validate_headers(headers_dict, custom_headers)
+        if custom_headers:
+            headers_dict = _merge_mappings(self.default_headers, custom_headers)
+            self._validate_headers(headers_dict, custom_headers)
 
-        # headers are case-insensitive while dictionaries are not.
-        headers = httpx.Headers(headers_dict)
+            # headers are case-insensitive while dictionaries are not.
+            headers = httpx.Headers(headers_dict)
+        else:
+            headers = self._build_default_headers().copy()
 
         idempotency_header = self._idempotency_header
         if idempotency_header and options.idempotency_key and idempotency_header not in headers:
@@ -442,7 +495,7 @@ class BaseClient(Generic[_HttpxClientT, _DefaultStreamT]):
 
         # Don't set these headers if they were already set or removed by the caller. We check
         # `custom_headers`, which can contain `Omit()`, instead of `headers` to account for the removal case.
-        lower_custom_headers = [header.lower() for header in custom_headers]
+        lower_custom_headers = [header.lower() for header in custom_headers] if custom_headers else []
         if "x-stainless-retry-count" not in lower_custom_headers:
             headers["x-stainless-retry-count"] = str(retries_taken)
         if "x-stainless-read-timeout" not in lower_custom_headers:
@@ -454,18 +507,137 @@ class BaseClient(Generic[_HttpxClientT, _DefaultStreamT]):
 
         return headers
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in self._default_headers_attributes:
+            self.__dict__["_default_headers_cache"] = None
+
+    def _build_default_headers(self) -> httpx.Headers:
+        """The validated `default_headers`, built once and again after one of `_default_headers_attributes` is assigned.
+
+        The returned headers are shared between requests and must not be mutated. Subclasses whose
+        `default_headers` depend on other attributes add them to `_default_headers_attributes`.
+        """
+        headers = self._default_headers_cache
+        if headers is None:
+            headers_dict = _merge_mappings(self.default_headers, {})
+            self._validate_headers(headers_dict, {})
+            headers = self._default_headers_cache = httpx.Headers(headers_dict)
+        return headers
+
+    def _run_hooks(self, name: str, *args: Any, **kwargs: Any) -> None:
+        hooks: tuple[RequestHooks, ...] = self.hooks
+        if self.metrics_registry is not None:
+            hooks = (*hooks, self.metrics_registry)
+        request_span = current_request_span()
+        if request_span is not None:
+            hooks = (*hooks, request_span)
+        for hook in hooks:
+            try:
+                getattr(hook, name)(*args, **kwargs)
+            except Exception:
+                log.exception("Request hook %r raised in %s", hook, name)
+
+    def _request_failed(
+        self, error: _ExceptionT, *, request: httpx.Request, timings: RequestTimings, retries_taken: int
+    ) -> _ExceptionT:
+        """Runs the `on_error` hooks for an error that is about to be raised and returns it."""
+        timings._finish()
+        self._run_hooks("on_error", request, error, timings=timings, retries_taken=retries_taken)
+        return error
+
+    def _request_succeeded(self, response: httpx.Response, *, timings: RequestTimings, retries_taken: int) -> None:
+        timings._finish()
+        self._run_hooks("on_response", response, timings=timings, retries_taken=retries_taken)
+
+    def _lookup_http_cache(self, request: httpx.Request, *, stream: bool) -> CacheLookup | None:
+        if self.http_cache is None or stream or request.method != "GET":
+            return None
+        return self.http_cache._lookup(request)
+
+    def _cache_response(
+        self, request: httpx.Request, response: httpx.Response, lookup: CacheLookup | None
+    ) -> httpx.Response:
+        """Stores the response to a looked up GET request; a successful change drops the related cached responses."""
+        if self.http_cache is None:
+            return response
+        if lookup is not None:
+            return self.http_cache._store(lookup, response)
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.is_success:
+            self.http_cache.invalidate(request.url.path)
+        return response
+
+    def _coalescing_key(self, request: httpx.Request, kwargs: HttpxSendArgs, *, stream: bool) -> Hashable | None:
+        """Concurrent GET requests with the same key share one response; `None` if the request is sent on its own."""
+        if not self.coalesce_requests or stream or request.method != "GET":
+            return None
+        # a request only waits for one with the same timeouts, never longer than it would take itself
+        timeout = request.extensions.get("timeout")
+        timeout_key = tuple(sorted(timeout.items())) if isinstance(timeout, dict) else timeout
+        return (request_key(request), kwargs.get("follow_redirects"), timeout_key)
+
+    def _coalescing_timeout(self, request: httpx.Request) -> float | None:
+        """How long a request waits for an identical one before sending itself: the sum of its own timeouts.
+
+        That is as long as the request could take to get a connection, send itself and start reading the
+        response; `None`, waiting as long as it takes, if any of its timeouts is disabled.
+        """
+        timeout = request.extensions.get("timeout")
+        if not isinstance(timeout, dict):
+            return None
+        seconds = list(timeout.values())
+        if None in seconds:
+            return None
+        return float(sum(seconds))
+
+    def _attempt_waiter(self, start: Callable[[], None], timings: RequestTimings) -> Callable[[], None]:
+        """Returns the `on_wait` callback of an attempt waiting for an identical request's response."""
+
+        def wait() -> None:
+            start()
+            timings.coalesced = True
+
+        return wait
+
+    def _attempt_starter(
+        self, request: httpx.Request, timings: RequestTimings, *, retries_taken: int, is_async: bool
+    ) -> Callable[[], None]:
+        """Returns a function running the `on_request` hooks and starting the timings of an attempt, once."""
+        started = False
+
+        def start() -> None:
+            nonlocal started
+            if started:
+                return
+            started = True
+            self._run_hooks("on_request", request, retries_taken=retries_taken)
+            log.debug("Sending HTTP Request: %s %s", request.method, request.url)
+            timings._start_send(request, is_async=is_async)
+
+        return start
+
     def _prepare_url(self, url: str) -> URL:
         """
         Merge a URL argument together with any 'base_url' on the client,
         to create the URL used for the outgoing request.
         """
+        prepared_url = self._prepared_urls.get(url)
+        if prepared_url is not None:
+            return prepared_url
+
         # Copied from httpx's `_merge_url` method.
         merge_url = URL(url)
         if merge_url.is_relative_url:
             merge_raw_path = self.base_url.raw_path + merge_url.raw_path.lstrip(b"/")
-            return self.base_url.copy_with(raw_path=merge_raw_path)
+            prepared_url = self.base_url.copy_with(raw_path=merge_raw_path)
+        else:
+            prepared_url = merge_url
 
-        return merge_url
+        # URLs embedding resource IDs are unbounded, so start over once the cache is full
+        if len(self._prepared_urls) >= _MAX_PREPARED_URLS:
+            self._prepared_urls.clear()
+        self._prepared_urls[url] = prepared_url
+        return prepared_url
 
     def _make_sse_decoder(self) -> SSEDecoder | SSEBytesDecoder:
         return SSEDecoder()
@@ -475,6 +647,7 @@ class BaseClient(Generic[_HttpxClientT, _DefaultStreamT]):
         options: FinalRequestOptions,
         *,
         retries_taken: int = 0,
+        body_cache: dict[str, bytes] | None = None,
     ) -> httpx.Request:
         if log.isEnabledFor(logging.DEBUG):
             log.debug("Request options: %s", model_dump(options, exclude_unset=True))
@@ -532,7 +705,10 @@ class BaseClient(Generic[_HttpxClientT, _DefaultStreamT]):
         is_body_allowed = options.method.lower() != "get"
 
         if is_body_allowed:
-            kwargs["json"] = json_data if is_given(json_data) else None
+            if not files and is_given(json_data) and json_data is not None:
+                kwargs["content"] = self._encode_json_body(json_data, headers, body_cache)
+            else:
+                kwargs["json"] = json_data if is_given(json_data) else None
             kwargs["files"] = files
         else:
             headers.pop("Content-Type", None)
@@ -552,6 +728,26 @@ class BaseClient(Generic[_HttpxClientT, _DefaultStreamT]):
             **kwargs,
         )
 
+    def _encode_json_body(self, json_data: Body, headers: httpx.Headers, body_cache: dict[str, bytes] | None) -> bytes:
+        """Encodes a JSON request body with `json_codec` and compresses it if `compression` applies.
+
+        Given a `body_cache` shared by the retries of a request, the body is only encoded and
+        compressed once.
+        """
+        cache = body_cache if body_cache is not None else {}
+        content = cache.get("json")
+        if content is None:
+            content = cache["json"] = self.json_codec.dumps(json_data)
+
+        compression = self.compression
+        if compression is None or "Content-Encoding" in headers or not compression.should_compress(content):
+            return content
+        compressed = cache.get(compression.content_encoding)
+        if compressed is None:
+            compressed = cache[compression.content_encoding] = compression.compress(content)
+        headers["Content-Encoding"] = compression.content_encoding
+        return compressed
+
     def _serialize_multipartform(self, data: Mapping[object, object]) -> dict[str, object]:
         items = self.qs.stringify_items(
             # TODO: type ignore is required as stringify_items is well typed but we can't be
@@ -677,6 +873,7 @@ class BaseClient(Generic[_HttpxClientT, _DefaultStreamT]):
     @base_url.setter
     def base_url(self, url: URL | str) -> None:
         self._base_url = self._enforce_trailing_slash(url if isinstance(url, URL) else URL(url))
+        self._prepared_urls.clear()
 
     def platform_headers(self) -> Dict[str, str]:
         # the actual implementation is in a separate `lru_cache` decorated
@@ -742,6 +939,33 @@ class BaseClient(Generic[_HttpxClientT, _DefaultStreamT]):
         timeout = sleep_seconds * jitter
         return timeout if timeout >= 0 else 0
 
+    def _next_retry_timeout(
+        self,
+        retry_state: RetryState | None,
+        remaining_retries: int,
+        options: FinalRequestOptions,
+        response: httpx.Response | None,
+    ) -> float | None:
+        """Returns the seconds to wait before retrying, or None if the `retry_policy` refuses the retry."""
+        response_headers = response.headers if response else None
+        if retry_state is None:
+            return self._calculate_retry_timeout(remaining_retries, options, response_headers)
+        return retry_state.next_delay(self._parse_retry_after_header(response_headers))
+
+    def _rate_limit_key(self, options: FinalRequestOptions) -> str | None:
+        if self.rate_limiter is None:
+            return None
+        return self.rate_limiter.endpoint_key(options.method, options.url)
+
+    def _record_rate_limit(self, rate_limit_key: str | None, response: httpx.Response) -> None:
+        """Feeds the outcome of a request back into the `rate_limiter`."""
+        if rate_limit_key is None or self.rate_limiter is None:
+            return
+        if response.status_code == 429:
+            self.rate_limiter.on_throttle(rate_limit_key, self._parse_retry_after_header(response.headers))
+        elif response.is_success:
+            self.rate_limiter.on_success(rate_limit_key)
+
     def _should_retry(self, response: httpx.Response) -> bool:
         # Note: this is not a standard header
         should_retry_header = response.headers.get("x-should-retry")
@@ -784,7 +1008,7 @@ class BaseClient(Generic[_HttpxClientT, _DefaultStreamT]):
 class _DefaultHttpxClient(httpx.Client):
     def __init__(self, **kwargs: Any) -> None:
         kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
-        kwargs.setdefault("limits", DEFAULT_CONNECTION_LIMITS)
+        kwargs.setdefault("limits", DEFAULT_HTTP2_CONNECTION_LIMITS if kwargs.get("http2") else DEFAULT_CONNECTION_LIMITS)
         kwargs.setdefault("follow_redirects", True)
         super().__init__(**kwargs)
 
@@ -826,6 +1050,15 @@ class SyncAPIClient(BaseClient[httpx.Client, Stream[Any]]):
         http_client: httpx.Client | None = None,
         custom_headers: Mapping[str, str] | None = None,
         custom_query: Mapping[str, object] | None = None,
+        retry_policy: RetryPolicy | None = None,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+        json_codec: str | JSONCodec = "json",
+        compression: RequestCompression | None = None,
+        http2: bool = False,
+        hooks: Sequence[RequestHooks] | None = None,
+        metrics_registry: MetricsRegistry | None = None,
+        coalesce_requests: bool = True,
+        http_cache: HTTPCache | None = None,
         _strict_response_validation: bool,
     ) -> None:
         if not is_given(timeout):
@@ -854,12 +1087,24 @@ class SyncAPIClient(BaseClient[httpx.Client, Stream[Any]]):
             max_retries=max_retries,
             custom_query=custom_query,
             custom_headers=custom_headers,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            json_codec=json_codec,
+            compression=compression,
+            hooks=hooks,
+            metrics_registry=metrics_registry,
+            coalesce_requests=coalesce_requests,
+            http_cache=http_cache,
             _strict_response_validation=_strict_response_validation,
         )
+        # `http2` only configures the default client; a custom `http_client` brings its own protocol settings
+        self.http2 = http2
+        self._single_flight = SingleFlight()
         self._client = http_client or SyncHttpxClientWrapper(
             base_url=base_url,
             # cast to a valid type because mypy doesn't understand our type narrowing
             timeout=cast(Timeout, timeout),
+            http2=http2,
         )
 
     def is_closed(self) -> bool:
@@ -940,6 +1185,17 @@ class SyncAPIClient(BaseClient[httpx.Client, Stream[Any]]):
         *,
         stream: bool = False,
         stream_cls: type[_StreamT] | None = None,
+    ) -> ResponseT | _StreamT:
+        with trace_request(options.method, options.url):
+            return self._request(cast_to, options, stream=stream, stream_cls=stream_cls)
+
+    def _request(
+        self,
+        cast_to: Type[ResponseT],
+        options: FinalRequestOptions,
+        *,
+        stream: bool,
+        stream_cls: type[_StreamT] | None,
     ) -> ResponseT | _StreamT:
         cast_to = self._maybe_override_cast_to(cast_to, options)
 
@@ -953,14 +1209,22 @@ class SyncAPIClient(BaseClient[httpx.Client, Stream[Any]]):
 
         response: httpx.Response | None = None
         max_retries = input_options.get_max_retries(self.max_retries)
+        retry_state = self.retry_policy.start() if self.retry_policy is not None else None
+        body_cache: dict[str, bytes] = {}
+
+        # a fresh copy per attempt is only needed when a `_prepare_options()` override may mutate it
+        copy_options = type(self)._prepare_options is not SyncAPIClient._prepare_options
+
+        timings = RequestTimings(transform=take_transform_time())
 
         retries_taken = 0
         for retries_taken in range(max_retries + 1):
-            options = model_copy(input_options)
-            options = self._prepare_options(options)
+            options = self._prepare_options(model_copy(input_options) if copy_options else input_options)
 
             remaining_retries = max_retries - retries_taken
-            request = self._build_request(options, retries_taken=retries_taken)
+            serialize_started = time.perf_counter()
+            request = self._build_request(options, retries_taken=retries_taken, body_cache=body_cache)
+            timings._add_serialize(time.perf_counter() - serialize_started)
             self._prepare_request(request)
 
             kwargs: HttpxSendArgs = {}
@@ -970,65 +1234,95 @@ class SyncAPIClient(BaseClient[httpx.Client, Stream[Any]]):
             if options.follow_redirects is not None:
                 kwargs["follow_redirects"] = options.follow_redirects
 
-            log.debug("Sending HTTP Request: %s %s", request.method, request.url)
-
             response = None
             try:
-                response = self._client.send(
+                response = self._send_request(
                     request,
+                    kwargs,
+                    options=options,
                     stream=stream or self._should_stream_response_body(request=request),
-                    **kwargs,
+                    timings=timings,
+                    retries_taken=retries_taken,
                 )
             except httpx.TimeoutException as err:
+                timings._finish_send()
                 log.debug("Encountered httpx.TimeoutException", exc_info=True)
 
-                if remaining_retries > 0:
+                timeout = (
+                    self._next_retry_timeout(retry_state, remaining_retries, input_options, None)
+                    if remaining_retries > 0
+                    else None
+                )
+                if timeout is not None:
                     self._sleep_for_retry(
                         retries_taken=retries_taken,
                         max_retries=max_retries,
                         options=input_options,
-                        response=None,
+                        timeout=timeout,
+                        request=request,
+                        error=err,
                     )
                     continue
 
                 log.debug("Raising timeout error")
-                raise APITimeoutError(request=request) from err
+                raise self._request_failed(
+                    APITimeoutError(request=request), request=request, timings=timings, retries_taken=retries_taken
+                ) from err
             except Exception as err:
+                timings._finish_send()
                 log.debug("Encountered Exception", exc_info=True)
 
-                if remaining_retries > 0:
+                timeout = (
+                    self._next_retry_timeout(retry_state, remaining_retries, input_options, None)
+                    if remaining_retries > 0
+                    else None
+                )
+                if timeout is not None:
                     self._sleep_for_retry(
                         retries_taken=retries_taken,
                         max_retries=max_retries,
                         options=input_options,
-                        response=None,
+                        timeout=timeout,
+                        request=request,
+                        error=err,
                     )
                     continue
 
                 log.debug("Raising connection error")
-                raise APIConnectionError(request=request) from err
-
-            log.debug(
-                'HTTP Response: %s %s "%i %s" %s',
-                request.method,
-                request.url,
-                response.status_code,
-                response.reason_phrase,
-                response.headers,
-            )
+                raise self._request_failed(
+                    APIConnectionError(request=request), request=request, timings=timings, retries_taken=retries_taken
+                ) from err
+
+            timings._finish_send()
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(
+                    'HTTP Response: %s %s "%i %s" %s',
+                    request.method,
+                    request.url,
+                    response.status_code,
+                    response.reason_phrase,
+                    response.headers,
+                )
 
             try:
                 response.raise_for_status()
             except httpx.HTTPStatusError as err:  # thrown on 4xx and 5xx status code
                 log.debug("Encountered httpx.HTTPStatusError", exc_info=True)
 
-                if remaining_retries > 0 and self._should_retry(err.response):
+                timeout = (
+                    self._next_retry_timeout(retry_state, remaining_retries, input_options, response)
+                    if remaining_retries > 0 and self._should_retry(err.response)
+                    else None
+                )
+                if timeout is not None:
                     err.response.close()
                     self._sleep_for_retry(
                         retries_taken=retries_taken,
                         max_retries=max_retries,
                         options=input_options,
-                        response=response,
+                        timeout=timeout,
+                        request=request,
+                        response=err.response,
                     )
                     continue
 
@@ -1038,7 +1332,12 @@ class SyncAPIClient(BaseClient[httpx.Client, Stream[Any]]):
                     err.response.read()
 
                 log.debug("Re-raising status error")
-                raise self._make_status_error_from_response(err.response) from None
+                raise self._request_failed(
+                    self._make_status_error_from_response(err.response),
+                    request=request,
+                    timings=timings,
+                    retries_taken=retries_taken,
+                ) from None
 
             break
 
@@ -1050,10 +1349,68 @@ class SyncAPIClient(BaseClient[httpx.Client, Stream[Any]]):
             stream=stream,
             stream_cls=stream_cls,
             retries_taken=retries_taken,
+            timings=timings,
         )
 
+    def _send_request(
+        self,
+        request: httpx.Request,
+        kwargs: HttpxSendArgs,
+        *,
+        options: FinalRequestOptions,
+        stream: bool,
+        timings: RequestTimings,
+        retries_taken: int,
+    ) -> httpx.Response:
+        """Sends one attempt of a request.
+
+        Fresh responses in the `http_cache` are returned without sending anything, and concurrent identical
+        GETs share one response, unless waiting for it takes longer than the request's own timeouts allow.
+        Only the attempts that are actually sent count against the `rate_limiter`.
+        """
+        start = self._attempt_starter(request, timings, retries_taken=retries_taken, is_async=False)
+        lookup = self._lookup_http_cache(request, stream=stream)
+        if lookup is not None and lookup.response is not None:
+            start()
+            return lookup.response
+
+        def send() -> httpx.Response:
+            rate_limit_key = self._wait_for_rate_limit(options)
+            start()
+            # also when a waiting request gave up and sends itself
+            timings.coalesced = False
+            response = self._client.send(request, stream=stream, **kwargs)
+            self._record_rate_limit(rate_limit_key, response)
+            return self._cache_response(request, response, lookup)
+
+        key = self._coalescing_key(request, kwargs, stream=stream)
+        if key is None:
+            return send()
+        response = self._single_flight.do(
+            key, send, on_wait=self._attempt_waiter(start, timings), timeout=self._coalescing_timeout(request)
+        )
+        return share_response(response, request)
+
+    def _wait_for_rate_limit(self, options: FinalRequestOptions) -> str | None:
+        """Waits until the `rate_limiter` lets the request through; returns its rate limit key."""
+        rate_limit_key = self._rate_limit_key(options)
+        if rate_limit_key is not None:
+            delay = self.rate_limiter.reserve(rate_limit_key)  # type: ignore[union-attr]
+            if delay > 0:
+                log.debug("Rate limiting request to %s for %f seconds", options.url, delay)
+                time.sleep(delay)
+        return rate_limit_key
+
     def _sleep_for_retry(
-        self, *, retries_taken: int, max_retries: int, options: FinalRequestOptions, response: httpx.Response | None
+        self,
+        *,
+        retries_taken: int,
+        max_retries: int,
+        options: FinalRequestOptions,
+        timeout: float,
+        request: httpx.Request,
+        response: httpx.Response | None = None,
+        error: Exception | None = None,
     ) -> None:
         remaining_retries = max_retries - retries_taken
         if remaining_retries == 1:
@@ -1061,8 +1418,10 @@ class SyncAPIClient(BaseClient[httpx.Client, Stream[Any]]):
         else:
             log.debug("%i retries left", remaining_retries)
 
-        timeout = self._calculate_retry_timeout(remaining_retries, options, response.headers if response else None)
         log.info("Retrying request to %s in %f seconds", options.url, timeout)
+        self._run_hooks(
+            "on_retry", request, retries_taken=retries_taken, delay=timeout, response=response, error=error
+        )
 
         time.sleep(timeout)
 
@@ -1075,7 +1434,10 @@ class SyncAPIClient(BaseClient[httpx.Client, Stream[Any]]):
         stream: bool,
         stream_cls: type[Stream[Any]] | type[AsyncStream[Any]] | None,
         retries_taken: int = 0,
+        timings: RequestTimings | None = None,
     ) -> ResponseT:
+        if timings is None:
+            timings = RequestTimings()
         origin = get_origin(cast_to) or cast_to
 
         if (
@@ -1090,6 +1452,7 @@ class SyncAPIClient(BaseClient[httpx.Client, Stream[Any]]):
                 raise TypeError(f"API Response types must subclass {APIResponse}; Received {origin}")
 
             response_cls = cast("type[BaseAPIResponse[Any]]", cast_to)
+            self._request_succeeded(response, timings=timings, retries_taken=retries_taken)
             return cast(
                 ResponseT,
                 response_cls(
@@ -1100,10 +1463,12 @@ class SyncAPIClient(BaseClient[httpx.Client, Stream[Any]]):
                     stream_cls=stream_cls,
                     options=options,
                     retries_taken=retries_taken,
+                    timings=timings,
                 ),
             )
 
         if cast_to == httpx.Response:
+            self._request_succeeded(response, timings=timings, retries_taken=retries_taken)
             return cast(ResponseT, response)
 
         api_response = APIResponse(
@@ -1114,11 +1479,15 @@ class SyncAPIClient(BaseClient[httpx.Client, Stream[Any]]):
             stream_cls=stream_cls,
             options=options,
             retries_taken=retries_taken,
+            timings=timings,
         )
         if bool(response.request.headers.get(RAW_RESPONSE_HEADER)):
+            self._request_succeeded(response, timings=timings, retries_taken=retries_taken)
             return cast(ResponseT, api_response)
 
-        return api_response.parse()
+        parsed = api_response.parse()
+        self._request_succeeded(response, timings=timings, retries_taken=retries_taken)
+        return parsed
 
     def _request_api_list(
         self,
@@ -1291,7 +1660,7 @@ class SyncAPIClient(BaseClient[httpx.Client, Stream[Any]]):
 class _DefaultAsyncHttpxClient(httpx.AsyncClient):
     def __init__(self, **kwargs: Any) -> None:
         kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
-        kwargs.setdefault("limits", DEFAULT_CONNECTION_LIMITS)
+        kwargs.setdefault("limits", DEFAULT_HTTP2_CONNECTION_LIMITS if kwargs.get("http2") else DEFAULT_CONNECTION_LIMITS)
         kwargs.setdefault("follow_redirects", True)
         super().__init__(**kwargs)
 
@@ -1357,6 +1726,15 @@ class AsyncAPIClient(BaseClient[httpx.AsyncClient, AsyncStream[Any]]):
         http_client: httpx.AsyncClient | None = None,
         custom_headers: Mapping[str, str] | None = None,
         custom_query: Mapping[str, object] | None = None,
+        retry_policy: RetryPolicy | None = None,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+        json_codec: str | JSONCodec = "json",
+        compression: RequestCompression | None = None,
+        http2: bool = False,
+        hooks: Sequence[RequestHooks] | None = None,
+        metrics_registry: MetricsRegistry | None = None,
+        coalesce_requests: bool = True,
+        http_cache: HTTPCache | None = None,
     ) -> None:
         if not is_given(timeout):
             # if the user passed in a custom http client with a non-default
@@ -1384,12 +1762,24 @@ class AsyncAPIClient(BaseClient[httpx.AsyncClient, AsyncStream[Any]]):
             max_retries=max_retries,
             custom_query=custom_query,
             custom_headers=custom_headers,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            json_codec=json_codec,
+            compression=compression,
+            hooks=hooks,
+            metrics_registry=metrics_registry,
+            coalesce_requests=coalesce_requests,
+            http_cache=http_cache,
             _strict_response_validation=_strict_response_validation,
         )
+        # `http2` only configures the default client; a custom `http_client` brings its own protocol settings
+        self.http2 = http2
+        self._single_flight = AsyncSingleFlight()
         self._client = http_client or AsyncHttpxClientWrapper(
             base_url=base_url,
             # cast to a valid type because mypy doesn't understand our type narrowing
             timeout=cast(Timeout, timeout),
+            http2=http2,
         )
 
     def is_closed(self) -> bool:
@@ -1467,6 +1857,17 @@ class AsyncAPIClient(BaseClient[httpx.AsyncClient, AsyncStream[Any]]):
         *,
         stream: bool = False,
         stream_cls: type[_AsyncStreamT] | None = None,
+    ) -> ResponseT | _AsyncStreamT:
+        with trace_request(options.method, options.url):
+            return await self._request(cast_to, options, stream=stream, stream_cls=stream_cls)
+
+    async def _request(
+        self,
+        cast_to: Type[ResponseT],
+        options: FinalRequestOptions,
+        *,
+        stream: bool,
+        stream_cls: type[_AsyncStreamT] | None,
     ) -> ResponseT | _AsyncStreamT:
         if self._platform is None:
             # `get_platform` can make blocking IO calls so we
@@ -1485,14 +1886,22 @@ class AsyncAPIClient(BaseClient[httpx.AsyncClient, AsyncStream[Any]]):
 
         response: httpx.Response | None = None
         max_retries = input_options.get_max_retries(self.max_retries)
+        retry_state = self.retry_policy.start() if self.retry_policy is not None else None
+        body_cache: dict[str, bytes] = {}
+
+        # a fresh copy per attempt is only needed when a `_prepare_options()` override may mutate it
+        copy_options = type(self)._prepare_options is not AsyncAPIClient._prepare_options
+
+        timings = RequestTimings(transform=take_transform_time())
 
         retries_taken = 0
         for retries_taken in range(max_retries + 1):
-            options = model_copy(input_options)
-            options = await self._prepare_options(options)
+            options = await self._prepare_options(model_copy(input_options) if copy_options else input_options)
 
             remaining_retries = max_retries - retries_taken
-            request = self._build_request(options, retries_taken=retries_taken)
+            serialize_started = time.perf_counter()
+            request = self._build_request(options, retries_taken=retries_taken, body_cache=body_cache)
+            timings._add_serialize(time.perf_counter() - serialize_started)
             await self._prepare_request(request)
 
             kwargs: HttpxSendArgs = {}
@@ -1502,65 +1911,95 @@ class AsyncAPIClient(BaseClient[httpx.AsyncClient, AsyncStream[Any]]):
             if options.follow_redirects is not None:
                 kwargs["follow_redirects"] = options.follow_redirects
 
-            log.debug("Sending HTTP Request: %s %s", request.method, request.url)
-
             response = None
             try:
-                response = await self._client.send(
+                response = await self._send_request(
                     request,
+                    kwargs,
+                    options=options,
                     stream=stream or self._should_stream_response_body(request=request),
-                    **kwargs,
+                    timings=timings,
+                    retries_taken=retries_taken,
                 )
             except httpx.TimeoutException as err:
+                timings._finish_send()
                 log.debug("Encountered httpx.TimeoutException", exc_info=True)
 
-                if remaining_retries > 0:
+                timeout = (
+                    self._next_retry_timeout(retry_state, remaining_retries, input_options, None)
+                    if remaining_retries > 0
+                    else None
+                )
+                if timeout is not None:
                     await self._sleep_for_retry(
                         retries_taken=retries_taken,
                         max_retries=max_retries,
                         options=input_options,
-                        response=None,
+                        timeout=timeout,
+                        request=request,
+                        error=err,
                     )
                     continue
 
                 log.debug("Raising timeout error")
-                raise APITimeoutError(request=request) from err
+                raise self._request_failed(
+                    APITimeoutError(request=request), request=request, timings=timings, retries_taken=retries_taken
+                ) from err
             except Exception as err:
+                timings._finish_send()
                 log.debug("Encountered Exception", exc_info=True)
 
-                if remaining_retries > 0:
+                timeout = (
+                    self._next_retry_timeout(retry_state, remaining_retries, input_options, None)
+                    if remaining_retries > 0
+                    else None
+                )
+                if timeout is not None:
                     await self._sleep_for_retry(
                         retries_taken=retries_taken,
                         max_retries=max_retries,
                         options=input_options,
-                        response=None,
+                        timeout=timeout,
+                        request=request,
+                        error=err,
                     )
                     continue
 
                 log.debug("Raising connection error")
-                raise APIConnectionError(request=request) from err
-
-            log.debug(
-                'HTTP Response: %s %s "%i %s" %s',
-                request.method,
-                request.url,
-                response.status_code,
-                response.reason_phrase,
-                response.headers,
-            )
+                raise self._request_failed(
+                    APIConnectionError(request=request), request=request, timings=timings, retries_taken=retries_taken
+                ) from err
+
+            timings._finish_send()
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(
+                    'HTTP Response: %s %s "%i %s" %s',
+                    request.method,
+                    request.url,
+                    response.status_code,
+                    response.reason_phrase,
+                    response.headers,
+                )
 
             try:
                 response.raise_for_status()
             except httpx.HTTPStatusError as err:  # thrown on 4xx and 5xx status code
                 log.debug("Encountered httpx.HTTPStatusError", exc_info=True)
 
-                if remaining_retries > 0 and self._should_retry(err.response):
+                timeout = (
+                    self._next_retry_timeout(retry_state, remaining_retries, input_options, response)
+                    if remaining_retries > 0 and self._should_retry(err.response)
+                    else None
+                )
+                if timeout is not None:
                     await err.response.aclose()
                     await self._sleep_for_retry(
                         retries_taken=retries_taken,
                         max_retries=max_retries,
                         options=input_options,
-                        response=response,
+                        timeout=timeout,
+                        request=request,
+                        response=err.response,
                     )
                     continue
 
@@ -1570,7 +2009,12 @@ class AsyncAPIClient(BaseClient[httpx.AsyncClient, AsyncStream[Any]]):
                     await err.response.aread()
 
                 log.debug("Re-raising status error")
-                raise self._make_status_error_from_response(err.response) from None
+                raise self._request_failed(
+                    self._make_status_error_from_response(err.response),
+                    request=request,
+                    timings=timings,
+                    retries_taken=retries_taken,
+                ) from None
 
             break
 
@@ -1582,10 +2026,68 @@ class AsyncAPIClient(BaseClient[httpx.AsyncClient, AsyncStream[Any]]):
             stream=stream,
             stream_cls=stream_cls,
             retries_taken=retries_taken,
+            timings=timings,
+        )
+
+    async def _send_request(
+        self,
+        request: httpx.Request,
+        kwargs: HttpxSendArgs,
+        *,
+        options: FinalRequestOptions,
+        stream: bool,
+        timings: RequestTimings,
+        retries_taken: int,
+    ) -> httpx.Response:
+        """Sends one attempt of a request.
+
+        Fresh responses in the `http_cache` are returned without sending anything, and concurrent identical
+        GETs share one response, unless waiting for it takes longer than the request's own timeouts allow.
+        Only the attempts that are actually sent count against the `rate_limiter`.
+        """
+        start = self._attempt_starter(request, timings, retries_taken=retries_taken, is_async=True)
+        lookup = self._lookup_http_cache(request, stream=stream)
+        if lookup is not None and lookup.response is not None:
+            start()
+            return lookup.response
+
+        async def send() -> httpx.Response:
+            rate_limit_key = await self._wait_for_rate_limit(options)
+            start()
+            # also when a waiting request gave up and sends itself
+            timings.coalesced = False
+            response = await self._client.send(request, stream=stream, **kwargs)
+            self._record_rate_limit(rate_limit_key, response)
+            return self._cache_response(request, response, lookup)
+
+        key = self._coalescing_key(request, kwargs, stream=stream)
+        if key is None:
+            return await send()
+        response = await self._single_flight.do(
+            key, send, on_wait=self._attempt_waiter(start, timings), timeout=self._coalescing_timeout(request)
         )
+        return share_response(response, request)
+
+    async def _wait_for_rate_limit(self, options: FinalRequestOptions) -> str | None:
+        """Waits until the `rate_limiter` lets the request through; returns its rate limit key."""
+        rate_limit_key = self._rate_limit_key(options)
+        if rate_limit_key is not None:
+            delay = self.rate_limiter.reserve(rate_limit_key)  # type: ignore[union-attr]
+            if delay > 0:
+                log.debug("Rate limiting request to %s for %f seconds", options.url, delay)
+                await anyio.sleep(delay)
+        return rate_limit_key
 
     async def _sleep_for_retry(
-        self, *, retries_taken: int, max_retries: int, options: FinalRequestOptions, response: httpx.Response | None
+        self,
+        *,
+        retries_taken: int,
+        max_retries: int,
+        options: FinalRequestOptions,
+        timeout: float,
+        request: httpx.Request,
+        response: httpx.Response | None = None,
+        error: Exception | None = None,
     ) -> None:
         remaining_retries = max_retries - retries_taken
         if remaining_retries == 1:
@@ -1593,8 +2095,10 @@ class AsyncAPIClient(BaseClient[httpx.AsyncClient, AsyncStream[Any]]):
         else:
             log.debug("%i retries left", remaining_retries)
 
-        timeout = self._calculate_retry_timeout(remaining_retries, options, response.headers if response else None)
         log.info("Retrying request to %s in %f seconds", options.url, timeout)
+        self._run_hooks(
+            "on_retry", request, retries_taken=retries_taken, delay=timeout, response=response, error=error
+        )
 
         await anyio.sleep(timeout)
 
@@ -1607,7 +2111,10 @@ class AsyncAPIClient(BaseClient[httpx.AsyncClient, AsyncStream[Any]]):
         stream: bool,
         stream_cls: type[Stream[Any]] | type[AsyncStream[Any]] | None,
         retries_taken: int = 0,
+        timings: RequestTimings | None = None,
     ) -> ResponseT:
+        if timings is None:
+            timings = RequestTimings()
         origin = get_origin(cast_to) or cast_to
 
         if (
@@ -1622,6 +2129,7 @@ class AsyncAPIClient(BaseClient[httpx.AsyncClient, AsyncStream[Any]]):
                 raise TypeError(f"API Response types must subclass {AsyncAPIResponse}; Received {origin}")
 
             response_cls = cast("type[BaseAPIResponse[Any]]", cast_to)
+            self._request_succeeded(response, timings=timings, retries_taken=retries_taken)
             return cast(
                 "ResponseT",
                 response_cls(
@@ -1632,10 +2140,12 @@ class AsyncAPIClient(BaseClient[httpx.AsyncClient, AsyncStream[Any]]):
                     stream_cls=stream_cls,
                     options=options,
                     retries_taken=retries_taken,
+                    timings=timings,
                 ),
             )
 
         if cast_to == httpx.Response:
+            self._request_succeeded(response, timings=timings, retries_taken=retries_taken)
             return cast(ResponseT, response)
 
         api_response = AsyncAPIResponse(
@@ -1646,11 +2156,15 @@ class AsyncAPIClient(BaseClient[httpx.AsyncClient, AsyncStream[Any]]):
             stream_cls=stream_cls,
             options=options,
             retries_taken=retries_taken,
+            timings=timings,
         )
         if bool(response.request.headers.get(RAW_RESPONSE_HEADER)):
+            self._request_succeeded(response, timings=timings, retries_taken=retries_taken)
             return cast(ResponseT, api_response)
 
-        return await api_response.parse()
+        parsed = await api_response.parse()
+        self._request_succeeded(response, timings=timings, retries_taken=retries_taken)
+        return parsed
 
     def _request_api_list(
         self,
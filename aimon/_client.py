@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Union, Mapping
+from typing import Any, Union, Mapping, Sequence
 from typing_extensions import Self, override
 
 import httpx
@@ -24,6 +24,14 @@ from ._version import __version__
 from .resources import users, models, analyze, metrics, inference, retrieval
 from ._streaming import Stream as Stream, AsyncStream as AsyncStream
 from ._exceptions import APIStatusError
+from ._rerank_cache import RerankCache
+from ._json import JSONCodec
+from ._hooks import RequestHooks
+from ._metrics import MetricsRegistry
+from ._http_cache import HTTPCache
+from ._compression import RequestCompression
+from ._rate_limiter import AdaptiveRateLimiter
+from ._retry_policy import RetryPolicy
 from ._base_client import (
     DEFAULT_MAX_RETRIES,
     SyncAPIClient,
@@ -51,6 +59,8 @@ class Client(SyncAPIClient):
 
     # client options
     auth_header: str
+    rerank_cache: RerankCache | None
+    _default_headers_attributes = SyncAPIClient._default_headers_attributes | {"auth_header"}
 
     def __init__(
         self,
@@ -65,6 +75,34 @@ class Client(SyncAPIClient):
         # We provide a `DefaultHttpxClient` class that you can pass to retain the default values we use for `limits`, `timeout` & `follow_redirects`.
         # See the [httpx documentation](https://www.python-httpx.org/api/#client) for more details.
         http_client: httpx.Client | None = None,
+        # Cache `retrieval.rerank()` scores so that only uncached documents are sent to the API.
+        rerank_cache: RerankCache | None = None,
+        # Decide retry delays and whether to retry at all, e.g. to share a retry budget and deadline
+        # with other clients. By default retries use exponential backoff up to `max_retries`.
+        retry_policy: RetryPolicy | None = None,
+        # Pace requests per endpoint, backing off on 429 responses. Shared by all resources of the client.
+        rate_limiter: AdaptiveRateLimiter | None = None,
+        # JSON library used for request and response bodies: "json" (standard library), "orjson", "msgspec",
+        # "auto" (orjson, then msgspec, if installed) or a `JSONCodec` instance. The faster libraries differ
+        # from the standard library on edge cases, e.g. they send NaN and Infinity as null.
+        json_codec: str | JSONCodec = "json",
+        # Compress large JSON request bodies, e.g. `RequestCompression("gzip", threshold=16384)`.
+        compression: RequestCompression | None = None,
+        # Multiplex concurrent requests over a few HTTP/2 connections, with as many concurrent streams
+        # per connection as the server allows (at most 100). Requires the `h2` package
+        # (`pip install aimon[http2]`) and only applies when no `http_client` is given.
+        http2: bool = False,
+        # Callbacks invoked around every request, e.g. to record metrics from their timings
+        hooks: Sequence[RequestHooks] | None = None,
+        # Count requests, retries, timeouts and bytes and record their latencies, exportable in the Prometheus
+        # text format. A registry can be shared by several clients.
+        metrics_registry: MetricsRegistry | None = None,
+        # Send concurrent identical GET requests once and share the response between the callers. Hooks still
+        # run for every caller; callers that shared a response have `timings.coalesced` set. A caller waits
+        # for the shared response at most as long as its own timeouts add up to, then sends its own request.
+        coalesce_requests: bool = True,
+        # Reuse GET responses for a while and revalidate them with conditional requests, e.g. `HTTPCache(ttl=60)`.
+        http_cache: HTTPCache | None = None,
         # Enable or disable schema validation for data returned by the API.
         # When enabled an error APIResponseValidationError is raised
         # if the API responds with invalid data for the expected schema.
@@ -77,6 +115,7 @@ class Client(SyncAPIClient):
     ) -> None:
         """Construct a new synchronous Client client instance."""
         self.auth_header = auth_header
+        self.rerank_cache = rerank_cache
 
         if base_url is None:
             base_url = os.environ.get("CLIENT_BASE_URL")
@@ -91,6 +130,15 @@ class Client(SyncAPIClient):
             http_client=http_client,
             custom_headers=default_headers,
             custom_query=default_query,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            json_codec=json_codec,
+            compression=compression,
+            http2=http2,
+            hooks=hooks,
+            metrics_registry=metrics_registry,
+            coalesce_requests=coalesce_requests,
+            http_cache=http_cache,
             _strict_response_validation=_strict_response_validation,
         )
 
@@ -138,6 +186,16 @@ class Client(SyncAPIClient):
         set_default_headers: Mapping[str, str] | None = None,
         default_query: Mapping[str, object] | None = None,
         set_default_query: Mapping[str, object] | None = None,
+        rerank_cache: RerankCache | None | NotGiven = NOT_GIVEN,
+        retry_policy: RetryPolicy | None | NotGiven = NOT_GIVEN,
+        rate_limiter: AdaptiveRateLimiter | None | NotGiven = NOT_GIVEN,
+        json_codec: str | JSONCodec | NotGiven = NOT_GIVEN,
+        compression: RequestCompression | None | NotGiven = NOT_GIVEN,
+        http2: bool | NotGiven = NOT_GIVEN,
+        hooks: Sequence[RequestHooks] | None | NotGiven = NOT_GIVEN,
+        metrics_registry: MetricsRegistry | None | NotGiven = NOT_GIVEN,
+        coalesce_requests: bool | NotGiven = NOT_GIVEN,
+        http_cache: HTTPCache | None | NotGiven = NOT_GIVEN,
         _extra_kwargs: Mapping[str, Any] = {},
     ) -> Self:
         """
@@ -170,6 +228,16 @@ class Client(SyncAPIClient):
             max_retries=max_retries if is_given(max_retries) else self.max_retries,
             default_headers=headers,
             default_query=params,
+            rerank_cache=rerank_cache if is_given(rerank_cache) else self.rerank_cache,
+            retry_policy=retry_policy if is_given(retry_policy) else self.retry_policy,
+            rate_limiter=rate_limiter if is_given(rate_limiter) else self.rate_limiter,
+            json_codec=json_codec if is_given(json_codec) else self.json_codec,
+            compression=compression if is_given(compression) else self.compression,
+            http2=http2 if is_given(http2) else self.http2,
+            hooks=hooks if is_given(hooks) else self.hooks,
+            metrics_registry=metrics_registry if is_given(metrics_registry) else self.metrics_registry,
+            coalesce_requests=coalesce_requests if is_given(coalesce_requests) else self.coalesce_requests,
+            http_cache=http_cache if is_given(http_cache) else self.http_cache,
             **_extra_kwargs,
         )
 
@@ -226,6 +294,8 @@ class AsyncClient(AsyncAPIClient):
 
     # client options
     auth_header: str
+    rerank_cache: RerankCache | None
+    _default_headers_attributes = AsyncAPIClient._default_headers_attributes | {"auth_header"}
 
     def __init__(
         self,
@@ -240,6 +310,34 @@ class AsyncClient(AsyncAPIClient):
         # We provide a `DefaultAsyncHttpxClient` class that you can pass to retain the default values we use for `limits`, `timeout` & `follow_redirects`.
         # See the [httpx documentation](https://www.python-httpx.org/api/#asyncclient) for more details.
         http_client: httpx.AsyncClient | None = None,
+        # Cache `retrieval.rerank()` scores so that only uncached documents are sent to the API.
+        rerank_cache: RerankCache | None = None,
+        # Decide retry delays and whether to retry at all, e.g. to share a retry budget and deadline
+        # with other clients. By default retries use exponential backoff up to `max_retries`.
+        retry_policy: RetryPolicy | None = None,
+        # Pace requests per endpoint, backing off on 429 responses. Shared by all resources of the client.
+        rate_limiter: AdaptiveRateLimiter | None = None,
+        # JSON library used for request and response bodies: "json" (standard library), "orjson", "msgspec",
+        # "auto" (orjson, then msgspec, if installed) or a `JSONCodec` instance. The faster libraries differ
+        # from the standard library on edge cases, e.g. they send NaN and Infinity as null.
+        json_codec: str | JSONCodec = "json",
+        # Compress large JSON request bodies, e.g. `RequestCompression("gzip", threshold=16384)`.
+        compression: RequestCompression | None = None,
+        # Multiplex concurrent requests over a few HTTP/2 connections, with as many concurrent streams
+        # per connection as the server allows (at most 100). Requires the `h2` package
+        # (`pip install aimon[http2]`) and only applies when no `http_client` is given.
+        http2: bool = False,
+        # Callbacks invoked around every request, e.g. to record metrics from their timings
+        hooks: Sequence[RequestHooks] | None = None,
+        # Count requests, retries, timeouts and bytes and record their latencies, exportable in the Prometheus
+        # text format. A registry can be shared by several clients.
+        metrics_registry: MetricsRegistry | None = None,
+        # Send concurrent identical GET requests once and share the response between the callers. Hooks still
+        # run for every caller; callers that shared a response have `timings.coalesced` set. A caller waits
+        # for the shared response at most as long as its own timeouts add up to, then sends its own request.
+        coalesce_requests: bool = True,
+        # Reuse GET responses for a while and revalidate them with conditional requests, e.g. `HTTPCache(ttl=60)`.
+        http_cache: HTTPCache | None = None,
         # Enable or disable schema validation for data returned by the API.
         # When enabled an error APIResponseValidationError is raised
         # if the API responds with invalid data for the expected schema.
@@ -252,6 +350,7 @@ class AsyncClient(AsyncAPIClient):
     ) -> None:
         """Construct a new async AsyncClient client instance."""
         self.auth_header = auth_header
+        self.rerank_cache = rerank_cache
 
         if base_url is None:
             base_url = os.environ.get("CLIENT_BASE_URL")
@@ -266,6 +365,15 @@ class AsyncClient(AsyncAPIClient):
             http_client=http_client,
             custom_headers=default_headers,
             custom_query=default_query,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            json_codec=json_codec,
+            compression=compression,
+            http2=http2,
+            hooks=hooks,
+            metrics_registry=metrics_registry,
+            coalesce_requests=coalesce_requests,
+            http_cache=http_cache,
             _strict_response_validation=_strict_response_validation,
         )
 
@@ -313,6 +421,16 @@ class AsyncClient(AsyncAPIClient):
         set_default_headers: Mapping[str, str] | None = None,
         default_query: Mapping[str, object] | None = None,
         set_default_query: Mapping[str, object] | None = None,
+        rerank_cache: RerankCache | None | NotGiven = NOT_GIVEN,
+        retry_policy: RetryPolicy | None | NotGiven = NOT_GIVEN,
+        rate_limiter: AdaptiveRateLimiter | None | NotGiven = NOT_GIVEN,
+        json_codec: str | JSONCodec | NotGiven = NOT_GIVEN,
+        compression: RequestCompression | None | NotGiven = NOT_GIVEN,
+        http2: bool | NotGiven = NOT_GIVEN,
+        hooks: Sequence[RequestHooks] | None | NotGiven = NOT_GIVEN,
+        metrics_registry: MetricsRegistry | None | NotGiven = NOT_GIVEN,
+        coalesce_requests: bool | NotGiven = NOT_GIVEN,
+        http_cache: HTTPCache | None | NotGiven = NOT_GIVEN,
         _extra_kwargs: Mapping[str, Any] = {},
     ) -> Self:
         """
@@ -345,6 +463,16 @@ class AsyncClient(AsyncAPIClient):
             max_retries=max_retries if is_given(max_retries) else self.max_retries,
             default_headers=headers,
             default_query=params,
+            rerank_cache=rerank_cache if is_given(rerank_cache) else self.rerank_cache,
+            retry_policy=retry_policy if is_given(retry_policy) else self.retry_policy,
+            rate_limiter=rate_limiter if is_given(rate_limiter) else self.rate_limiter,
+            json_codec=json_codec if is_given(json_codec) else self.json_codec,
+            compression=compression if is_given(compression) else self.compression,
+            http2=http2 if is_given(http2) else self.http2,
+            hooks=hooks if is_given(hooks) else self.hooks,
+            metrics_registry=metrics_registry if is_given(metrics_registry) else self.metrics_registry,
+            coalesce_requests=coalesce_requests if is_given(coalesce_requests) else self.coalesce_requests,
+            http_cache=http_cache if is_given(http_cache) else self.http_cache,
             **_extra_kwargs,
         )
 
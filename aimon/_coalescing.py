@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import copy
+import asyncio
+import threading
+from typing import Any, Dict, Tuple, TypeVar, Callable, Hashable, Optional, Awaitable
+
+import httpx
+
+__all__ = ["SingleFlight", "AsyncSingleFlight", "request_key", "share_response"]
+
+_T = TypeVar("_T")
+
+# headers that differ between attempts of otherwise identical requests
+_VOLATILE_HEADERS = frozenset({b"x-stainless-retry-count"})
+# headers describing the encoded body, which no longer apply to the decoded content of a read response
+_BODY_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+
+def request_key(request: httpx.Request) -> Tuple[Any, ...]:
+    """Identifies requests that get the same response: same method, URL and headers."""
+    headers = tuple(
+        (name.lower(), value) for name, value in request.headers.raw if name.lower() not in _VOLATILE_HEADERS
+    )
+    return (request.method, str(request.url), headers)
+
+
+def share_response(response: httpx.Response, request: httpx.Request) -> httpx.Response:
+    """A copy of a read `response` for another caller's `request`, so that callers don't share response state."""
+    if response.request is request:
+        return response
+    headers = [(name, value) for name, value in response.headers.items() if name.lower() not in _BODY_HEADERS]
+    copy = httpx.Response(
+        response.status_code,
+        headers=headers,
+        content=response.content,
+        request=request,
+        extensions=response.extensions,
+    )
+    try:
+        copy.elapsed = response.elapsed
+    except RuntimeError:
+        # the response was read without its stream being closed, e.g. one of an `httpx.MockTransport`
+        pass
+    return copy
+
+
+def _copy_error(error: BaseException) -> BaseException:
+    """A fresh exception like the shared `error` for one caller, so that callers don't overwrite its traceback."""
+    try:
+        fresh = copy.copy(error)
+    except Exception:
+        fresh = None
+    if type(fresh) is not type(error):
+        return RuntimeError(f"The coalesced request failed: {error!r}")
+    return fresh
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Runs concurrent calls with the same key once, sharing the result or exception with every caller.
+
+    `on_wait` is called by the callers that wait for another one's call instead of running `fn`.
+    Waiting callers get a copy of the exception, chained to the original. A caller that has waited
+    `timeout` seconds without the call finishing stops waiting and runs its own `fn`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], _T],
+        *,
+        on_wait: Optional[Callable[[], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> _T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if on_wait is not None:
+                on_wait()
+            if not call.done.wait(timeout):
+                return fn()
+            if call.error is not None:
+                raise _copy_error(call.error) from call.error
+            return call.result  # type: ignore[no-any-return]
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result  # type: ignore[no-any-return]
+
+
+class AsyncSingleFlight:
+    """`SingleFlight` for coroutines; calls are only shared between tasks of the same event loop.
+
+    If the task running a call is cancelled, or has not finished after `timeout` seconds, the tasks
+    waiting for it run the call themselves.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Tuple[int, Hashable], asyncio.Future[Any]] = {}
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[_T]],
+        *,
+        on_wait: Optional[Callable[[], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> _T:
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+        future = self._calls.get(loop_key)
+        if future is not None:
+            if on_wait is not None:
+                on_wait()
+            # unlike awaiting the future, `wait` neither raises its exception nor cancels it with this task
+            done, _ = await asyncio.wait((future,), timeout=timeout)
+            if not done:
+                return await fn()
+            if future.cancelled():
+                return await self.do(key, fn, timeout=timeout)
+            error = future.exception()
+            if error is not None:
+                raise _copy_error(error) from error
+            return future.result()  # type: ignore[no-any-return]
+
+        future = self._calls[loop_key] = loop.create_future()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # waiting tasks, if any, get the exception too; don't report it as never retrieved
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[loop_key]
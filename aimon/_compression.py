@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import gzip
+from typing import Any, Callable, Optional
+
+__all__ = ["RequestCompression"]
+
+
+def _zstd_compressor(level: Optional[int]) -> Callable[[bytes], bytes]:
+    try:
+        from compression import zstd  # type: ignore[import-not-found]  # Python 3.14+
+    except ImportError:
+        try:
+            import zstandard  # type: ignore[import-not-found]
+        except ImportError:
+            raise ImportError(
+                "zstd request compression requires Python 3.14+ or the `zstandard` package; install it with `pip install zstandard`"
+            ) from None
+        compressor: Any = zstandard.ZstdCompressor(level=3 if level is None else level)
+        return compressor.compress
+    return lambda data: zstd.compress(data, level=level)
+
+
+class RequestCompression:
+    """Opt-in compression of large request bodies, e.g. detect calls carrying long RAG contexts.
+
+    JSON request bodies of at least `threshold` bytes are compressed and sent with a
+    `Content-Encoding` header; smaller bodies, where compression costs more than it saves, are
+    sent as is. A body is compressed once per request and reused by its retries.
+
+    Only enable this for servers that accept compressed request bodies.
+    """
+
+    def __init__(self, algorithm: str = "gzip", *, threshold: int = 16 * 1024, level: Optional[int] = None) -> None:
+        """
+        Args:
+            algorithm: "gzip" or "zstd". zstd needs Python 3.14+ or the `zstandard` package.
+            threshold: Smallest body size in bytes that is compressed.
+            level: Compression level; defaults to 6 for gzip and 3 for zstd.
+        """
+        if threshold < 0:
+            raise ValueError("threshold must not be negative")
+        if algorithm == "gzip":
+            gzip_level = 6 if level is None else level
+            # mtime=0 keeps the output deterministic
+            self._compress: Callable[[bytes], bytes] = lambda data: gzip.compress(data, compresslevel=gzip_level, mtime=0)
+        elif algorithm == "zstd":
+            self._compress = _zstd_compressor(level)
+        else:
+            raise ValueError(f"Unsupported compression algorithm {algorithm!r}; expected 'gzip' or 'zstd'")
+        self.algorithm = algorithm
+        self.threshold = threshold
+        self.level = level
+
+    @property
+    def content_encoding(self) -> str:
+        return self.algorithm
+
+    def should_compress(self, body: bytes) -> bool:
+        return len(body) >= self.threshold
+
+    def compress(self, body: bytes) -> bytes:
+        return self._compress(body)
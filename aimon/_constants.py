@@ -9,6 +9,12 @@ OVERRIDE_CAST_TO_HEADER = "____stainless_override_cast_to"
 DEFAULT_TIMEOUT = httpx.Timeout(timeout=60, connect=5.0)
 DEFAULT_MAX_RETRIES = 2
 DEFAULT_CONNECTION_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+# with HTTP/2 a few connections multiplex all concurrent requests, so every connection is kept alive;
+# the connection limit stays at the HTTP/1.1 default because the server may only negotiate HTTP/1.1.
+# Streams need no limit of their own: httpcore caps the streams of each connection at the server's
+# SETTINGS_MAX_CONCURRENT_STREAMS (at most 100, the value it advertises itself) and queues further
+# requests on the connection, so the server's setting always bounds concurrency per connection.
+DEFAULT_HTTP2_CONNECTION_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=100)
 
 INITIAL_RETRY_DELAY = 0.5
 MAX_RETRY_DELAY = 8.0
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Tuple, Mapping, Optional
+
+import httpx
+
+__all__ = ["RequestHooks", "RequestTimings"]
+
+_CONNECT = "connection.connect_tcp"
+_TLS = "connection.start_tls"
+
+
+class RequestTimings:
+    """Seconds spent in each phase of a request; phases that did not happen, or were not reported, are `None`.
+
+    - `transform`: converting the method arguments into the request body and query.
+    - `serialize`: building the HTTP request, including JSON encoding and compression, summed over all attempts.
+    - `network`: sending the final attempt and receiving its response.
+    - `pool_wait`, `connect`, `tls` and `server` break `network` down: waiting for a connection from the pool,
+      opening a TCP connection (including DNS resolution), the TLS handshake, and the time between sending the
+      request and receiving the response headers. They are only reported by httpcore-based transports.
+    - `parse` and `construct`: decoding the JSON response and building the typed result from it. These are
+      filled in when the response is parsed, which for raw responses happens after the request returned.
+    - `total`: the whole request, from transforming its arguments until it succeeded or failed, including
+      retries and the delays between them but not parsing a raw response later on.
+
+    `coalesced` is `True` if the final attempt was not sent but shared the response of an identical concurrent
+    GET request (see the client's `coalesce_requests` option); its `network` time is then the time it waited.
+    """
+
+    def __init__(self, *, transform: Optional[float] = None) -> None:
+        self.transform = transform
+        self.serialize: Optional[float] = None
+        self.parse: Optional[float] = None
+        self.construct: Optional[float] = None
+        self.total: Optional[float] = None
+        self.coalesced = False
+        self._started = time.perf_counter()
+        self._send_started: Optional[float] = None
+        self._send_finished: Optional[float] = None
+        self._events: List[Tuple[str, float]] = []
+
+    def _add_serialize(self, seconds: float) -> None:
+        self.serialize = seconds if self.serialize is None else self.serialize + seconds
+
+    def _start_send(self, request: httpx.Request, *, is_async: bool) -> None:
+        """Starts timing an attempt, replacing the network timings of any previous attempt."""
+        self._events = []
+        self._send_finished = None
+        self.coalesced = False
+        request.extensions["trace"] = self._atrace if is_async else self._trace
+        self._send_started = time.perf_counter()
+
+    def _finish_send(self) -> None:
+        self._send_finished = time.perf_counter()
+
+    def _finish(self) -> None:
+        self.total = (self.transform or 0.0) + time.perf_counter() - self._started
+
+    def _trace(self, event_name: str, info: Mapping[str, Any]) -> None:  # noqa: ARG002
+        self._events.append((event_name, time.perf_counter()))
+
+    async def _atrace(self, event_name: str, info: Mapping[str, Any]) -> None:  # noqa: ARG002
+        self._events.append((event_name, time.perf_counter()))
+
+    def _event_time(self, suffix: str) -> Optional[float]:
+        for name, at in self._events:
+            if name.endswith(suffix):
+                return at
+        return None
+
+    def _duration(self, start: str, end: str) -> Optional[float]:
+        started = self._event_time(start)
+        finished = self._event_time(end)
+        if started is None or finished is None:
+            return None
+        return finished - started
+
+    @property
+    def network(self) -> Optional[float]:
+        if self._send_started is None or self._send_finished is None:
+            return None
+        return self._send_finished - self._send_started
+
+    @property
+    def pool_wait(self) -> Optional[float]:
+        # the pool reports nothing while a request waits, so its first event marks getting a connection
+        if self._send_started is None or not self._events:
+            return None
+        return self._events[0][1] - self._send_started
+
+    @property
+    def connect(self) -> Optional[float]:
+        return self._duration(f"{_CONNECT}.started", f"{_CONNECT}.complete")
+
+    @property
+    def tls(self) -> Optional[float]:
+        return self._duration(f"{_TLS}.started", f"{_TLS}.complete")
+
+    @property
+    def server(self) -> Optional[float]:
+        return self._duration(".send_request_body.complete", ".receive_response_headers.complete")
+
+    def as_dict(self) -> Dict[str, Optional[float]]:
+        return {
+            "transform": self.transform,
+            "serialize": self.serialize,
+            "pool_wait": self.pool_wait,
+            "connect": self.connect,
+            "tls": self.tls,
+            "server": self.server,
+            "network": self.network,
+            "parse": self.parse,
+            "construct": self.construct,
+            "total": self.total,
+        }
+
+    def __repr__(self) -> str:
+        phases = ", ".join(f"{name}={value * 1000:.2f}ms" for name, value in self.as_dict().items() if value is not None)
+        return f"{self.__class__.__name__}({phases})"
+
+
+class RequestHooks:
+    """Callbacks the client invokes around each request, e.g. to feed a metrics system.
+
+    Subclass this and override the methods you need, then pass instances to the client:
+
+    ```py
+    class SlowRequestLogger(RequestHooks):
+        def on_response(self, response, *, timings, retries_taken):
+            if timings.network and timings.network > 1:
+                print(response.request.url, timings)
+
+
+    client = Client(hooks=[SlowRequestLogger()])
+    ```
+
+    Hooks are called synchronously, also by `AsyncClient`, so they should return quickly.
+    Exceptions raised by a hook are logged and otherwise ignored.
+    """
+
+    def on_request(self, request: httpx.Request, *, retries_taken: int) -> None:
+        """Called before each attempt is sent, including retries."""
+
+    def on_response(self, response: httpx.Response, *, timings: RequestTimings, retries_taken: int) -> None:
+        """Called once a request succeeded, after its response has been parsed unless a raw response was requested."""
+
+    def on_retry(
+        self,
+        request: httpx.Request,
+        *,
+        retries_taken: int,
+        delay: float,
+        response: Optional[httpx.Response],
+        error: Optional[Exception],
+    ) -> None:
+        """Called before waiting `delay` seconds to retry a failed attempt.
+
+        `response` is the error response if the server answered, otherwise `error` is the
+        exception raised while sending the request.
+        """
+
+    def on_error(
+        self,
+        request: httpx.Request,
+        error: Exception,
+        *,
+        timings: RequestTimings,
+        retries_taken: int,
+    ) -> None:
+        """Called when a request failed for good, right before `error`, usually an `APIError`, is raised."""
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import time
+import datetime
+import threading
+from typing import Set, Dict, List, Hashable, Optional, NamedTuple
+from collections import OrderedDict
+
+import httpx
+
+from ._coalescing import _BODY_HEADERS, request_key
+
+__all__ = ["HTTPCache"]
+
+
+class _Entry:
+    __slots__ = ("status_code", "headers", "content", "path", "stored_at", "fresh_for")
+
+    def __init__(self, response: httpx.Response, fresh_for: float) -> None:
+        self.status_code = response.status_code
+        self.headers = [(name, value) for name, value in response.headers.items() if name.lower() not in _BODY_HEADERS]
+        self.content = response.content
+        self.path = response.request.url.path.rstrip("/")
+        self.stored_at = time.monotonic()
+        self.fresh_for = fresh_for
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() - self.stored_at < self.fresh_for
+
+    def validators(self) -> Dict[str, str]:
+        headers = httpx.Headers(self.headers)
+        validators = {}
+        if "etag" in headers:
+            validators["If-None-Match"] = headers["etag"]
+        if "last-modified" in headers:
+            validators["If-Modified-Since"] = headers["last-modified"]
+        return validators
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        response = httpx.Response(self.status_code, headers=self.headers, content=self.content, request=request)
+        response.elapsed = datetime.timedelta(0)
+        return response
+
+
+class CacheLookup(NamedTuple):
+    """The result of looking a GET request up: a fresh cached `response`, or the `stale` entry it revalidates."""
+
+    key: Hashable
+    response: Optional[httpx.Response]
+    stale: Optional[_Entry]
+
+
+def _cache_control(response: httpx.Response) -> Dict[str, Optional[str]]:
+    directives: Dict[str, Optional[str]] = {}
+    for part in response.headers.get("cache-control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    return directives
+
+
+def _prefixes(path: str) -> List[str]:
+    """`path` and the paths above it, without trailing slashes: "/v1/a" -> ["", "/v1", "/v1/a"]."""
+    segments = path.split("/")
+    return ["/".join(segments[:end]) for end in range(1, len(segments) + 1)]
+
+
+class HTTPCache:
+    """An opt-in cache of GET responses, e.g. for application, model and metric lookups repeated by many workers.
+
+    ```py
+    client = Client(auth_header=..., http_cache=HTTPCache(ttl=60))
+    ```
+
+    Successful GET responses are reused for `ttl` seconds, or for the `max-age` the server sent in a
+    `Cache-Control` header. After that, a response with an `ETag` or `Last-Modified` header is
+    revalidated with a conditional request, and a `304 Not Modified` answer keeps it for another period.
+    Responses marked `no-store` are not cached, and `no-cache` ones are revalidated on every use.
+
+    A successful POST, PUT, PATCH or DELETE request drops the cached responses of the same path and
+    of the paths above and below it, so that e.g. updating an application is visible to the next lookup.
+    Other changes are only seen once a response expires; call `clear()` to drop everything.
+
+    Args:
+        ttl: Seconds a response is reused without asking the server; 0 revalidates every time.
+        maxsize: The maximum number of responses kept, least recently used first out; `None` for unbounded.
+    """
+
+    def __init__(self, *, ttl: float = 60.0, maxsize: Optional[int] = 1024) -> None:
+        if ttl < 0:
+            raise ValueError("ttl must not be negative")
+        if maxsize is not None and maxsize <= 0:
+            raise ValueError("`maxsize` must be a positive integer or None")
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        # keys by the path of their entry, and by every path prefix of it, to invalidate without a scan
+        self._by_path: Dict[str, Set[Hashable]] = {}
+        self._by_prefix: Dict[str, Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, request: httpx.Request) -> CacheLookup:
+        """Looks a GET request up; a stale response with validators turns it into a conditional request."""
+        key = request_key(request)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return CacheLookup(key, None, None)
+            self._entries.move_to_end(key)
+            if entry.is_fresh():
+                self.hits += 1
+                return CacheLookup(key, entry.to_response(request), None)
+            validators = entry.validators()
+            if not validators:
+                self._remove(key)
+                self.misses += 1
+                return CacheLookup(key, None, None)
+        request.headers.update(validators)
+        return CacheLookup(key, None, entry)
+
+    def _store(self, lookup: CacheLookup, response: httpx.Response) -> httpx.Response:
+        """Stores the response to a looked up request, or turns a 304 answer into the revalidated response."""
+        with self._lock:
+            if response.status_code == 304 and lookup.stale is not None:
+                entry = lookup.stale
+                entry.stored_at = time.monotonic()
+                entry.fresh_for = self._fresh_for(response, default=self.ttl)
+                self._insert(lookup.key, entry)
+                self.revalidations += 1
+                response.close()
+                return entry.to_response(response.request)
+
+            self._remove(lookup.key)
+            if response.status_code != 200 or "no-store" in _cache_control(response):
+                return response
+            entry = _Entry(response, self._fresh_for(response, default=self.ttl))
+            if entry.fresh_for > 0 or entry.validators():
+                self._insert(lookup.key, entry)
+            return response
+
+    def _insert(self, key: Hashable, entry: _Entry) -> None:
+        self._remove(key)
+        self._entries[key] = entry
+        self._by_path.setdefault(entry.path, set()).add(key)
+        for prefix in _prefixes(entry.path):
+            self._by_prefix.setdefault(prefix, set()).add(key)
+        if self.maxsize is not None:
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for index, paths in ((self._by_path, (entry.path,)), (self._by_prefix, _prefixes(entry.path))):
+            for path in paths:
+                keys = index[path]
+                keys.discard(key)
+                if not keys:
+                    del index[path]
+
+    def _fresh_for(self, response: httpx.Response, *, default: float) -> float:
+        directives = _cache_control(response)
+        if "no-cache" in directives:
+            return 0.0
+        max_age = directives.get("max-age")
+        if max_age is not None:
+            try:
+                return max(float(max_age), 0.0)
+            except ValueError:
+                pass
+        return default
+
+    def invalidate(self, path: str) -> None:
+        """Drops the responses of `path` and of the paths above and below it."""
+        path = path.rstrip("/")
+        with self._lock:
+            keys = set(self._by_prefix.get(path, ()))
+            for prefix in _prefixes(path)[:-1]:
+                keys.update(self._by_path.get(prefix, ()))
+            for key in keys:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_path.clear()
+            self._by_prefix.clear()
+            self.hits = 0
+            self.misses = 0
+            self.revalidations = 0
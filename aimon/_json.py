@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import abc
+import json
+from typing import Any, Union
+
+__all__ = ["JSONCodec", "StdlibJSONCodec", "OrjsonCodec", "MsgspecCodec", "get_json_codec"]
+
+
+class JSONCodec(abc.ABC):
+    """Encodes request bodies and decodes response bodies.
+
+    Subclasses must produce compact UTF-8 JSON, like httpx does for `json=` request bodies.
+    """
+
+    name: str = ""
+
+    @abc.abstractmethod
+    def dumps(self, obj: Any) -> bytes: ...
+
+    @abc.abstractmethod
+    def loads(self, data: Union[bytes, str]) -> Any: ...
+
+
+class StdlibJSONCodec(JSONCodec):
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        # same options as httpx's own JSON encoding
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._orjson = orjson
+
+    def dumps(self, obj: Any) -> bytes:
+        # like the standard library, accept non-string dict keys
+        return self._orjson.dumps(obj, option=self._orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._orjson.loads(data)
+
+
+class MsgspecCodec(JSONCodec):
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        import msgspec
+
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._decoder.decode(data)
+
+
+_CODECS = {"orjson": OrjsonCodec, "msgspec": MsgspecCodec, "json": StdlibJSONCodec}
+
+
+def get_json_codec(codec: Union[str, JSONCodec] = "json") -> JSONCodec:
+    """Resolves a codec name to a codec instance.
+
+    `"json"`, the default, is the standard library with httpx's options. `"auto"` picks the
+    fastest installed library: orjson, then msgspec, then the standard library. The fast
+    libraries encode NaN and Infinity as `null` instead of raising, reject them in responses,
+    and orjson also encodes values such as datetimes and dataclasses that the standard library
+    rejects, so opt into them only for payloads where that makes no difference.
+    Naming a library that is not installed raises an `ImportError`.
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+    if codec == "auto":
+        for name in ("orjson", "msgspec"):
+            try:
+                return _CODECS[name]()
+            except ImportError:
+                continue
+        return StdlibJSONCodec()
+    if codec not in _CODECS:
+        raise ValueError(f"Unknown JSON codec {codec!r}; expected 'auto', 'orjson', 'msgspec' or 'json'")
+    return _CODECS[codec]()
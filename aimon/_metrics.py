@@ -0,0 +1,388 @@
+from __future__ import annotations
+
+import math
+import weakref
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple, Union, Iterable, Optional, Sequence
+
+import httpx
+
+from ._hooks import RequestHooks, RequestTimings
+from ._utils import endpoint_template
+from ._exceptions import APIStatusError, APITimeoutError
+
+if TYPE_CHECKING:
+    from ._base_client import BaseClient
+
+__all__ = ["MetricsRegistry", "DEFAULT_LATENCY_BUCKETS"]
+
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_PHASES = ("transform", "serialize", "pool_wait", "connect", "tls", "server", "network", "parse", "construct")
+
+_Labels = Tuple[str, ...]
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str]) -> None:  # noqa: A002
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+
+class _Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str]) -> None:  # noqa: A002
+        super().__init__(name, help, labelnames)
+        self.values: Dict[_Labels, float] = {}
+
+    def inc(self, labels: _Labels, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class _Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str], buckets: Sequence[float]) -> None:  # noqa: A002
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        # per label set: the count of each bucket (not cumulative), then the sum of all observations
+        self.values: Dict[_Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, labels: _Labels, value: float) -> None:
+        entry = self.values.get(labels)
+        if entry is None:
+            entry = self.values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = entry
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        total[0] += value
+
+
+class MetricsRegistry(RequestHooks):
+    """Counters and latency histograms of the requests made by one or more clients.
+
+    ```py
+    registry = MetricsRegistry()
+    client = Client(auth_header=..., metrics_registry=registry)
+    ...
+    print(registry.to_prometheus())
+    ```
+
+    Requests are labelled with their method and endpoint, the URL path with ids replaced by `{id}`,
+    and their outcome: the HTTP status code, `timeout` or `error` for other connection failures.
+    Requests that shared the response of an identical concurrent GET count as completed requests and
+    in `coalesced_requests_total`, but receive no response bytes of their own.
+    Connection pool usage and cache hits of the registered clients are read when exporting.
+
+    A registry can be shared by several clients, sync and async. It has no third-party dependencies;
+    use `to_prometheus()` to serve the metrics from an existing HTTP endpoint or `snapshot()` to
+    forward them to another metrics system.
+    """
+
+    def __init__(self, *, namespace: str = "aimon", buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        """
+        Args:
+            namespace: Prefix of the metric names.
+            buckets: Upper bounds in seconds of the latency histogram buckets.
+        """
+        if list(buckets) != sorted(set(buckets)) or not buckets:
+            raise ValueError("buckets must be a non-empty, strictly increasing sequence")
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._clients: weakref.WeakSet[BaseClient[Any, Any]] = weakref.WeakSet()
+        self._caches: Dict[str, Any] = {}
+
+        endpoint = ("method", "endpoint")
+        self._requests = self._counter("requests_total", "Completed requests, retries included.", (*endpoint, "status"))
+        self._duration = self._histogram(
+            "request_duration_seconds", "Time to complete a request, retries included.", (*endpoint, "status"), buckets
+        )
+        self._phases = self._histogram(
+            "request_phase_seconds", "Time spent in each phase of a completed request.", (*endpoint, "phase"), buckets
+        )
+        self._retries = self._counter("retries_total", "Retried attempts, by what the attempt failed with.", (*endpoint, "reason"))
+        self._timeouts = self._counter("timeouts_total", "Attempts that timed out, retried or not.", endpoint)
+        self._coalesced = self._counter(
+            "coalesced_requests_total", "Completed requests that shared the response of an identical one.", endpoint
+        )
+        self._bytes_sent = self._counter("request_bytes_total", "Request body bytes sent, over all attempts.", endpoint)
+        self._bytes_received = self._counter(
+            "response_bytes_total", "Response body bytes received, over all attempts.", endpoint
+        )
+        self._metrics: List[_Metric] = [
+            self._requests,
+            self._duration,
+            self._phases,
+            self._retries,
+            self._timeouts,
+            self._coalesced,
+            self._bytes_sent,
+            self._bytes_received,
+        ]
+
+    def _counter(self, name: str, help: str, labelnames: Sequence[str]) -> _Counter:  # noqa: A002
+        return _Counter(f"{self.namespace}_{name}", help, labelnames)
+
+    def _histogram(self, name: str, help: str, labelnames: Sequence[str], buckets: Sequence[float]) -> _Histogram:  # noqa: A002
+        return _Histogram(f"{self.namespace}_{name}", help, labelnames, buckets)
+
+    def endpoint_label(self, request: httpx.Request) -> str:
+        """The `endpoint` label of a request; override this to group endpoints differently."""
+        return endpoint_template(request.url.path)
+
+    def track_cache(self, name: str, cache: Any) -> None:
+        """Export the `hits` and `misses` counters of a cache, e.g. the response cache of a re-prompting pipeline.
+
+        The `rerank_cache` and `http_cache` of the registered clients are tracked automatically under the names
+        `rerank` and `http`.
+        """
+        with self._lock:
+            self._caches[name] = cache
+
+    def _track_client(self, client: BaseClient[Any, Any]) -> None:
+        with self._lock:
+            self._clients.add(client)
+
+    def reset(self) -> None:
+        """Clear all request metrics. Pool and cache metrics are read from their source and are not affected."""
+        with self._lock:
+            for metric in self._metrics:
+                metric.values.clear()  # type: ignore[attr-defined]
+
+    # request hooks
+
+    def on_request(self, request: httpx.Request, *, retries_taken: int) -> None:  # noqa: ARG002
+        sent = _content_length(request.headers)
+        if sent:
+            with self._lock:
+                self._bytes_sent.inc((request.method, self.endpoint_label(request)), sent)
+
+    def on_response(self, response: httpx.Response, *, timings: RequestTimings, retries_taken: int) -> None:  # noqa: ARG002
+        self._record(response.request, str(response.status_code), response, timings)
+
+    def on_retry(
+        self,
+        request: httpx.Request,
+        *,
+        retries_taken: int,  # noqa: ARG002
+        delay: float,  # noqa: ARG002
+        response: Optional[httpx.Response],
+        error: Optional[Exception],
+    ) -> None:
+        labels = (request.method, self.endpoint_label(request))
+        if response is not None:
+            reason = str(response.status_code)
+        elif isinstance(error, (httpx.TimeoutException, APITimeoutError)):
+            reason = "timeout"
+        else:
+            reason = "error"
+        with self._lock:
+            self._retries.inc((*labels, reason))
+            if reason == "timeout":
+                self._timeouts.inc(labels)
+            if response is not None:
+                self._bytes_received.inc(labels, _response_bytes(response))
+
+    def on_error(
+        self,
+        request: httpx.Request,
+        error: Exception,
+        *,
+        timings: RequestTimings,
+        retries_taken: int,  # noqa: ARG002
+    ) -> None:
+        if isinstance(error, APIStatusError):
+            self._record(request, str(error.status_code), error.response, timings)
+        else:
+            self._record(request, "timeout" if isinstance(error, APITimeoutError) else "error", None, timings)
+
+    def _record(
+        self, request: httpx.Request, status: str, response: Optional[httpx.Response], timings: RequestTimings
+    ) -> None:
+        labels = (request.method, self.endpoint_label(request))
+        phases = timings.as_dict()
+        with self._lock:
+            self._requests.inc((*labels, status))
+            if timings.total is not None:
+                self._duration.observe((*labels, status), timings.total)
+            for phase in _PHASES:
+                seconds = phases[phase]
+                if seconds is not None:
+                    self._phases.observe((*labels, phase), seconds)
+            if status == "timeout":
+                self._timeouts.inc(labels)
+            if timings.coalesced:
+                self._coalesced.inc(labels)
+            elif response is not None:
+                self._bytes_received.inc(labels, _response_bytes(response))
+
+    # export
+
+    def _collect_gauges(self) -> List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]:
+        """Reads the pool usage and cache counters of the tracked clients and caches."""
+        with self._lock:
+            clients = list(self._clients)
+            caches = dict(self._caches)
+
+        pools: Dict[int, Any] = {}
+        for client in clients:
+            pool = _connection_pool(client)
+            if pool is not None:
+                pools[id(pool)] = pool
+            rerank_cache = getattr(client, "rerank_cache", None)
+            if rerank_cache is not None:
+                caches.setdefault("rerank", rerank_cache)
+            http_cache = getattr(client, "http_cache", None)
+            if http_cache is not None:
+                caches.setdefault("http", http_cache)
+
+        active = idle = pending = 0
+        limit: float = 0
+        for pool in pools.values():
+            for connection in list(getattr(pool, "connections", ())):
+                if connection.is_closed():
+                    continue
+                if connection.is_idle():
+                    idle += 1
+                else:
+                    active += 1
+            pending += sum(1 for request in list(getattr(pool, "_requests", ())) if request.is_queued())
+            max_connections = getattr(pool, "_max_connections", None)
+            limit += math.inf if max_connections is None else max_connections
+
+        cache_samples: List[Tuple[Dict[str, str], float]] = []
+        for name, cache in sorted(caches.items()):
+            cache_samples.append(({"cache": name, "result": "hit"}, getattr(cache, "hits", 0)))
+            cache_samples.append(({"cache": name, "result": "miss"}, getattr(cache, "misses", 0)))
+
+        prefix = self.namespace
+        gauges = [
+            (
+                f"{prefix}_pool_connections",
+                "gauge",
+                "Open connections in the connection pools of the tracked clients.",
+                [({"state": "active"}, active), ({"state": "idle"}, idle)],
+            ),
+            (
+                f"{prefix}_pool_pending_requests",
+                "gauge",
+                "Requests waiting for a connection from the pool.",
+                [({}, pending)],
+            ),
+            (
+                f"{prefix}_pool_max_connections",
+                "gauge",
+                "Maximum number of connections of the connection pools.",
+                [({}, limit)],
+            ),
+            (f"{prefix}_cache_lookups_total", "counter", "Cache lookups by result.", cache_samples),
+        ]
+        return [gauge for gauge in gauges if pools or not gauge[0].startswith(f"{prefix}_pool_")]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """The current metrics as a dict keyed by metric name.
+
+        Each metric has a `type`, a `help` text and a list of `samples`. Counter and gauge samples are
+        `{"labels": {...}, "value": ...}`; histogram samples are `{"labels": {...}, "buckets": {le: count},
+        "sum": ..., "count": ...}` with cumulative bucket counts like in Prometheus.
+        """
+        result: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for metric in self._metrics:
+                samples: List[Dict[str, Any]] = []
+                if isinstance(metric, _Histogram):
+                    bounds = [_format_value(bound) for bound in metric.buckets] + ["+Inf"]
+                    for labels, (counts, total) in sorted(metric.values.items()):
+                        cumulative: Dict[str, int] = {}
+                        running = 0
+                        for bound, count in zip(bounds, counts):
+                            running += count
+                            cumulative[bound] = running
+                        samples.append(
+                            {
+                                "labels": dict(zip(metric.labelnames, labels)),
+                                "buckets": cumulative,
+                                "sum": total[0],
+                                "count": running,
+                            }
+                        )
+                elif isinstance(metric, _Counter):
+                    samples = _labelled(
+                        (dict(zip(metric.labelnames, labels)), value) for labels, value in sorted(metric.values.items())
+                    )
+                result[metric.name] = {"type": metric.kind, "help": metric.help, "samples": samples}
+
+        for name, kind, help, gauge_samples in self._collect_gauges():
+            result[name] = {"type": kind, "help": help, "samples": _labelled(gauge_samples)}
+        return result
+
+    def to_prometheus(self) -> str:
+        """The current metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        for name, metric in self.snapshot().items():
+            lines.append(f"# HELP {name} {_escape_help(metric['help'])}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for sample in metric["samples"]:
+                labels = sample["labels"]
+                if metric["type"] == "histogram":
+                    for bound, count in sample["buckets"].items():
+                        lines.append(_sample_line(f"{name}_bucket", {**labels, "le": bound}, count))
+                    lines.append(_sample_line(f"{name}_sum", labels, sample["sum"]))
+                    lines.append(_sample_line(f"{name}_count", labels, sample["count"]))
+                else:
+                    lines.append(_sample_line(name, labels, sample["value"]))
+        return "\n".join(lines) + "\n"
+
+
+def _content_length(headers: httpx.Headers) -> int:
+    try:
+        return int(headers.get("content-length", 0))
+    except ValueError:
+        return 0
+
+
+def _response_bytes(response: httpx.Response) -> int:
+    # bytes read so far, which misses unread (streamed or closed) bodies; fall back to their announced size
+    return response.num_bytes_downloaded or _content_length(response.headers)
+
+
+def _connection_pool(client: BaseClient[Any, Any]) -> Any:
+    http_client = getattr(client, "_client", None)
+    transport = getattr(http_client, "_transport", None)
+    pool = getattr(transport, "_pool", None)
+    return pool if hasattr(pool, "connections") else None
+
+
+def _format_value(value: Union[int, float]) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return f"{value:.1f}"
+    return repr(value)
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _sample_line(name: str, labels: Dict[str, str], value: Union[int, float]) -> str:
+    if not labels:
+        return f"{name} {_format_value(value)}"
+    rendered = ",".join(f'{key}="{_escape_label(str(val))}"' for key, val in labels.items())
+    return f"{name}{{{rendered}}} {_format_value(value)}"
+
+
+def _labelled(samples: Iterable[Tuple[Dict[str, str], float]]) -> List[Dict[str, Any]]:
+    return [{"labels": labels, "value": value} for labels, value in samples]
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import os
 import inspect
-from typing import TYPE_CHECKING, Any, Type, Union, Generic, TypeVar, Callable, Optional, cast
+from typing import TYPE_CHECKING, Any, Type, Union, Generic, TypeVar, Callable, Optional, NamedTuple, cast
 from datetime import date, datetime
 from typing_extensions import (
     List,
@@ -186,27 +186,24 @@ class BaseModel(pydantic.BaseModel):
         m = __cls.__new__(__cls)
         fields_values: dict[str, object] = {}
 
-        config = get_model_config(__cls)
-        populate_by_name = (
-            config.allow_population_by_field_name
-            if isinstance(config, _ConfigProtocol)
-            else config.get("populate_by_name")
-        )
-
         if _fields_set is None:
             _fields_set = set()
 
-        model_fields = get_model_fields(__cls)
-        for name, field in model_fields.items():
-            key = field.alias
-            if key is None or (key not in values and populate_by_name):
-                key = name
+        model_fields, plan = _get_construct_plan(__cls)
+        for field_plan in plan:
+            key = field_plan.key
+            if key not in values and field_plan.fallback_key is not None:
+                key = field_plan.fallback_key
 
             if key in values:
-                fields_values[name] = _construct_field(value=values[key], field=field, key=key)
-                _fields_set.add(name)
+                value = values[key]
+                if field_plan.passthrough and value is not None:
+                    fields_values[field_plan.name] = value
+                else:
+                    fields_values[field_plan.name] = _construct_field(value=value, field=field_plan.field, key=key)
+                _fields_set.add(field_plan.name)
             else:
-                fields_values[name] = field_get_default(field)
+                fields_values[field_plan.name] = field_get_default(field_plan.field)
 
         _extra = {}
         for key, value in values.items():
@@ -355,21 +352,121 @@ class BaseModel(pydantic.BaseModel):
             )
 
 
+class _FieldPlan(NamedTuple):
+    name: str
+
+    key: str
+    """The key the field is read from, i.e. its alias if it has one"""
+
+    fallback_key: str | None
+    """The field name, if the model also accepts it in place of the alias"""
+
+    field: FieldInfo
+
+    passthrough: bool
+    """Whether non-null values are stored as is, see `_is_passthrough_type()`"""
+
+
+def _build_construct_plan(model: type[pydantic.BaseModel]) -> tuple[dict[str, FieldInfo], tuple[_FieldPlan, ...]]:
+    config = get_model_config(model)
+    populate_by_name = (
+        config.allow_population_by_field_name if isinstance(config, _ConfigProtocol) else config.get("populate_by_name")
+    )
+
+    model_fields = get_model_fields(model)
+    plan: list[_FieldPlan] = []
+    for name, field in model_fields.items():
+        type_ = _get_field_type(field)
+        plan.append(
+            _FieldPlan(
+                name=name,
+                key=field.alias or name,
+                fallback_key=name if field.alias is not None and populate_by_name else None,
+                field=field,
+                passthrough=type_ is not None and _is_passthrough_type(type_),
+            )
+        )
+    return model_fields, tuple(plan)
+
+
+_construct_plans: dict[type, tuple[dict[str, FieldInfo], tuple[_FieldPlan, ...]]] = {}
+
+
+def _get_construct_plan(model: type[pydantic.BaseModel]) -> tuple[dict[str, FieldInfo], tuple[_FieldPlan, ...]]:
+    """Returns the model's fields and how to construct each of them, resolved once per model class."""
+    plan = _construct_plans.get(model)
+    if plan is None:
+        plan = _build_construct_plan(model)
+        # the fields of a model with unresolved forward references change once it is rebuilt
+        fields_complete = getattr(model, "__pydantic_fields_complete__", getattr(model, "__pydantic_complete__", True))
+        if not PYDANTIC_V2 or fields_complete:
+            _construct_plans[model] = plan
+    return plan
+
+
+def _get_field_type(field: FieldInfo) -> type | None:
+    if PYDANTIC_V2:
+        return field.annotation
+    return cast(type, field.outer_type_)  # type: ignore
+
+
 def _construct_field(value: object, field: FieldInfo, key: str) -> object:
     if value is None:
         return field_get_default(field)
 
-    if PYDANTIC_V2:
-        type_ = field.annotation
-    else:
-        type_ = cast(type, field.outer_type_)  # type: ignore
-
+    type_ = _get_field_type(field)
     if type_ is None:
         raise RuntimeError(f"Unexpected field type is None for {key}")
 
     return construct_type(value=value, type_=type_, metadata=getattr(field, "metadata", None))
 
 
+_UNCHANGED_TYPES: tuple[object, ...] = (object, Any, type(None))
+
+
+@lru_cache(maxsize=8096)
+def _is_unchanged_type(type_: type, *, in_union: bool) -> bool:
+    if is_annotated_type(type_):
+        type_ = extract_type_arg(type_, 0)
+
+    if type_ in _UNCHANGED_TYPES:
+        return True
+
+    # outside of unions values are never coerced to these types, but unions are validated
+    # first, which e.g. parses "1" as an int and, on Pydantic v1, 1 as a str
+    if type_ is str and (PYDANTIC_V2 or not in_union):
+        return True
+
+    if not in_union and (type_ is int or type_ is bool):
+        return True
+
+    origin = get_origin(type_)
+    args = get_args(type_)
+    if is_union(origin):
+        return all(_is_unchanged_type(variant, in_union=True) for variant in args)
+
+    if origin == list:
+        return len(args) == 1 and _is_unchanged_type(args[0], in_union=in_union)
+
+    if origin == dict:
+        return len(args) == 2 and args[0] is str and _is_unchanged_type(args[1], in_union=in_union)
+
+    return False
+
+
+def _is_passthrough_type(type_: object) -> bool:
+    """Whether `construct_type()` always returns JSON data of the given type unchanged.
+
+    This holds for e.g. `object`, `str`, `List[object]` and `Optional[object]`, so
+    decoded responses of these types can be used as is without being walked.
+    """
+    try:
+        return _is_unchanged_type(cast(type, type_), in_union=False)
+    except TypeError:
+        # unhashable metadata in an `Annotated` type
+        return False
+
+
 def is_basemodel(type_: type) -> bool:
     """Returns whether or not the given type is either a `BaseModel` or a union of `BaseModel`"""
     if is_union(type_):
@@ -434,6 +531,9 @@ def construct_type(*, value: object, type_: object, metadata: Optional[List[Any]
     # we allow `object` as the input type because otherwise, passing things like
     # `Literal['value']` will be reported as a type error by type checkers
     type_ = cast("type[object]", type_)
+    if _is_passthrough_type(type_):
+        return value
+
     if is_type_alias_type(type_):
         original_type = type_  # type: ignore[unreachable]
         type_ = type_.__value__  # type: ignore[unreachable]
@@ -515,6 +615,13 @@ def construct_type(*, value: object, type_: object, metadata: Optional[List[Any]
             return value
 
         inner_type = args[0]  # List[inner_type]
+        if inspect.isclass(inner_type) and issubclass(inner_type, BaseModel):
+            # skip dispatching on the entry type once per entry, e.g. for long pages of models
+            return [
+                inner_type.construct(**entry) if is_mapping(entry) else construct_type(value=entry, type_=inner_type)
+                for entry in value
+            ]
+
         return [construct_type(value=entry, type_=inner_type) for entry in value]
 
     if origin == float:
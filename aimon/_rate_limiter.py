@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import time
+import threading
+from typing import Callable, Optional
+from collections import OrderedDict
+
+import httpx
+
+from ._utils import endpoint_template
+
+__all__ = ["AdaptiveRateLimiter"]
+
+
+class _EndpointState:
+    def __init__(self, rate: float, burst: float, now: float) -> None:
+        self.rate = rate
+        self.tokens = burst
+        self.updated_at = now
+        self.blocked_until = 0.0
+
+
+class AdaptiveRateLimiter:
+    """Client-side rate limiting per endpoint that adapts to the server's rate limits (AIMD).
+
+    Each endpoint (HTTP method and path template, with resource ids replaced by `{id}`) gets a
+    token bucket refilled at its current rate; the `max_endpoints` least recently used are kept.
+    Successful responses increase the rate additively, by about `additive_increase` requests
+    per second for every second of traffic at the current rate; a 429 response multiplies it
+    by `decrease_factor`. A `Retry-After` on a 429 additionally pauses the endpoint for every
+    caller until it has passed, not just for the request that received it.
+
+    Pass one limiter to a client (`rate_limiter=`); it is shared by all of the client's
+    resources, by its copies and by every thread or task using them.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_rate: float = 10.0,
+        min_rate: float = 0.5,
+        max_rate: Optional[float] = None,
+        additive_increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        burst: float = 1.0,
+        max_endpoints: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            initial_rate: Requests per second allowed per endpoint before any feedback.
+            min_rate: Lowest rate a 429 can bring an endpoint down to.
+            max_rate: Highest rate successes can bring an endpoint up to; None = unbounded.
+            additive_increase: Rate increase (requests per second) per second of successful traffic.
+            decrease_factor: Rate multiplier applied on a 429, in (0, 1).
+            burst: Requests that may be sent back to back while the bucket is full.
+            max_endpoints: Endpoints whose state is kept; the least recently used one is dropped beyond that.
+        """
+        if min_rate <= 0:
+            raise ValueError("min_rate must be greater than 0")
+        if initial_rate < min_rate or (max_rate is not None and initial_rate > max_rate):
+            raise ValueError("initial_rate must be between min_rate and max_rate")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be in (0, 1)")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        if max_endpoints < 1:
+            raise ValueError("max_endpoints must be at least 1")
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.additive_increase = additive_increase
+        self.decrease_factor = decrease_factor
+        self.burst = burst
+        self.max_endpoints = max_endpoints
+        self._clock = clock
+        self._endpoints: OrderedDict[str, _EndpointState] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _state(self, key: str, now: float) -> _EndpointState:
+        state = self._endpoints.get(key)
+        if state is None:
+            state = self._endpoints[key] = _EndpointState(self.initial_rate, self.burst, now)
+            if len(self._endpoints) > self.max_endpoints:
+                self._endpoints.popitem(last=False)
+        else:
+            self._endpoints.move_to_end(key)
+        return state
+
+    def reserve(self, key: str) -> float:
+        """Reserve a slot for one request to `key` and return the seconds to wait before sending it."""
+        with self._lock:
+            now = self._clock()
+            state = self._state(key, now)
+            state.tokens = min(self.burst, state.tokens + (now - state.updated_at) * state.rate)
+            state.updated_at = now
+            state.tokens -= 1
+            wait = -state.tokens / state.rate if state.tokens < 0 else 0.0
+            return max(wait, state.blocked_until - now)
+
+    def on_success(self, key: str) -> None:
+        """Additively increase the rate of `key` after a successful response."""
+        with self._lock:
+            state = self._state(key, self._clock())
+            rate = state.rate + self.additive_increase / state.rate
+            state.rate = rate if self.max_rate is None else min(rate, self.max_rate)
+
+    def on_throttle(self, key: str, retry_after: Optional[float] = None) -> None:
+        """Multiplicatively decrease the rate of `key` after a 429 response.
+
+        Args:
+            key: Endpoint key.
+            retry_after: Seconds the server asked to wait, if it sent a `Retry-After` header.
+        """
+        with self._lock:
+            now = self._clock()
+            state = self._state(key, now)
+            state.rate = max(self.min_rate, state.rate * self.decrease_factor)
+            state.tokens = min(state.tokens, 0.0)
+            if retry_after is not None and 0 < retry_after <= 60:
+                state.blocked_until = max(state.blocked_until, now + retry_after)
+
+    def rate(self, key: str) -> float:
+        """Current rate (requests per second) of an endpoint."""
+        with self._lock:
+            state = self._endpoints.get(key)
+            return state.rate if state is not None else self.initial_rate
+
+    @staticmethod
+    def endpoint_key(method: str, url: str) -> str:
+        """Key of the endpoint a request is sent to: the method and the path template, e.g. `GET /v1/application/{id}`."""
+        path = httpx.URL(url).path if "://" in url else url.partition("?")[0]
+        return f"{method.upper()} {endpoint_template(path)}"
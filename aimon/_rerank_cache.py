@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import os
+import json
+import hashlib
+import threading
+from typing import Any, Dict, List, Tuple, Optional, Sequence
+from collections import OrderedDict
+
+from ._types import NotGiven
+
+__all__ = ["RerankCache"]
+
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class RerankPlan:
+    """The cached and missing parts of a single `retrieval.rerank()` call.
+
+    `scores` is a `len(queries) x len(context_docs)` matrix where cache misses are `None`.
+    `query_indices` / `doc_indices` are the positions that still have to be sent to the API;
+    every (query, doc) pair in their cross product is requested, which re-scores a few
+    already cached pairs when the misses are ragged but keeps it to a single request.
+    """
+
+    def __init__(
+        self,
+        *,
+        cache: RerankCache,
+        queries: Sequence[str],
+        doc_hashes: Sequence[str],
+        task_definition: str,
+        model_type: Optional[str],
+        scores: List[List[Optional[float]]],
+    ) -> None:
+        self._cache = cache
+        self._queries = queries
+        self._doc_hashes = doc_hashes
+        self._task_definition = task_definition
+        self._model_type = model_type
+        self.scores = scores
+        self.query_indices = [qi for qi, row in enumerate(scores) if any(s is None for s in row)]
+        self.doc_indices = [
+            di for di in range(len(doc_hashes)) if any(scores[qi][di] is None for qi in self.query_indices)
+        ]
+
+    @property
+    def is_complete(self) -> bool:
+        return not self.query_indices
+
+    def fill(self, fresh: Sequence[Sequence[float]]) -> List[List[float]]:
+        """Merge the API response for the missing sub-matrix back into request order and cache it."""
+        if len(fresh) != len(self.query_indices) or any(len(row) != len(self.doc_indices) for row in fresh):
+            raise ValueError(
+                f"Unexpected rerank response shape; expected {len(self.query_indices)}x{len(self.doc_indices)} scores"
+            )
+
+        entries: List[Tuple[str, float]] = []
+        for row, qi in zip(fresh, self.query_indices):
+            for score, di in zip(row, self.doc_indices):
+                self.scores[qi][di] = score
+                key = self._cache._key(self._queries[qi], self._doc_hashes[di], self._task_definition, self._model_type)
+                entries.append((key, score))
+        self._cache._store(entries)
+        return self.scores  # type: ignore[return-value]
+
+
+class RerankCache:
+    """An LRU cache of `retrieval.rerank()` scores.
+
+    Scores are stored per `(query, sha256(context_doc), task_definition, model_type)` so that a
+    rerank call against a mostly unchanged corpus only sends the uncached documents to the API.
+
+    ```py
+    client = Client(auth_header=..., rerank_cache=RerankCache(maxsize=100_000, path="rerank-cache.json"))
+    ```
+
+    Args:
+        maxsize: The maximum number of (query, document) scores to keep in memory, `None` for unbounded.
+        path: An optional JSON file to load scores from on construction and write to on `save()`.
+    """
+
+    def __init__(self, *, maxsize: Optional[int] = 10_000, path: str | os.PathLike[str] | None = None) -> None:
+        if maxsize is not None and maxsize <= 0:
+            raise ValueError("`maxsize` must be a positive integer or None")
+
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, float] = OrderedDict()
+
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _key(self, query: str, doc_hash: str, task_definition: str, model_type: Optional[str]) -> str:
+        return _hash_text(json.dumps([query, doc_hash, task_definition, model_type]))
+
+    def _store(self, entries: Sequence[Tuple[str, float]]) -> None:
+        with self._lock:
+            for key, score in entries:
+                self._entries[key] = score
+                self._entries.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+    def plan(
+        self,
+        *,
+        queries: Sequence[str],
+        context_docs: Sequence[str],
+        task_definition: str,
+        model_type: str | NotGiven | None,
+    ) -> RerankPlan:
+        """Look up every (query, doc) pair and return the cached scores together with what is missing."""
+        model = None if isinstance(model_type, NotGiven) else model_type
+        doc_hashes = [_hash_text(doc) for doc in context_docs]
+
+        scores: List[List[Optional[float]]] = []
+        with self._lock:
+            for query in queries:
+                row: List[Optional[float]] = []
+                for doc_hash in doc_hashes:
+                    key = self._key(query, doc_hash, task_definition, model)
+                    score = self._entries.get(key)
+                    if score is None:
+                        self.misses += 1
+                    else:
+                        self.hits += 1
+                        self._entries.move_to_end(key)
+                    row.append(score)
+                scores.append(row)
+
+        return RerankPlan(
+            cache=self,
+            queries=queries,
+            doc_hashes=doc_hashes,
+            task_definition=task_definition,
+            model_type=model,
+            scores=scores,
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def load(self, path: str | os.PathLike[str] | None = None) -> None:
+        """Load scores previously written by `save()`, keeping any entries already in memory."""
+        path = path if path is not None else self.path
+        if path is None:
+            raise ValueError("No `path` given to load the rerank cache from")
+
+        with open(path, "r", encoding="utf-8") as fh:
+            data: Dict[str, Any] = json.load(fh)
+        self._store([(key, float(score)) for key, score in data.items()])
+
+    def save(self, path: str | os.PathLike[str] | None = None) -> None:
+        """Write the cached scores to a JSON file, atomically replacing any previous file."""
+        path = path if path is not None else self.path
+        if path is None:
+            raise ValueError("No `path` given to save the rerank cache to")
+
+        with self._lock:
+            data = dict(self._entries)
+
+        tmp_path = f"{os.fspath(path)}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(data, fh)
+        os.replace(tmp_path, path)
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import os
+import json
+import time
+import codecs
 import inspect
 import logging
 import datetime
@@ -24,6 +27,7 @@ import anyio
 import httpx
 import pydantic
 
+from ._hooks import RequestTimings
 from ._types import NoneType
 from ._utils import is_given, extract_type_arg, is_annotated_type, is_type_alias_type, extract_type_var_from_base
 from ._models import BaseModel, is_basemodel
@@ -58,6 +62,9 @@ class BaseAPIResponse(Generic[R]):
     retries_taken: int
     """The number of retries made. If no retries happened this will be `0`"""
 
+    timings: RequestTimings
+    """The time spent in each phase of the request, see `RequestTimings`"""
+
     def __init__(
         self,
         *,
@@ -68,6 +75,7 @@ class BaseAPIResponse(Generic[R]):
         stream_cls: type[Stream[Any]] | type[AsyncStream[Any]] | None,
         options: FinalRequestOptions,
         retries_taken: int = 0,
+        timings: RequestTimings | None = None,
     ) -> None:
         self._cast_to = cast_to
         self._client = client
@@ -77,6 +85,7 @@ class BaseAPIResponse(Generic[R]):
         self._options = options
         self.http_response = raw
         self.retries_taken = retries_taken
+        self.timings = timings if timings is not None else RequestTimings()
 
     @property
     def headers(self) -> httpx.Headers:
@@ -258,13 +267,36 @@ class BaseAPIResponse(Generic[R]):
             # handle the response however you need to.
             return response.text  # type: ignore
 
-        data = response.json()
+        started = time.perf_counter()
+        data = self._client.json_codec.loads(_json_content(response))
+        parsed = time.perf_counter()
 
-        return self._client._process_response_data(
+        result = self._client._process_response_data(
             data=data,
             cast_to=cast_to,  # type: ignore
             response=response,
         )
+        self.timings.parse = parsed - started
+        self.timings.construct = time.perf_counter() - parsed
+        return result
+
+
+def _json_content(response: httpx.Response) -> Union[bytes, str]:
+    """The body of a JSON response for `JSONCodec.loads`.
+
+    UTF-8 bodies are passed as bytes, without a byte order mark, which every codec decodes
+    fastest. Bodies in another `charset`, or in UTF-16 / UTF-32 without one, are decoded to
+    text first, like `httpx.Response.json()` would.
+    """
+    content = response.content
+    encoding = response.charset_encoding or json.detect_encoding(content)
+    try:
+        name = codecs.lookup(encoding).name
+    except LookupError:
+        return response.text
+    if name == "utf-8":
+        return content[len(codecs.BOM_UTF8) :] if content.startswith(codecs.BOM_UTF8) else content
+    return content.decode(encoding, errors="replace")
 
 
 class APIResponse(BaseAPIResponse[R]):
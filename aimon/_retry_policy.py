@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import time
+import random
+import threading
+from typing import Optional
+
+from ._constants import MAX_RETRY_DELAY, INITIAL_RETRY_DELAY
+
+__all__ = ["RetryBudget", "RetryPolicy", "RetryState"]
+
+
+class RetryBudget:
+    """A token bucket capping retries to a fraction of all calls, shared across threads.
+
+    Every call deposits `retry_ratio` tokens and every retry withdraws one, so in steady state at
+    most `retry_ratio` retries are made per call, plus a burst of up to `max_tokens` retries. While
+    a backend is failing the bucket drains and retries stop, instead of every caller multiplying
+    the load by its retry count. Share one budget between every layer that retries (client,
+    `Detect`, pipeline) so that nested retries draw from the same pool.
+    """
+
+    def __init__(self, *, max_tokens: float = 10.0, retry_ratio: float = 0.1) -> None:
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be at least 1")
+        if retry_ratio < 0:
+            raise ValueError("retry_ratio must not be negative")
+        self.max_tokens = max_tokens
+        self.retry_ratio = retry_ratio
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            return self._tokens
+
+    def deposit(self) -> None:
+        """Credit the budget for a new call."""
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.retry_ratio)
+
+    def try_withdraw(self) -> bool:
+        """Take one token for a retry; returns False if the budget is exhausted."""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class RetryPolicy:
+    """How and whether to retry, shared by the API client, `Detect` and the reprompting pipeline.
+
+    Delays use decorrelated jitter: each delay is drawn uniformly from
+    `[initial_delay, 3 * previous_delay]` and capped at `max_delay`, which spreads out callers that
+    failed at the same moment better than jittered exponential backoff. A retry is refused when
+    the optional `budget` is exhausted or when its delay would end after the call's deadline.
+
+    The number of attempts stays with the caller (e.g. the client's `max_retries`); the policy only
+    decides the delays and whether a retry may happen at all.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_delay: float = INITIAL_RETRY_DELAY,
+        max_delay: float = MAX_RETRY_DELAY,
+        budget: Optional[RetryBudget] = None,
+        timeout: Optional[float] = None,
+        respect_retry_after: bool = True,
+    ) -> None:
+        """
+        Args:
+            initial_delay: Smallest delay before a retry, in seconds.
+            max_delay: Largest delay before a retry, in seconds.
+            budget: Retry budget shared with other policies, if any.
+            timeout: Default time in seconds a call may take including all its retries; None = no deadline.
+            respect_retry_after: Wait as long as a server's `Retry-After` asks (up to 60 seconds)
+                instead of the jittered delay.
+        """
+        if initial_delay <= 0:
+            raise ValueError("initial_delay must be greater than 0")
+        if max_delay < initial_delay:
+            raise ValueError("max_delay must not be smaller than initial_delay")
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.timeout = timeout
+        self.respect_retry_after = respect_retry_after
+        self._random = random.random
+
+    def start(self, deadline: Optional[float] = None) -> RetryState:
+        """Begin a call: credit the budget and return the state tracking its retries.
+
+        Args:
+            deadline: Absolute `time.monotonic()` deadline of the call. Defaults to `timeout` from now.
+        """
+        if deadline is None and self.timeout is not None:
+            deadline = time.monotonic() + self.timeout
+        if self.budget is not None:
+            self.budget.deposit()
+        return RetryState(self, deadline)
+
+    def compute_delay(self, previous_delay: Optional[float]) -> float:
+        """Decorrelated jitter delay following a delay of `previous_delay` (None before the first retry)."""
+        previous = self.initial_delay if previous_delay is None else previous_delay
+        delay = self.initial_delay + (previous * 3 - self.initial_delay) * self._random()
+        return min(delay, self.max_delay)
+
+
+class RetryState:
+    """Retry bookkeeping of a single call, created by `RetryPolicy.start()`."""
+
+    def __init__(self, policy: RetryPolicy, deadline: Optional[float]) -> None:
+        self.policy = policy
+        self.deadline = deadline
+        self.retries = 0
+        self._previous_delay: Optional[float] = None
+
+    def next_delay(self, retry_after: Optional[float] = None) -> Optional[float]:
+        """Seconds to wait before the next retry, or None if the policy refuses to retry.
+
+        Args:
+            retry_after: Delay requested by the server through a `Retry-After` header, if any.
+        """
+        policy = self.policy
+        if policy.respect_retry_after and retry_after is not None and 0 < retry_after <= 60:
+            delay = retry_after
+        else:
+            delay = policy.compute_delay(self._previous_delay)
+        if self.deadline is not None and time.monotonic() + delay >= self.deadline:
+            return None
+        if policy.budget is not None and not policy.budget.try_withdraw():
+            return None
+        self._previous_delay = delay
+        self.retries += 1
+        return delay
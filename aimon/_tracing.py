@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import time
+import random
+import threading
+import contextlib
+from typing import Any, Dict, List, Mapping, Iterator, Optional
+from contextvars import ContextVar
+from collections import deque
+
+import httpx
+
+from ._hooks import RequestHooks, RequestTimings
+from ._utils import endpoint_template
+from ._version import __version__
+
+__all__ = ["RecordedSpan", "SpanRecorder", "get_tracer", "set_tracer"]
+
+_UNSET: Any = object()
+_tracer: Any = _UNSET
+_tracer_lock = threading.Lock()
+
+_current_span: ContextVar[Optional["RecordedSpan"]] = ContextVar("aimon_current_span", default=None)
+_current_request: ContextVar[Optional["_RequestSpan"]] = ContextVar("aimon_current_request", default=None)
+
+
+class RecordedSpan:
+    """A span recorded by a `SpanRecorder`.
+
+    `status` is "unset" or "error"; `error` is the exception recorded for a failed span.
+    `start_time` and `end_time` are `time.time()` values, `duration` is in seconds.
+    """
+
+    def __init__(self, recorder: SpanRecorder, name: str, attributes: Optional[Mapping[str, Any]], parent: Optional[RecordedSpan]) -> None:
+        self.name = name
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.trace_id = parent.trace_id if parent is not None else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent is not None else None
+        self.status = "unset"
+        self.error: Optional[BaseException] = None
+        self.start_time = time.time()
+        self.end_time: Optional[float] = None
+        self.duration: Optional[float] = None
+        self._started = time.perf_counter()
+        self._recorder = recorder
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exception: BaseException) -> None:
+        self.status = "error"
+        self.error = exception
+
+    def is_recording(self) -> bool:
+        return self.end_time is None
+
+    def end(self) -> None:
+        if self.end_time is not None:
+            return
+        self.duration = time.perf_counter() - self._started
+        self.end_time = self.start_time + self.duration
+        self._recorder._finished(self)
+
+    def __repr__(self) -> str:
+        duration = "running" if self.duration is None else f"{self.duration * 1000:.2f}ms"
+        return f"{self.__class__.__name__}({self.name!r}, {duration}, status={self.status!r})"
+
+
+class SpanRecorder:
+    """An in-process tracer keeping the last `maxlen` finished spans, used when OpenTelemetry is not installed.
+
+    ```py
+    recorder = SpanRecorder()
+    aimon.set_tracer(recorder)
+    ...
+    for span in recorder.get_finished_spans():
+        print(span.name, span.duration, span.attributes)
+    ```
+
+    Spans started while another span of the same thread or task is current become its children.
+    """
+
+    def __init__(self, maxlen: int = 1000) -> None:
+        if maxlen < 1:
+            raise ValueError("maxlen must be greater than 0")
+        self._spans: deque[RecordedSpan] = deque(maxlen=maxlen)
+
+    def start_span(self, name: str, attributes: Optional[Mapping[str, Any]] = None) -> RecordedSpan:
+        """Starts a child of the current span without making it current; call `end()` on it when done."""
+        return RecordedSpan(self, name, attributes, _current_span.get())
+
+    @contextlib.contextmanager
+    def start_as_current_span(self, name: str, attributes: Optional[Mapping[str, Any]] = None) -> Iterator[RecordedSpan]:
+        """Starts a span and makes it current until the block exits, recording any exception raised in it."""
+        span = self.start_span(name, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.record_exception(exc)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def _finished(self, span: RecordedSpan) -> None:
+        self._spans.append(span)
+
+    def get_finished_spans(self) -> List[RecordedSpan]:
+        """The finished spans, oldest first."""
+        return list(self._spans)
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+
+class _NoopSpan:
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_exception(self, exception: BaseException) -> None:
+        pass
+
+    def is_recording(self) -> bool:
+        return False
+
+    def end(self) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def _default_tracer() -> Any:
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        return SpanRecorder()
+    return trace.get_tracer("aimon", __version__)
+
+
+def get_tracer() -> Any:
+    """The tracer the SDK creates its spans with, see `set_tracer()`."""
+    global _tracer
+    if _tracer is _UNSET:
+        with _tracer_lock:
+            if _tracer is _UNSET:
+                _tracer = _default_tracer()
+    return _tracer
+
+
+def set_tracer(tracer: Any) -> None:
+    """Sets the tracer the SDK creates its spans with.
+
+    By default spans are created with the OpenTelemetry API if it is installed, so they join the
+    traces of the application, and are kept in a `SpanRecorder` otherwise. Pass an OpenTelemetry
+    `Tracer`, a `SpanRecorder`, or `None` to disable tracing.
+    """
+    global _tracer
+    _tracer = tracer
+
+
+def _clean(attributes: Mapping[str, Any]) -> Dict[str, Any]:
+    # OpenTelemetry rejects None attribute values
+    return {key: value for key, value in attributes.items() if value is not None}
+
+
+def record_error(span: Any, error: BaseException) -> None:
+    """Marks `span` as failed with `error`, for spans that are ended explicitly."""
+    span.record_exception(error)
+    if isinstance(span, (RecordedSpan, _NoopSpan)):
+        return
+    try:
+        from opentelemetry.trace import Status, StatusCode
+    except ImportError:  # pragma: no cover
+        return
+    span.set_status(Status(StatusCode.ERROR, str(error)))
+
+
+@contextlib.contextmanager
+def start_span(name: str, attributes: Optional[Mapping[str, Any]] = None) -> Iterator[Any]:
+    """Runs the block in a new current span; yields a no-op span when tracing is disabled."""
+    tracer = get_tracer()
+    if tracer is None:
+        yield _NOOP_SPAN
+        return
+    with tracer.start_as_current_span(name, attributes=_clean(attributes or {})) as span:
+        yield span
+
+
+def _request_size(request: httpx.Request) -> Optional[int]:
+    try:
+        return len(request.content)
+    except httpx.RequestNotRead:
+        # a streamed upload
+        return None
+
+
+class _RequestSpan(RequestHooks):
+    """Traces the attempts of a client request as children of its span, driven by the client's request hooks."""
+
+    def __init__(self, tracer: Any, span: Any, name: str) -> None:
+        self._tracer = tracer
+        self._span = span
+        self._name = name
+        self._attempt: Any = None
+
+    def _end_attempt(self, **attributes: Any) -> Any:
+        attempt = self._attempt
+        self._attempt = None
+        if attempt is not None:
+            for key, value in _clean(attributes).items():
+                attempt.set_attribute(key, value)
+        return attempt
+
+    def on_request(self, request: httpx.Request, *, retries_taken: int) -> None:
+        previous = self._end_attempt()
+        if previous is not None:
+            previous.end()
+        self._attempt = self._tracer.start_span(
+            self._name,
+            attributes=_clean(
+                {
+                    "http.request.method": request.method,
+                    "url.template": endpoint_template(request.url.path),
+                    "server.address": request.url.host,
+                    "http.request.resend_count": retries_taken or None,
+                    "http.request.body.size": _request_size(request),
+                }
+            ),
+        )
+
+    def on_response(self, response: httpx.Response, *, timings: RequestTimings, retries_taken: int) -> None:
+        attempt = self._end_attempt(
+            **{
+                "http.response.status_code": response.status_code,
+                "http.response.body.size": response.num_bytes_downloaded if response.is_stream_consumed else None,
+            }
+        )
+        if attempt is not None:
+            attempt.end()
+        self._span.set_attribute("http.response.status_code", response.status_code)
+        self._span.set_attribute("aimon.retry_count", retries_taken)
+
+    def on_retry(
+        self,
+        request: httpx.Request,  # noqa: ARG002
+        *,
+        retries_taken: int,  # noqa: ARG002
+        delay: float,
+        response: Optional[httpx.Response],
+        error: Optional[Exception],
+    ) -> None:
+        attempt = self._end_attempt(
+            **{
+                "http.response.status_code": response.status_code if response is not None else None,
+                "error.type": str(response.status_code) if response is not None else type(error).__name__,
+                "aimon.retry_delay": delay,
+            }
+        )
+        if attempt is not None:
+            if error is not None:
+                record_error(attempt, error)
+            attempt.end()
+
+    def on_error(self, request: httpx.Request, error: Exception, *, timings: RequestTimings, retries_taken: int) -> None:  # noqa: ARG002
+        status_code = getattr(error, "status_code", None)
+        attempt = self._end_attempt(**{"http.response.status_code": status_code, "error.type": type(error).__name__})
+        if attempt is not None:
+            record_error(attempt, error)
+            attempt.end()
+        self._span.set_attribute("error.type", type(error).__name__)
+        self._span.set_attribute("aimon.retry_count", retries_taken)
+        if status_code is not None:
+            self._span.set_attribute("http.response.status_code", status_code)
+
+    def close(self) -> None:
+        attempt = self._end_attempt()
+        if attempt is not None:
+            attempt.end()
+
+
+@contextlib.contextmanager
+def trace_request(method: str, url: str) -> Iterator[None]:
+    """Traces a client request: an `aimon.request` span with one HTTP client span per attempt."""
+    tracer = get_tracer()
+    if tracer is None:
+        yield
+        return
+    method = method.upper()
+    path = httpx.URL(url).path if "://" in url else url.partition("?")[0]
+    endpoint = endpoint_template(path)
+    with tracer.start_as_current_span(
+        "aimon.request", attributes={"http.request.method": method, "url.template": endpoint}
+    ) as span:
+        request_span = _RequestSpan(tracer, span, f"{method} {endpoint}")
+        token = _current_request.set(request_span)
+        try:
+            yield
+        finally:
+            _current_request.reset(token)
+            request_span.close()
+
+
+def current_request_span() -> Optional[_RequestSpan]:
+    return _current_request.get()
@@ -18,6 +18,7 @@ from ._utils import (
     removeprefix as removeprefix,
     removesuffix as removesuffix,
     extract_files as extract_files,
+    endpoint_template as endpoint_template,
     is_sequence_t as is_sequence_t,
     required_args as required_args,
     coerce_boolean as coerce_boolean,
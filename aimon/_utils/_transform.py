@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import io
+import time
 import base64
 import pathlib
-from typing import Any, Mapping, TypeVar, cast
+from contextvars import ContextVar
+from typing import Any, Mapping, TypeVar, NamedTuple, cast
 from datetime import date, datetime
 from typing_extensions import Literal, get_args, override, get_type_hints as _get_type_hints
 
@@ -27,10 +29,13 @@ from ._typing import (
     is_annotated_type,
     strip_annotated_type,
 )
-from .._compat import get_origin, model_dump, is_typeddict
+from .._compat import get_origin, model_dump, is_typeddict, is_literal_type
 
 _T = TypeVar("_T")
 
+# seconds spent in `transform()` since the client last picked them up, see `take_transform_time()`
+_transform_time: ContextVar[float | None] = ContextVar("_transform_time", default=None)
+
 
 # TODO: support for drilling globals() and locals()
 # TODO: ensure works correctly with forward references in all cases
@@ -106,10 +111,29 @@ def transform(
 
     It should be noted that the transformations that this function does are not represented in the type system.
     """
+    started = time.perf_counter()
     transformed = _transform_recursive(data, annotation=cast(type, expected_type))
+    _add_transform_time(time.perf_counter() - started)
     return cast(_T, transformed)
 
 
+def _add_transform_time(seconds: float) -> None:
+    spent = _transform_time.get()
+    _transform_time.set(seconds if spent is None else spent + seconds)
+
+
+def take_transform_time() -> float | None:
+    """Returns and resets the time spent transforming params in the current context.
+
+    Resource methods transform their params right before making the request, so the
+    client attributes this time to the request it is about to send.
+    """
+    spent = _transform_time.get()
+    if spent is not None:
+        _transform_time.set(None)
+    return spent
+
+
 @lru_cache(maxsize=8096)
 def _get_annotated_type(type_: type) -> type | None:
     """If the given type is an `Annotated` type then it is returned, if not `None` is returned.
@@ -145,8 +169,74 @@ def _maybe_transform_key(key: str, type_: type) -> str:
     return key
 
 
+@lru_cache(maxsize=8096)
+def _get_property_format(type_: type) -> PropertyInfo | None:
+    """Returns the `PropertyInfo` that formats data of the given type, if there is one."""
+    annotated_type = _get_annotated_type(type_)
+    if annotated_type is None:
+        return None
+
+    # ignore the first argument as it is the actual type
+    annotations = get_args(annotated_type)[1:]
+    for annotation in annotations:
+        if isinstance(annotation, PropertyInfo) and annotation.format is not None:
+            return annotation
+
+    return None
+
+
+_PASSTHROUGH_TYPES: tuple[object, ...] = (str, int, float, bool, type(None))
+
+
+@lru_cache(maxsize=8096)
 def _no_transform_needed(annotation: type) -> bool:
-    return annotation == float or annotation == int
+    """Whether data of the given type is always sent as is, so it does not need to be walked.
+
+    This holds for primitives, literals, and lists, dicts and unions of them that carry no
+    `PropertyInfo` formatting. TypedDicts are always walked as their keys may be aliased and
+    `NotGiven` values have to be dropped, `Iterable[T]` data has to be converted to a list
+    and anything we cannot reason about, e.g. `object`, may hold pydantic models.
+    """
+    if _get_property_format(annotation) is not None:
+        return False
+
+    stripped_type = strip_annotated_type(annotation)
+    if stripped_type in _PASSTHROUGH_TYPES or is_literal_type(stripped_type):
+        return True
+
+    if is_list_type(stripped_type) or is_union_type(stripped_type):
+        args = get_args(stripped_type)
+        return len(args) > 0 and all(_no_transform_needed(arg) for arg in args)
+
+    if get_origin(stripped_type) == dict:
+        args = get_args(stripped_type)
+        return len(args) == 2 and _no_transform_needed(args[1])
+
+    return False
+
+
+class _TypedDictField(NamedTuple):
+    key: str
+    """The key sent to the API, i.e. the `PropertyInfo` alias if there is one"""
+
+    annotation: type
+
+    passthrough: bool
+    """Whether values of this field can be sent as is"""
+
+
+@lru_cache(maxsize=8096)
+def _get_typeddict_plan(expected_type: type) -> dict[str, _TypedDictField]:
+    """Resolves the type hints, aliases and formats of a TypedDict once, instead of on every transform."""
+    annotations = get_type_hints(expected_type, include_extras=True)
+    return {
+        key: _TypedDictField(
+            key=_maybe_transform_key(key, type_),
+            annotation=type_,
+            passthrough=_no_transform_needed(type_),
+        )
+        for key, type_ in annotations.items()
+    }
 
 
 def _transform_recursive(
@@ -170,6 +260,10 @@ def _transform_recursive(
     if inner_type is None:
         inner_type = annotation
 
+    # formatting from the outer annotation is applied to each entry of a container type
+    if _no_transform_needed(inner_type) and (inner_type is annotation or _get_property_format(annotation) is None):
+        return data
+
     stripped_type = strip_annotated_type(inner_type)
     origin = get_origin(stripped_type) or stripped_type
     if is_typeddict(stripped_type) and is_mapping(data):
@@ -191,7 +285,7 @@ def _transform_recursive(
             return cast(object, data)
 
         inner_type = extract_type_arg(stripped_type, 0)
-        if _no_transform_needed(inner_type):
+        if _no_transform_needed(inner_type) and _get_property_format(annotation) is None:
             # for some types there is no need to transform anything, so we can get a small
             # perf boost from skipping that work.
             #
@@ -214,17 +308,11 @@ def _transform_recursive(
     if isinstance(data, pydantic.BaseModel):
         return model_dump(data, exclude_unset=True, mode="json")
 
-    annotated_type = _get_annotated_type(annotation)
-    if annotated_type is None:
+    property_info = _get_property_format(annotation)
+    if property_info is None or property_info.format is None:
         return data
 
-    # ignore the first argument as it is the actual type
-    annotations = get_args(annotated_type)[1:]
-    for annotation in annotations:
-        if isinstance(annotation, PropertyInfo) and annotation.format is not None:
-            return _format_data(data, annotation.format, annotation.format_template)
-
-    return data
+    return _format_data(data, property_info.format, property_info.format_template)
 
 
 def _format_data(data: object, format_: PropertyFormat, format_template: str | None) -> object:
@@ -259,19 +347,21 @@ def _transform_typeddict(
     expected_type: type,
 ) -> Mapping[str, object]:
     result: dict[str, object] = {}
-    annotations = get_type_hints(expected_type, include_extras=True)
+    plan = _get_typeddict_plan(expected_type)
     for key, value in data.items():
         if not is_given(value):
             # we don't need to include `NotGiven` values here as they'll
             # be stripped out before the request is sent anyway
             continue
 
-        type_ = annotations.get(key)
-        if type_ is None:
+        field = plan.get(key)
+        if field is None:
             # we do not have a type annotation for this field, leave it as is
             result[key] = value
+        elif field.passthrough:
+            result[field.key] = value
         else:
-            result[_maybe_transform_key(key, type_)] = _transform_recursive(value, annotation=type_)
+            result[field.key] = _transform_recursive(value, annotation=field.annotation)
     return result
 
 
@@ -307,7 +397,9 @@ async def async_transform(
 
     It should be noted that the transformations that this function does are not represented in the type system.
     """
+    started = time.perf_counter()
     transformed = await _async_transform_recursive(data, annotation=cast(type, expected_type))
+    _add_transform_time(time.perf_counter() - started)
     return cast(_T, transformed)
 
 
@@ -332,6 +424,10 @@ async def _async_transform_recursive(
     if inner_type is None:
         inner_type = annotation
 
+    # formatting from the outer annotation is applied to each entry of a container type
+    if _no_transform_needed(inner_type) and (inner_type is annotation or _get_property_format(annotation) is None):
+        return data
+
     stripped_type = strip_annotated_type(inner_type)
     origin = get_origin(stripped_type) or stripped_type
     if is_typeddict(stripped_type) and is_mapping(data):
@@ -353,7 +449,7 @@ async def _async_transform_recursive(
             return cast(object, data)
 
         inner_type = extract_type_arg(stripped_type, 0)
-        if _no_transform_needed(inner_type):
+        if _no_transform_needed(inner_type) and _get_property_format(annotation) is None:
             # for some types there is no need to transform anything, so we can get a small
             # perf boost from skipping that work.
             #
@@ -376,17 +472,11 @@ async def _async_transform_recursive(
     if isinstance(data, pydantic.BaseModel):
         return model_dump(data, exclude_unset=True, mode="json")
 
-    annotated_type = _get_annotated_type(annotation)
-    if annotated_type is None:
+    property_info = _get_property_format(annotation)
+    if property_info is None or property_info.format is None:
         return data
 
-    # ignore the first argument as it is the actual type
-    annotations = get_args(annotated_type)[1:]
-    for annotation in annotations:
-        if isinstance(annotation, PropertyInfo) and annotation.format is not None:
-            return await _async_format_data(data, annotation.format, annotation.format_template)
-
-    return data
+    return await _async_format_data(data, property_info.format, property_info.format_template)
 
 
 async def _async_format_data(data: object, format_: PropertyFormat, format_template: str | None) -> object:
@@ -421,19 +511,21 @@ async def _async_transform_typeddict(
     expected_type: type,
 ) -> Mapping[str, object]:
     result: dict[str, object] = {}
-    annotations = get_type_hints(expected_type, include_extras=True)
+    plan = _get_typeddict_plan(expected_type)
     for key, value in data.items():
         if not is_given(value):
             # we don't need to include `NotGiven` values here as they'll
             # be stripped out before the request is sent anyway
             continue
 
-        type_ = annotations.get(key)
-        if type_ is None:
+        field = plan.get(key)
+        if field is None:
             # we do not have a type annotation for this field, leave it as is
             result[key] = value
+        elif field.passthrough:
+            result[field.key] = value
         else:
-            result[_maybe_transform_key(key, type_)] = await _async_transform_recursive(value, annotation=type_)
+            result[field.key] = await _async_transform_recursive(value, annotation=field.annotation)
     return result
 
 
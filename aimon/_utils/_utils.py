@@ -420,3 +420,16 @@ def json_safe(data: object) -> object:
         return data.isoformat()
 
     return data
+
+
+# path segments kept as is by `endpoint_template`; anything else, e.g. ids and api keys, becomes "{id}"
+_STATIC_SEGMENT = re.compile(r"^(?:v\d+|[a-z]+(?:[-_][a-z]+)*)$")
+
+
+@lru_cache(maxsize=1024)
+def endpoint_template(path: str) -> str:
+    """Replaces the ids in a URL path by "{id}", e.g. "/v1/application/app-1" -> "/v1/application/{id}".
+
+    Used to label metrics, spans and rate limits per endpoint rather than per resource.
+    """
+    return "/".join(segment if not segment or _STATIC_SEGMENT.match(segment) else "{id}" for segment in path.split("/"))
@@ -1,11 +1,16 @@
 from functools import wraps
+import inspect
+import logging
 import os
 
 import json, textwrap
 
-from aimon import Client
+from aimon import Client, AsyncClient
+from aimon._tracing import start_span
 from .evaluate import Application, Model
 
+logger = logging.getLogger(__name__)
+
 class DetectResult:
     """
     A class to represent the result of an AIMon detection operation.
@@ -72,7 +77,8 @@ class Detect:
 
     This decorator wraps a function that generates text using an LLM and sends the generated text
     along with context to AIMon for analysis. It can be used in both synchronous and asynchronous modes,
-    and optionally publishes results to the AIMon UI.
+    and optionally publishes results to the AIMon UI. Coroutine functions (`async def`) can be decorated
+    as well, in which case the detection request is sent with an `AsyncClient` and the wrapper must be awaited.
 
     Parameters:
     -----------
@@ -135,7 +141,7 @@ class Detect:
     """
     DEFAULT_CONFIG = {'hallucination': {'detector_name': 'default'}}
 
-    def __init__(self, values_returned, api_key=None, config=None, async_mode=False, publish=False, application_name=None, model_name=None, must_compute='all_or_none'):
+    def __init__(self, values_returned, api_key=None, config=None, async_mode=False, publish=False, application_name=None, model_name=None, must_compute='all_or_none', retry_policy=None, metrics_registry=None):
         """
         :param values_returned: A list of values in the order returned by the decorated function
                                 Acceptable values are 'generated_text', 'context', 'user_query', 'instructions'
@@ -147,11 +153,17 @@ class Detect:
         :param application_name: The name of the application to use when publish is True
         :param model_name: The name of the model to use when publish is True
         :param must_compute: String, indicates the computation strategy. Must be either 'all_or_none' or 'ignore_failures'. Default is 'all_or_none'.
+        :param retry_policy: Optional `aimon.RetryPolicy` deciding the retries of detection requests, e.g. to share a retry budget with other layers.
+        :param metrics_registry: Optional `aimon.MetricsRegistry` recording the detection requests, e.g. one shared by all decorators of a service.
         """
         api_key = os.getenv('AIMON_API_KEY') if not api_key else api_key
         if api_key is None:
             raise ValueError("API key is None")
-        self.client = Client(auth_header="Bearer {}".format(api_key))
+        self._api_key = api_key
+        self.retry_policy = retry_policy
+        self.metrics_registry = metrics_registry
+        self.client = Client(auth_header="Bearer {}".format(api_key), retry_policy=retry_policy, metrics_registry=metrics_registry)
+        self._async_client = None
         self.config = config if config else self.DEFAULT_CONFIG
         self.values_returned = values_returned
         if self.values_returned is None or not hasattr(self.values_returned, '__iter__') or len(self.values_returned) == 0:
@@ -176,46 +188,136 @@ class Detect:
         self.application_name = application_name
         self.model_name = model_name
 
+    @property
+    def async_client(self):
+        """
+        An AsyncClient sharing this decorator's API key, created on first use by async decorated functions.
+        """
+        if self._async_client is None:
+            self._async_client = AsyncClient(
+                auth_header="Bearer {}".format(self._api_key), retry_policy=self.retry_policy, metrics_registry=self.metrics_registry
+            )
+        return self._async_client
+
+    def _build_payload(self, result, config=None):
+        # Create a dictionary mapping output names to results
+        aimon_payload = {name: value for name, value in zip(self.values_returned, result)}
+
+        aimon_payload['config'] = config if config is not None else self.config
+        aimon_payload['publish'] = self.publish
+        aimon_payload['async_mode'] = self.async_mode
+        aimon_payload['must_compute'] = self.must_compute
+
+        # Include application_name and model_name if publishing
+        if self.publish:
+            aimon_payload['application_name'] = self.application_name
+            aimon_payload['model_name'] = self.model_name
+
+        return [aimon_payload]
+
+    def _span_attributes(self, config=None, batch_size=None):
+        """
+        Attributes of the tracing span around a detection: the detectors run and how the result is published.
+        """
+        config = config if config is not None else self.config
+        return {
+            "aimon.detectors": sorted(config.keys()),
+            "aimon.batch_size": batch_size,
+            "aimon.publish": self.publish,
+            "aimon.async_mode": self.async_mode,
+            "aimon.application_name": self.application_name,
+            "aimon.model_name": self.model_name,
+        }
+
+    def _parse_detect_response(self, detect_response):
+        # Check if the response is a list
+        if isinstance(detect_response, list) and len(detect_response) > 0:
+            return detect_response[0]
+        elif isinstance(detect_response, dict):
+            return detect_response  # Single dict response
+        raise ValueError("Unexpected response format from detect API: {}".format(detect_response))
+
+    def detect_batch(self, rows, config=None):
+        """
+        Run detection for several outputs in a single request, without decorating a function.
+
+        :param rows: An iterable of tuples, each ordered like `values_returned`
+        :param config: Detector configuration for this request only. Defaults to the decorator's `config`.
+        :return: A list of DetectResult objects, one per row, in the same order
+        """
+        data_to_send = [self._build_payload(tuple(row), config)[0] for row in rows]
+        with start_span("aimon.detect_batch", self._span_attributes(config, len(data_to_send))):
+            detect_response = self.client.inference.detect(body=data_to_send)
+            return self._parse_batch_response(detect_response, len(data_to_send))
+
+    async def adetect_batch(self, rows, config=None):
+        """
+        Async counterpart of `detect_batch`, sent with the AsyncClient.
+
+        :param rows: An iterable of tuples, each ordered like `values_returned`
+        :param config: Detector configuration for this request only. Defaults to the decorator's `config`.
+        :return: A list of DetectResult objects, one per row, in the same order
+        """
+        data_to_send = [self._build_payload(tuple(row), config)[0] for row in rows]
+        with start_span("aimon.detect_batch", self._span_attributes(config, len(data_to_send))):
+            detect_response = await self.async_client.inference.detect(body=data_to_send)
+            return self._parse_batch_response(detect_response, len(data_to_send))
+
+    def _parse_batch_response(self, detect_response, expected):
+        if not isinstance(detect_response, list) or len(detect_response) != expected:
+            raise ValueError("Unexpected response format from detect API: {}".format(detect_response))
+        return [DetectResult(200 if item else 500, item) for item in detect_response]
+
     def __call__(self, func):
+        if inspect.iscoroutinefunction(func):
+            return self._wrap_async(func)
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            result = func(*args, **kwargs)
-
-            # Handle the case where the result is a single value
-            if not isinstance(result, tuple):
-                result = (result,)
-
-            # Create a dictionary mapping output names to results
-            aimon_payload = {name: value for name, value in zip(self.values_returned, result)}
-
-            aimon_payload['config'] = self.config
-            aimon_payload['publish'] = self.publish
-            aimon_payload['async_mode'] = self.async_mode
-            aimon_payload['must_compute'] = self.must_compute
-
-            # Include application_name and model_name if publishing
-            if self.publish:
-                aimon_payload['application_name'] = self.application_name
-                aimon_payload['model_name'] = self.model_name
-
-            data_to_send = [aimon_payload]
-
-            try:
-                detect_response = self.client.inference.detect(body=data_to_send)
-                # Check if the response is a list
-                if isinstance(detect_response, list) and len(detect_response) > 0:
-                    detect_result = detect_response[0]
-                elif isinstance(detect_response, dict):
-                    detect_result = detect_response  # Single dict response
-                else:
-                    raise ValueError("Unexpected response format from detect API: {}".format(detect_response))
-            except Exception as e:
-                # Log the error and raise it
-                print(f"Error during detection: {e}")
-                raise
-
-            # Return the original result along with the DetectResult
-            return result + (DetectResult(200 if detect_result else 500, detect_result),)
+            with start_span("aimon.detect", {"code.function": func.__qualname__, **self._span_attributes()}):
+                result = func(*args, **kwargs)
+
+                # Handle the case where the result is a single value
+                if not isinstance(result, tuple):
+                    result = (result,)
+
+                data_to_send = self._build_payload(result)
+
+                try:
+                    detect_result = self._parse_detect_response(self.client.inference.detect(body=data_to_send))
+                except Exception as e:
+                    # Log the error and raise it
+                    print(f"Error during detection: {e}")
+                    raise
+
+                # Return the original result along with the DetectResult
+                return result + (DetectResult(200 if detect_result else 500, detect_result),)
+
+
+        return wrapper
+
+    def _wrap_async(self, func):
+        """
+        Same as the synchronous wrapper, but awaits the decorated coroutine and
+        sends the detection request with the AsyncClient.
+        """
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with start_span("aimon.detect", {"code.function": func.__qualname__, **self._span_attributes()}):
+                result = await func(*args, **kwargs)
+
+                if not isinstance(result, tuple):
+                    result = (result,)
+
+                data_to_send = self._build_payload(result)
+
+                try:
+                    detect_response = await self.async_client.inference.detect(body=data_to_send)
+                    detect_result = self._parse_detect_response(detect_response)
+                except Exception as e:
+                    logger.error(f"Error during detection: {e}")
+                    raise
 
+                return result + (DetectResult(200 if detect_result else 500, detect_result),)
 
         return wrapper
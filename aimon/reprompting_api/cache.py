@@ -0,0 +1,93 @@
+"""
+cache.py — Memoization of LLM outputs and AIMon detection results.
+
+With a deterministic LLM (e.g. temperature 0), identical prompts produce identical responses,
+and identical responses get identical detection results. A `ResponseCache` shared by the
+sessions of a pipeline lets repeated queries finish without calling the LLM or AIMon again.
+
+Entries are keyed by a hash of everything that determines the output, evicted least recently
+used first once `max_entries` is reached, and expire `ttl_seconds` after they were stored.
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+import hashlib
+import json
+import threading
+import time
+
+def make_key(*parts) -> str:
+    """
+    Build a cache key from JSON-serializable parts.
+
+    Returns:
+        str: sha256 hex digest of the parts.
+    """
+    encoded = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache whose entries expire after a time to live.
+
+    Attributes:
+        max_entries (int): Maximum number of entries kept.
+        ttl_seconds (float, optional): Lifetime of an entry; None = entries never expire.
+        hits (int): Lookups that found a live entry.
+        misses (int): Lookups that found nothing or an expired entry.
+    """
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = 3600, clock: Callable[[], float] = time.monotonic):
+        if max_entries < 1:
+            raise ValueError("max_entries must be greater than 0")
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be greater than 0")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a live entry and mark it as recently used.
+
+        Returns:
+            Optional[Any]: The cached value, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entry if the cache is full.
+        None values are not stored, since `get` uses None to signal a miss.
+        """
+        if value is None:
+            return
+        expires_at = None if self.ttl_seconds is None else self._clock() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries and reset the hit and miss counts."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
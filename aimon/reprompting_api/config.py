@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import Any, Optional
 from dataclasses import dataclass
 import random
 import string
@@ -11,6 +11,9 @@ def generate_random_string(length: int) -> str:
   characters = string.ascii_letters + string.digits
   return ''.join(random.choice(characters) for i in range(length))
 
+# Substituted by the runner when no context is given; groundedness cannot be evaluated against it
+NO_CONTEXT_PLACEHOLDER = "[no context provided]"
+
 class StopReasons:
     ALL_INSTRUCTIONS_ADHERED = "all_instructions_adhered"
     MAX_ITERATIONS_REACHED = "max_iterations_reached"
@@ -38,8 +41,38 @@ class RepromptingConfig:
         return_telemetry (bool): Whether to include per-iteration telemetry in the response.
         return_aimon_summary (bool): Whether to include a human-readable caption summarizing re-prompting. (e.g.: 2 iterations, 0 failed instructions)
         latency_limit_ms (Optional[int]): Maximum cumulative latency (ms) before aborting. None = no limit.
+            A new iteration is not started if its predicted duration would exceed the remaining budget.
+            LLM and detect calls still running when the limit expires are abandoned, retries stop, and the best
+            response so far is returned.
         user_model_max_retries (Optional[int]): Max retries for user model calls. Defaults to 2.
         feedback_model_max_retries (Optional[int]): Max retries for feedback model calls. Defaults to 2.
+        max_concurrent_llm_calls (Optional[int]): Max LLM calls in flight across sessions sharing a pipeline. None = no limit.
+        max_concurrent_detect_calls (Optional[int]): Max AIMon detect calls in flight across sessions sharing a pipeline. None = no limit.
+        num_candidates (int): Corrective revisions generated in parallel per iteration; all are scored in one batched
+            detect request and the lowest residual error candidate is kept. Defaults to 1 (no speculation).
+        differential_evaluation (bool): After the first iteration, re-check only the instructions that failed in the
+            previous iteration plus `regression_check_instructions` previously passing ones, and reuse the cached
+            results for the rest. Groundedness is skipped when no context is provided. Defaults to False.
+        regression_check_instructions (int): Previously passing instructions (lowest follow probability first)
+            re-checked per iteration in differential evaluation mode. Defaults to 1.
+        context_token_budget (Optional[int]): If set, corrective prompts get the context pruned to the passages most
+            relevant to the query and failed instructions that fit this many (estimated) tokens. AIMon still evaluates
+            responses against the full context. None = no pruning.
+        context_scorer (str): How passages are scored for pruning: "lexical" (local BM25) or "rerank" (AIMon
+            `retrieval.rerank`). Defaults to "lexical".
+        telemetry_sinks (Optional[list]): `TelemetrySink`s (ring buffer, JSONL file, callback) receiving the telemetry
+            of every run. Sinks are shared by all sessions of a pipeline. None = in-memory per-run telemetry only.
+        telemetry_max_text_chars (Optional[int]): Truncate prompt and response texts in telemetry to this many characters.
+        telemetry_hash_text (bool): Store prompt and response texts in telemetry as sha256 hashes. Defaults to False.
+        cache_max_entries (Optional[int]): If set, LLM responses (keyed by the filled prompt) and detection results (keyed
+            by the evaluated texts) are memoized in an LRU cache of this many entries shared by the sessions of a pipeline,
+            so repeated queries need no LLM or AIMon calls. Only enable for deterministic LLMs (e.g. temperature 0).
+            With `publish=True` only LLM responses are memoized, so that every session is still published to AIMon.
+            None = no memoization.
+        cache_ttl_seconds (Optional[float]): Lifetime of memoized entries. None = until evicted. Defaults to 3600.
+        retry_policy (Optional[aimon.RetryPolicy]): Retry policy used for LLM and detect call retries and by the
+            AIMon client of the pipeline, replacing their exponential backoff. Share one policy (or its `RetryBudget`)
+            between layers to cap the total retry volume when a backend degrades. None = default backoff.
     """
     publish: bool = False
     max_iterations: int = 2
@@ -55,5 +88,18 @@ class RepromptingConfig:
     latency_limit_ms: Optional[int] = None
     user_model_max_retries: Optional[int] = 2
     feedback_model_max_retries: Optional[int] = 2
+    max_concurrent_llm_calls: Optional[int] = None
+    max_concurrent_detect_calls: Optional[int] = None
+    num_candidates: int = 1
+    differential_evaluation: bool = False
+    regression_check_instructions: int = 1
+    context_token_budget: Optional[int] = None
+    context_scorer: str = "lexical"
+    telemetry_sinks: Optional[list] = None
+    telemetry_max_text_chars: Optional[int] = None
+    telemetry_hash_text: bool = False
+    cache_max_entries: Optional[int] = None
+    cache_ttl_seconds: Optional[float] = 3600
+    retry_policy: Optional[Any] = None
     
     
\ No newline at end of file
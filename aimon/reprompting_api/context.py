@@ -0,0 +1,217 @@
+"""
+context.py — Context pruning for corrective re-prompts.
+
+Corrective prompts embed the context, so their size (and the LLM's latency and token cost)
+grows with it. A `ContextPruner` splits the context into passages, scores each passage
+against the user query and the currently failed instructions, and keeps the best passages
+that fit a token budget, in their original order.
+
+Passages are scored either with AIMon's `retrieval.rerank` endpoint or with a local BM25
+lexical scorer that needs no network access. Token counts are estimated from the text length
+(about 4 characters per token), which is close enough for budgeting without a tokenizer.
+"""
+from typing import Callable, List, Optional, Sequence
+import math
+import re
+
+LEXICAL_SCORER = "lexical"
+RERANK_SCORER = "rerank"
+
+CHARS_PER_TOKEN = 4
+DEFAULT_TASK_DEFINITION = (
+    "Rank context passages by how useful they are for answering the user query "
+    "while following the listed instructions."
+)
+
+_WORD_RE = re.compile(r"\w+")
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text.
+
+    Args:
+        text (str): Text to measure.
+
+    Returns:
+        int: Estimated token count.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def split_passages(context: str) -> List[str]:
+    """
+    Split a context into passages at blank lines.
+
+    Args:
+        context (str): Context text.
+
+    Returns:
+        List[str]: Non-empty passages, stripped, in their original order.
+    """
+    return [passage.strip() for passage in re.split(r"\n\s*\n", context) if passage.strip()]
+
+def lexical_scores(query: str, passages: Sequence[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """
+    Score passages against a query with BM25, using the passages themselves as the corpus.
+
+    Args:
+        query (str): Query text.
+        passages (Sequence[str]): Passages to score.
+        k1 (float): Term frequency saturation.
+        b (float): Length normalization.
+
+    Returns:
+        List[float]: One score per passage; higher is more relevant.
+    """
+    documents = [_WORD_RE.findall(passage.lower()) for passage in passages]
+    if not documents:
+        return []
+    average_length = sum(len(doc) for doc in documents) / len(documents) or 1
+    query_terms = set(_WORD_RE.findall(query.lower()))
+    document_frequency = {
+        term: sum(1 for doc in documents if term in doc) for term in query_terms
+    }
+    scores = []
+    for doc in documents:
+        counts = {}
+        for word in doc:
+            if word in query_terms:
+                counts[word] = counts.get(word, 0) + 1
+        score = 0.0
+        for term, tf in counts.items():
+            idf = math.log(1 + (len(documents) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc) / average_length))
+        scores.append(score)
+    return scores
+
+def select_passages(passages: Sequence[str], scores: Sequence[float], token_budget: int) -> str:
+    """
+    Keep the highest-scoring passages that fit the token budget, in their original order.
+    If not even the best passage fits, it is truncated to the budget.
+
+    Args:
+        passages (Sequence[str]): Passages.
+        scores (Sequence[float]): One score per passage.
+        token_budget (int): Maximum estimated tokens of the result.
+
+    Returns:
+        str: Selected passages joined by blank lines.
+    """
+    ranked = sorted(range(len(passages)), key=lambda i: (-scores[i], i))
+    separator_tokens = estimate_tokens("\n\n")
+    kept, used = [], 0
+    for i in ranked:
+        cost = estimate_tokens(passages[i]) + (separator_tokens if kept else 0)
+        if used + cost <= token_budget:
+            kept.append(i)
+            used += cost
+    if not kept:
+        return passages[ranked[0]][:token_budget * CHARS_PER_TOKEN]
+    return "\n\n".join(passages[i] for i in sorted(kept))
+
+class ContextPruner:
+    """
+    Prunes a context to the passages most relevant to a query and failed instructions.
+
+    Attributes:
+        token_budget (int): Maximum estimated tokens of the pruned context.
+        scorer (str): `LEXICAL_SCORER` or `RERANK_SCORER`.
+        task_definition (str): Task definition sent to the rerank endpoint.
+    """
+    def __init__(self, token_budget: int, scorer: str = LEXICAL_SCORER, task_definition: str = DEFAULT_TASK_DEFINITION):
+        if token_budget < 1:
+            raise ValueError("token_budget must be greater than 0")
+        if scorer not in (LEXICAL_SCORER, RERANK_SCORER):
+            raise ValueError(f"scorer must be '{LEXICAL_SCORER}' or '{RERANK_SCORER}'")
+        self.token_budget = token_budget
+        self.scorer = scorer
+        self.task_definition = task_definition
+
+    def build_query(self, user_query: str, failed_instructions: Sequence[str]) -> str:
+        """
+        Combine the user query and failed instructions into the query passages are scored against.
+
+        Returns:
+            str: Scoring query.
+        """
+        if not failed_instructions:
+            return user_query
+        return user_query + "\n" + "\n".join(failed_instructions)
+
+    def passages_to_score(self, context: str) -> Optional[List[str]]:
+        """
+        Split a context into passages, or return None if it already fits the budget.
+
+        Returns:
+            Optional[List[str]]: Passages to score, or None if no pruning is needed.
+        """
+        if estimate_tokens(context) <= self.token_budget:
+            return None
+        passages = split_passages(context)
+        return passages or None
+
+    def check_rerank(self, rerank: Optional[Callable]) -> None:
+        """
+        Check that a rerank callable is given when the rerank scorer is used.
+
+        Raises:
+            ValueError: If the scorer is `RERANK_SCORER` and `rerank` is not callable.
+        """
+        if self.scorer == RERANK_SCORER and not callable(rerank):
+            raise ValueError(f"The '{RERANK_SCORER}' scorer needs a rerank callable, e.g. `client.retrieval.rerank`")
+
+    def rerank_request(self, query: str, passages: List[str]) -> dict:
+        """
+        Keyword arguments for `client.retrieval.rerank` scoring `passages` against `query`.
+
+        Returns:
+            dict: Rerank request arguments.
+        """
+        return {"context_docs": passages, "queries": [query], "task_definition": self.task_definition}
+
+    def prune(self, context: str, user_query: str, failed_instructions: Sequence[str] = (), rerank: Optional[Callable] = None) -> str:
+        """
+        Prune a context to the token budget.
+
+        Args:
+            context (str): Context to prune.
+            user_query (str): The user's query.
+            failed_instructions (Sequence[str]): Instructions the previous response failed.
+            rerank (Callable, optional): `client.retrieval.rerank`, required by the rerank scorer.
+
+        Returns:
+            str: The pruned context, or `context` unchanged if it fits the budget.
+
+        Raises:
+            ValueError: If the rerank scorer is used without a `rerank` callable.
+        """
+        self.check_rerank(rerank)
+        passages = self.passages_to_score(context)
+        if passages is None:
+            return context
+        query = self.build_query(user_query, failed_instructions)
+        if self.scorer == RERANK_SCORER:
+            scores = rerank(**self.rerank_request(query, passages))[0]
+        else:
+            scores = lexical_scores(query, passages)
+        return select_passages(passages, scores, self.token_budget)
+
+    async def aprune(self, context: str, user_query: str, failed_instructions: Sequence[str] = (), rerank: Optional[Callable] = None) -> str:
+        """
+        Async counterpart of `prune`; `rerank` is `async_client.retrieval.rerank`.
+
+        Returns:
+            str: The pruned context, or `context` unchanged if it fits the budget.
+
+        Raises:
+            ValueError: If the rerank scorer is used without a `rerank` callable.
+        """
+        self.check_rerank(rerank)
+        passages = self.passages_to_score(context)
+        if passages is None:
+            return context
+        query = self.build_query(user_query, failed_instructions)
+        if self.scorer == RERANK_SCORER:
+            scores = (await rerank(**self.rerank_request(query, passages)))[0]
+        else:
+            scores = lexical_scores(query, passages)
+        return select_passages(passages, scores, self.token_budget)
@@ -0,0 +1,77 @@
+"""
+latency.py — Running estimates of LLM and AIMon detect call durations.
+
+The RepromptingPipeline uses these estimates to decide whether another re-prompting
+iteration fits in the remaining `latency_limit_ms` budget. Each run keeps its own
+exponentially weighted moving average (EWMA) per stage, which falls back to a
+process-wide prior until the run has observed a call of that stage itself.
+"""
+import threading
+from typing import Dict, Optional
+
+LLM_STAGE = "llm"
+DETECT_STAGE = "detect"
+
+class LatencyEstimator:
+    """
+    Thread-safe EWMA of call durations (ms) per stage.
+
+    Attributes:
+        alpha (float): Weight of the newest sample, in (0, 1].
+        prior (LatencyEstimator, optional): Estimator consulted for stages without samples of
+            their own. Samples recorded here are also recorded on the prior.
+    """
+    def __init__(self, alpha: float = 0.3, prior: Optional["LatencyEstimator"] = None):
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = alpha
+        self.prior = prior
+        self._estimates: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, duration_ms: float) -> None:
+        """
+        Add a duration sample for a stage.
+
+        Args:
+            stage (str): Stage name, e.g. `LLM_STAGE` or `DETECT_STAGE`.
+            duration_ms (float): Observed duration in milliseconds.
+        """
+        with self._lock:
+            previous = self._estimates.get(stage)
+            if previous is None:
+                self._estimates[stage] = duration_ms
+            else:
+                self._estimates[stage] = self.alpha * duration_ms + (1 - self.alpha) * previous
+        if self.prior is not None:
+            self.prior.record(stage, duration_ms)
+
+    def estimate(self, stage: str) -> Optional[float]:
+        """
+        Current estimate for a stage, falling back to the prior.
+
+        Returns:
+            Optional[float]: Estimated duration in milliseconds, or None if nothing was observed yet.
+        """
+        with self._lock:
+            value = self._estimates.get(stage)
+        if value is None and self.prior is not None:
+            return self.prior.estimate(stage)
+        return value
+
+    def predict_iteration_ms(self) -> Optional[float]:
+        """
+        Predict the duration of one re-prompting iteration (one LLM call plus one detect call).
+
+        Returns:
+            Optional[float]: Predicted duration in milliseconds, or None if either stage has no estimate.
+        """
+        llm_ms = self.estimate(LLM_STAGE)
+        detect_ms = self.estimate(DETECT_STAGE)
+        if llm_ms is None or detect_ms is None:
+            return None
+        return llm_ms + detect_ms
+
+# Shared by all pipelines in the process, so the first iteration decision of a new run
+# is informed by calls made in earlier runs.
+PROCESS_LATENCY_PRIORS = LatencyEstimator(alpha=0.1)
@@ -0,0 +1,238 @@
+"""
+metrics.py — Process-wide aggregation of re-prompting run statistics.
+
+RepromptingPipeline feeds every run into a `RepromptingMetrics` aggregator: the number of
+iterations, stop reason, residual error of the best response, total latency, and the duration
+of every LLM and detect call. Distributions are kept in `QuantileSketch`es, which use
+logarithmic buckets with bounded relative error and bounded memory, so an aggregator costs the
+same memory after ten runs as after ten million.
+
+Snapshots are exported as a dict (`snapshot()`) or as Prometheus text exposition format
+(`to_prometheus()`).
+"""
+from typing import Dict, Optional
+import math
+import threading
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+class QuantileSketch:
+    """
+    Streaming quantile estimator with relative accuracy (a simplified DDSketch).
+
+    Positive values are counted in buckets whose bounds grow geometrically by
+    `gamma = (1 + relative_accuracy) / (1 - relative_accuracy)`, so any quantile is
+    estimated within `relative_accuracy` of a value actually observed. Values <= 0 share
+    a single bucket. If more than `max_buckets` buckets are needed, the lowest ones are
+    merged, trading accuracy at the low end for bounded memory.
+
+    Not thread-safe on its own; `RepromptingMetrics` guards its sketches with a lock.
+    """
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        if max_buckets < 1:
+            raise ValueError("max_buckets must be greater than 0")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: Dict[int, int] = {}
+        self._zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        """Add an observation."""
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value <= 0:
+            self._zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        if len(self._buckets) > self.max_buckets:
+            self._collapse_lowest()
+
+    def _collapse_lowest(self) -> None:
+        lowest, second = sorted(self._buckets)[:2]
+        self._buckets[second] += self._buckets.pop(lowest)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile.
+
+        Args:
+            q (float): Quantile in [0, 1].
+
+        Returns:
+            Optional[float]: Estimated value, or None if nothing was observed.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("q must be in [0, 1]")
+        if self.count == 0:
+            return None
+        if q == 0:
+            return self.min
+        if q == 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = self._zero_count
+        if rank < seen:
+            return min(max(0.0, self.min), self.max)
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if rank < seen:
+                estimate = 2 * self._gamma ** index / (self._gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def summary(self, quantiles=DEFAULT_QUANTILES) -> dict:
+        """
+        Summarize the observations.
+
+        Returns:
+            dict: count, sum, min, max and one "p<quantile * 100>" entry per quantile.
+        """
+        summary = {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+        for q in quantiles:
+            summary[f"p{q * 100:g}"] = self.quantile(q)
+        return summary
+
+class RepromptingMetrics:
+    """
+    Thread-safe aggregator of re-prompting run and call statistics.
+
+    Attributes:
+        relative_accuracy (float): Relative accuracy of the quantile sketches.
+        quantiles (tuple): Quantiles included in snapshots.
+    """
+    def __init__(self, relative_accuracy: float = 0.01, quantiles=DEFAULT_QUANTILES):
+        self.relative_accuracy = relative_accuracy
+        self.quantiles = tuple(quantiles)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard everything recorded so far."""
+        with self._lock:
+            self._runs_by_stop_reason: Dict[str, int] = {}
+            self._iterations = self._new_sketch()
+            self._residual_error = self._new_sketch()
+            self._run_latency_ms = self._new_sketch()
+            self._stage_latency_ms: Dict[str, QuantileSketch] = {}
+
+    def _new_sketch(self) -> QuantileSketch:
+        return QuantileSketch(relative_accuracy=self.relative_accuracy)
+
+    def record_run(self, iterations: int, stop_reason: str, latency_ms: float, residual_error: Optional[float] = None) -> None:
+        """
+        Record a completed run.
+
+        Args:
+            iterations (int): Number of iterations performed.
+            stop_reason (str): Why the run stopped (see `StopReasons`).
+            latency_ms (float): Total duration of the run.
+            residual_error (float, optional): Residual error score of the best response, if evaluated.
+        """
+        with self._lock:
+            self._runs_by_stop_reason[stop_reason] = self._runs_by_stop_reason.get(stop_reason, 0) + 1
+            self._iterations.add(iterations)
+            self._run_latency_ms.add(latency_ms)
+            if residual_error is not None:
+                self._residual_error.add(residual_error)
+
+    def record_stage(self, stage: str, duration_ms: float) -> None:
+        """
+        Record the duration of an LLM or detect call.
+
+        Args:
+            stage (str): Stage name, e.g. `LLM_STAGE` or `DETECT_STAGE`.
+            duration_ms (float): Duration of the call, retries included.
+        """
+        with self._lock:
+            sketch = self._stage_latency_ms.get(stage)
+            if sketch is None:
+                sketch = self._stage_latency_ms[stage] = self._new_sketch()
+            sketch.add(duration_ms)
+
+    def snapshot(self) -> dict:
+        """
+        Export the current statistics.
+
+        Returns:
+            dict:
+                {
+                    "runs_by_stop_reason" (dict): Run count per stop reason.
+                    "iterations" (dict): Summary of iterations per run.
+                    "residual_error" (dict): Summary of the best response's residual error.
+                    "run_latency_ms" (dict): Summary of run durations.
+                    "stage_latency_ms" (dict): Summary of call durations per stage.
+                }
+        """
+        with self._lock:
+            return {
+                "runs_by_stop_reason": dict(self._runs_by_stop_reason),
+                "iterations": self._iterations.summary(self.quantiles),
+                "residual_error": self._residual_error.summary(self.quantiles),
+                "run_latency_ms": self._run_latency_ms.summary(self.quantiles),
+                "stage_latency_ms": {
+                    stage: sketch.summary(self.quantiles) for stage, sketch in sorted(self._stage_latency_ms.items())
+                },
+            }
+
+    def to_prometheus(self, prefix: str = "aimon_reprompting") -> str:
+        """
+        Export the current statistics in Prometheus text exposition format. Distributions
+        are exposed as summaries and run counts as a counter labelled by stop reason.
+
+        Args:
+            prefix (str): Metric name prefix.
+
+        Returns:
+            str: Prometheus text.
+        """
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_runs_total Completed re-prompting runs by stop reason.",
+            f"# TYPE {prefix}_runs_total counter",
+        ]
+        for stop_reason, count in sorted(snapshot["runs_by_stop_reason"].items()):
+            lines.append(f'{prefix}_runs_total{{stop_reason="{stop_reason}"}} {count}')
+
+        summaries = [
+            ("iterations", "Iterations per re-prompting run.", {"": snapshot["iterations"]}),
+            ("residual_error", "Residual error score of the best response per run.", {"": snapshot["residual_error"]}),
+            ("run_latency_ms", "Duration of re-prompting runs in milliseconds.", {"": snapshot["run_latency_ms"]}),
+            ("stage_latency_ms", "Duration of LLM and detect calls in milliseconds.", snapshot["stage_latency_ms"]),
+        ]
+        for name, help_text, by_stage in summaries:
+            metric = f"{prefix}_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} summary")
+            for stage, summary in by_stage.items():
+                stage_label = f'stage="{stage}",' if stage else ""
+                for q in self.quantiles:
+                    value = summary[f"p{q * 100:g}"]
+                    lines.append(f'{metric}{{{stage_label}quantile="{q:g}"}} {_format_value(value)}')
+                labels = f"{{{stage_label.rstrip(',')}}}" if stage_label else ""
+                lines.append(f"{metric}_sum{labels} {_format_value(summary['sum'])}")
+                lines.append(f"{metric}_count{labels} {summary['count']}")
+        return "\n".join(lines) + "\n"
+
+def _format_value(value) -> str:
+    if value is None:
+        return "NaN"
+    return repr(float(value))
+
+# Shared by all pipelines in the process unless a pipeline is given its own aggregator.
+PROCESS_METRICS = RepromptingMetrics()
@@ -1,8 +1,21 @@
-from aimon.reprompting_api.config import RepromptingConfig, StopReasons
-from aimon.reprompting_api.telemetry import TelemetryLogger
+from aimon.reprompting_api.config import RepromptingConfig, StopReasons, NO_CONTEXT_PLACEHOLDER
+from aimon.reprompting_api.telemetry import TelemetryLogger, SessionCounters
+from aimon.reprompting_api.latency import LatencyEstimator, PROCESS_LATENCY_PRIORS, LLM_STAGE, DETECT_STAGE
+from aimon.reprompting_api.context import ContextPruner
+from aimon.reprompting_api.metrics import PROCESS_METRICS
+from aimon.reprompting_api.cache import ResponseCache, make_key
 from aimon.reprompting_api.reprompter import Reprompter
-from aimon.reprompting_api.utils import retry, toxicity_check, get_failed_instructions_count, get_failed_instructions, get_residual_error_score, get_failed_toxicity_instructions
+from aimon.reprompting_api.utils import retry, async_retry, call_with_deadline, await_with_deadline, hold_slot, DeadlineExceeded, toxicity_check, get_failed_instructions_count, get_failed_instructions, get_residual_error_score, get_failed_toxicity_instructions
 from aimon import Detect
+from aimon.decorators.detect import DetectResult
+from aimon.types.inference_detect_response import InferenceDetectResponseItem
+from aimon._utils import asyncify
+from aimon._tracing import start_span
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+import inspect
+import threading
 import time
 import random
 from string import Template
@@ -10,6 +23,57 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+class _NoLimit:
+    """No-op semaphore and sync / async context manager used when a concurrency limit is not set."""
+    def acquire(self, blocking=True, timeout=None):
+        return True
+
+    def release(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+class _Session:
+    """
+    State of one run of a `RepromptingPipeline`, shared by the sync and async code paths.
+
+    Attributes:
+        mode (str): "run" or "async run", used in log messages.
+        telemetry (TelemetryLogger): Telemetry logger of the run.
+        latency (LatencyEstimator): Call durations observed by the run.
+        deadline (float, optional): `time.monotonic()` deadline of the run.
+        prompt (Template): Prompt template of the current iteration.
+        generated_text (str, optional): Response of the current iteration.
+        payload (dict, optional): AIMon payload of the current response.
+        result (object, optional): AIMon detection result of the current response.
+    """
+    def __init__(self, mode, telemetry, latency, deadline, prompt):
+        self.mode = mode
+        self.telemetry = telemetry
+        self.latency = latency
+        self.deadline = deadline
+        self.prompt = prompt
+        self.counters = SessionCounters()
+        self.pipeline_start = time.time()
+        self.iteration_num = 1
+        self.iteration_outputs = {} # key: iteration number → dict(response_text, residual_error_score, failed_instructions_count)
+        self.generated_text = None
+        self.payload = None
+        self.result = None
+        self.scores, self.feedback = {}, []
+        self.predicted_iteration_ms = None
+        self.stop_reason = None
+
 class RepromptingPipeline:
     """
     A pipeline for iterative re-prompting of LLM responses using AIMon evaluation.
@@ -40,6 +104,7 @@ class RepromptingPipeline:
         dict:
             {
                 "best_response" (str): Best model response across all iterations.
+                "counters" (dict): LLM calls, detect calls, retries and bytes sent by the run.
                 "telemetry" (list, optional): Iteration-level telemetry if enabled.
                 "summary" (str, optional): Human-readable run summary if enabled.
             }
@@ -82,8 +147,36 @@ class RepromptingPipeline:
             api_key=self.config.aimon_api_key,
             application_name = self.config.application_name,
             model_name = self.config.model_name,
-            publish=self.config.publish
+            publish=self.config.publish,
+            retry_policy=self.config.retry_policy
         )
+
+        if self.config.num_candidates < 1:
+            raise ValueError("num_candidates must be greater than 0")
+        if self.config.regression_check_instructions < 0:
+            raise ValueError("regression_check_instructions must not be negative")
+
+        # Optional limits on concurrent LLM / detect calls when sessions share this pipeline.
+        # A call abandoned at the deadline keeps its slot until it actually returns.
+        self._llm_slots = self._make_slots(self.config.max_concurrent_llm_calls)
+        self._detect_slots = self._make_slots(self.config.max_concurrent_detect_calls)
+        self._async_llm_slots = None
+        self._async_detect_slots = None
+
+        # Call durations observed by earlier runs seed the latency predictions of new runs
+        self.latency_priors = PROCESS_LATENCY_PRIORS
+        # Aggregated statistics of all runs, shared process-wide by default
+        self.metrics = PROCESS_METRICS
+
+        # Optional pruning of the context passed to the LLM for corrective prompts
+        self.context_pruner = None
+        if self.config.context_token_budget is not None:
+            self.context_pruner = ContextPruner(self.config.context_token_budget, scorer=self.config.context_scorer)
+
+        # Optional memoization of LLM responses and detection results across sessions
+        self.response_cache = None
+        if self.config.cache_max_entries is not None:
+            self.response_cache = ResponseCache(self.config.cache_max_entries, self.config.cache_ttl_seconds)
         
     def run(self, system_prompt: str, context: str, user_query: str, user_instructions):
         """
@@ -109,95 +202,291 @@ class RepromptingPipeline:
             dict: 
                 {
                     "best_response" (str): Best model response from all iterations.
+                    "counters" (dict): LLM calls, detect calls, retries and bytes sent by the run.
                     "telemetry" (list, optional): Telemetry for all iterations if enabled.
                     "summary" (str, optional): Summary of the process if enabled.
                 }
         """
-        logger.info("Starting RepromptingPipeline run")
+        with start_span("aimon.reprompting.run", self._run_span_attributes()) as span:
+            return self._run(system_prompt, context, user_query, user_instructions, span)
+
+    def _run(self, system_prompt, context, user_query, user_instructions, span):
+        """
+        Body of `run()`, executed in its tracing span `span`.
+        """
+        session = self._start_session("run", system_prompt, context, user_query, user_instructions)
+        try:
+            with self._iteration_span(session.iteration_num):
+                # First LLM call
+                session.generated_text = self._call_llm(session.prompt, self.config.user_model_max_retries, system_prompt, context, user_query, latency=session.latency, deadline=session.deadline, counters=session.counters)
+                self._record_response(session)
+
+                # Evaluate response with AIMon
+                session.payload = self._build_aimon_payload(context, user_query, user_instructions, session.generated_text, system_prompt)
+                result = self._detect_aimon_response(session.payload, self.config.feedback_model_max_retries, latency=session.latency, deadline=session.deadline, counters=session.counters)
+            self._record_result(session, result)
+
+            # Iteratively re-prompt until conditions are met or limits reached
+            while self._continue_reprompting(session):
+                with self._iteration_span(session.iteration_num + 1):
+                    # Generate corrective prompt
+                    session.prompt = self._build_corrective_prompt(session.payload, session.result)
+                    llm_context = self._prune_context(context, user_query, session.result, deadline=session.deadline)
+
+                    if self.config.num_candidates > 1:
+                        # Generate several revisions in parallel and keep the best-scoring one
+                        session.generated_text, session.payload, result = self._generate_best_candidate(
+                            session.prompt, system_prompt, context, user_query, user_instructions, latency=session.latency, previous_result=session.result, deadline=session.deadline, llm_context=llm_context, counters=session.counters
+                        )
+                    else:
+                        # Retry LLM call with corrective prompt
+                        session.generated_text = self._call_llm(session.prompt, self.config.user_model_max_retries, system_prompt, llm_context, user_query, latency=session.latency, deadline=session.deadline, counters=session.counters)
+                        # Re-evaluate the new response
+                        session.payload = self._build_aimon_payload(context, user_query, user_instructions, session.generated_text, system_prompt)
+                        result = self._detect_aimon_response(session.payload, self.config.feedback_model_max_retries, latency=session.latency, previous_result=session.result, deadline=session.deadline, counters=session.counters)
+                self._record_result(session, result, next_iteration=True)
+        except DeadlineExceeded as e:
+            self._stop_at_deadline(session, e)
+
+        return self._finish_session(session, span)
+
+    async def arun(self, system_prompt: str, context: str, user_query: str, user_instructions):
+        """
+        Async counterpart of `run()` for use inside an event loop.
+
+        Follows the same process as `run()`, but `llm_fn` may be a coroutine function
+        (a synchronous `llm_fn` is executed in a worker thread), detection requests are
+        sent with an `AsyncClient`, and retry backoff uses non-blocking sleeps, so many
+        sessions can run concurrently on one event loop.
+
+        Args:
+            user_query (str): Must be a non-empty string. The user's query or instruction.
+            context (str): Contextual information to include in the prompt.
+            user_instructions (list[str]): Instructions the model must follow.
+            system_prompt (str): A high‑level role or behavior definition for the model.
+
+        Returns:
+            dict: Same structure as returned by `run()`.
+        """
+        with start_span("aimon.reprompting.run", self._run_span_attributes()) as span:
+            return await self._arun(system_prompt, context, user_query, user_instructions, span)
+
+    async def _arun(self, system_prompt, context, user_query, user_instructions, span):
+        """
+        Body of `arun()`, executed in its tracing span `span`.
+        """
+        session = self._start_session("async run", system_prompt, context, user_query, user_instructions)
+        try:
+            with self._iteration_span(session.iteration_num):
+                session.generated_text = await self._acall_llm(session.prompt, self.config.user_model_max_retries, system_prompt, context, user_query, latency=session.latency, deadline=session.deadline, counters=session.counters)
+                self._record_response(session)
+
+                session.payload = self._build_aimon_payload(context, user_query, user_instructions, session.generated_text, system_prompt)
+                result = await self._adetect_aimon_response(session.payload, self.config.feedback_model_max_retries, latency=session.latency, deadline=session.deadline, counters=session.counters)
+            self._record_result(session, result)
+
+            while self._continue_reprompting(session):
+                with self._iteration_span(session.iteration_num + 1):
+                    session.prompt = self._build_corrective_prompt(session.payload, session.result)
+                    llm_context = await self._aprune_context(context, user_query, session.result, deadline=session.deadline)
+                    if self.config.num_candidates > 1:
+                        session.generated_text, session.payload, result = await self._agenerate_best_candidate(
+                            session.prompt, system_prompt, context, user_query, user_instructions, latency=session.latency, previous_result=session.result, deadline=session.deadline, llm_context=llm_context, counters=session.counters
+                        )
+                    else:
+                        session.generated_text = await self._acall_llm(session.prompt, self.config.user_model_max_retries, system_prompt, llm_context, user_query, latency=session.latency, deadline=session.deadline, counters=session.counters)
+                        session.payload = self._build_aimon_payload(context, user_query, user_instructions, session.generated_text, system_prompt)
+                        result = await self._adetect_aimon_response(session.payload, self.config.feedback_model_max_retries, latency=session.latency, previous_result=session.result, deadline=session.deadline, counters=session.counters)
+                self._record_result(session, result, next_iteration=True)
+        except DeadlineExceeded as e:
+            self._stop_at_deadline(session, e)
+
+        return self._finish_session(session, span)
+
+    def _start_session(self, mode, system_prompt, context, user_query, user_instructions):
+        """
+        Start a run: log its inputs and set up its state.
+
+        Args:
+            mode (str): "run" or "async run", used in log messages.
+
+        Returns:
+            _Session: State of the run.
+        """
+        logger.info(f"Starting RepromptingPipeline {mode}")
         logger.debug(f"Inputs - System Prompt: {system_prompt}, Context: {context}, User Query: {user_query}, Instructions: {user_instructions}")
-        iteration_outputs = {} # key: iteration number → dict(response_text, residual_error_score, failed_instructions_count)
-        pipeline_start = time.time()
-        iteration_num = 1
+        session = _Session(
+            mode=mode,
+            telemetry=self._new_session_telemetry(),
+            latency=LatencyEstimator(prior=self.latency_priors),
+            deadline=self._get_deadline(),
+            prompt=self._build_original_prompt(),
+        )
+        logger.debug(f"Initial prompt template built: {session.prompt.template}")
+        return session
 
-        curr_prompt = self._build_original_prompt()
-        logger.debug(f"Initial prompt template built: {curr_prompt.template}")
+    def _record_response(self, session):
+        """
+        Record the first response of a run before it is evaluated.
 
-        
-        # First LLM call
-        curr_generated_text = self._call_llm(curr_prompt,self.config.user_model_max_retries, system_prompt, context, user_query)
-        logger.debug(f"Initial LLM response: {curr_generated_text}")
+        Args:
+            session (_Session): State of the run.
+        """
+        logger.debug(f"Initial LLM response: {session.generated_text}")
+        self._record_unevaluated_output(session.iteration_outputs, session.iteration_num, session.generated_text)
 
-        
-        # Evaluate response with AIMon
-        curr_payload = self._build_aimon_payload(context, user_query, user_instructions, curr_generated_text, system_prompt)
-        curr_result = self._detect_aimon_response(curr_payload, self.config.feedback_model_max_retries)
-        logger.debug(f"AIMon evaluation result: {curr_result}")
-        
-        # Get scores and detailed feedback on failed instructions
-        scores, feedback = self.get_response_feedback(curr_result)
-        self._record_iteration_output(iteration_outputs, iteration_num, curr_generated_text, curr_result)
-
-        # Iteratively re-prompt until conditions are met or limits reached
-        stop_reason = None
-        while True:
-            should_stop, stop_reason = self._should_stop_reprompting(curr_result, iteration_num, pipeline_start)
-            logger.info(f"Iteration {iteration_num}: Stop decision: {should_stop}, Reason: {stop_reason}")
-            if should_stop:
-                break
-            
-            # Emit telemetry for this iteration
-            self._emit_iteration_telemetry(
-                iteration_num,
-                pipeline_start,
-                scores,
-                feedback,
-                curr_result,
-                stop_reason or StopReasons.CONTINUE,
-                curr_prompt,
-                curr_generated_text,
-            )
+    def _record_result(self, session, result, next_iteration=False):
+        """
+        Record the AIMon evaluation of the current response of a run, with its scores and feedback.
 
-            # Generate corrective prompt
-            curr_prompt = self._build_corrective_prompt(curr_payload, curr_result)
-            
-            # Retry LLM call with corrective prompt
-            curr_generated_text = self._call_llm(curr_prompt, self.config.user_model_max_retries)
-            curr_generated_text = self._call_llm(curr_prompt,self.config.user_model_max_retries, system_prompt, context, user_query)
-            # Re-evaluate the new response
-            curr_payload = self._build_aimon_payload(context, user_query, user_instructions, curr_generated_text, system_prompt)
-            curr_result = self._detect_aimon_response(curr_payload, self.config.feedback_model_max_retries)
-
-            # Extract updated scores and feedback
-            scores, feedback = self.get_response_feedback(curr_result)
-            iteration_num += 1
-            self._record_iteration_output(iteration_outputs, iteration_num, curr_generated_text, curr_result)
+        Args:
+            session (_Session): State of the run.
+            result (object): AIMon detection result of `session.generated_text`.
+            next_iteration (bool): Whether the response was generated by a new iteration.
+        """
+        logger.debug(f"AIMon evaluation result: {result}")
+        if next_iteration:
+            session.iteration_num += 1
+        session.result = result
+        session.scores, session.feedback = self.get_response_feedback(result)
+        self._record_iteration_output(session.iteration_outputs, session.iteration_num, session.generated_text, result)
 
-        # Final telemetry after loop exit
-        self._emit_iteration_telemetry(
-            iteration_num,
-            pipeline_start,
-            scores,
-            feedback,
-            curr_result,
-            stop_reason or StopReasons.UNKNOWN_ERROR,
-            curr_prompt,
-            curr_generated_text,
+    def _continue_reprompting(self, session):
+        """
+        Decide whether a run re-prompts the LLM once more. If it does, the telemetry of the
+        current iteration is emitted; otherwise `session.stop_reason` says why the run stops.
+
+        Args:
+            session (_Session): State of the run.
+
+        Returns:
+            bool: True to run another iteration.
+        """
+        session.predicted_iteration_ms = session.latency.predict_iteration_ms()
+        should_stop, session.stop_reason = self._should_stop_reprompting(
+            session.result, session.iteration_num, session.pipeline_start, session.predicted_iteration_ms
         )
+        logger.info(f"Iteration {session.iteration_num}: Stop decision: {should_stop}, Reason: {session.stop_reason}")
+        if should_stop:
+            return False
+
+        # Emit telemetry for this iteration
+        self._emit_session_telemetry(session, session.stop_reason or StopReasons.CONTINUE)
+        return True
+
+    @staticmethod
+    def _stop_at_deadline(session, error):
+        """
+        Stop a run whose latency limit was reached during an iteration; the best response
+        generated so far is returned.
+
+        Args:
+            session (_Session): State of the run.
+            error (DeadlineExceeded): The error raised by the call that ran out of time.
+        """
+        logger.warning(f"Iteration {session.iteration_num}: Latency limit reached during the iteration: {error}")
+        session.stop_reason = StopReasons.LATENCY_LIMIT_EXCEEDED
+
+    def _finish_session(self, session, span):
+        """
+        Emit the final telemetry of a run, record its metrics and build its response.
+
+        Args:
+            session (_Session): State of the run.
+            span: The tracing span of the run.
+
+        Returns:
+            dict: The response returned by `run()` / `arun()`.
+        """
+        stop_reason = session.stop_reason or StopReasons.UNKNOWN_ERROR
+        # Final telemetry after loop exit
+        self._emit_session_telemetry(session, stop_reason)
+        self._record_run_metrics(session.iteration_outputs, session.iteration_num, stop_reason, session.pipeline_start)
+        self._annotate_run_span(span, session.iteration_num, stop_reason, session.counters)
 
         # Select best response across all iterations
-        best_output, best_failed_count = self._select_best_iteration(iteration_outputs)
-            
+        best_output, best_failed_count = self._select_best_iteration(session.iteration_outputs)
+
         # Build final response payload
-        response = {"best_response": best_output}
+        response = {"best_response": best_output, "counters": session.counters.as_dict()}
         if self.config.return_telemetry:
-            response["telemetry"] = self.telemetry.get_all()
+            response["telemetry"] = session.telemetry.get_all()
         if self.config.return_aimon_summary:
-            response["summary"] = self._gen_summary(iteration_num, best_failed_count)
-            
-        logger.info("RepromptingPipeline run completed")
+            response["summary"] = self._gen_summary(session.iteration_num, best_failed_count)
+
+        logger.info(f"RepromptingPipeline {session.mode} completed")
         logger.info(f"Best response selected with {best_failed_count} failed instructions remaining.")
+        return response
+
+    def _emit_session_telemetry(self, session, stop_reason):
+        """
+        Emit the telemetry of the current iteration of a run.
+
+        Args:
+            session (_Session): State of the run.
+            stop_reason (str): Reason for stopping or continuing.
+        """
+        self._emit_iteration_telemetry(
+            session.iteration_num,
+            session.pipeline_start,
+            session.scores,
+            session.feedback,
+            session.result,
+            stop_reason,
+            session.prompt,
+            session.generated_text,
+            session.telemetry,
+            session.predicted_iteration_ms,
+            session.counters,
+        )
+
+    def _new_session_telemetry(self):
+        """
+        Create the telemetry logger for a new run. Each run gets its own logger so that
+        concurrent sessions sharing this pipeline don't mix their telemetry; `self.telemetry`
+        points at the logger of the most recently started run.
+
+        Returns:
+            TelemetryLogger: Telemetry logger for the run.
+        """
+        telemetry = TelemetryLogger(
+            sinks=self.config.telemetry_sinks,
+            max_text_chars=self.config.telemetry_max_text_chars,
+            hash_text=self.config.telemetry_hash_text,
+        )
+        self.telemetry = telemetry
+        return telemetry
+
+    @staticmethod
+    def _make_slots(limit, semaphore=threading.BoundedSemaphore):
+        """
+        Build a context manager limiting concurrent calls.
 
-        return response  
+        Args:
+            limit (Optional[int]): Maximum concurrent calls, or None for no limit.
+            semaphore (type): The semaphore type, `threading.BoundedSemaphore` or `asyncio.Semaphore`.
+
+        Returns:
+            A `semaphore`, or a no-op context manager if no limit is set.
+        """
+        if limit is None:
+            return _NoLimit()
+        if limit < 1:
+            raise ValueError("Concurrency limits must be greater than 0")
+        return semaphore(limit)
+
+    def _get_async_slots(self):
+        """
+        Lazily build the asyncio counterparts of the LLM and detect concurrency limits.
+        They are created inside the running event loop on first use.
+
+        Returns:
+            tuple: (llm_slots, detect_slots) async context managers.
+        """
+        if self._async_llm_slots is None:
+            self._async_llm_slots = self._make_slots(self.config.max_concurrent_llm_calls, asyncio.Semaphore)
+            self._async_detect_slots = self._make_slots(self.config.max_concurrent_detect_calls, asyncio.Semaphore)
+        return self._async_llm_slots, self._async_detect_slots
 
     def _build_original_prompt(self) -> Template:
         """
@@ -243,7 +532,7 @@ class RepromptingPipeline:
         }
         return payload
 
-    def _call_llm(self, prompt_template: Template, max_attempts, system_prompt=None, context=None, user_query=None):
+    def _call_llm(self, prompt_template: Template, max_attempts, system_prompt=None, context=None, user_query=None, latency=None, deadline=None, counters=None, candidate=None):
         """
         Calls the LLM with exponential backoff. Retries if the LLM call fails
         OR returns a non-string value.  If all retries fail, the last encountered
@@ -252,6 +541,10 @@ class RepromptingPipeline:
         Args:
             prompt_template (Template): Prompt template for the LLM.
             max_attempts (int): Max retry attempts.
+            latency (LatencyEstimator, optional): Records the duration of the call, retries included.
+            deadline (float, optional): `time.monotonic()` deadline bounding each attempt and the retries.
+            counters (SessionCounters, optional): Counts the attempts, retries and prompt bytes.
+            candidate (int, optional): Index of the candidate when several are generated for the same prompt.
             
         Returns:
             str: LLM response text.
@@ -259,16 +552,88 @@ class RepromptingPipeline:
         Raises:
             RuntimeError: If the LLM call repeatedly fails, re-raises the last encountered error.
             TypeError: If the LLM call fails to return a string.
+            DeadlineExceeded: If the deadline expires before the LLM responds.
         """
-        @retry(exception_to_check=Exception, tries=max_attempts, delay=1, backoff=2, logger=logger)
+        cache_key = self._llm_cache_key(prompt_template, system_prompt, context, user_query, candidate)
+        cached = self._cache_lookup(cache_key, counters)
+        if cached is not None:
+            return cached
+
+        prompt_bytes = self._prompt_bytes(counters, prompt_template, system_prompt, context, user_query)
+        attempts = []
+
+        def invoke():
+            attempts.append(1)
+            self._count_call(counters, "llm_calls", len(attempts), prompt_bytes)
+            with self._call_span("llm", len(attempts), prompt_bytes), hold_slot(self._llm_slots, deadline):
+                return self.llm_fn(prompt_template, system_prompt, context, user_query)
+
+        @retry(exception_to_check=Exception, tries=max_attempts, delay=1, backoff=2, logger=logger, deadline=deadline, policy=self.config.retry_policy)
         def backoff_call():
-            result = self.llm_fn(prompt_template, system_prompt, context, user_query)
+            result = call_with_deadline(invoke, deadline)
             if not isinstance(result, str):
                 raise TypeError(f"LLM returned invalid type {type(result).__name__}, expected str.")
             return result
-        return backoff_call()
+        start = time.perf_counter()
+        result = backoff_call()
+        self._record_latency(latency, LLM_STAGE, start)
+        self._cache_store(cache_key, result)
+        return result
+
+    async def _acall_llm(self, prompt_template: Template, max_attempts, system_prompt=None, context=None, user_query=None, latency=None, deadline=None, counters=None, candidate=None):
+        """
+        Async counterpart of `_call_llm`. Awaits `llm_fn` if it is a coroutine function,
+        otherwise runs it in a worker thread so the event loop is never blocked.
+
+        Args:
+            prompt_template (Template): Prompt template for the LLM.
+            max_attempts (int): Max retry attempts.
+            latency (LatencyEstimator, optional): Records the duration of the call, retries included.
+            deadline (float, optional): `time.monotonic()` deadline; an attempt still running then is cancelled.
+            counters (SessionCounters, optional): Counts the attempts, retries and prompt bytes.
+            candidate (int, optional): Index of the candidate when several are generated for the same prompt.
+
+        Returns:
+            str: LLM response text.
+
+        Raises:
+            TypeError: If the LLM call fails to return a string.
+            DeadlineExceeded: If the deadline expires before the LLM responds.
+        """
+        if inspect.iscoroutinefunction(self.llm_fn):
+            llm_fn = self.llm_fn
+        else:
+            llm_fn = asyncify(self.llm_fn)
+        llm_slots, _ = self._get_async_slots()
+
+        cache_key = self._llm_cache_key(prompt_template, system_prompt, context, user_query, candidate)
+        cached = self._cache_lookup(cache_key, counters)
+        if cached is not None:
+            return cached
+
+        prompt_bytes = self._prompt_bytes(counters, prompt_template, system_prompt, context, user_query)
+        attempts = []
+
+        async def invoke():
+            attempts.append(1)
+            self._count_call(counters, "llm_calls", len(attempts), prompt_bytes)
+            with self._call_span("llm", len(attempts), prompt_bytes):
+                async with llm_slots:
+                    return await llm_fn(prompt_template, system_prompt, context, user_query)
+
+        @async_retry(exception_to_check=Exception, tries=max_attempts, delay=1, backoff=2, logger=logger, deadline=deadline, policy=self.config.retry_policy)
+        async def backoff_call():
+            result = await await_with_deadline(invoke(), deadline)
+            if not isinstance(result, str):
+                raise TypeError(f"LLM returned invalid type {type(result).__name__}, expected str.")
+            return result
+        start = time.perf_counter()
+        result = await backoff_call()
+        self._record_latency(latency, LLM_STAGE, start)
+        self._cache_store(cache_key, result)
+        return result
     
-    def _detect_aimon_response(self, payload, max_attempts):
+    def _detect_aimon_response(self, payload, max_attempts, latency=None, previous_result=None, deadline=None, counters=None):
         """
         Calls AIMon Detect with exponential backoff and returns the detection result.
 
@@ -281,37 +646,561 @@ class RepromptingPipeline:
             payload (dict): A dictionary containing 'context', 'user_query', 
                             'instructions', and 'generated_text' for evaluation.
             max_attempts (int): Maximum number of retry attempts.
+            latency (LatencyEstimator, optional): Records the duration of the call, retries included.
+            previous_result (object, optional): Result of the previous iteration, reused in differential evaluation mode.
+            deadline (float, optional): `time.monotonic()` deadline bounding each attempt and the retries.
+            counters (SessionCounters, optional): Counts the requests, retries and bytes sent.
 
         Returns:
             object: The AIMon detection result containing evaluation scores and feedback.
 
         Raises:
             RuntimeError: If AIMon Detect fails after all retry attempts, re-raises the last encountered error.
+            DeadlineExceeded: If the deadline expires before AIMon responds.
         """
-        aimon_context = f"{payload['context']}\n\nUser Query:\n{payload['user_query']}"
-        aimon_query = f"{payload['user_query']}\n\nInstructions:\n{payload['instructions']}"
+        if self.config.differential_evaluation:
+            results = self._detect_aimon_candidates(
+                [payload], max_attempts, latency=latency, previous_result=previous_result, deadline=deadline, counters=counters
+            )
+            return results[0]
+
+        aimon_query, aimon_context = self._build_detection_inputs(payload)
+        cache_key = self._detect_cache_key((aimon_query, payload['instructions'], payload['generated_text'], aimon_context))
+        cached = self._cache_lookup(cache_key, counters)
+        if cached is not None:
+            return cached
         
         @self.detect
         def run_detection(query, instructions, generated_text, context):
             return query, instructions, generated_text, context
 
+        request_bytes = self._text_bytes(aimon_query, payload['instructions'], payload['generated_text'], aimon_context)
+        attempts = []
+
+        def invoke():
+            attempts.append(1)
+            self._count_call(counters, "detect_calls", len(attempts), request_bytes)
+            with self._call_span("detect", len(attempts), request_bytes, self.detect.config), hold_slot(self._detect_slots, deadline):
+                return run_detection(
+                    aimon_query,
+                    payload['instructions'],
+                    payload['generated_text'],
+                    aimon_context
+                )
+
         @retry(
             exception_to_check=Exception,
             tries=max_attempts,
             delay=1,
             backoff=2,
-            logger=logger
+            logger=logger,
+            deadline=deadline,
+            policy=self.config.retry_policy
         )
         def inner_detection():
             logger.debug(f"AIMon detect call with payload: {payload}")
-            _, _, _, _, result = run_detection(
-                aimon_query,
-                payload['instructions'],
-                payload['generated_text'],
-                aimon_context
+            _, _, _, _, result = call_with_deadline(invoke, deadline)
+            return result
+        start = time.perf_counter()
+        result = inner_detection()
+        self._record_latency(latency, DETECT_STAGE, start)
+        self._cache_store(cache_key, result)
+        return result
+
+    async def _adetect_aimon_response(self, payload, max_attempts, latency=None, previous_result=None, deadline=None, counters=None):
+        """
+        Async counterpart of `_detect_aimon_response`. The detection request is sent with
+        the `AsyncClient` of the `Detect` decorator and retries back off without blocking.
+
+        Args:
+            payload (dict): A dictionary containing 'context', 'user_query',
+                            'instructions', and 'generated_text' for evaluation.
+            max_attempts (int): Maximum number of retry attempts.
+            latency (LatencyEstimator, optional): Records the duration of the call, retries included.
+            previous_result (object, optional): Result of the previous iteration, reused in differential evaluation mode.
+            deadline (float, optional): `time.monotonic()` deadline; a request still in flight then is cancelled.
+            counters (SessionCounters, optional): Counts the requests, retries and bytes sent.
+
+        Returns:
+            object: The AIMon detection result containing evaluation scores and feedback.
+        """
+        if self.config.differential_evaluation:
+            results = await self._adetect_aimon_candidates(
+                [payload], max_attempts, latency=latency, previous_result=previous_result, deadline=deadline, counters=counters
             )
+            return results[0]
+
+        aimon_query, aimon_context = self._build_detection_inputs(payload)
+        cache_key = self._detect_cache_key((aimon_query, payload['instructions'], payload['generated_text'], aimon_context))
+        cached = self._cache_lookup(cache_key, counters)
+        if cached is not None:
+            return cached
+        _, detect_slots = self._get_async_slots()
+
+        @self.detect
+        async def run_detection(query, instructions, generated_text, context):
+            return query, instructions, generated_text, context
+
+        request_bytes = self._text_bytes(aimon_query, payload['instructions'], payload['generated_text'], aimon_context)
+        attempts = []
+
+        async def invoke():
+            attempts.append(1)
+            self._count_call(counters, "detect_calls", len(attempts), request_bytes)
+            with self._call_span("detect", len(attempts), request_bytes, self.detect.config):
+                async with detect_slots:
+                    return await run_detection(
+                        aimon_query,
+                        payload['instructions'],
+                        payload['generated_text'],
+                        aimon_context
+                    )
+
+        @async_retry(
+            exception_to_check=Exception,
+            tries=max_attempts,
+            delay=1,
+            backoff=2,
+            logger=logger,
+            deadline=deadline,
+            policy=self.config.retry_policy
+        )
+        async def inner_detection():
+            logger.debug(f"AIMon async detect call with payload: {payload}")
+            _, _, _, _, result = await await_with_deadline(invoke(), deadline)
             return result
-        return inner_detection()
+        start = time.perf_counter()
+        result = await inner_detection()
+        self._record_latency(latency, DETECT_STAGE, start)
+        self._cache_store(cache_key, result)
+        return result
+
+    def _generate_best_candidate(self, prompt_template, system_prompt, context, user_query, user_instructions, latency=None, previous_result=None, deadline=None, llm_context=None, counters=None):
+        """
+        Generate `config.num_candidates` revisions for a corrective prompt in parallel, score
+        them all in one batched AIMon request and keep the one with the lowest residual error.
+        Candidates whose LLM call fails are dropped; if every call fails, the last error is raised.
+
+        Args:
+            prompt_template (Template): Corrective prompt template.
+            system_prompt (str): The original system prompt.
+            context (str): The original context.
+            user_query (str): The user's query.
+            user_instructions (list[str]): Instructions the model must follow.
+            latency (LatencyEstimator, optional): Records the durations of the LLM and detect calls.
+            previous_result (object, optional): Result of the previous iteration, reused in differential evaluation mode.
+            deadline (float, optional): `time.monotonic()` deadline for the LLM and detect calls.
+            llm_context (str, optional): Context passed to the LLM instead of `context`, e.g. a pruned one.
+            counters (SessionCounters, optional): Counts the LLM and detect calls.
+
+        Returns:
+            tuple: (generated_text (str), payload (dict), result (object)) of the best candidate.
+        """
+        num_candidates = self.config.num_candidates
+        llm_context = context if llm_context is None else llm_context
+        with ThreadPoolExecutor(max_workers=num_candidates) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._call_llm, prompt_template, self.config.user_model_max_retries, system_prompt, llm_context, user_query, latency, deadline, counters, candidate)
+                for candidate in range(num_candidates)
+            ]
+            outcomes = []
+            for future in futures:
+                try:
+                    outcomes.append(future.result())
+                except Exception as e:
+                    outcomes.append(e)
+
+        payloads = self._candidate_payloads(outcomes, context, user_query, user_instructions, system_prompt)
+        results = self._detect_aimon_candidates(
+            payloads, self.config.feedback_model_max_retries, latency=latency, previous_result=previous_result, deadline=deadline, counters=counters
+        )
+        return self._select_best_candidate(payloads, results)
+
+    async def _agenerate_best_candidate(self, prompt_template, system_prompt, context, user_query, user_instructions, latency=None, previous_result=None, deadline=None, llm_context=None, counters=None):
+        """
+        Async counterpart of `_generate_best_candidate`; candidates are generated concurrently
+        on the event loop.
+
+        Returns:
+            tuple: (generated_text (str), payload (dict), result (object)) of the best candidate.
+        """
+        llm_context = context if llm_context is None else llm_context
+        outcomes = await asyncio.gather(
+            *[
+                self._acall_llm(prompt_template, self.config.user_model_max_retries, system_prompt, llm_context, user_query, latency=latency, deadline=deadline, counters=counters, candidate=candidate)
+                for candidate in range(self.config.num_candidates)
+            ],
+            return_exceptions=True,
+        )
+        payloads = self._candidate_payloads(outcomes, context, user_query, user_instructions, system_prompt)
+        results = await self._adetect_aimon_candidates(
+            payloads, self.config.feedback_model_max_retries, latency=latency, previous_result=previous_result, deadline=deadline, counters=counters
+        )
+        return self._select_best_candidate(payloads, results)
+
+    def _candidate_payloads(self, outcomes, context, user_query, user_instructions, system_prompt):
+        """
+        Build AIMon payloads for the candidates that were generated successfully.
+
+        Args:
+            outcomes (list): Generated texts or the exceptions raised while generating them.
+
+        Returns:
+            list[dict]: One AIMon payload per successful candidate.
+
+        Raises:
+            Exception: The last candidate error if no candidate was generated.
+        """
+        errors = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+        texts = [outcome for outcome in outcomes if not isinstance(outcome, BaseException)]
+        if errors:
+            logger.warning(f"{len(errors)} of {len(outcomes)} candidate LLM calls failed: {errors[-1]}")
+        if not texts:
+            raise errors[-1]
+        return [
+            self._build_aimon_payload(context, user_query, user_instructions, text, system_prompt)
+            for text in texts
+        ]
+
+    def _select_best_candidate(self, payloads, results):
+        """
+        Pick the candidate with the lowest residual error score, breaking ties on the number
+        of failed instructions and then on generation order.
+
+        Returns:
+            tuple: (generated_text (str), payload (dict), result (object))
+        """
+        best_index = min(
+            range(len(payloads)),
+            key=lambda i: (get_residual_error_score(results[i]), get_failed_instructions_count(results[i]), i),
+        )
+        logger.debug(f"Selected candidate {best_index + 1} of {len(payloads)}")
+        return payloads[best_index]['generated_text'], payloads[best_index], results[best_index]
+
+    def _detect_aimon_candidates(self, payloads, max_attempts, latency=None, previous_result=None, deadline=None, counters=None):
+        """
+        Score several candidate payloads with a single batched AIMon Detect request.
+
+        Args:
+            payloads (list[dict]): AIMon input payloads.
+            max_attempts (int): Maximum number of retry attempts.
+            latency (LatencyEstimator, optional): Records the duration of the batched call.
+            previous_result (object, optional): Result of the previous iteration, reused in differential evaluation mode.
+            deadline (float, optional): `time.monotonic()` deadline bounding each attempt and the retries.
+            counters (SessionCounters, optional): Counts the requests, retries and bytes sent.
+
+        Returns:
+            list: AIMon detection results in the same order as `payloads`.
+        """
+        rows, config = self._build_detection_request(payloads, previous_result)
+        keys, results, pending = self._lookup_detection_rows(rows, config, counters)
+        if not pending:
+            return self._merge_detection_results(payloads, results, previous_result)
+        pending_rows = [rows[i] for i in pending]
+        request_bytes = self._text_bytes(pending_rows)
+        attempts = []
+
+        def invoke():
+            attempts.append(1)
+            self._count_call(counters, "detect_calls", len(attempts), request_bytes)
+            with self._call_span("detect", len(attempts), request_bytes, config, len(pending_rows)), hold_slot(self._detect_slots, deadline):
+                return self.detect.detect_batch(pending_rows, config=config)
+
+        @retry(exception_to_check=Exception, tries=max_attempts, delay=1, backoff=2, logger=logger, deadline=deadline, policy=self.config.retry_policy)
+        def inner_detection():
+            return call_with_deadline(invoke, deadline)
+        start = time.perf_counter()
+        fetched = inner_detection()
+        self._record_latency(latency, DETECT_STAGE, start)
+        self._store_detection_rows(keys, results, pending, fetched)
+        return self._merge_detection_results(payloads, results, previous_result)
+
+    async def _adetect_aimon_candidates(self, payloads, max_attempts, latency=None, previous_result=None, deadline=None, counters=None):
+        """
+        Async counterpart of `_detect_aimon_candidates`.
+
+        Returns:
+            list: AIMon detection results in the same order as `payloads`.
+        """
+        rows, config = self._build_detection_request(payloads, previous_result)
+        keys, results, pending = self._lookup_detection_rows(rows, config, counters)
+        if not pending:
+            return self._merge_detection_results(payloads, results, previous_result)
+        _, detect_slots = self._get_async_slots()
+        pending_rows = [rows[i] for i in pending]
+        request_bytes = self._text_bytes(pending_rows)
+        attempts = []
+
+        async def invoke():
+            attempts.append(1)
+            self._count_call(counters, "detect_calls", len(attempts), request_bytes)
+            with self._call_span("detect", len(attempts), request_bytes, config, len(pending_rows)):
+                async with detect_slots:
+                    return await self.detect.adetect_batch(pending_rows, config=config)
+
+        @async_retry(exception_to_check=Exception, tries=max_attempts, delay=1, backoff=2, logger=logger, deadline=deadline, policy=self.config.retry_policy)
+        async def inner_detection():
+            return await await_with_deadline(invoke(), deadline)
+        start = time.perf_counter()
+        fetched = await inner_detection()
+        self._record_latency(latency, DETECT_STAGE, start)
+        self._store_detection_rows(keys, results, pending, fetched)
+        return self._merge_detection_results(payloads, results, previous_result)
+
+    def _record_latency(self, latency, stage, start):
+        """
+        Record the duration of a call that started at `start` (a `time.perf_counter()` value)
+        in the session latency estimator and in `self.metrics`.
+
+        Args:
+            latency (LatencyEstimator, optional): Session latency estimator; skipped if None.
+            stage (str): `LLM_STAGE` or `DETECT_STAGE`.
+            start (float): Start time of the call.
+        """
+        duration_ms = (time.perf_counter() - start) * 1000
+        if latency is not None:
+            latency.record(stage, duration_ms)
+        if self.metrics is not None:
+            self.metrics.record_stage(stage, duration_ms)
+
+    def _llm_cache_key(self, prompt_template, system_prompt, context, user_query, candidate=None):
+        """
+        Response cache key of an LLM call, or None if memoization is disabled.
+
+        Candidates generated for the same prompt get separate entries, so a cached run
+        still compares `num_candidates` different responses.
+
+        Returns:
+            Optional[str]: Cache key.
+        """
+        if self.response_cache is None:
+            return None
+        if candidate is None:
+            return make_key("llm", prompt_template.template, system_prompt, context, user_query)
+        return make_key("llm", prompt_template.template, system_prompt, context, user_query, candidate)
+
+    def _detect_cache_key(self, row, config=None):
+        """
+        Response cache key of the detection of one (query, instructions, generated_text, context)
+        row, or None if memoization is disabled. Detection results are not memoized when they are
+        published, since a cache hit would skip publishing the session to AIMon.
+
+        Args:
+            row (tuple): Detection row.
+            config (dict, optional): Detector configuration; None means the one of `self.detect`.
+
+        Returns:
+            Optional[str]: Cache key.
+        """
+        if self.response_cache is None or self.detect.publish:
+            return None
+        return make_key("detect", row, config if config is not None else self.detect.config)
+
+    def _cache_lookup(self, key, counters=None):
+        """
+        Look up a memoized LLM response or detection result, counting hits in `counters`.
+
+        Returns:
+            object: The cached value, or None on a miss or if memoization is disabled.
+        """
+        if key is None:
+            return None
+        value = self.response_cache.get(key)
+        if value is not None and counters is not None:
+            counters.add(cache_hits=1)
+        return value
+
+    def _cache_store(self, key, value):
+        """Memoize an LLM response or detection result if memoization is enabled."""
+        if key is not None:
+            self.response_cache.put(key, value)
+
+    def _lookup_detection_rows(self, rows, config, counters=None):
+        """
+        Look up the memoized detection results of a batch of rows.
+
+        Returns:
+            tuple: (keys (list), results (list), pending (list[int])). `results` holds the cached
+            result of each row or None, and `pending` the indices of the rows still to be scored.
+        """
+        keys = [self._detect_cache_key(row, config) for row in rows]
+        results = [self._cache_lookup(key, counters) for key in keys]
+        pending = [i for i, result in enumerate(results) if result is None]
+        return keys, results, pending
+
+    def _store_detection_rows(self, keys, results, pending, fetched):
+        """Fill in and memoize the results fetched for the `pending` rows of a batch."""
+        for i, result in zip(pending, fetched):
+            results[i] = result
+            self._cache_store(keys[i], result)
+
+    @staticmethod
+    def _count_call(counters, field, attempt, bytes_sent):
+        """
+        Count one LLM or detect call attempt in the session counters.
+
+        Args:
+            counters (SessionCounters, optional): Session counters; nothing is counted if None.
+            field (str): "llm_calls" or "detect_calls".
+            attempt (int): 1 for the first attempt of a call, 2 for its first retry, and so on.
+            bytes_sent (int): Size of the request.
+        """
+        if counters is not None:
+            counters.add(**{field: 1, "retries": int(attempt > 1), "bytes_sent": bytes_sent})
+
+    def _prompt_bytes(self, counters, prompt_template, system_prompt, context, user_query):
+        """
+        UTF-8 size of the prompt recommended to the LLM, or 0 if calls are not counted.
+
+        Returns:
+            int: Prompt size in bytes.
+        """
+        if counters is None:
+            return 0
+        prompt = prompt_template.safe_substitute(system_prompt=system_prompt, context=context, user_query=user_query)
+        return self._text_bytes(prompt)
+
+    @staticmethod
+    def _text_bytes(*values):
+        """
+        UTF-8 size of the strings in `values`, searched recursively through lists and tuples.
+
+        Returns:
+            int: Size in bytes.
+        """
+        total = 0
+        for value in values:
+            if isinstance(value, str):
+                total += len(value.encode("utf-8"))
+            elif isinstance(value, (list, tuple)):
+                total += RepromptingPipeline._text_bytes(*value)
+        return total
+
+    def _build_detection_request(self, payloads, previous_result=None):
+        """
+        Build the detection rows and detector configuration for a batched AIMon Detect request.
+
+        Without differential evaluation every row is scored against all instructions with the
+        detectors of `self.detect`. In differential evaluation mode, only the instructions returned
+        by `_instructions_to_recheck` are sent, and detectors that cannot apply are left out:
+        groundedness when no context is provided, instruction adherence when there is nothing to check.
+
+        Args:
+            payloads (list[dict]): AIMon input payloads. They share context and instructions.
+            previous_result (object, optional): Result of the previous iteration.
+
+        Returns:
+            tuple: (rows (list[tuple]), config (dict or None)). A None config uses the detectors of `self.detect`.
+        """
+        rows = [self._build_detection_row(payload) for payload in payloads]
+        if not self.config.differential_evaluation:
+            return rows, None
+
+        instructions = self._instructions_to_recheck(payloads[0]['instructions'], previous_result)
+        config = dict(self.detect.config)
+        if payloads[0]['context'] == NO_CONTEXT_PLACEHOLDER:
+            config.pop('groundedness', None)
+        if not instructions:
+            config.pop('instruction_adherence', None)
+        rows = [(query, instructions, generated_text, context) for query, _, generated_text, context in rows]
+        return rows, config
+
+    def _instructions_to_recheck(self, instructions, previous_result):
+        """
+        Select the instructions to send to AIMon in differential evaluation mode: all of them on
+        the first iteration, afterwards those that failed (or were not scored) in the previous
+        iteration plus `regression_check_instructions` passing ones, least confident first.
+
+        Args:
+            instructions (list[str]): All user instructions.
+            previous_result (object, optional): Result of the previous iteration.
+
+        Returns:
+            list[str]: Instructions to re-check, in their original order.
+        """
+        if previous_result is None:
+            return list(instructions)
+        previous = self._instruction_results(previous_result)
+        passed = [i for i in instructions if i in previous and previous[i].get("label", True)]
+        passed.sort(key=lambda i: previous[i].get("follow_probability", 1.0))
+        recheck = set(passed[:self.config.regression_check_instructions])
+        return [i for i in instructions if i not in passed or i in recheck]
+
+    def _merge_detection_results(self, payloads, results, previous_result):
+        """
+        Complete differential evaluation results so they look like a full evaluation: skipped
+        detectors get an empty section, and instructions that were not re-checked keep their
+        result from the previous iteration. Results are returned unchanged otherwise.
+
+        The instruction adherence `score` is the server's when every instruction was re-checked.
+        After a partial re-check the server only scored a subset, so the score is replaced by the
+        mean `follow_probability` of the merged instructions and the section is marked with
+        `"score_source": "merged"`.
+
+        Args:
+            payloads (list[dict]): AIMon input payloads.
+            results (list): AIMon detection results in the same order as `payloads`.
+            previous_result (object, optional): Result of the previous iteration.
+
+        Returns:
+            list: Merged AIMon detection results.
+        """
+        if not self.config.differential_evaluation:
+            return results
+        previous = self._instruction_results(previous_result) if previous_result is not None else {}
+        merged_results = []
+        for payload, result in zip(payloads, results):
+            response = result.detect_response.to_dict()
+            for source in ("instruction_adherence", "groundedness", "toxicity"):
+                response.setdefault(source, {"instructions_list": []})
+            fresh = {inst.get("instruction"): inst for inst in response["instruction_adherence"].get("instructions_list", [])}
+            instructions_list = [
+                fresh.get(instruction) or previous.get(instruction)
+                for instruction in payload['instructions']
+                if instruction in fresh or instruction in previous
+            ]
+            adherence = {**response["instruction_adherence"], "instructions_list": instructions_list}
+            if any(instruction not in fresh for instruction in payload['instructions']) and instructions_list:
+                adherence["score"] = sum(inst.get("follow_probability", 0.0) for inst in instructions_list) / len(instructions_list)
+                adherence["score_source"] = "merged"
+            response["instruction_adherence"] = adherence
+            merged_results.append(DetectResult(result.status, InferenceDetectResponseItem.construct(**response)))
+        return merged_results
+
+    @staticmethod
+    def _instruction_results(result):
+        """
+        Map instruction text to its instruction adherence entry in a detection result.
+
+        Returns:
+            dict: instruction (str) -> instructions_list entry (dict)
+        """
+        adherence = getattr(result.detect_response, "instruction_adherence", None) or {}
+        return {inst.get("instruction"): inst for inst in adherence.get("instructions_list", [])}
+
+    def _build_detection_row(self, payload):
+        """
+        Order a payload's detection inputs like the `values_returned` of `self.detect`.
+
+        Returns:
+            tuple: (user_query, instructions, generated_text, context)
+        """
+        aimon_query, aimon_context = self._build_detection_inputs(payload)
+        return aimon_query, payload['instructions'], payload['generated_text'], aimon_context
+
+    def _build_detection_inputs(self, payload):
+        """
+        Build the query and context strings sent to AIMon Detect for a payload.
+
+        Args:
+            payload (dict): AIMon input payload.
+
+        Returns:
+            tuple: (aimon_query (str), aimon_context (str))
+        """
+        aimon_context = f"{payload['context']}\n\nUser Query:\n{payload['user_query']}"
+        aimon_query = f"{payload['user_query']}\n\nInstructions:\n{payload['instructions']}"
+        return aimon_query, aimon_context
 
     def get_response_feedback(self, result):
             """
@@ -331,6 +1220,58 @@ class RepromptingPipeline:
             feedback = get_failed_instructions(result) + get_failed_toxicity_instructions(result)
             return scores, feedback
     
+    def _prune_context(self, context, user_query, result, deadline=None):
+        """
+        Prune the context passed to the LLM for a corrective prompt to `context_token_budget`,
+        keeping the passages most relevant to the query and the failed instructions. If pruning
+        is disabled, there is no real context, or scoring fails, the full context is used.
+
+        Args:
+            context (str): The original context.
+            user_query (str): The user's query.
+            result (object): AIMon detection result of the previous response.
+            deadline (float, optional): `time.monotonic()` deadline for the rerank request.
+
+        Returns:
+            str: Context for the corrective LLM call.
+        """
+        if self.context_pruner is None or context == NO_CONTEXT_PLACEHOLDER:
+            return context
+        failed = [inst["instruction"] for inst in get_failed_instructions(result)]
+        try:
+            pruned = call_with_deadline(
+                self.context_pruner.prune, deadline, context, user_query, failed, self.detect.client.retrieval.rerank
+            )
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.warning(f"Context pruning failed, using the full context: {e}")
+            return context
+        logger.debug(f"Pruned context from {len(context)} to {len(pruned)} characters")
+        return pruned
+
+    async def _aprune_context(self, context, user_query, result, deadline=None):
+        """
+        Async counterpart of `_prune_context`; rerank requests are sent with the `AsyncClient`.
+
+        Returns:
+            str: Context for the corrective LLM call.
+        """
+        if self.context_pruner is None or context == NO_CONTEXT_PLACEHOLDER:
+            return context
+        failed = [inst["instruction"] for inst in get_failed_instructions(result)]
+        try:
+            pruned = await await_with_deadline(
+                self.context_pruner.aprune(context, user_query, failed, self.detect.async_client.retrieval.rerank), deadline
+            )
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.warning(f"Context pruning failed, using the full context: {e}")
+            return context
+        logger.debug(f"Pruned context from {len(context)} to {len(pruned)} characters")
+        return pruned
+
     def _build_corrective_prompt(self, payload, result):
         """
         Generate a corrective prompt using AIMon evaluation results.
@@ -344,19 +1285,22 @@ class RepromptingPipeline:
         """
         return self.reprompter.create_corrective_prompt(result, payload)
 
-    def _should_stop_reprompting(self, result, iteration_num, pipeline_start):
+    def _should_stop_reprompting(self, result, iteration_num, pipeline_start, predicted_iteration_ms=None):
         """
         Determine whether to stop re-prompting. 
         
         Stopping conditions:
         - Max iterations reached.
-        - Latency budget 75% depleted
+        - Another iteration is predicted to exceed the latency budget. Without a
+          prediction, stop once the latency budget is 75% depleted.
         - All instructions are adhered to.
         - Otherwise, continue if violations or toxicity remain.
         
         Args:
             result (object): AIMon detection result.
             iteration_num (int): Current iteration number.
+            pipeline_start (float): Start time of the pipeline (epoch).
+            predicted_iteration_ms (float, optional): Predicted duration of the next iteration.
             
         Returns:
             tuple: 
@@ -369,7 +1313,10 @@ class RepromptingPipeline:
         latency_limit_ms = self.config.latency_limit_ms
         if latency_limit_ms is not None:
             cumulative_latency = self._get_cumulative_latency(pipeline_start)
-            if cumulative_latency > ((0.75) * latency_limit_ms):
+            if predicted_iteration_ms is not None:
+                if cumulative_latency + predicted_iteration_ms > latency_limit_ms:
+                    return True, StopReasons.LATENCY_LIMIT_EXCEEDED
+            elif cumulative_latency > ((0.75) * latency_limit_ms):
                 return True, StopReasons.LATENCY_LIMIT_EXCEEDED
         
         # Continue if toxicity is detected
@@ -398,6 +1345,9 @@ class RepromptingPipeline:
             if isinstance(entry.get("residual_error_score"), (int, float))
         ]
         if not valid_iterations:
+            if iteration_outputs:
+                # Nothing was evaluated in time; fall back to the unevaluated response
+                return iteration_outputs[max(iteration_outputs)]["response_text"], None
             return "[ERROR: No valid response]", None
 
         best_iteration = min(valid_iterations, key=lambda x: x["residual_error_score"])
@@ -430,6 +1380,8 @@ class RepromptingPipeline:
         stop_reason,
         prompt,
         response_text,
+        predicted_iteration_latency_ms=None,
+        counters=None,
     ):
         """
         Build a structured telemetry entry for an iteration.
@@ -444,6 +1396,8 @@ class RepromptingPipeline:
             stop_reason (str): Reason for stopping.
             prompt (str): Prompt used for this iteration.
             response_text (str): Model's response.
+            predicted_iteration_latency_ms (float, optional): Predicted duration of the next iteration.
+            counters (dict, optional): Session counters so far.
 
         Returns:
             dict: Structured telemetry entry.
@@ -458,6 +1412,8 @@ class RepromptingPipeline:
             "stop_reason": stop_reason,
             "prompt": prompt,
             "response_text": response_text,
+            "predicted_iteration_latency_ms": predicted_iteration_latency_ms,
+            "counters": counters,
         }
 
     def _emit_iteration_telemetry(
@@ -470,6 +1426,9 @@ class RepromptingPipeline:
         stop_reason,
         curr_prompt,
         curr_generated_text,
+        telemetry=None,
+        predicted_iteration_ms=None,
+        counters=None,
     ):
         """
         Build and emit telemetry for an iteration. Calculates cumulative latency.
@@ -483,6 +1442,9 @@ class RepromptingPipeline:
             stop_reason (str): Reason for stopping or continuing.
             curr_prompt (str): Prompt used.
             curr_generated_text (str): Model response text.
+            telemetry (TelemetryLogger, optional): Session telemetry logger. Defaults to `self.telemetry`.
+            predicted_iteration_ms (float, optional): Predicted duration of the next iteration.
+            counters (SessionCounters, optional): Session counters; a snapshot is added to the entry.
 
         Returns:
             dict: The telemetry entry.
@@ -504,13 +1466,112 @@ class RepromptingPipeline:
             stop_reason,
             prompt_text,
             curr_generated_text,
+            predicted_iteration_ms,
+            counters.as_dict() if counters is not None else None,
         )
         try:
-            self.telemetry.emit(**entry)
+            (telemetry or self.telemetry).emit(**entry)
         except Exception as e:
             logger.warning(f"[Warning] Telemetry emission failed: {e}")
         return entry
     
+    def _run_span_attributes(self):
+        """
+        Attributes of the tracing span around a run.
+
+        Returns:
+            dict: The run limits and the LLM function.
+        """
+        return {
+            "aimon.reprompting.max_iterations": self.config.max_iterations,
+            "aimon.reprompting.num_candidates": self.config.num_candidates,
+            "aimon.reprompting.latency_limit_ms": self.config.latency_limit_ms,
+            "code.function": getattr(self.llm_fn, "__qualname__", None),
+        }
+
+    @staticmethod
+    def _annotate_run_span(span, iteration_num, stop_reason, counters):
+        """
+        Record the outcome of a run on its tracing span.
+
+        Args:
+            span: The span of the run.
+            iteration_num (int): Number of iterations performed.
+            stop_reason (str): Why the run stopped.
+            counters (SessionCounters): Calls made by the run.
+        """
+        span.set_attribute("aimon.reprompting.iterations", iteration_num)
+        span.set_attribute("aimon.reprompting.stop_reason", stop_reason)
+        for field, value in counters.as_dict().items():
+            span.set_attribute(f"aimon.reprompting.{field}", value)
+
+    @staticmethod
+    def _iteration_span(iteration_num):
+        """
+        Tracing span around the LLM and detect calls of one iteration.
+        """
+        return start_span("aimon.reprompting.iteration", {"aimon.reprompting.iteration": iteration_num})
+
+    @staticmethod
+    def _call_span(stage, attempt, payload_bytes, config=None, batch_size=None):
+        """
+        Tracing span around one attempt of an LLM or detect call.
+
+        Args:
+            stage (str): "llm" or "detect".
+            attempt (int): 1 for the first attempt of a call, 2 for its first retry, and so on.
+            payload_bytes (int): Size of the prompt or of the texts sent to AIMon.
+            config (dict, optional): Detector configuration of a detect call.
+            batch_size (int, optional): Number of candidates scored by a batched detect call.
+        """
+        return start_span(
+            f"aimon.reprompting.{stage}",
+            {
+                "aimon.reprompting.stage": stage,
+                "aimon.attempt": attempt,
+                "aimon.payload_bytes": payload_bytes,
+                "aimon.detectors": sorted(config.keys()) if config else None,
+                "aimon.batch_size": batch_size,
+            },
+        )
+
+    def _record_run_metrics(self, iteration_outputs, iteration_num, stop_reason, pipeline_start):
+        """
+        Feed a completed run into `self.metrics`.
+
+        Args:
+            iteration_outputs (dict): Outputs per iteration.
+            iteration_num (int): Number of iterations performed.
+            stop_reason (str): Why the run stopped.
+            pipeline_start (float): Start time of the pipeline (epoch).
+        """
+        if self.metrics is None:
+            return
+        residual_errors = [
+            entry["residual_error_score"] for entry in iteration_outputs.values()
+            if isinstance(entry.get("residual_error_score"), (int, float))
+        ]
+        try:
+            self.metrics.record_run(
+                iterations=iteration_num,
+                stop_reason=stop_reason,
+                latency_ms=self._get_cumulative_latency(pipeline_start),
+                residual_error=min(residual_errors) if residual_errors else None,
+            )
+        except Exception as e:
+            logger.warning(f"[Warning] Recording run metrics failed: {e}")
+
+    def _get_deadline(self):
+        """
+        Deadline of a run starting now, derived from `latency_limit_ms`.
+
+        Returns:
+            Optional[float]: Absolute `time.monotonic()` deadline, or None if no latency limit is set.
+        """
+        if self.config.latency_limit_ms is None:
+            return None
+        return time.monotonic() + self.config.latency_limit_ms / 1000
+
     def _get_cumulative_latency(self, pipeline_start):
         """
         Calculate cumulative latency since pipeline start.
@@ -523,6 +1584,22 @@ class RepromptingPipeline:
         """
         return (time.time() - pipeline_start) * 1000
     
+    def _record_unevaluated_output(self, iteration_outputs, iteration_num, generated_text):
+        """
+        Record a response before it is evaluated, so it can still be returned if the
+        latency limit is reached while AIMon evaluates it.
+
+        Args:
+            iteration_outputs (dict): Stores outputs per iteration.
+            iteration_num (int): Current iteration number.
+            generated_text (str): Model's generated response.
+        """
+        iteration_outputs[iteration_num] = {
+            "response_text": generated_text,
+            "residual_error_score": None,
+            "failed_instructions_count": None
+        }
+
     def _record_iteration_output(self, iteration_outputs, iteration_num, generated_text, result):
         """
         Record iteration outputs for later selection of the best response.
@@ -1,6 +1,8 @@
 """
 runner.py — This module provides a high-level function (`run_reprompting_pipeline`) 
-for executing AIMon's iterative re-prompting workflow.
+for executing AIMon's iterative re-prompting workflow, and its async counterpart
+(`arun_reprompting_pipeline`) for use inside an event loop. `run_reprompting_batch` and
+`arun_reprompting_batch` run many queries concurrently through one shared pipeline.
 
 This function is the primary entry point for developers and end-users. It:
     - Normalizes inputs (replacing missing `system_prompt` or `context` with clear placeholders).
@@ -10,9 +12,12 @@ This function is the primary entry point for developers and end-users. It:
 
 Contributors can extend this behavior by modifying `RepromptingPipeline` or `RepromptingConfig`.
 """
-from typing import List, Optional
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import asyncio
+import itertools
 from aimon.reprompting_api.pipeline import RepromptingPipeline
-from aimon.reprompting_api.config import RepromptingConfig
+from aimon.reprompting_api.config import RepromptingConfig, NO_CONTEXT_PLACEHOLDER
 
 def run_reprompting_pipeline(
     llm_fn,
@@ -48,16 +53,7 @@ def run_reprompting_pipeline(
 
     # Use the provided config or fall back to defaults
     config = reprompting_config or RepromptingConfig()
-    
-    # validate llm_fn
-    if not callable(llm_fn):
-        raise TypeError("llm_fn must be a callable that returns a string.")
-
-    if not user_query or not isinstance(user_query, str):
-        raise ValueError("user_query must be a non-empty string.")
-    
-    context = context if (context and isinstance(context, str)) else "[no context provided]"
-    system_prompt = system_prompt if (system_prompt and isinstance(system_prompt, str)) else "[no system prompt provided]"
+    system_prompt, context = _validate_and_normalize_inputs(llm_fn, user_query, system_prompt, context)
 
     # initialize the re-prompting pipeline with the LLM function and configuration
     pipeline = RepromptingPipeline(llm_fn=llm_fn, config=config)
@@ -67,4 +63,184 @@ def run_reprompting_pipeline(
         context=context,
         user_query=user_query,
         user_instructions=user_instructions or [] # Default to empty list if none provided
-    )
\ No newline at end of file
+    )
+
+async def arun_reprompting_pipeline(
+    llm_fn,
+    user_query: str,
+    system_prompt: str = None,
+    context:str = None,
+    user_instructions: List[str] = None,
+    reprompting_config: RepromptingConfig = None,
+) -> dict:
+    """
+    Async counterpart of `run_reprompting_pipeline` for use inside an event loop.
+
+    `llm_fn` may be a coroutine function with the same signature as the synchronous
+    `llm_fn`; a regular function is executed in a worker thread. Detection uses
+    AIMon's `AsyncClient` and retries back off without blocking the event loop.
+
+    Args:
+        llm_fn (Callable[[Template, str, str, str], Awaitable[str] | str]): A function to call the LLM.
+        user_query (str): The user’s query. Must be a non-empty string.
+        system_prompt (str, optional): A system-level instruction string.
+        context (str, optional): Supplemental context for the LLM.
+        user_instructions (List[str], optional): A list of instructions for the model to follow.
+        reprompting_config (RepromptingConfig, optional): Configuration object for controlling pipeline behavior.
+
+    Returns:
+        dict: Same structure as returned by `run_reprompting_pipeline`.
+    """
+    config = reprompting_config or RepromptingConfig()
+    system_prompt, context = _validate_and_normalize_inputs(llm_fn, user_query, system_prompt, context)
+
+    pipeline = RepromptingPipeline(llm_fn=llm_fn, config=config)
+
+    return await pipeline.arun(
+        system_prompt=system_prompt,
+        context=context,
+        user_query=user_query,
+        user_instructions=user_instructions or []
+    )
+
+def run_reprompting_batch(
+    llm_fn,
+    items: Iterable[Tuple[str, Optional[str], Optional[List[str]]]],
+    system_prompt: str = None,
+    reprompting_config: RepromptingConfig = None,
+    max_concurrent_sessions: int = 8,
+) -> Iterator[dict]:
+    """
+    Run the re-prompting pipeline over many queries, yielding results as sessions finish.
+
+    A single `RepromptingPipeline` (and therefore a single AIMon client and connection pool)
+    is shared by all sessions, which run in a thread pool. LLM and AIMon concurrency are limited
+    separately through `max_concurrent_llm_calls` and `max_concurrent_detect_calls` on the config.
+    Items are consumed lazily, so at most `max_concurrent_sessions` of them are in flight at once.
+
+    Args:
+        llm_fn (Callable[[Template, str, str, str], str]): A function to call the LLM.
+        items (Iterable[Tuple[str, str, List[str]]]): `(user_query, context, user_instructions)` tuples.
+            `context` and `user_instructions` may be None.
+        system_prompt (str, optional): A system-level instruction string shared by all sessions.
+        reprompting_config (RepromptingConfig, optional): Configuration shared by all sessions.
+        max_concurrent_sessions (int): Maximum number of sessions running at once. Defaults to 8.
+
+    Yields:
+        dict: In completion order, the pipeline result for each item plus:
+            - "index" (int): Position of the item in `items`.
+            - "user_query" (str): The item's query.
+            - "error" (Exception, optional): Set instead of the pipeline result keys if the session failed.
+    """
+    if max_concurrent_sessions < 1:
+        raise ValueError("max_concurrent_sessions must be greater than 0")
+    config = reprompting_config or RepromptingConfig()
+    pipeline = RepromptingPipeline(llm_fn=llm_fn, config=config)
+
+    def run_one(index, item):
+        user_query = None
+        try:
+            user_query, context, user_instructions = item
+            normalized_system_prompt, context = _validate_and_normalize_inputs(llm_fn, user_query, system_prompt, context)
+            result = pipeline.run(
+                system_prompt=normalized_system_prompt,
+                context=context,
+                user_query=user_query,
+                user_instructions=user_instructions or []
+            )
+        except Exception as e:
+            result = {"error": e}
+        return {"index": index, "user_query": user_query, **result}
+
+    pending = set()
+    item_iter = enumerate(items)
+    with ThreadPoolExecutor(max_workers=max_concurrent_sessions) as executor:
+        for index, item in itertools.islice(item_iter, max_concurrent_sessions):
+            pending.add(executor.submit(run_one, index, item))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                next_item = next(item_iter, None)
+                if next_item is not None:
+                    pending.add(executor.submit(run_one, *next_item))
+
+async def arun_reprompting_batch(
+    llm_fn,
+    items: Iterable[Tuple[str, Optional[str], Optional[List[str]]]],
+    system_prompt: str = None,
+    reprompting_config: RepromptingConfig = None,
+    max_concurrent_sessions: int = 64,
+) -> AsyncIterator[dict]:
+    """
+    Async counterpart of `run_reprompting_batch`. Sessions run as tasks on the current event
+    loop using `RepromptingPipeline.arun`, so `llm_fn` may be a coroutine function.
+
+    Args:
+        llm_fn (Callable[[Template, str, str, str], Awaitable[str] | str]): A function to call the LLM.
+        items (Iterable[Tuple[str, str, List[str]]]): `(user_query, context, user_instructions)` tuples.
+        system_prompt (str, optional): A system-level instruction string shared by all sessions.
+        reprompting_config (RepromptingConfig, optional): Configuration shared by all sessions.
+        max_concurrent_sessions (int): Maximum number of sessions running at once. Defaults to 64.
+
+    Yields:
+        dict: Same as `run_reprompting_batch`, in completion order.
+    """
+    if max_concurrent_sessions < 1:
+        raise ValueError("max_concurrent_sessions must be greater than 0")
+    config = reprompting_config or RepromptingConfig()
+    pipeline = RepromptingPipeline(llm_fn=llm_fn, config=config)
+
+    async def run_one(index, item):
+        user_query = None
+        try:
+            user_query, context, user_instructions = item
+            normalized_system_prompt, context = _validate_and_normalize_inputs(llm_fn, user_query, system_prompt, context)
+            result = await pipeline.arun(
+                system_prompt=normalized_system_prompt,
+                context=context,
+                user_query=user_query,
+                user_instructions=user_instructions or []
+            )
+        except Exception as e:
+            result = {"error": e}
+        return {"index": index, "user_query": user_query, **result}
+
+    pending = set()
+    item_iter = enumerate(items)
+    try:
+        for index, item in itertools.islice(item_iter, max_concurrent_sessions):
+            pending.add(asyncio.ensure_future(run_one(index, item)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+                next_item = next(item_iter, None)
+                if next_item is not None:
+                    pending.add(asyncio.ensure_future(run_one(*next_item)))
+    finally:
+        for task in pending:
+            task.cancel()
+
+def _validate_and_normalize_inputs(llm_fn, user_query, system_prompt, context):
+    """
+    Validate `llm_fn` and `user_query`, and replace a missing `system_prompt` or
+    `context` with its placeholder.
+
+    Returns:
+        tuple: (system_prompt (str), context (str))
+
+    Raises:
+        TypeError: If `llm_fn` is not callable.
+        ValueError: If `user_query` is empty or not a string.
+    """
+    # validate llm_fn
+    if not callable(llm_fn):
+        raise TypeError("llm_fn must be a callable that returns a string.")
+
+    if not user_query or not isinstance(user_query, str):
+        raise ValueError("user_query must be a non-empty string.")
+    
+    context = context if (context and isinstance(context, str)) else NO_CONTEXT_PLACEHOLDER
+    system_prompt = system_prompt if (system_prompt and isinstance(system_prompt, str)) else "[no system prompt provided]"
+    return system_prompt, context
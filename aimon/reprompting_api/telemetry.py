@@ -1,17 +1,201 @@
+import abc
+import atexit
+import hashlib
 import json
+import logging
+import threading
 import uuid
+import weakref
+from collections import deque
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+# Entry fields holding free text whose size depends on the prompts and responses
+TEXT_FIELDS = ("prompt_template", "response_text")
+
+# File sinks with buffered lines, flushed once at interpreter exit without keeping them alive
+_OPEN_FILE_SINKS = weakref.WeakSet()
+
+@atexit.register
+def _close_file_sinks():
+    for sink in list(_OPEN_FILE_SINKS):
+        sink.close()
+
+class TelemetrySink(abc.ABC):
+    """
+    Destination for telemetry entries, shared by all sessions of a pipeline.
+
+    Subclasses implement `write`; `flush` and `close` are optional. Sinks may be called
+    from several threads at once, and can be used as context managers that close them on exit.
+    """
+    @abc.abstractmethod
+    def write(self, entry: dict):
+        """Record one telemetry entry."""
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+class RingBufferSink(TelemetrySink):
+    """
+    Keeps the most recent `maxlen` entries in memory.
+    """
+    def __init__(self, maxlen: int = 1000):
+        if maxlen < 1:
+            raise ValueError("maxlen must be greater than 0")
+        self.entries = deque(maxlen=maxlen)
+
+    def write(self, entry: dict):
+        self.entries.append(entry)
+
+    def get_all(self):
+        """Return the buffered entries, oldest first."""
+        return list(self.entries)
+
+class JSONLFileSink(TelemetrySink):
+    """
+    Appends entries to a JSON Lines file. Lines are buffered in memory and written
+    every `buffer_size` entries, on `flush()` / `close()`, when the sink is garbage
+    collected, and at interpreter exit.
+    """
+    def __init__(self, path: str, buffer_size: int = 64):
+        if buffer_size < 1:
+            raise ValueError("buffer_size must be greater than 0")
+        self.path = path
+        self.buffer_size = buffer_size
+        self._buffer = []
+        self._lock = threading.Lock()
+        _OPEN_FILE_SINKS.add(self)
+
+    def write(self, entry: dict):
+        line = json.dumps(entry, default=str)
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= self.buffer_size:
+                self._write_buffer()
+
+    def flush(self):
+        with self._lock:
+            self._write_buffer()
+
+    def close(self):
+        self.flush()
+        _OPEN_FILE_SINKS.discard(self)
+
+    def __del__(self):
+        try:
+            with self._lock:
+                self._write_buffer()
+        except Exception:
+            pass
+
+    def _write_buffer(self):
+        if not self._buffer:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(self._buffer) + "\n")
+        self._buffer = []
+
+class CallbackSink(TelemetrySink):
+    """
+    Passes each entry to a callback, e.g. `queue.Queue.put_nowait` or a metrics exporter.
+    """
+    def __init__(self, callback):
+        if not callable(callback):
+            raise TypeError("callback must be callable")
+        self.callback = callback
+
+    def write(self, entry: dict):
+        self.callback(entry)
+
+class SessionCounters:
+    """
+    Thread-safe counters of the work done by one re-prompting run.
+
+    Attributes:
+        llm_calls (int): LLM call attempts, retries included.
+        detect_calls (int): AIMon detect requests, retries included.
+        retries (int): LLM and detect attempts after the first one of each call.
+        bytes_sent (int): UTF-8 size of the prompts sent to the LLM and of the texts sent to AIMon Detect.
+        cache_hits (int): LLM responses and detection results served from the response cache.
+    """
+    FIELDS = ("llm_calls", "detect_calls", "retries", "bytes_sent", "cache_hits")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        for field in self.FIELDS:
+            setattr(self, field, 0)
+
+    def add(self, **increments):
+        """Increment counters by name, e.g. `add(llm_calls=1, bytes_sent=120)`."""
+        with self._lock:
+            for field, value in increments.items():
+                if field not in self.FIELDS:
+                    raise ValueError(f"Unknown counter: {field}")
+                setattr(self, field, getattr(self, field) + value)
+
+    def as_dict(self):
+        """Return the counters as a dict."""
+        with self._lock:
+            return {field: getattr(self, field) for field in self.FIELDS}
+
+def shrink_text(text, max_chars=None, hash_text=False):
+    """
+    Bound the size of a telemetry text field.
+
+    Args:
+        text (str): Field value.
+        max_chars (int, optional): Keep at most this many characters, followed by a marker
+            with the number of characters dropped.
+        hash_text (bool): Replace the text by "sha256:<hex digest>".
+
+    Returns:
+        str: The bounded text, or `text` unchanged if it is not a string or no bound is set.
+    """
+    if not isinstance(text, str):
+        return text
+    if hash_text:
+        return "sha256:" + hashlib.sha256(text.encode("utf-8")).hexdigest()
+    if max_chars is not None and len(text) > max_chars:
+        return f"{text[:max_chars]}...[{len(text) - max_chars} more chars]"
+    return text
+
 class TelemetryLogger:
     """
     A lightweight logger for recording telemetry events during re-prompting pipeline execution.
 
     Telemetry is stored in memory for retrieval and returned by the pipeline when requested.
+    Entries are also written to any configured sinks, and large text fields can be truncated
+    or replaced by their hash so that long-lived processes keep bounded memory. Only the most
+    recent `max_entries` entries are kept in memory; sinks receive all of them.
     """
-    def __init__(self):
-        """Initialize an in-memory telemetry logger."""
+    def __init__(self, sinks=None, max_text_chars=None, hash_text=False, max_entries=1000):
+        """
+        Initialize an in-memory telemetry logger.
+
+        Args:
+            sinks (list[TelemetrySink], optional): Sinks receiving every emitted entry.
+            max_text_chars (int, optional): Truncate prompt and response texts to this many characters.
+            hash_text (bool): Store prompt and response texts as sha256 hashes. Defaults to False.
+            max_entries (int, optional): Entries kept in memory, oldest dropped first. None = unbounded. Defaults to 1000.
+        """
+        if max_entries is not None and max_entries < 0:
+            raise ValueError("max_entries must not be negative")
         self.session_id = str(uuid.uuid4())
-        self.memory_store = []
+        self.memory_store = deque(maxlen=max_entries)
+        self.sinks = list(sinks or [])
+        self.max_text_chars = max_text_chars
+        self.hash_text = hash_text
 
     def emit(
         self,
@@ -24,6 +208,8 @@ class TelemetryLogger:
         stop_reason: str,
         response_text: str,
         prompt: str = "",
+        predicted_iteration_latency_ms: float = None,
+        counters: dict = None,
     ):
         """
         Emit a single telemetry entry.
@@ -38,6 +224,8 @@ class TelemetryLogger:
             stop_reason (str): Reason for stopping or continuing.
             response_text (str): The raw text response from the LLM.
             prompt (str): The prompt text used for this iteration.
+            predicted_iteration_latency_ms (float, optional): Predicted duration of the next iteration (ms).
+            counters (dict, optional): Session counters (LLM calls, detect calls, retries, bytes sent) so far.
         """
         telemetry = {
             # not returned
@@ -53,8 +241,18 @@ class TelemetryLogger:
             "stop_reason": stop_reason,
             "prompt_template": prompt,
             "response_text": response_text,
+            "predicted_iteration_latency_ms": predicted_iteration_latency_ms,
+            "counters": counters,
         }
+        if self.max_text_chars is not None or self.hash_text:
+            for field in TEXT_FIELDS:
+                telemetry[field] = shrink_text(telemetry[field], self.max_text_chars, self.hash_text)
         self.memory_store.append(telemetry)
+        for sink in self.sinks:
+            try:
+                sink.write(telemetry)
+            except Exception as e:
+                logger.warning(f"Telemetry sink {type(sink).__name__} failed: {e}")
 
     def get_all(self, include_meta=False):
         """
@@ -67,7 +265,7 @@ class TelemetryLogger:
             list: Telemetry entries, stripped of internal metadata unless requested.
         """
         if include_meta:
-            return self.memory_store
+            return list(self.memory_store)
         # Strip out keys starting with "_" for external return
         sanitized = []
         for entry in self.memory_store:
@@ -4,6 +4,8 @@ utils.py — Utility functions for processing AIMon reprompting detector results
 This module provides helper functions for:
 - Extracting failed instructions across instruction adherence, groundedness, and toxicity detectors.
 - Calculating a residual error score (0–1) for evaluating LLM responses.
+- Scoring many detection results at once (`batch_*` functions), vectorized with NumPy when it is installed
+  (`pip install aimon[numpy]`).
 
 These utilities are primarily used by the RepromptingPipeline to:
 - Build telemetry.
@@ -16,10 +18,116 @@ Key conventions:
 """
 from typing import Callable, Type, Union, Tuple, Optional, List
 from functools import wraps
+import asyncio
+import contextlib
+import contextvars
 import logging
 import random
+import threading
 import time
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# fallback for `async_retry` when no logger is given
+_logger = logging.getLogger(__name__)
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call cannot complete before the re-prompting deadline."""
+
+def remaining_time(deadline: Optional[float]) -> Optional[float]:
+    """
+    Seconds left before a deadline.
+
+    :param deadline: Absolute deadline as a `time.monotonic()` value, or None for no deadline.
+    :return: Remaining seconds, or None if there is no deadline.
+    :raises DeadlineExceeded: If the deadline has already passed.
+    """
+    if deadline is None:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded("Deadline exceeded")
+    return remaining
+
+def call_with_deadline(func: Callable, deadline: Optional[float], *args, **kwargs):
+    """
+    Call `func` and wait for it at most until `deadline`.
+
+    The call runs in a daemon thread so that the caller can return as soon as the deadline
+    expires. Python threads cannot be interrupted, so a call that overruns keeps running in
+    the background and its result is discarded.
+
+    :param func: Blocking callable.
+    :param deadline: Absolute deadline as a `time.monotonic()` value, or None to call `func` directly.
+    :raises DeadlineExceeded: If the deadline expires before `func` returns.
+    """
+    timeout = remaining_time(deadline)
+    if timeout is None:
+        return func(*args, **kwargs)
+    outcome = {}
+    # run in the caller's context, so that e.g. tracing spans started by `func` join the caller's trace
+    context = contextvars.copy_context()
+
+    def target():
+        try:
+            outcome["result"] = context.run(func, *args, **kwargs)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise DeadlineExceeded(f"Call to {getattr(func, '__name__', func)} did not finish before the deadline")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+@contextlib.contextmanager
+def hold_slot(slots, deadline: Optional[float]):
+    """
+    Hold one of `slots` while a call runs, waiting for a free slot at most until `deadline`.
+
+    Enter it inside the function given to `call_with_deadline`: the slot then belongs to the
+    worker thread and is only released when the call really finishes, so calls abandoned at
+    the deadline still count against the limit. A worker still waiting for a slot when the
+    deadline expires gives up without making the call.
+
+    :param slots: A `threading.BoundedSemaphore`, or any object with the same `acquire(timeout=...)` and `release()`.
+    :param deadline: Absolute deadline as a `time.monotonic()` value, or None to wait as long as needed.
+    :raises DeadlineExceeded: If no slot is free before the deadline.
+    """
+    if not slots.acquire(timeout=remaining_time(deadline)):
+        raise DeadlineExceeded("No free slot before the deadline")
+    try:
+        yield
+    finally:
+        slots.release()
+
+async def await_with_deadline(awaitable, deadline: Optional[float]):
+    """
+    Async counterpart of `call_with_deadline`: the awaitable is cancelled if the deadline expires.
+
+    :param awaitable: Coroutine or future to await.
+    :param deadline: Absolute deadline as a `time.monotonic()` value, or None for no deadline.
+    :raises DeadlineExceeded: If the deadline expires before the awaitable completes.
+    """
+    try:
+        timeout = remaining_time(deadline)
+    except DeadlineExceeded:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise
+    if timeout is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("Call did not finish before the deadline") from None
+
 def retry(
         exception_to_check: Union[Type[BaseException], Tuple[Type[BaseException], ...]],
         tries: int = 5,
@@ -28,7 +136,9 @@ def retry(
         logger: Optional[logging.Logger] = None,
         log_level: int = logging.WARNING,
         re_raise: bool = True,
-        jitter: float = 0.1
+        jitter: float = 0.1,
+        deadline: Optional[float] = None,
+        policy=None
 ) -> Callable:
     """
     Retry calling the decorated function using an exponential backoff.
@@ -40,22 +150,35 @@ def retry(
     :param log_level: Logging level.
     :param re_raise: Whether to re-raise the exception after the last retry.
     :param jitter: The maximum jitter to apply to the delay as a fraction of the delay.
+    :param deadline: Absolute `time.monotonic()` deadline. No retry is attempted if the backoff
+        sleep would end after it; the last exception is handled as on the last try.
+    :param policy: Optional `aimon.RetryPolicy`. If given, it decides the sleeps (instead of `delay`,
+        `backoff` and `jitter`) and may refuse a retry, e.g. when its shared retry budget is exhausted.
     """
 
     def deco_retry(func: Callable) -> Callable:
         @wraps(func)
         def f_retry(*args, **kwargs):
             remaining_tries, current_delay = tries, delay
+            retry_state = policy.start(deadline) if policy is not None else None
             while remaining_tries > 1:
                 try:
                     return func(*args, **kwargs)
                 except exception_to_check as e:
+                    if retry_state is not None:
+                        sleep_time = current_delay = retry_state.next_delay()
+                        if sleep_time is None:
+                            return _give_up(e, tries - remaining_tries + 1, logger, log_level, re_raise, "Retry policy refused a retry")
+                    else:
+                        sleep_time = current_delay * (1 + jitter * (2 * random.random() - 1))
+                        if deadline is not None and time.monotonic() + sleep_time >= deadline:
+                            return _give_up(e, tries - remaining_tries + 1, logger, log_level, re_raise)
                     msg = f"{e}, Retrying in {current_delay} seconds..."
                     if logger:
                         logger.log(log_level, msg)
                     else:
                         print(msg)
-                    time.sleep(current_delay * (1 + jitter * (2 * random.random() - 1)))
+                    time.sleep(sleep_time)
                     remaining_tries -= 1
                     current_delay *= backoff
             try:
@@ -71,6 +194,68 @@ def retry(
         return f_retry
     return deco_retry
 
+def async_retry(
+        exception_to_check: Union[Type[BaseException], Tuple[Type[BaseException], ...]],
+        tries: int = 5,
+        delay: int = 3,
+        backoff: int = 2,
+        logger: Optional[logging.Logger] = None,
+        log_level: int = logging.WARNING,
+        re_raise: bool = True,
+        jitter: float = 0.1,
+        deadline: Optional[float] = None,
+        policy=None
+) -> Callable:
+    """
+    Async counterpart of `retry` for coroutine functions. Backoff sleeps use
+    `asyncio.sleep`, so waiting for a retry never blocks the event loop.
+    Parameters are the same as for `retry`, except that messages go to this
+    module's logger when no `logger` is given.
+    """
+    logger = logger or _logger
+
+    def deco_retry(func: Callable) -> Callable:
+        @wraps(func)
+        async def f_retry(*args, **kwargs):
+            remaining_tries, current_delay = tries, delay
+            retry_state = policy.start(deadline) if policy is not None else None
+            while remaining_tries > 1:
+                try:
+                    return await func(*args, **kwargs)
+                except exception_to_check as e:
+                    if retry_state is not None:
+                        sleep_time = current_delay = retry_state.next_delay()
+                        if sleep_time is None:
+                            return _give_up(e, tries - remaining_tries + 1, logger, log_level, re_raise, "Retry policy refused a retry")
+                    else:
+                        sleep_time = current_delay * (1 + jitter * (2 * random.random() - 1))
+                        if deadline is not None and time.monotonic() + sleep_time >= deadline:
+                            return _give_up(e, tries - remaining_tries + 1, logger, log_level, re_raise)
+                    msg = f"{e}, Retrying in {current_delay} seconds..."
+                    logger.log(log_level, msg)
+                    await asyncio.sleep(sleep_time)
+                    remaining_tries -= 1
+                    current_delay *= backoff
+            try:
+                return await func(*args, **kwargs)
+            except exception_to_check as e:
+                msg = f"Failed after {tries} tries. {e}"
+                logger.log(log_level, msg)
+                if re_raise:
+                    raise
+        return f_retry
+    return deco_retry
+
+def _give_up(error, attempts, logger, log_level, re_raise, reason="Deadline reached"):
+    """Log that retrying stopped early, and re-raise the last error if requested."""
+    msg = f"{reason} after {attempts} tries, not retrying. {error}"
+    if logger:
+        logger.log(log_level, msg)
+    else:
+        print(msg)
+    if re_raise:
+        raise error
+
 # toxicity threshold for AIMon detection; Follow probabilities below this are considered failures (lower score = more toxic)
 TOXICITY_THRESHOLD = 0.5
 
@@ -244,4 +429,168 @@ def penalized_average(probs: List[float]) -> float:
         else:
             penalty = (1 - p) * 2  # heavier penalty
         penalties.append(penalty)
-    return sum(penalties) / len(penalties)
\ No newline at end of file
+    return sum(penalties) / len(penalties)
+
+# Batch scoring of many detection results, e.g. for offline analysis of stored results.
+# Follow probabilities and labels of all results are flattened once into arrays tagged with
+# the index of the result they belong to; the scores are then computed over whole arrays,
+# with NumPy if it is installed and with plain Python otherwise. Counts and flags match the
+# scalar functions above exactly. Without NumPy, averages do too; with NumPy each owner's
+# penalties are added in order, so on Python 3.12+ (whose `sum` compensates rounding errors)
+# an average can differ from `penalized_average` in the last bit.
+
+class FlatDetectionResults:
+    """
+    Follow probabilities and labels of a list of detection results, flattened once.
+
+    Attributes:
+        size (int): Number of detection results.
+        probs (list[float]): Groundedness, instruction adherence and toxicity follow probabilities
+            (the inputs of `get_residual_error_score`), result by result.
+        prob_owners (list[int]): Index of the result each entry of `probs` belongs to.
+        missing_probs (list[int]): Index of the result of each of those instructions without a follow probability.
+        label_failures (list[int]): Index of the result of each failed (label False) groundedness
+            or instruction adherence instruction.
+        toxicity_probs (list[float]): Toxicity follow probabilities (missing ones count as 0.0).
+        toxicity_owners (list[int]): Index of the result each entry of `toxicity_probs` belongs to.
+    """
+    def __init__(self, results):
+        self.size = 0
+        self.probs, self.prob_owners, self.missing_probs = [], [], []
+        self.label_failures = []
+        self.toxicity_probs, self.toxicity_owners = [], []
+        for index, result in enumerate(results):
+            self.size += 1
+            detect_response = result.detect_response
+            for source in ("groundedness", "instruction_adherence", "toxicity"):
+                for item in getattr(detect_response, source, {}).get("instructions_list", []):
+                    if "follow_probability" in item:
+                        self.probs.append(item["follow_probability"])
+                        self.prob_owners.append(index)
+                    else:
+                        self.missing_probs.append(index)
+            for source in ("instruction_adherence", "groundedness"):
+                for inst in getattr(detect_response, source).get("instructions_list", []):
+                    if not inst.get("label", True):
+                        self.label_failures.append(index)
+            for inst in detect_response.toxicity.get("instructions_list", []):
+                self.toxicity_probs.append(inst.get("follow_probability", 0.0))
+                self.toxicity_owners.append(index)
+
+def flatten_detection_results(results) -> FlatDetectionResults:
+    """
+    Flatten detection results for the batch scoring functions. Flatten once and pass the
+    result to several batch functions to avoid walking the results again.
+
+    Args:
+        results (Iterable): AIMon detection results.
+
+    Returns:
+        FlatDetectionResults: Flattened probabilities and labels.
+    """
+    return FlatDetectionResults(results)
+
+def _as_flat(results) -> FlatDetectionResults:
+    if isinstance(results, FlatDetectionResults):
+        return results
+    return FlatDetectionResults(results)
+
+def _toxicity_failure_counts(flat: FlatDetectionResults) -> List[int]:
+    if np is not None:
+        probs = np.asarray(flat.toxicity_probs, dtype=float)
+        owners = np.asarray(flat.toxicity_owners, dtype=np.intp)
+        return np.bincount(owners[probs < TOXICITY_THRESHOLD], minlength=flat.size).tolist()
+    counts = [0] * flat.size
+    for prob, owner in zip(flat.toxicity_probs, flat.toxicity_owners):
+        if prob < TOXICITY_THRESHOLD:
+            counts[owner] += 1
+    return counts
+
+def batch_toxicity_check(results) -> List[bool]:
+    """
+    Batch version of `toxicity_check`.
+
+    Args:
+        results (Iterable or FlatDetectionResults): AIMon detection results.
+
+    Returns:
+        List[bool]: One toxicity flag per result.
+    """
+    return [count > 0 for count in _toxicity_failure_counts(_as_flat(results))]
+
+def batch_failed_instructions_count(results) -> List[int]:
+    """
+    Batch version of `get_failed_instructions_count`.
+
+    Args:
+        results (Iterable or FlatDetectionResults): AIMon detection results.
+
+    Returns:
+        List[int]: Number of failed instructions per result.
+    """
+    flat = _as_flat(results)
+    toxicity_counts = _toxicity_failure_counts(flat)
+    if np is not None:
+        label_counts = np.bincount(np.asarray(flat.label_failures, dtype=np.intp), minlength=flat.size)
+        return (label_counts + np.asarray(toxicity_counts, dtype=np.intp)).tolist()
+    counts = toxicity_counts
+    for owner in flat.label_failures:
+        counts[owner] += 1
+    return counts
+
+def batch_penalized_average(prob_lists) -> List[float]:
+    """
+    Batch version of `penalized_average`.
+
+    Args:
+        prob_lists (Iterable[List[float]]): Lists of follow probabilities.
+
+    Returns:
+        List[float]: Penalized average per list (-1 for an empty list).
+    """
+    prob_lists = list(prob_lists)
+    probs, owners = [], []
+    for index, group in enumerate(prob_lists):
+        probs.extend(group)
+        owners.extend([index] * len(group))
+    averages = _penalized_averages(probs, owners, len(prob_lists))
+    return [-1 if average is None else average for average in averages]
+
+def _penalized_averages(probs, owners, size) -> List[Optional[float]]:
+    """Penalized average of the probabilities of each owner, or None for owners without any."""
+    if size == 0:
+        return []
+    if np is not None:
+        values = np.asarray(probs, dtype=float)
+        indexes = np.asarray(owners, dtype=np.intp)
+        penalties = np.where(values >= 0.5, 0.0, (1 - values) * 2)
+        counts = np.bincount(indexes, minlength=size)
+        totals = np.bincount(indexes, weights=penalties, minlength=size)
+        averages = totals / np.maximum(counts, 1)
+        return [average if count else None for average, count in zip(averages.tolist(), counts.tolist())]
+    groups = [[] for _ in range(size)]
+    for prob, owner in zip(probs, owners):
+        groups[owner].append(prob)
+    return [penalized_average(group) if group else None for group in groups]
+
+def batch_residual_error_score(results) -> List[float]:
+    """
+    Batch version of `get_residual_error_score`.
+
+    Args:
+        results (Iterable or FlatDetectionResults): AIMon detection results.
+
+    Returns:
+        List[float]: Residual error score (0–1, rounded to 2 decimals) per result.
+
+    Raises:
+        KeyError: If an instruction has no follow probability, like `get_residual_error_score`.
+    """
+    flat = _as_flat(results)
+    if flat.missing_probs:
+        raise KeyError(f"follow_probability missing in detection result {flat.missing_probs[0]}")
+    scores = []
+    for average in _penalized_averages(flat.probs, flat.prob_owners, flat.size):
+        score = 0.0 if average is None else min(1.0, max(0.0, average))
+        scores.append(round(score, 2))
+    return scores
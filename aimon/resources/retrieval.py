@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import List
+from typing import List, cast
 
 import httpx
 
@@ -10,6 +10,7 @@ from ..types import retrieval_rerank_params
 from .._types import NOT_GIVEN, Body, Query, Headers, NotGiven
 from .._utils import maybe_transform, async_maybe_transform
 from .._compat import cached_property
+from .._constants import RAW_RESPONSE_HEADER
 from .._resource import SyncAPIResource, AsyncAPIResource
 from .._response import (
     to_raw_response_wrapper,
@@ -63,6 +64,9 @@ class RetrievalResource(SyncAPIResource):
         few-shot examples to fine-tune the model for better domain-specific
         understanding.
 
+        When the client was created with a `rerank_cache`, cached scores are reused and
+        only the uncached (query, document) pairs are sent to the API.
+
         Args:
           context_docs: List of context documents.
 
@@ -80,7 +84,21 @@ class RetrievalResource(SyncAPIResource):
 
           timeout: Override the client-level default timeout for this request, in seconds
         """
-        return self._post(
+        cache = self._client.rerank_cache
+        if cache is None or (extra_headers and RAW_RESPONSE_HEADER in extra_headers):
+            plan = None
+        else:
+            plan = cache.plan(
+                queries=queries, context_docs=context_docs, task_definition=task_definition, model_type=model_type
+            )
+            if plan.is_complete:
+                return cast(RetrievalRerankResponse, plan.scores)
+
+            # only send the (query, document) pairs that are not already cached
+            queries = [queries[i] for i in plan.query_indices]
+            context_docs = [context_docs[i] for i in plan.doc_indices]
+
+        response = self._post(
             "/v1/rerank-icl",
             body=maybe_transform(
                 {
@@ -96,6 +114,9 @@ class RetrievalResource(SyncAPIResource):
             ),
             cast_to=RetrievalRerankResponse,
         )
+        if plan is None:
+            return response
+        return plan.fill(response)
 
 
 class AsyncRetrievalResource(AsyncAPIResource):
@@ -138,6 +159,9 @@ class AsyncRetrievalResource(AsyncAPIResource):
         few-shot examples to fine-tune the model for better domain-specific
         understanding.
 
+        When the client was created with a `rerank_cache`, cached scores are reused and
+        only the uncached (query, document) pairs are sent to the API.
+
         Args:
           context_docs: List of context documents.
 
@@ -155,7 +179,21 @@ class AsyncRetrievalResource(AsyncAPIResource):
 
           timeout: Override the client-level default timeout for this request, in seconds
         """
-        return await self._post(
+        cache = self._client.rerank_cache
+        if cache is None or (extra_headers and RAW_RESPONSE_HEADER in extra_headers):
+            plan = None
+        else:
+            plan = cache.plan(
+                queries=queries, context_docs=context_docs, task_definition=task_definition, model_type=model_type
+            )
+            if plan.is_complete:
+                return cast(RetrievalRerankResponse, plan.scores)
+
+            # only send the (query, document) pairs that are not already cached
+            queries = [queries[i] for i in plan.query_indices]
+            context_docs = [context_docs[i] for i in plan.doc_indices]
+
+        response = await self._post(
             "/v1/rerank-icl",
             body=await async_maybe_transform(
                 {
@@ -171,6 +209,9 @@ class AsyncRetrievalResource(AsyncAPIResource):
             ),
             cast_to=RetrievalRerankResponse,
         )
+        if plan is None:
+            return response
+        return plan.fill(response)
 
 
 class RetrievalResourceWithRawResponse:
@@ -0,0 +1,66 @@
+"""Per-call CPU time of building typed responses from decoded JSON with `construct_type`.
+
+Uses payloads shaped like real list responses: dataset records and metrics (`List[object]`),
+a batch of detect results and a page of datasets. No network access is needed.
+
+    PYTHONPATH=. python benchmarks/construct_type.py [--items 1000] [--calls 50]
+"""
+from __future__ import annotations
+
+import time
+import argparse
+from typing import Any, List, Callable
+
+from aimon._models import construct_type
+from aimon.types import Dataset, MetricListResponse, InferenceDetectResponse
+from aimon.types.datasets import RecordListResponse
+
+
+def make_payloads(items: int) -> dict[str, tuple[object, Any]]:
+    record = {"prompt": "What is the capital of France?", "context_docs": ["Paris is the capital of France."] * 3, "output": "Paris."}
+    metric = {"application_id": "app_1", "metric": "hallucination", "score": 0.12, "timestamp": "2024-05-01T12:00:00Z"}
+    detection = {
+        "result": {
+            "hallucination": {"score": 0.1, "sentences": [{"text": "Paris.", "score": 0.1}] * 5},
+            "instruction_adherence": {"results": [{"instruction": "Be brief.", "adherence": True}] * 3},
+        }
+    }
+    dataset = {
+        "name": "qa",
+        "description": "QA pairs",
+        "id": "ds_1",
+        "company_id": "co_1",
+        "creation_time": "2024-05-01T12:00:00Z",
+        "last_updated_time": "2024-05-02T12:00:00Z",
+        "s3_location": "s3://bucket/qa.csv",
+        "sha": "abc123",
+        "user_id": "user_1",
+    }
+    return {
+        "records": ([record] * items, RecordListResponse),
+        "metrics": ([metric] * items, MetricListResponse),
+        "detect": ([detection] * items, InferenceDetectResponse),
+        "datasets": ([dataset] * items, List[Dataset]),
+    }
+
+
+def bench(fn: Callable[[], object], calls: int) -> float:
+    start = time.process_time()
+    for _ in range(calls):
+        fn()
+    return (time.process_time() - start) / calls * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+
+    for name, (value, type_) in make_payloads(args.items).items():
+        ms = bench(lambda: construct_type(value=value, type_=type_), args.calls)
+        print(f"{name:>8}: {ms:.3f} ms CPU per {args.items}-item response")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Throughput and latency of concurrent requests over HTTP/1.1 versus HTTP/2.
+
+Starts a local stand-in server (hypercorn, serving cleartext HTTP/2 with prior knowledge) that
+answers every request after a fixed delay, then fires concurrent detect-sized POSTs through an
+`AsyncClient` with and without `http2=True`. Requires the optional `h2` and `hypercorn` packages:
+
+    pip install 'httpx[http2]' hypercorn
+    PYTHONPATH=. python benchmarks/http2.py [--requests 2000] [--concurrency 200] [--delay-ms 20]
+"""
+from __future__ import annotations
+
+import time
+import socket
+import asyncio
+import argparse
+import statistics
+
+import httpx
+
+from aimon import AsyncClient, DefaultAsyncHttpxClient
+from aimon._constants import DEFAULT_HTTP2_CONNECTION_LIMITS
+
+BODY = [{"context": "Paris is the capital of France. " * 200, "generated_text": "Paris.", "config": {}}]
+
+
+def make_app(delay: float):
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        while (await receive()).get("more_body"):
+            pass
+        await asyncio.sleep(delay)
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": b'[{"groundedness": {"score": 0.9}}]'})
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run(base_url: str, http2: bool, requests: int, concurrency: int) -> tuple[float, list[float]]:
+    if http2:
+        # the stand-in serves cleartext HTTP/2 only, so skip the HTTP/1.1 upgrade dance
+        http_client = DefaultAsyncHttpxClient(
+            base_url=base_url, http1=False, http2=True, limits=DEFAULT_HTTP2_CONNECTION_LIMITS
+        )
+    else:
+        http_client = DefaultAsyncHttpxClient(base_url=base_url)
+    client = AsyncClient(auth_header="Bearer bench", base_url=base_url, http_client=http_client, max_retries=0)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await client.post("/v2/detect", cast_to=object, body=BODY)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    await client.close()
+    return elapsed, latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--delay-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    try:
+        import h2  # noqa: F401  # type: ignore[import-not-found]
+        from hypercorn.config import Config  # type: ignore[import-not-found]
+        from hypercorn.asyncio import serve  # type: ignore[import-not-found]
+    except ImportError:
+        raise SystemExit("this benchmark needs the `h2` and `hypercorn` packages: pip install 'httpx[http2]' hypercorn")
+
+    port = free_port()
+    config = Config()
+    config.bind = [f"127.0.0.1:{port}"]
+    config.h2_max_concurrent_streams = 1000
+    config.accesslog = None
+    shutdown = asyncio.Event()
+    server = asyncio.ensure_future(serve(make_app(args.delay_ms / 1000), config, shutdown_trigger=shutdown.wait))
+    await asyncio.sleep(0.5)
+
+    base_url = f"http://127.0.0.1:{port}"
+    for label, http2 in (("HTTP/1.1", False), ("HTTP/2", True)):
+        elapsed, latencies = await run(base_url, http2, args.requests, args.concurrency)
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(
+            f"{label:>8}: {args.requests / elapsed:8.0f} req/s"
+            f"  p50 {quantiles[49] * 1000:6.1f} ms  p99 {quantiles[98] * 1000:6.1f} ms"
+        )
+
+    shutdown.set()
+    await server
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+"""Per-call CPU time of JSON request encoding and response decoding with each installed codec.
+
+Builds a detect request carrying a large context and parses a detect-sized response through
+the client, once per codec. No network access is needed.
+
+    PYTHONPATH=. python benchmarks/json_codec.py [--context-kb 100] [--calls 200]
+"""
+from __future__ import annotations
+
+import time
+import argparse
+
+import httpx
+
+from aimon import Client
+from aimon._json import MsgspecCodec, OrjsonCodec, StdlibJSONCodec
+from aimon._models import FinalRequestOptions
+
+
+def make_payload(context_kb: int) -> list:
+    sentence = "Paris is the capital and most populous city of France. "
+    context = sentence * (context_kb * 1024 // len(sentence))
+    return [
+        {
+            "context": context,
+            "generated_text": "The capital of France is Paris.",
+            "user_query": "What is the capital of France?",
+            "instructions": ["Answer in one sentence.", "Mention the country."],
+            "config": {"groundedness": {"detector_name": "default"}, "instruction_adherence": {"detector_name": "default"}},
+        }
+    ]
+
+
+def make_response(context_kb: int) -> bytes:
+    item = {
+        "groundedness": {"score": 0.9, "instructions_list": [{"instruction": "x", "label": True, "follow_probability": 0.9, "explanation": "e" * 200}] * 20},
+        "instruction_adherence": {"score": 0.8, "instructions_list": [{"instruction": "y", "label": False, "follow_probability": 0.2, "explanation": "f" * 200}] * 20},
+        "context": "c" * (context_kb * 1024),
+    }
+    return StdlibJSONCodec().dumps([item])
+
+
+def bench(codec, payload, response_body: bytes, calls: int) -> float:
+    client = Client(auth_header="Bearer bench", base_url="http://aimon.test", json_codec=codec)
+    options = FinalRequestOptions.construct(method="post", url="/v2/detect", json_data=payload)
+    response = httpx.Response(200, content=response_body, headers={"content-type": "application/json"})
+    start = time.process_time()
+    for _ in range(calls):
+        client._build_request(options)
+        client.json_codec.loads(response.content)
+    return (time.process_time() - start) / calls * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--context-kb", type=int, default=100)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    payload = make_payload(args.context_kb)
+    response_body = make_response(args.context_kb)
+    baseline = None
+    for cls in (StdlibJSONCodec, OrjsonCodec, MsgspecCodec):
+        try:
+            codec = cls()
+        except ImportError:
+            print(f"{cls.name:>8}: not installed")
+            continue
+        ms = bench(codec, payload, response_body, args.calls)
+        baseline = baseline or ms
+        print(f"{codec.name:>8}: {ms:.3f} ms CPU per call ({baseline / ms:.1f}x vs json)")
+
+
+if __name__ == "__main__":
+    main()
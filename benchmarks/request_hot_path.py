@@ -0,0 +1,63 @@
+"""Client-side CPU time and memory churn per request, excluding the network.
+
+Sends detect calls through a `Client` backed by an in-memory transport that returns a
+canned response, so only the SDK's own request path (options, headers, URL, body encoding,
+retry loop and response parsing) and httpx's request building are measured.
+
+    PYTHONPATH=. python benchmarks/request_hot_path.py [--requests 5000]
+"""
+from __future__ import annotations
+
+import time
+import argparse
+import tracemalloc
+
+import httpx
+
+from aimon import Client
+
+BODY = [{"context": "Paris is the capital of France.", "generated_text": "Paris.", "config": {"hallucination": {"detector_name": "default"}}}]
+RESPONSE = b'[{"result": {"hallucination": {"score": 0.1}}}]'
+
+
+def make_client() -> Client:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=RESPONSE, headers={"content-type": "application/json"})
+
+    return Client(
+        auth_header="Bearer bench",
+        base_url="http://aimon.test",
+        http_client=httpx.Client(transport=httpx.MockTransport(handler)),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    client = make_client()
+    for _ in range(200):
+        client.inference.detect(body=BODY)
+
+    start = time.process_time()
+    for _ in range(args.requests):
+        client.inference.detect(body=BODY)
+    cpu_us = (time.process_time() - start) / args.requests * 1e6
+
+    # allocations are sampled on fewer requests as tracing slows them down considerably
+    samples = min(args.requests, 500)
+    tracemalloc.start()
+    allocated = 0
+    for _ in range(samples):
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        client.inference.detect(body=BODY)
+        allocated += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    print(f"{cpu_us:.1f} us CPU per request, {allocated / samples / 1024:.1f} KiB peak allocations per request")
+
+
+if __name__ == "__main__":
+    main()
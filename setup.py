@@ -23,6 +23,12 @@ setup(
         "sniffio~=1.3.1",
         "typing-extensions>=4.14.1"
     ],
+    extras_require={
+        # `Client(http2=True)`
+        "http2": ["h2>=3,<5"],
+        # vectorized `batch_*` scoring in `aimon.reprompting_api.utils`
+        "numpy": ["numpy>=1.21"],
+    },
     author='AIMon',
     author_email='info@aimon.ai',
     description='The AIMon SDK that is used to interact with the AIMon API and the product.',
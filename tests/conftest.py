@@ -0,0 +1,76 @@
+import json
+
+import httpx
+import pytest
+
+from aimon import Client, AsyncClient
+
+
+class FakeDetectServer:
+    """
+    Stand-in for the AIMon detect endpoint used by offline reprompting tests.
+
+    An instruction is reported as followed only if its text appears in the generated
+    text, so a mocked LLM can "fix" its response by echoing the instructions back.
+    Groundedness and toxicity always pass. Rerank requests score a document by the number
+    of query words it contains.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.rerank_requests = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        if request.url.path.endswith("/rerank-icl"):
+            self.rerank_requests.append(body)
+            return httpx.Response(200, json=self.rerank(body))
+        self.requests.extend(body)
+        return httpx.Response(200, json=[self.judge(item) for item in body])
+
+    def rerank(self, body):
+        return [
+            [float(sum(word in doc.lower() for word in query.lower().split())) for doc in body["context_docs"]]
+            for query in body["queries"]
+        ]
+
+    def judge(self, item):
+        generated_text = item.get("generated_text", "")
+        instructions = [
+            {
+                "instruction": instruction,
+                "label": instruction in generated_text,
+                "follow_probability": 0.9 if instruction in generated_text else 0.1,
+                "explanation": "ok" if instruction in generated_text else f"missing '{instruction}'",
+            }
+            for instruction in item.get("instructions") or []
+        ]
+        result = {"toxicity": {"score": 0.0, "instructions_list": []}}
+        config = item.get("config", {})
+        if "instruction_adherence" in config:
+            result["instruction_adherence"] = {"score": 1.0, "instructions_list": instructions}
+        if "groundedness" in config:
+            result["groundedness"] = {"score": 0.0, "instructions_list": []}
+        return result
+
+    def install(self, detect):
+        """Point a `Detect` decorator's sync and async clients at this server."""
+        transport = httpx.MockTransport(self.handler)
+        detect.client = Client(
+            auth_header="Bearer test",
+            base_url="http://aimon.test",
+            http_client=httpx.Client(transport=transport),
+            retry_policy=detect.retry_policy,
+        )
+        detect._async_client = AsyncClient(
+            auth_header="Bearer test",
+            base_url="http://aimon.test",
+            http_client=httpx.AsyncClient(transport=transport),
+            retry_policy=detect.retry_policy,
+        )
+
+
+@pytest.fixture
+def fake_detect():
+    return FakeDetectServer()
+
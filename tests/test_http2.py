@@ -0,0 +1,74 @@
+import asyncio
+import importlib.util
+
+import httpx
+import pytest
+
+from aimon import (
+    DEFAULT_CONNECTION_LIMITS,
+    DEFAULT_HTTP2_CONNECTION_LIMITS,
+    AsyncClient,
+    Client,
+    DefaultAsyncHttpxClient,
+    DefaultHttpxClient,
+)
+
+HAS_H2 = importlib.util.find_spec("h2") is not None
+
+
+def pool_limits(http_client):
+    pool = http_client._transport._pool
+    return pool._max_connections, pool._max_keepalive_connections, pool._http2
+
+
+class TestHTTP2:
+    def test_disabled_by_default(self):
+        client = Client(auth_header="Bearer test", base_url="http://aimon.test")
+        assert client.http2 is False
+        assert pool_limits(client._client) == (
+            DEFAULT_CONNECTION_LIMITS.max_connections,
+            DEFAULT_CONNECTION_LIMITS.max_keepalive_connections,
+            False,
+        )
+
+    def test_http2_limits_keep_the_http1_connection_limit(self):
+        # servers and proxies may negotiate HTTP/1.1, which needs as many connections as before
+        assert DEFAULT_HTTP2_CONNECTION_LIMITS.max_connections == DEFAULT_CONNECTION_LIMITS.max_connections
+
+    @pytest.mark.skipif(HAS_H2, reason="h2 is installed")
+    def test_requires_h2(self):
+        with pytest.raises(ImportError, match="h2"):
+            Client(auth_header="Bearer test", base_url="http://aimon.test", http2=True)
+
+    @pytest.mark.skipif(not HAS_H2, reason="h2 is not installed")
+    def test_default_client_uses_http2_limits(self):
+        client = Client(auth_header="Bearer test", base_url="http://aimon.test", http2=True)
+        assert client.http2 is True
+        assert pool_limits(client._client) == (
+            DEFAULT_HTTP2_CONNECTION_LIMITS.max_connections,
+            DEFAULT_HTTP2_CONNECTION_LIMITS.max_keepalive_connections,
+            True,
+        )
+        assert client.copy(max_retries=0).http2 is True
+
+        async_client = AsyncClient(auth_header="Bearer test", base_url="http://aimon.test", http2=True)
+        assert pool_limits(async_client._client)[2] is True
+        asyncio.run(async_client.close())
+
+    @pytest.mark.skipif(not HAS_H2, reason="h2 is not installed")
+    def test_default_httpx_clients_use_http2_limits(self):
+        for cls in (DefaultHttpxClient, DefaultAsyncHttpxClient):
+            http_client = cls(http2=True)
+            assert pool_limits(http_client)[:2] == (
+                DEFAULT_HTTP2_CONNECTION_LIMITS.max_connections,
+                DEFAULT_HTTP2_CONNECTION_LIMITS.max_keepalive_connections,
+            )
+            custom = cls(http2=True, limits=httpx.Limits(max_connections=2))
+            assert pool_limits(custom)[0] == 2
+
+    def test_custom_http_client_takes_precedence(self):
+        http_client = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, json={})))
+        client = Client(auth_header="Bearer test", base_url="http://aimon.test", http_client=http_client, http2=True)
+        assert client._client is http_client
+        assert client.http2 is True
+        assert client.copy().http2 is True
@@ -0,0 +1,419 @@
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from aimon import Client, HTTPCache, AsyncClient, RequestHooks, MetricsRegistry, APIConnectionError, AdaptiveRateLimiter
+from aimon._coalescing import SingleFlight, AsyncSingleFlight
+
+
+def mock_client(handler, cls=Client, http_cls=httpx.Client, **kwargs):
+    client = cls(
+        auth_header="Bearer test",
+        base_url="http://aimon.test",
+        http_client=http_cls(transport=httpx.MockTransport(handler)),
+        **kwargs,
+    )
+    client._calculate_retry_timeout = lambda *args, **kwargs: 0
+    return client
+
+
+class SlowHandler:
+    def __init__(self, delay=0.2, **response):
+        self.delay = delay
+        self.response = response or {"json": {"name": "app"}}
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        with self._lock:
+            self.requests.append(request)
+        time.sleep(self.delay)
+        return httpx.Response(200, **self.response)
+
+
+class TestCoalescing:
+    def test_concurrent_identical_gets_are_sent_once(self):
+        handler = SlowHandler()
+        client = mock_client(handler)
+
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda _: client.get("/v1/application", cast_to=object), range(8)))
+
+        assert results == [{"name": "app"}] * 8
+        assert len(handler.requests) == 1
+
+    def test_different_requests_and_writes_are_not_coalesced(self):
+        handler = SlowHandler(delay=0.1)
+        client = mock_client(handler)
+
+        calls = [
+            lambda: client.get("/v1/application", cast_to=object, options={"params": {"name": "a"}}),
+            lambda: client.get("/v1/application", cast_to=object, options={"params": {"name": "b"}}),
+            lambda: client.get("/v1/application", cast_to=object, options={"headers": {"Authorization": "Bearer other"}}),
+            lambda: client.post("/v1/application", cast_to=object, body={}),
+            lambda: client.post("/v1/application", cast_to=object, body={}),
+        ]
+        with ThreadPoolExecutor(len(calls)) as pool:
+            list(pool.map(lambda call: call(), calls))
+
+        assert len(handler.requests) == len(calls)
+
+    def test_disabled(self):
+        handler = SlowHandler(delay=0.1)
+        client = mock_client(handler, coalesce_requests=False)
+
+        with ThreadPoolExecutor(3) as pool:
+            list(pool.map(lambda _: client.get("/v1/application", cast_to=object), range(3)))
+
+        assert len(handler.requests) == 3
+        assert client.copy().coalesce_requests is False
+
+    def test_errors_are_shared_and_retried_by_each_caller(self):
+        attempts = []
+
+        def handler(request):
+            attempts.append(request)
+            time.sleep(0.2)
+            raise httpx.ConnectError("refused", request=request)
+
+        client = mock_client(handler, max_retries=0)
+
+        def call(_):
+            with pytest.raises(APIConnectionError):
+                client.get("/v1/application", cast_to=object)
+
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(call, range(4)))
+
+        assert len(attempts) == 1
+
+    def test_waiting_callers_get_their_own_exception(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        errors = []
+
+        def fail():
+            started.set()
+            time.sleep(0.2)
+            raise httpx.ConnectError("refused")
+
+        def call(_):
+            try:
+                flight.do("key", fail)
+            except httpx.ConnectError as exc:
+                errors.append(exc)
+
+        with ThreadPoolExecutor(4) as pool:
+            leader = pool.submit(call, None)
+            started.wait()
+            list(pool.map(call, range(3)))
+            leader.result()
+
+        original = next(error for error in errors if error.__cause__ is None)
+        copies = [error for error in errors if error is not original]
+        assert len(copies) == 3 and len({id(error) for error in copies}) == 3
+        assert all(type(error) is httpx.ConnectError and error.__cause__ is original for error in copies)
+
+    def test_async_waiting_tasks_get_their_own_exception(self):
+        flight = AsyncSingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.05)
+            raise httpx.ConnectError("refused")
+
+        async def main():
+            return await asyncio.gather(*[flight.do("key", fail) for _ in range(3)], return_exceptions=True)
+
+        original, *copies = asyncio.run(main())
+        assert all(type(error) is httpx.ConnectError and error.__cause__ is original for error in copies)
+        assert copies[0] is not copies[1]
+
+    def test_requests_with_other_timeouts_are_not_coalesced(self):
+        handler = SlowHandler(delay=0.1)
+        client = mock_client(handler)
+
+        with ThreadPoolExecutor(2) as pool:
+            list(pool.map(lambda timeout: client.get("/v1/application", cast_to=object, options={"timeout": timeout}), (1, 60)))
+
+        assert len(handler.requests) == 2
+
+    def test_only_the_sent_request_is_rate_limited(self):
+        limiter = AdaptiveRateLimiter(initial_rate=1000, burst=10)
+        reservations, successes = [], []
+        reserve, on_success = limiter.reserve, limiter.on_success
+        limiter.reserve = lambda key: reservations.append(key) or reserve(key)
+        limiter.on_success = lambda key: successes.append(key) or on_success(key)
+        client = mock_client(SlowHandler(), rate_limiter=limiter)
+
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(lambda _: client.get("/v1/application", cast_to=object), range(8)))
+
+        assert reservations == successes == ["GET /v1/application"]
+
+    def test_async_gather(self):
+        requests = []
+
+        async def handler(request):
+            requests.append(request)
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"name": "app"})
+
+        client = mock_client(handler, cls=AsyncClient, http_cls=httpx.AsyncClient)
+
+        async def main():
+            return await asyncio.gather(*[client.get("/v1/application", cast_to=object) for _ in range(5)])
+
+        assert asyncio.run(main()) == [{"name": "app"}] * 5
+        assert len(requests) == 1
+
+    def test_async_followers_rerun_a_cancelled_call(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return len(calls)
+
+        async def main():
+            leader = asyncio.ensure_future(flight.do("key", fn))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flight.do("key", fn))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower
+
+        assert asyncio.run(main()) == 2
+
+    def test_waiting_callers_give_up_after_their_timeout(self):
+        flight = SingleFlight()
+        started = threading.Event()
+
+        def slow():
+            started.set()
+            time.sleep(0.5)
+            return "leader"
+
+        with ThreadPoolExecutor(2) as pool:
+            leader = pool.submit(flight.do, "key", slow)
+            started.wait()
+            began = time.perf_counter()
+            assert flight.do("key", lambda: "follower", timeout=0.05) == "follower"
+            assert time.perf_counter() - began < 0.4
+            assert leader.result() == "leader"
+
+    def test_async_waiting_tasks_give_up_after_their_timeout(self):
+        flight = AsyncSingleFlight()
+
+        async def slow():
+            await asyncio.sleep(0.5)
+            return "leader"
+
+        async def fast():
+            return "follower"
+
+        async def main():
+            leader = asyncio.ensure_future(flight.do("key", slow))
+            await asyncio.sleep(0)
+            follower = await asyncio.wait_for(flight.do("key", fast, timeout=0.05), 0.4)
+            return follower, await leader
+
+        assert asyncio.run(main()) == ("follower", "leader")
+
+    def test_callers_send_their_own_request_once_their_timeouts_expire(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            if len(requests) == 1:
+                time.sleep(0.5)
+            return httpx.Response(200, json={"name": "app"})
+
+        # four timeouts of 0.02 seconds, so the second caller waits at most 0.08 seconds
+        client = mock_client(handler, timeout=0.02)
+        timeouts = {"timeout": httpx.Timeout(0.02).as_dict()}
+        assert client._coalescing_timeout(httpx.Request("GET", "/", extensions=timeouts)) == pytest.approx(0.08)
+        timeouts = {"timeout": httpx.Timeout(0.02, read=None).as_dict()}
+        assert client._coalescing_timeout(httpx.Request("GET", "/", extensions=timeouts)) is None
+
+        with ThreadPoolExecutor(2) as pool:
+            first = pool.submit(client.get, "/v1/application", cast_to=object)
+            while not requests:
+                time.sleep(0.01)
+            began = time.perf_counter()
+            assert client.get("/v1/application", cast_to=object) == {"name": "app"}
+            assert time.perf_counter() - began < 0.4
+            assert first.result() == {"name": "app"}
+
+        assert len(requests) == 2
+
+    def test_hooks_and_metrics_count_every_caller(self):
+        class Recorder(RequestHooks):
+            def __init__(self):
+                self.requests, self.timings = [], []
+
+            def on_request(self, request, *, retries_taken):
+                self.requests.append(request)
+
+            def on_response(self, response, *, timings, retries_taken):
+                self.timings.append(timings)
+
+        recorder, registry = Recorder(), MetricsRegistry()
+        handler = SlowHandler()
+        client = mock_client(handler, hooks=[recorder], metrics_registry=registry)
+
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(lambda _: client.get("/v1/application", cast_to=object), range(8)))
+
+        assert len(handler.requests) == 1
+        assert len(recorder.requests) == len(recorder.timings) == 8
+        assert sorted(timings.coalesced for timings in recorder.timings) == [False] + [True] * 7
+        snapshot = registry.snapshot()
+        endpoint = {"method": "GET", "endpoint": "/v1/application"}
+
+        def value(name, **labels):
+            (sample,) = [s for s in snapshot[f"aimon_{name}"]["samples"] if s["labels"] == {**endpoint, **labels}]
+            return sample["value"]
+
+        assert value("requests_total", status="200") == 8
+        assert value("coalesced_requests_total") == 7
+        assert value("response_bytes_total") == len(b'{"name":"app"}')
+
+    def test_single_flight_is_reusable(self):
+        flight = SingleFlight()
+        assert flight.do("key", lambda: 1) == 1
+        assert flight.do("key", lambda: 2) == 2
+
+
+class Server:
+    """Answers GETs with an ETag, honouring If-None-Match."""
+
+    def __init__(self, cache_control=None):
+        self.cache_control = cache_control
+        self.version = 1
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        if request.method != "GET":
+            self.version += 1
+            return httpx.Response(200, json={})
+        etag = f'"v{self.version}"'
+        headers = {"ETag": etag}
+        if self.cache_control:
+            headers["Cache-Control"] = self.cache_control
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers=headers)
+        return httpx.Response(200, json={"version": self.version}, headers=headers)
+
+
+class TestHTTPCache:
+    def test_fresh_responses_are_reused(self):
+        server = Server()
+        cache = HTTPCache(ttl=60)
+        client = mock_client(server, http_cache=cache)
+
+        assert client.get("/v1/application", cast_to=object) == {"version": 1}
+        assert client.get("/v1/application", cast_to=object) == {"version": 1}
+
+        assert len(server.requests) == 1
+        assert (cache.hits, cache.misses, len(cache)) == (1, 1, 1)
+
+    def test_stale_responses_are_revalidated(self):
+        server = Server()
+        cache = HTTPCache(ttl=0)
+        client = mock_client(server, http_cache=cache)
+
+        assert client.get("/v1/application", cast_to=object) == {"version": 1}
+        assert client.get("/v1/application", cast_to=object) == {"version": 1}
+        assert server.requests[1].headers["If-None-Match"] == '"v1"'
+        assert cache.revalidations == 1
+
+        server.version = 2
+        assert client.get("/v1/application", cast_to=object) == {"version": 2}
+        assert len(server.requests) == 3
+
+    def test_cache_control(self):
+        server = Server(cache_control="max-age=0")
+        client = mock_client(server, http_cache=HTTPCache(ttl=60))
+        client.get("/v1/application", cast_to=object)
+        client.get("/v1/application", cast_to=object)
+        assert "If-None-Match" in server.requests[1].headers
+
+        server = Server(cache_control="no-store")
+        cache = HTTPCache(ttl=60)
+        client = mock_client(server, http_cache=cache)
+        client.get("/v1/application", cast_to=object)
+        client.get("/v1/application", cast_to=object)
+        assert len(server.requests) == 2 and len(cache) == 0
+
+    def test_writes_invalidate_related_paths(self):
+        server = Server()
+        cache = HTTPCache(ttl=60)
+        client = mock_client(server, http_cache=cache)
+
+        client.get("/v1/application/app-1", cast_to=object)
+        client.get("/v1/model", cast_to=object)
+        client.post("/v1/application", cast_to=object, body={})
+
+        assert client.get("/v1/application/app-1", cast_to=object) == {"version": 2}
+        assert client.get("/v1/model", cast_to=object) == {"version": 1}
+        assert len(server.requests) == 4
+
+    def test_errors_are_not_cached(self):
+        statuses = iter([404, 200])
+        client = mock_client(lambda request: httpx.Response(next(statuses), json={}), http_cache=HTTPCache())
+
+        with pytest.raises(Exception):
+            client.get("/v1/application", cast_to=object)
+        assert client.get("/v1/application", cast_to=object) == {}
+
+    def test_lru_eviction(self):
+        cache = HTTPCache(maxsize=2)
+        client = mock_client(Server(), http_cache=cache)
+
+        for path in ("/v1/a", "/v1/b", "/v1/a", "/v1/c"):
+            client.get(path, cast_to=object)
+
+        assert {entry.path for entry in cache._entries.values()} == {"/v1/a", "/v1/c"}
+        assert set(cache._by_path) == {"/v1/a", "/v1/c"}
+        cache.clear()
+        assert len(cache) == 0 and cache.hits == 0
+        assert not cache._by_path and not cache._by_prefix
+
+    def test_invalidation_uses_the_path_index(self):
+        cache = HTTPCache()
+        client = mock_client(Server(), http_cache=cache)
+        for path in ("/v1", "/v1/application", "/v1/application/app-1/metrics", "/v1/applications", "/v1/model"):
+            client.get(path, cast_to=object)
+
+        cache.invalidate("/v1/application/")
+
+        assert sorted(entry.path for entry in cache._entries.values()) == ["/v1/applications", "/v1/model"]
+        assert set(cache._by_prefix) == {"", "/v1", "/v1/applications", "/v1/model"}
+
+    def test_async_client_and_metrics(self):
+        server = Server()
+        registry = MetricsRegistry()
+        client = mock_client(
+            server, cls=AsyncClient, http_cls=httpx.AsyncClient, http_cache=HTTPCache(), metrics_registry=registry
+        )
+
+        async def main():
+            await client.get("/v1/application", cast_to=object)
+            return await client.get("/v1/application", cast_to=object)
+
+        assert asyncio.run(main()) == {"version": 1}
+        assert len(server.requests) == 1
+        samples = registry.snapshot()["aimon_cache_lookups_total"]["samples"]
+        assert {"labels": {"cache": "http", "result": "hit"}, "value": 1} in samples
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            HTTPCache(ttl=-1)
+        with pytest.raises(ValueError):
+            HTTPCache(maxsize=0)
@@ -0,0 +1,156 @@
+import json
+
+import httpx
+import pytest
+
+from aimon import Client, JSONCodec
+from aimon._json import MsgspecCodec, OrjsonCodec, StdlibJSONCodec, get_json_codec
+
+PAYLOAD = {"context": "Paris is the capital of France. " * 100, "scores": [0.1, 0.5], "nested": {"é": None, "ok": True}}
+
+
+class CountingCodec(StdlibJSONCodec):
+    def __init__(self):
+        self.dumps_calls = 0
+        self.loads_calls = 0
+
+    def dumps(self, obj):
+        self.dumps_calls += 1
+        return super().dumps(obj)
+
+    def loads(self, data):
+        self.loads_calls += 1
+        return super().loads(data)
+
+
+def available_codecs():
+    codecs = [StdlibJSONCodec()]
+    for cls in (OrjsonCodec, MsgspecCodec):
+        try:
+            codecs.append(cls())
+        except ImportError:
+            pass
+    return codecs
+
+
+class TestCodecs:
+    @pytest.mark.parametrize("codec", available_codecs(), ids=lambda codec: codec.name)
+    def test_round_trip(self, codec):
+        assert codec.loads(codec.dumps(PAYLOAD)) == PAYLOAD
+        assert json.loads(codec.dumps(PAYLOAD)) == PAYLOAD
+
+    def test_stdlib_matches_httpx_encoding(self):
+        request = httpx.Request("POST", "http://aimon.test", json=PAYLOAD)
+        assert StdlibJSONCodec().dumps(PAYLOAD) == request.read()
+
+    def test_auto_prefers_installed_fast_codec(self):
+        codec = get_json_codec("auto")
+        try:
+            import orjson  # noqa: F401
+        except ImportError:
+            assert codec.name in ("msgspec", "json")
+        else:
+            assert codec.name == "orjson"
+
+    def test_standard_library_is_the_default(self):
+        client = Client(auth_header="Bearer test", base_url="http://aimon.test")
+        assert client.json_codec.name == "json"
+        with pytest.raises(ValueError):
+            client.json_codec.dumps({"score": float("nan")})
+
+    def test_codecs_must_implement_dumps_and_loads(self):
+        class Incomplete(JSONCodec):
+            def dumps(self, obj):
+                return b""
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    def test_codec_instances_and_names(self):
+        codec = CountingCodec()
+        assert get_json_codec(codec) is codec
+        assert get_json_codec("json").name == "json"
+        with pytest.raises(ValueError):
+            get_json_codec("yaml")
+
+
+class TestClientCodec:
+    def test_body_encoded_once_across_retries_and_response_decoded(self):
+        bodies = []
+
+        def handler(request):
+            bodies.append(request.read())
+            if len(bodies) < 3:
+                return httpx.Response(500, json={"message": "retry"})
+            return httpx.Response(200, json={"ok": True})
+
+        codec = CountingCodec()
+        client = Client(
+            auth_header="Bearer test",
+            base_url="http://aimon.test",
+            http_client=httpx.Client(transport=httpx.MockTransport(handler)),
+            json_codec=codec,
+            max_retries=2,
+        )
+        client._calculate_retry_timeout = lambda *args, **kwargs: 0
+
+        result = client.post("/v1/thing", cast_to=object, body=PAYLOAD)
+
+        assert result == {"ok": True}
+        assert codec.dumps_calls == 1
+        assert codec.loads_calls == 1
+        assert len(bodies) == 3
+        assert all(json.loads(body) == PAYLOAD for body in bodies)
+
+    def test_content_type_and_copy(self):
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers["content-type"])
+            return httpx.Response(200, json={})
+
+        codec = CountingCodec()
+        client = Client(
+            auth_header="Bearer test",
+            base_url="http://aimon.test",
+            http_client=httpx.Client(transport=httpx.MockTransport(handler)),
+            json_codec=codec,
+        )
+        client.post("/v1/thing", cast_to=object, body={"a": 1})
+
+        assert seen == ["application/json"]
+        assert client.with_options(max_retries=0).json_codec is codec
+        assert isinstance(codec, JSONCodec)
+
+    @pytest.mark.parametrize(
+        "content, content_type",
+        [
+            ('{"name": "café"}'.encode("latin-1"), "application/json; charset=iso-8859-1"),
+            ('{"name": "café"}'.encode("utf-16"), "application/json"),
+            (b"\xef\xbb\xbf" + '{"name": "café"}'.encode("utf-8"), "application/json; charset=utf-8"),
+        ],
+        ids=["latin-1", "utf-16", "utf-8-bom"],
+    )
+    def test_response_charset_and_bom(self, content, content_type):
+        loaded = []
+
+        class StrictCodec(StdlibJSONCodec):
+            # like orjson and msgspec, only understands UTF-8 bytes without a byte order mark
+            def loads(self, data):
+                loaded.append(data)
+                if isinstance(data, bytes):
+                    data = data.decode("utf-8")
+                return super().loads(data)
+
+        def handler(request):
+            return httpx.Response(200, content=content, headers={"content-type": content_type})
+
+        client = Client(
+            auth_header="Bearer test",
+            base_url="http://aimon.test",
+            http_client=httpx.Client(transport=httpx.MockTransport(handler)),
+            json_codec=StrictCodec(),
+        )
+
+        assert client.get("/v1/thing", cast_to=object) == {"name": "café"}
+        assert loaded[0] in ('{"name": "café"}', '{"name": "café"}'.encode("utf-8"))
@@ -0,0 +1,221 @@
+import gc
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from aimon import (
+    DEFAULT_CONNECTION_LIMITS,
+    Client,
+    AsyncClient,
+    RerankCache,
+    BadRequestError,
+    APITimeoutError,
+    MetricsRegistry,
+)
+
+BODY = [{"context": "Paris is the capital of France.", "generated_text": "Paris."}]
+
+
+def mock_client(handler, cls=Client, http_cls=httpx.Client, **kwargs):
+    client = cls(
+        auth_header="Bearer test",
+        base_url="http://aimon.test",
+        http_client=http_cls(transport=httpx.MockTransport(handler)),
+        **kwargs,
+    )
+    client._calculate_retry_timeout = lambda *args, **kwargs: 0
+    return client
+
+
+def samples(registry, name):
+    return {tuple(sorted(s["labels"].items())): s for s in registry.snapshot()[f"aimon_{name}"]["samples"]}
+
+
+def value(registry, name, **labels):
+    sample = samples(registry, name).get(tuple(sorted(labels.items())))
+    return None if sample is None else sample.get("value", sample.get("count"))
+
+
+class TestRequestMetrics:
+    def test_counts_requests_retries_and_bytes(self):
+        attempts = []
+
+        def handler(request):
+            attempts.append(request)
+            if len(attempts) == 1:
+                return httpx.Response(503, json={"error": "busy"})
+            return httpx.Response(200, json=[{"result": {}}])
+
+        registry = MetricsRegistry()
+        client = mock_client(handler, metrics_registry=registry)
+        client.inference.detect(body=BODY)
+
+        endpoint = {"method": "POST", "endpoint": "/v2/detect"}
+        assert value(registry, "requests_total", status="200", **endpoint) == 1
+        assert value(registry, "retries_total", reason="503", **endpoint) == 1
+        assert value(registry, "request_duration_seconds", status="200", **endpoint) == 1
+        assert value(registry, "request_bytes_total", **endpoint) == sum(len(r.content) for r in attempts)
+        assert value(registry, "response_bytes_total", **endpoint) == len(b'{"error":"busy"}') + len(b'[{"result":{}}]')
+        phases = {labels[2][1] for labels in samples(registry, "request_phase_seconds")}
+        assert {"transform", "serialize", "network", "parse", "construct"} <= phases
+
+    def test_errors_and_timeouts(self):
+        def handler(request):
+            if request.url.path.endswith("timeout"):
+                raise httpx.ReadTimeout("slow", request=request)
+            return httpx.Response(400, json={"error": "bad"})
+
+        registry = MetricsRegistry()
+        client = mock_client(handler, metrics_registry=registry, max_retries=1)
+
+        with pytest.raises(BadRequestError):
+            client.post("/v1/bad", cast_to=object, body={})
+        with pytest.raises(APITimeoutError):
+            client.post("/v1/timeout", cast_to=object, body={})
+
+        assert value(registry, "requests_total", method="POST", endpoint="/v1/bad", status="400") == 1
+        assert value(registry, "requests_total", method="POST", endpoint="/v1/timeout", status="timeout") == 1
+        assert value(registry, "retries_total", method="POST", endpoint="/v1/timeout", reason="timeout") == 1
+        # the retried attempt and the final one
+        assert value(registry, "timeouts_total", method="POST", endpoint="/v1/timeout") == 2
+
+    def test_async_client_and_shared_registry(self):
+        registry = MetricsRegistry()
+        handler = lambda request: httpx.Response(200, json={"ok": True})  # noqa: E731
+        sync_client = mock_client(handler, metrics_registry=registry)
+        async_client = mock_client(handler, cls=AsyncClient, http_cls=httpx.AsyncClient, metrics_registry=registry)
+
+        sync_client.get("/v1/user", cast_to=object)
+        asyncio.run(async_client.get("/v1/user", cast_to=object))
+
+        assert value(registry, "requests_total", method="GET", endpoint="/v1/user", status="200") == 2
+
+    def test_copies_keep_the_registry(self):
+        registry = MetricsRegistry()
+        client = mock_client(lambda request: httpx.Response(200, json={}), metrics_registry=registry)
+
+        client.copy(max_retries=0).get("/v1/user", cast_to=object)
+        assert value(registry, "requests_total", method="GET", endpoint="/v1/user", status="200") == 1
+        assert client.copy(metrics_registry=None).metrics_registry is None
+
+    def test_ids_are_not_labels(self):
+        registry = MetricsRegistry()
+        client = mock_client(lambda request: httpx.Response(200, json={}), metrics_registry=registry)
+
+        client.get("/v1/api-key/sk-Abc123secret/validate", cast_to=object)
+        client.get("/v1/custom-metric/3f2b8c1e-0d4a-4e8b-9a53-1c2d3e4f5a6b", cast_to=object)
+
+        endpoints = {dict(labels)["endpoint"] for labels in samples(registry, "requests_total")}
+        assert endpoints == {"/v1/api-key/{id}/validate", "/v1/custom-metric/{id}"}
+        assert "Abc123secret" not in registry.to_prometheus()
+
+
+class TestExport:
+    def test_prometheus_text_format(self):
+        registry = MetricsRegistry(buckets=(0.1, 1.0))
+        client = mock_client(lambda request: httpx.Response(200, json={}), metrics_registry=registry)
+        client.get("/v1/user", cast_to=object)
+
+        text = registry.to_prometheus()
+        assert "# TYPE aimon_requests_total counter\n" in text
+        assert 'aimon_requests_total{method="GET",endpoint="/v1/user",status="200"} 1\n' in text
+        assert "# TYPE aimon_request_duration_seconds histogram\n" in text
+        assert 'aimon_request_duration_seconds_bucket{method="GET",endpoint="/v1/user",status="200",le="+Inf"} 1\n' in text
+        assert 'aimon_request_duration_seconds_count{method="GET",endpoint="/v1/user",status="200"} 1\n' in text
+        for line in text.splitlines():
+            assert line.startswith("# ") or len(line.rsplit(" ", 1)) == 2
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry(buckets=(0.1, 1.0))
+        request = httpx.Request("GET", "http://aimon.test/v1/user")
+        for seconds in (0.05, 0.5, 5.0):
+            registry._duration.observe(("GET", "/v1/user", "200"), seconds)
+
+        (sample,) = registry.snapshot()["aimon_request_duration_seconds"]["samples"]
+        assert sample["buckets"] == {"0.1": 1, "1.0": 2, "+Inf": 3}
+        assert sample["sum"] == pytest.approx(5.55)
+        assert registry.endpoint_label(request) == "/v1/user"
+
+    def test_label_values_are_escaped(self):
+        class Registry(MetricsRegistry):
+            def endpoint_label(self, request):
+                return 'say "hi"\\'
+
+        registry = Registry()
+        client = mock_client(lambda request: httpx.Response(200, json={}), metrics_registry=registry)
+        client.get("/v1/user", cast_to=object)
+
+        assert 'endpoint="say \\"hi\\"\\\\"' in registry.to_prometheus()
+
+    def test_reset(self):
+        registry = MetricsRegistry()
+        client = mock_client(lambda request: httpx.Response(200, json={}), metrics_registry=registry)
+        client.get("/v1/user", cast_to=object)
+
+        registry.reset()
+        assert registry.snapshot()["aimon_requests_total"]["samples"] == []
+
+    def test_invalid_buckets(self):
+        with pytest.raises(ValueError):
+            MetricsRegistry(buckets=(1.0, 0.5))
+
+
+class TestCollectedMetrics:
+    def test_pool_usage(self):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            def log_message(self, *args):
+                pass
+
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        host, port = httpd.server_address
+        registry = MetricsRegistry()
+        client = Client(auth_header="Bearer test", base_url=f"http://{host}:{port}", metrics_registry=registry)
+
+        def pool():
+            snapshot = registry.snapshot()
+            connections = {s["labels"]["state"]: s["value"] for s in snapshot["aimon_pool_connections"]["samples"]}
+            return connections, snapshot["aimon_pool_max_connections"]["samples"][0]["value"]
+
+        try:
+            assert pool() == ({"active": 0, "idle": 0}, DEFAULT_CONNECTION_LIMITS.max_connections)
+            client.get("/v1/user", cast_to=object)
+            # the connection is kept alive for the next request
+            assert pool() == ({"active": 0, "idle": 1}, DEFAULT_CONNECTION_LIMITS.max_connections)
+        finally:
+            client.close()
+            httpd.shutdown()
+            httpd.server_close()
+
+    def test_cache_hits(self):
+        class Cache:
+            hits = 3
+            misses = 1
+
+        registry = MetricsRegistry()
+        client = Client(
+            auth_header="Bearer test", base_url="http://aimon.test", rerank_cache=RerankCache(), metrics_registry=registry
+        )
+        registry.track_cache("reprompting", Cache())
+
+        assert value(registry, "cache_lookups_total", cache="reprompting", result="hit") == 3
+        assert value(registry, "cache_lookups_total", cache="rerank", result="miss") == 0
+        client.close()
+
+    def test_clients_are_not_kept_alive(self):
+        registry = MetricsRegistry()
+        Client(auth_header="Bearer test", base_url="http://aimon.test", metrics_registry=registry)
+        gc.collect()
+        assert "aimon_pool_connections" not in registry.snapshot()
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+import pytest
+from pydantic import Field
+
+from aimon._models import BaseModel, construct_type, _construct_plans, _is_passthrough_type
+
+
+class Item(BaseModel):
+    result: Optional[object] = None
+
+    name: Optional[str] = None
+
+    created_at: Optional[datetime] = None
+
+    tags: List[str] = []
+
+    api_name: Optional[str] = Field(default=None, alias="apiName")
+
+
+class TestPassthrough:
+    @pytest.mark.parametrize(
+        "type_", [object, Any, str, int, List[object], Optional[object], Optional[str], Dict[str, object]]
+    )
+    def test_passthrough_types(self, type_):
+        assert _is_passthrough_type(type_)
+
+    @pytest.mark.parametrize("type_", [float, datetime, Item, Optional[int], List[Item], Dict[str, float]])
+    def test_types_needing_construction(self, type_):
+        assert not _is_passthrough_type(type_)
+
+    def test_list_of_objects_is_returned_unchanged(self):
+        records = [{"a": 1}, {"b": [2]}]
+        assert construct_type(value=records, type_=List[object]) is records
+
+    def test_unions_are_still_coerced(self):
+        assert construct_type(value="1", type_=Optional[int]) == 1
+
+
+class TestConstructPlans:
+    def test_fields_are_constructed(self):
+        result = {"nested": [1, 2]}
+        item = construct_type(
+            value={"result": result, "name": "x", "created_at": "2024-05-01T12:00:00Z", "apiName": "y", "extra": 1},
+            type_=Item,
+        )
+        assert isinstance(item, Item)
+        assert item.result is result
+        assert item.created_at == datetime.fromisoformat("2024-05-01T12:00:00+00:00")
+        assert item.api_name == "y"
+        assert item.tags == []
+        assert item.model_fields_set == {"result", "name", "created_at", "api_name"}
+        assert item.model_extra == {"apiName": "y", "extra": 1}
+        assert Item in _construct_plans
+
+    def test_missing_and_null_fields_use_defaults(self):
+        first, second = construct_type(value=[{"result": None, "tags": None}, {}], type_=List[Item])
+        assert first.result is None
+        assert first.tags == second.tags == []
+        assert first.model_fields_set == {"result", "tags"}
+        assert second.model_fields_set == set()
+
+    def test_list_entries_that_are_not_mappings_are_kept(self):
+        assert construct_type(value=[{"name": "a"}, 1], type_=List[Item])[1] == 1
+
+    def test_forward_references_are_resolved_before_caching(self):
+        class Parent(BaseModel):
+            child: Optional["Child"] = None
+
+        parent = construct_type(value={"child": {"x": 1}}, type_=Parent)
+        assert parent.child == {"x": 1}
+        assert Parent not in _construct_plans
+
+        class Child(BaseModel):
+            x: int
+
+        Parent.model_rebuild()
+        parent = construct_type(value={"child": {"x": 1}}, type_=Parent)
+        assert isinstance(parent.child, Child)
+        assert Parent in _construct_plans
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from aimon import AdaptiveRateLimiter, AsyncClient, Client
+
+KEY = "POST /v1/thing"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class ThrottlingServer:
+    """Returns 429 with a `retry-after-ms` header for the first `throttled` requests, then 200."""
+
+    def __init__(self, throttled=1, retry_after_ms=None):
+        self.throttled = throttled
+        self.retry_after_ms = retry_after_ms
+        self.times = []
+        self._lock = threading.Lock()
+
+    def handler(self, request):
+        with self._lock:
+            self.times.append(time.monotonic())
+            count = len(self.times)
+        if count <= self.throttled:
+            headers = {"retry-after-ms": str(self.retry_after_ms)} if self.retry_after_ms is not None else {}
+            return httpx.Response(429, json={"message": "slow down"}, headers=headers)
+        return httpx.Response(200, json={"ok": True})
+
+
+class TestAdaptiveRateLimiter:
+    def test_paces_requests_at_rate(self):
+        clock = FakeClock()
+        limiter = AdaptiveRateLimiter(initial_rate=2, clock=clock)
+        assert limiter.reserve(KEY) == 0
+        assert limiter.reserve(KEY) == pytest.approx(0.5)
+        assert limiter.reserve(KEY) == pytest.approx(1.0)
+        clock.now += 1.0
+        assert limiter.reserve(KEY) == pytest.approx(0.5)
+
+    def test_endpoints_are_independent(self):
+        limiter = AdaptiveRateLimiter(initial_rate=1, clock=FakeClock())
+        limiter.reserve(KEY)
+        assert limiter.reserve("GET /v1/other") == 0
+
+    def test_throttle_decreases_and_success_recovers(self):
+        limiter = AdaptiveRateLimiter(initial_rate=8, min_rate=1, max_rate=9, clock=FakeClock())
+        limiter.on_throttle(KEY)
+        assert limiter.rate(KEY) == pytest.approx(4)
+        limiter.on_throttle(KEY)
+        limiter.on_throttle(KEY)
+        limiter.on_throttle(KEY)
+        assert limiter.rate(KEY) == pytest.approx(1)
+        for _ in range(1000):
+            limiter.on_success(KEY)
+        assert limiter.rate(KEY) == pytest.approx(9)
+
+    def test_retry_after_pauses_the_endpoint(self):
+        clock = FakeClock()
+        limiter = AdaptiveRateLimiter(initial_rate=100, clock=clock)
+        limiter.on_throttle(KEY, retry_after=3)
+        assert limiter.reserve(KEY) == pytest.approx(3)
+        clock.now += 3
+        assert limiter.reserve(KEY) < 1
+
+    def test_endpoint_key_ignores_query(self):
+        assert AdaptiveRateLimiter.endpoint_key("get", "/v1/x?page=2") == "GET /v1/x"
+
+    def test_endpoint_key_groups_resource_ids(self):
+        key = AdaptiveRateLimiter.endpoint_key
+        assert key("get", "/v1/application/3f2b8c1e-0d4a") == key("GET", "/v1/application/9a53-1c2d") == "GET /v1/application/{id}"
+        assert key("get", "http://aimon.test/v1/application/42?x=1") == "GET /v1/application/{id}"
+
+    def test_endpoint_table_is_bounded(self):
+        limiter = AdaptiveRateLimiter(initial_rate=1, max_endpoints=2, clock=FakeClock())
+        limiter.on_throttle("GET /a")
+        limiter.reserve("GET /b")
+        limiter.reserve("GET /a")
+        limiter.reserve("GET /c")
+        assert list(limiter._endpoints) == ["GET /a", "GET /c"]
+        assert limiter.rate("GET /a") == pytest.approx(0.5)
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            AdaptiveRateLimiter(min_rate=0)
+        with pytest.raises(ValueError):
+            AdaptiveRateLimiter(initial_rate=1, min_rate=2)
+        with pytest.raises(ValueError):
+            AdaptiveRateLimiter(decrease_factor=1)
+        with pytest.raises(ValueError):
+            AdaptiveRateLimiter(max_endpoints=0)
+
+
+class TestClientRateLimiting:
+    def make_client(self, server, limiter, cls=Client, http_cls=httpx.Client):
+        return cls(
+            auth_header="Bearer test",
+            base_url="http://aimon.test",
+            http_client=http_cls(transport=httpx.MockTransport(server.handler)),
+            rate_limiter=limiter,
+        )
+
+    def test_429_slows_down_every_thread(self):
+        server = ThrottlingServer(throttled=1, retry_after_ms=200)
+        limiter = AdaptiveRateLimiter(initial_rate=100, burst=10)
+        client = self.make_client(server, limiter)
+
+        client.post("/v1/thing", cast_to=object, body={})
+        first_response = server.times[0]
+        threads = [threading.Thread(target=client.post, args=("/v1/thing",), kwargs={"cast_to": object, "body": {}}) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(server.times) == 5
+        assert limiter.rate("POST /v1/thing") < 100
+        # Every request after the 429 waited for the Retry-After, not only the retried one
+        assert all(t - first_response >= 0.19 for t in server.times[1:])
+
+    def test_limiter_is_shared_by_copies(self):
+        limiter = AdaptiveRateLimiter()
+        client = self.make_client(ThrottlingServer(throttled=0), limiter)
+        assert client.with_options(max_retries=0).rate_limiter is limiter
+
+    def test_async_client(self):
+        server = ThrottlingServer(throttled=1)
+        limiter = AdaptiveRateLimiter(initial_rate=50)
+        client = self.make_client(server, limiter, cls=AsyncClient, http_cls=httpx.AsyncClient)
+
+        asyncio.run(client.post("/v1/thing", cast_to=object, body={}))
+
+        assert len(server.times) == 2
+        # halved by the 429, then slightly increased by the success
+        assert 25 < limiter.rate("POST /v1/thing") < 26
@@ -0,0 +1,106 @@
+import asyncio
+from string import Template
+
+from aimon.reprompting_api.config import RepromptingConfig
+from aimon.reprompting_api.pipeline import RepromptingPipeline
+from aimon.reprompting_api.telemetry import SessionCounters
+
+import pytest
+
+INSTRUCTION = "Mention Paris"
+
+
+def get_config(**kwargs):
+    options = dict(
+        aimon_api_key="test",
+        publish=False,
+        return_telemetry=True,
+        return_aimon_summary=False,
+        application_name="api_test",
+        max_iterations=2,
+    )
+    options.update(kwargs)
+    return RepromptingConfig(**options)
+
+
+class CountingLLM:
+    """LLM stand-in that records its calls and fails the first `failures` of them."""
+
+    def __init__(self, response="no instructions followed", failures=0):
+        self.response = response
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self, prompt_template: Template, system_prompt, context, user_query):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("transient LLM failure")
+        return self.response
+
+
+class TestSessionCounters:
+    """Test suite for the per-run call counters."""
+
+    def test_add_and_snapshot(self):
+        counters = SessionCounters()
+        counters.add(llm_calls=1, bytes_sent=10)
+        counters.add(llm_calls=1, retries=1, bytes_sent=5)
+        assert counters.as_dict() == {"llm_calls": 2, "detect_calls": 0, "retries": 1, "bytes_sent": 15, "cache_hits": 0}
+
+    def test_unknown_counter(self):
+        with pytest.raises(ValueError):
+            SessionCounters().add(tokens=1)
+
+
+class TestCallAccounting:
+    """Offline tests for LLM call accounting in the pipeline."""
+
+    def test_one_llm_call_per_iteration(self, fake_detect):
+        llm = CountingLLM()
+        pipeline = RepromptingPipeline(llm_fn=llm, config=get_config())
+        fake_detect.install(pipeline.detect)
+
+        result = pipeline.run("", "France facts", "What is the capital?", [INSTRUCTION])
+
+        assert len(result["telemetry"]) == 2
+        assert llm.calls == 2
+        assert result["counters"]["llm_calls"] == 2
+        assert result["counters"]["detect_calls"] == len(fake_detect.requests) == 2
+        assert result["counters"]["retries"] == 0
+        assert result["counters"]["bytes_sent"] > 0
+
+    def test_async_run_matches_sync_run(self, fake_detect):
+        llm = CountingLLM()
+
+        async def allm(prompt_template, system_prompt, context, user_query):
+            return llm(prompt_template, system_prompt, context, user_query)
+
+        pipeline = RepromptingPipeline(llm_fn=allm, config=get_config())
+        fake_detect.install(pipeline.detect)
+
+        result = asyncio.run(pipeline.arun("", "France facts", "What is the capital?", [INSTRUCTION]))
+
+        assert llm.calls == 2
+        assert result["counters"]["llm_calls"] == 2
+        assert result["counters"]["detect_calls"] == 2
+
+    def test_retries_are_counted(self, fake_detect):
+        llm = CountingLLM(response=f"{INSTRUCTION}: it is Paris.", failures=1)
+        pipeline = RepromptingPipeline(llm_fn=llm, config=get_config())
+        fake_detect.install(pipeline.detect)
+
+        result = pipeline.run("", "France facts", "What is the capital?", [INSTRUCTION])
+
+        assert result["counters"]["llm_calls"] == 2
+        assert result["counters"]["retries"] == 1
+        assert result["counters"]["detect_calls"] == 1
+
+    def test_counters_in_telemetry(self, fake_detect):
+        pipeline = RepromptingPipeline(llm_fn=CountingLLM(), config=get_config())
+        fake_detect.install(pipeline.detect)
+
+        result = pipeline.run("", "France facts", "What is the capital?", [INSTRUCTION])
+
+        first, last = result["telemetry"]
+        assert first["counters"]["llm_calls"] == 1
+        assert last["counters"] == result["counters"]
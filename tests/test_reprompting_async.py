@@ -0,0 +1,133 @@
+import asyncio
+from string import Template
+
+import pytest
+
+from aimon.reprompting_api.config import RepromptingConfig
+from aimon.reprompting_api.pipeline import RepromptingPipeline
+from aimon.reprompting_api.utils import async_retry
+
+INSTRUCTION = "Mention Paris"
+
+
+def get_config(**kwargs):
+    options = dict(
+        aimon_api_key="test",
+        publish=False,
+        return_telemetry=True,
+        return_aimon_summary=True,
+        application_name="api_test",
+        max_iterations=3,
+    )
+    options.update(kwargs)
+    return RepromptingConfig(**options)
+
+
+def fill(prompt_template: Template, system_prompt, context, user_query) -> str:
+    return prompt_template.safe_substitute(system_prompt=system_prompt, context=context, user_query=user_query)
+
+
+class TestAsyncPipeline:
+    """Offline tests for RepromptingPipeline.arun against a stand-in detect endpoint."""
+
+    def test_arun_with_async_llm_fn(self, fake_detect):
+        calls = []
+
+        async def llm_fn(prompt_template, system_prompt, context, user_query):
+            calls.append(prompt_template)
+            await asyncio.sleep(0)
+            return fill(prompt_template, system_prompt, context, user_query)
+
+        pipeline = RepromptingPipeline(llm_fn=llm_fn, config=get_config())
+        fake_detect.install(pipeline.detect)
+
+        result = asyncio.run(pipeline.arun("Be helpful", "France facts", "What is the capital?", [INSTRUCTION]))
+
+        assert INSTRUCTION in result["best_response"]
+        assert result["summary"] == "2 iterations, 0 failed instructions remaining"
+        assert len(calls) == 2
+        assert len(fake_detect.requests) == 2
+
+    def test_arun_with_sync_llm_fn(self, fake_detect):
+        pipeline = RepromptingPipeline(llm_fn=fill, config=get_config())
+        fake_detect.install(pipeline.detect)
+
+        result = asyncio.run(pipeline.arun("Be helpful", "France facts", "What is the capital?", [INSTRUCTION]))
+
+        assert INSTRUCTION in result["best_response"]
+
+    def test_arun_rejects_non_string_llm_output(self, fake_detect):
+        async def llm_fn(prompt_template, system_prompt, context, user_query):
+            return 42
+
+        config = get_config(user_model_max_retries=1)
+        pipeline = RepromptingPipeline(llm_fn=llm_fn, config=config)
+        fake_detect.install(pipeline.detect)
+
+        with pytest.raises(TypeError, match="LLM returned invalid type int, expected str."):
+            asyncio.run(pipeline.arun("", "", "query", []))
+
+    def test_concurrent_sessions_share_the_event_loop(self, fake_detect):
+        async def llm_fn(prompt_template, system_prompt, context, user_query):
+            await asyncio.sleep(0.05)
+            return fill(prompt_template, system_prompt, context, user_query)
+
+        pipeline = RepromptingPipeline(llm_fn=llm_fn, config=get_config(max_iterations=1))
+        fake_detect.install(pipeline.detect)
+
+        async def main():
+            return await asyncio.gather(*[pipeline.arun("", "", f"query {i}", []) for i in range(20)])
+
+        results = asyncio.run(main())
+        assert len(results) == 20
+        assert len(fake_detect.requests) == 20
+
+    def test_arun_matches_run(self, fake_detect):
+        pipeline = RepromptingPipeline(llm_fn=fill, config=get_config())
+        fake_detect.install(pipeline.detect)
+
+        sync_result = pipeline.run("Be helpful", "France facts", "What is the capital?", [INSTRUCTION])
+        async_result = asyncio.run(pipeline.arun("Be helpful", "France facts", "What is the capital?", [INSTRUCTION]))
+
+        def strip(entry):
+            return {key: value for key, value in entry.items() if "latency" not in key}
+
+        assert async_result["best_response"] == sync_result["best_response"]
+        assert async_result["summary"] == sync_result["summary"]
+        assert [strip(e) for e in async_result["telemetry"]] == [strip(e) for e in sync_result["telemetry"]]
+
+
+class TestAsyncRetry:
+    """Test suite for the non-blocking retry decorator."""
+
+    def test_retries_until_success(self):
+        attempts = []
+
+        @async_retry(exception_to_check=ValueError, tries=3, delay=0, backoff=2)
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ValueError("boom")
+            return "ok"
+
+        assert asyncio.run(flaky()) == "ok"
+        assert len(attempts) == 3
+
+    def test_re_raises_after_last_try(self):
+        @async_retry(exception_to_check=ValueError, tries=2, delay=0, backoff=2)
+        async def always_fails():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            asyncio.run(always_fails())
+
+    def test_logs_instead_of_printing(self, capsys, caplog):
+        @async_retry(exception_to_check=ValueError, tries=2, delay=0, backoff=2)
+        async def always_fails():
+            raise ValueError("boom")
+
+        with caplog.at_level("WARNING", logger="aimon.reprompting_api.utils"), pytest.raises(ValueError):
+            asyncio.run(always_fails())
+
+        assert capsys.readouterr().out == ""
+        assert [record.getMessage() for record in caplog.records] == ["boom, Retrying in 0 seconds...", "Failed after 2 tries. boom"]
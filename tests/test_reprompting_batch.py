@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+from string import Template
+
+import pytest
+
+from aimon.reprompting_api import runner
+from aimon.reprompting_api.config import RepromptingConfig
+from aimon.reprompting_api.pipeline import RepromptingPipeline
+
+INSTRUCTION = "Mention Paris"
+
+
+def get_config(**kwargs):
+    options = dict(
+        aimon_api_key="test",
+        publish=False,
+        return_telemetry=True,
+        return_aimon_summary=True,
+        application_name="api_test",
+        max_iterations=3,
+    )
+    options.update(kwargs)
+    return RepromptingConfig(**options)
+
+
+def fill(prompt_template: Template, system_prompt, context, user_query) -> str:
+    return prompt_template.safe_substitute(system_prompt=system_prompt, context=context, user_query=user_query)
+
+
+@pytest.fixture
+def pipelines(monkeypatch, fake_detect):
+    """Patch the runner so every pipeline it builds talks to the fake detect server."""
+    created = []
+
+    class FakePipeline(RepromptingPipeline):
+        def __init__(self, llm_fn, config):
+            super().__init__(llm_fn, config)
+            fake_detect.install(self.detect)
+            created.append(self)
+
+    monkeypatch.setattr(runner, "RepromptingPipeline", FakePipeline)
+    return created
+
+
+class TestBatchRunner:
+    """Offline tests for run_reprompting_batch / arun_reprompting_batch."""
+
+    def test_results_cover_every_item_and_share_one_pipeline(self, pipelines):
+        items = [(f"query {i}", "France facts", [INSTRUCTION]) for i in range(10)]
+        results = list(runner.run_reprompting_batch(fill, items, reprompting_config=get_config(), max_concurrent_sessions=4))
+
+        assert sorted(r["index"] for r in results) == list(range(10))
+        assert all(INSTRUCTION in r["best_response"] for r in results)
+        assert all(len(r["telemetry"]) == 2 for r in results)
+        assert len(pipelines) == 1
+
+    def test_llm_concurrency_limit_is_respected(self, pipelines):
+        lock = threading.Lock()
+        in_flight = []
+        peak = []
+
+        def slow_llm(prompt_template, system_prompt, context, user_query):
+            with lock:
+                in_flight.append(1)
+                peak.append(len(in_flight))
+            time.sleep(0.02)
+            with lock:
+                in_flight.pop()
+            return fill(prompt_template, system_prompt, context, user_query)
+
+        items = [(f"query {i}", None, None) for i in range(12)]
+        config = get_config(max_iterations=1, max_concurrent_llm_calls=2)
+        results = list(runner.run_reprompting_batch(slow_llm, items, reprompting_config=config, max_concurrent_sessions=6))
+
+        assert len(results) == 12
+        assert max(peak) <= 2
+
+    def test_failed_session_is_reported_not_raised(self, pipelines):
+        items = [("ok query", None, None), ("", None, None)]
+        results = sorted(runner.run_reprompting_batch(fill, items, reprompting_config=get_config()), key=lambda r: r["index"])
+
+        assert "best_response" in results[0]
+        assert isinstance(results[1]["error"], ValueError)
+
+    def test_malformed_item_is_reported_not_raised(self, pipelines):
+        items = [("ok query", None, None), ("missing context",)]
+        results = sorted(runner.run_reprompting_batch(fill, items, reprompting_config=get_config()), key=lambda r: r["index"])
+
+        assert "best_response" in results[0]
+        assert results[1]["user_query"] is None
+        assert isinstance(results[1]["error"], ValueError)
+
+        async def main():
+            return [r async for r in runner.arun_reprompting_batch(fill, [("bad",)], reprompting_config=get_config())]
+
+        (result,) = asyncio.run(main())
+        assert isinstance(result["error"], ValueError)
+
+    def test_async_batch(self, pipelines):
+        async def llm_fn(prompt_template, system_prompt, context, user_query):
+            await asyncio.sleep(0.01)
+            return fill(prompt_template, system_prompt, context, user_query)
+
+        async def main():
+            items = [(f"query {i}", "France facts", [INSTRUCTION]) for i in range(25)]
+            config = get_config(max_concurrent_llm_calls=5, max_concurrent_detect_calls=3)
+            return [r async for r in runner.arun_reprompting_batch(llm_fn, items, reprompting_config=config, max_concurrent_sessions=10)]
+
+        results = asyncio.run(main())
+        assert sorted(r["index"] for r in results) == list(range(25))
+        assert all(INSTRUCTION in r["best_response"] for r in results)
+
+    def test_invalid_session_limit(self, pipelines):
+        with pytest.raises(ValueError):
+            list(runner.run_reprompting_batch(fill, [], max_concurrent_sessions=0))
+
+    def test_zero_concurrency_limit_is_rejected(self, pipelines):
+        pipeline = RepromptingPipeline(fill, get_config())
+        pipeline.config.max_concurrent_llm_calls = 0
+        with pytest.raises(ValueError):
+            pipeline._get_async_slots()
@@ -0,0 +1,162 @@
+import asyncio
+from string import Template
+
+import pytest
+
+from aimon.reprompting_api.cache import ResponseCache, make_key
+from aimon.reprompting_api.config import RepromptingConfig
+from aimon.reprompting_api.pipeline import RepromptingPipeline
+
+INSTRUCTION = "Mention Paris"
+
+
+def get_config(**kwargs):
+    options = dict(
+        aimon_api_key="test",
+        publish=False,
+        return_telemetry=True,
+        return_aimon_summary=False,
+        application_name="api_test",
+        max_iterations=2,
+        cache_max_entries=16,
+    )
+    options.update(kwargs)
+    return RepromptingConfig(**options)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingLLM:
+    def __init__(self, response="no instructions followed"):
+        self.response = response
+        self.calls = 0
+
+    def __call__(self, prompt_template, system_prompt, context, user_query):
+        self.calls += 1
+        return self.response
+
+
+class TestResponseCache:
+    """Test suite for the LRU + TTL response cache."""
+
+    def test_evicts_least_recently_used(self):
+        cache = ResponseCache(max_entries=2, ttl_seconds=None)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = ResponseCache(max_entries=4, ttl_seconds=10, clock=clock)
+        cache.put("a", 1)
+        clock.now = 9.9
+        assert cache.get("a") == 1
+        clock.now = 10
+        assert cache.get("a") is None
+        assert len(cache) == 0
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_make_key_is_stable(self):
+        assert make_key("llm", "prompt", None) == make_key("llm", "prompt", None)
+        assert make_key("llm", "prompt", None) != make_key("llm", "prompt", "")
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            ResponseCache(max_entries=0)
+        with pytest.raises(ValueError):
+            ResponseCache(ttl_seconds=0)
+
+
+class TestPipelineMemoization:
+    """Offline tests for memoized LLM and detect calls across sessions."""
+
+    def test_repeated_session_makes_no_external_calls(self, fake_detect):
+        llm = CountingLLM()
+        pipeline = RepromptingPipeline(llm_fn=llm, config=get_config())
+        fake_detect.install(pipeline.detect)
+
+        first = pipeline.run("", "France facts", "What is the capital?", [INSTRUCTION])
+        calls, requests = llm.calls, len(fake_detect.requests)
+        second = pipeline.run("", "France facts", "What is the capital?", [INSTRUCTION])
+
+        assert llm.calls == calls
+        assert len(fake_detect.requests) == requests
+        assert second["best_response"] == first["best_response"]
+        assert second["counters"]["llm_calls"] == second["counters"]["detect_calls"] == 0
+        first_lookups = sum(first["counters"][name] for name in ("llm_calls", "detect_calls", "cache_hits"))
+        assert second["counters"]["cache_hits"] == first_lookups
+        assert [t["residual_error"] for t in second["telemetry"]] == [t["residual_error"] for t in first["telemetry"]]
+
+    def test_different_inputs_miss(self, fake_detect):
+        llm = CountingLLM()
+        pipeline = RepromptingPipeline(llm_fn=llm, config=get_config(max_iterations=1))
+        fake_detect.install(pipeline.detect)
+
+        pipeline.run("", "France facts", "What is the capital?", [INSTRUCTION])
+        pipeline.run("", "France facts", "What is the largest city?", [INSTRUCTION])
+
+        assert llm.calls == 2
+        assert len(fake_detect.requests) == 2
+
+    def test_disabled_by_default(self, fake_detect):
+        llm = CountingLLM()
+        pipeline = RepromptingPipeline(llm_fn=llm, config=get_config(cache_max_entries=None, max_iterations=1))
+        fake_detect.install(pipeline.detect)
+
+        pipeline.run("", "France facts", "What is the capital?", [INSTRUCTION])
+        pipeline.run("", "France facts", "What is the capital?", [INSTRUCTION])
+
+        assert pipeline.response_cache is None
+        assert llm.calls == 2
+
+    def test_published_detections_are_not_cached(self, fake_detect):
+        llm = CountingLLM()
+        pipeline = RepromptingPipeline(llm_fn=llm, config=get_config(publish=True, max_iterations=1))
+        fake_detect.install(pipeline.detect)
+
+        pipeline.run("", "France facts", "What is the capital?", [INSTRUCTION])
+        pipeline.run("", "France facts", "What is the capital?", [INSTRUCTION])
+
+        assert llm.calls == 1
+        assert len(fake_detect.requests) == 2
+        assert all(request["publish"] for request in fake_detect.requests)
+
+    def test_candidates_are_cached_separately(self):
+        responses = iter(f"candidate {i}" for i in range(100))
+        pipeline = RepromptingPipeline(llm_fn=lambda *args: next(responses), config=get_config(num_candidates=3))
+        template = Template("$user_query")
+
+        first = [pipeline._call_llm(template, 1, "", "France facts", "query", candidate=i) for i in range(3)]
+        second = [pipeline._call_llm(template, 1, "", "France facts", "query", candidate=i) for i in range(3)]
+
+        # a cached run still compares distinct candidates rather than one repeated response
+        assert first == second == ["candidate 0", "candidate 1", "candidate 2"]
+        assert next(responses) == "candidate 3"
+
+    def test_async_and_batched_paths(self, fake_detect):
+        llm = CountingLLM()
+
+        async def allm(prompt_template, system_prompt, context, user_query):
+            return llm(prompt_template, system_prompt, context, user_query)
+
+        pipeline = RepromptingPipeline(llm_fn=allm, config=get_config(differential_evaluation=True))
+        fake_detect.install(pipeline.detect)
+
+        asyncio.run(pipeline.arun("", "France facts", "What is the capital?", [INSTRUCTION]))
+        calls, requests = llm.calls, len(fake_detect.requests)
+        result = asyncio.run(pipeline.arun("", "France facts", "What is the capital?", [INSTRUCTION]))
+
+        assert llm.calls == calls
+        assert len(fake_detect.requests) == requests
+        assert result["counters"]["cache_hits"] > 0
@@ -0,0 +1,87 @@
+import asyncio
+import itertools
+import threading
+from string import Template
+
+import pytest
+
+from aimon.reprompting_api.config import RepromptingConfig
+from aimon.reprompting_api.pipeline import RepromptingPipeline
+
+INSTRUCTION = "Mention Paris"
+
+
+def get_config(**kwargs):
+    options = dict(
+        aimon_api_key="test",
+        publish=False,
+        return_telemetry=True,
+        return_aimon_summary=True,
+        application_name="api_test",
+        max_iterations=2,
+    )
+    options.update(kwargs)
+    return RepromptingConfig(**options)
+
+
+def make_llm():
+    """LLM whose corrective revisions only follow the instruction on every third call."""
+    counter = itertools.count()
+    lock = threading.Lock()
+
+    def llm_fn(prompt_template: Template, system_prompt, context, user_query):
+        with lock:
+            n = next(counter)
+        if "Revise" in prompt_template.template and n % 3 == 0:
+            return f"candidate {n}: {INSTRUCTION}"
+        return f"candidate {n}"
+
+    return llm_fn
+
+
+class TestBestOfNCandidates:
+    """Offline tests for speculative best-of-N corrective iterations."""
+
+    def test_candidates_scored_in_one_batched_request(self, fake_detect):
+        pipeline = RepromptingPipeline(llm_fn=make_llm(), config=get_config(num_candidates=3))
+        fake_detect.install(pipeline.detect)
+
+        result = pipeline.run("", "context", "query", [INSTRUCTION])
+
+        # 1 initial detection + 3 candidates batched into the corrective iteration
+        assert len(fake_detect.requests) == 4
+        assert INSTRUCTION in result["best_response"]
+        assert result["summary"] == "2 iterations, 0 failed instructions remaining"
+
+    def test_async_candidates(self, fake_detect):
+        llm = make_llm()
+
+        async def llm_fn(*args):
+            return llm(*args)
+
+        pipeline = RepromptingPipeline(llm_fn=llm_fn, config=get_config(num_candidates=3))
+        fake_detect.install(pipeline.detect)
+
+        result = asyncio.run(pipeline.arun("", "context", "query", [INSTRUCTION]))
+
+        assert len(fake_detect.requests) == 4
+        assert INSTRUCTION in result["best_response"]
+
+    def test_failed_candidates_are_dropped(self, fake_detect):
+        counter = itertools.count()
+
+        def llm_fn(prompt_template, system_prompt, context, user_query):
+            if "Revise" in prompt_template.template and next(counter) % 2 == 0:
+                raise RuntimeError("LLM call failed")
+            return f"revised: {INSTRUCTION}"
+
+        config = get_config(num_candidates=4, user_model_max_retries=1)
+        pipeline = RepromptingPipeline(llm_fn=llm_fn, config=config)
+        fake_detect.install(pipeline.detect)
+
+        result = pipeline.run("", "context", "query", [INSTRUCTION])
+        assert result["best_response"] == f"revised: {INSTRUCTION}"
+
+    def test_invalid_num_candidates(self):
+        with pytest.raises(ValueError):
+            RepromptingPipeline(llm_fn=make_llm(), config=get_config(num_candidates=0))
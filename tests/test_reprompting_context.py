@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from aimon.reprompting_api.config import RepromptingConfig
+from aimon.reprompting_api.context import (
+    ContextPruner,
+    estimate_tokens,
+    lexical_scores,
+    select_passages,
+    split_passages,
+)
+from aimon.reprompting_api.pipeline import RepromptingPipeline
+
+INSTRUCTION = "Mention the Seine"
+PASSAGES = [
+    "Berlin is the capital of Germany and sits on the Spree.",
+    "Paris is the capital of France. The Seine river flows through Paris.",
+    "Madrid is the capital of Spain and has a dry climate.",
+    "Rome is the capital of Italy and is built on seven hills.",
+]
+CONTEXT = "\n\n".join(PASSAGES)
+
+
+def get_config(**kwargs):
+    options = dict(
+        aimon_api_key="test",
+        publish=False,
+        return_telemetry=True,
+        return_aimon_summary=True,
+        application_name="api_test",
+        max_iterations=2,
+        context_token_budget=20,
+    )
+    options.update(kwargs)
+    return RepromptingConfig(**options)
+
+
+def recording_llm(contexts):
+    def llm_fn(prompt_template, system_prompt, context, user_query):
+        contexts.append(context)
+        return "Paris." if len(contexts) == 1 else f"Paris. {INSTRUCTION}."
+
+    return llm_fn
+
+
+class TestContextPruning:
+    """Test suite for passage scoring and selection."""
+
+    def test_split_passages(self):
+        assert split_passages("a\n\n  b \n \n\nc") == ["a", "b", "c"]
+
+    def test_lexical_scores_rank_relevant_passage_first(self):
+        scores = lexical_scores("Seine river in Paris", PASSAGES)
+        assert max(range(len(scores)), key=scores.__getitem__) == 1
+
+    def test_select_passages_keeps_original_order_within_budget(self):
+        selected = select_passages(["aaaa", "bbbb", "cccc"], [1.0, 3.0, 2.0], token_budget=3)
+        assert selected == "bbbb\n\ncccc"
+
+    def test_select_passages_truncates_a_passage_larger_than_budget(self):
+        assert select_passages(["x" * 100], [1.0], token_budget=5) == "x" * 20
+
+    def test_context_within_budget_is_unchanged(self):
+        pruner = ContextPruner(token_budget=estimate_tokens(CONTEXT))
+        assert pruner.prune(CONTEXT, "anything") == CONTEXT
+
+    def test_rerank_scorer(self):
+        requests = []
+
+        def rerank(**kwargs):
+            requests.append(kwargs)
+            return [[0.0, 0.1, 0.9, 0.2]]
+
+        pruner = ContextPruner(token_budget=20, scorer="rerank")
+        assert pruner.prune(CONTEXT, "query", ["Mention Spain"], rerank=rerank) == PASSAGES[2]
+        assert requests[0]["queries"] == ["query\nMention Spain"]
+
+    def test_rerank_scorer_without_callable(self):
+        pruner = ContextPruner(token_budget=20, scorer="rerank")
+        with pytest.raises(ValueError, match="rerank callable"):
+            pruner.prune(CONTEXT, "query")
+        with pytest.raises(ValueError, match="rerank callable"):
+            asyncio.run(pruner.aprune(CONTEXT, "query", rerank=None))
+
+    def test_invalid_scorer(self):
+        with pytest.raises(ValueError):
+            ContextPruner(token_budget=10, scorer="semantic")
+
+
+class TestPipelineContextPruning:
+    """Offline tests for pruning the context of corrective prompts."""
+
+    def test_corrective_call_gets_pruned_context(self, fake_detect):
+        contexts = []
+        pipeline = RepromptingPipeline(llm_fn=recording_llm(contexts), config=get_config())
+        fake_detect.install(pipeline.detect)
+
+        result = pipeline.run("", CONTEXT, "Which river flows through Paris?", [INSTRUCTION])
+
+        assert contexts[0] == CONTEXT
+        assert contexts[-1] == PASSAGES[1]
+        # AIMon keeps evaluating against the full context
+        assert all(PASSAGES[0] in request["context"] for request in fake_detect.requests)
+        assert INSTRUCTION in result["best_response"]
+
+    def test_rerank_scorer_uses_the_rerank_endpoint(self, fake_detect):
+        contexts = []
+        pipeline = RepromptingPipeline(llm_fn=recording_llm(contexts), config=get_config(context_scorer="rerank"))
+        fake_detect.install(pipeline.detect)
+
+        pipeline.run("", CONTEXT, "Which river flows through Paris?", [INSTRUCTION])
+
+        assert len(fake_detect.rerank_requests) == 1
+        assert fake_detect.rerank_requests[0]["context_docs"] == PASSAGES
+        assert contexts[-1] == PASSAGES[1]
+
+    def test_async_pruning(self, fake_detect):
+        contexts = []
+
+        async def llm_fn(prompt_template, system_prompt, context, user_query):
+            contexts.append(context)
+            return "Paris." if len(contexts) == 1 else f"Paris. {INSTRUCTION}."
+
+        pipeline = RepromptingPipeline(llm_fn=llm_fn, config=get_config(context_scorer="rerank"))
+        fake_detect.install(pipeline.detect)
+
+        asyncio.run(pipeline.arun("", CONTEXT, "Which river flows through Paris?", [INSTRUCTION]))
+
+        assert contexts == [CONTEXT, PASSAGES[1]]
@@ -0,0 +1,207 @@
+import asyncio
+import threading
+import time
+from string import Template
+
+import pytest
+
+from aimon.reprompting_api.config import RepromptingConfig, StopReasons
+from aimon.reprompting_api.latency import LatencyEstimator
+from aimon.reprompting_api import runner
+from aimon.reprompting_api.pipeline import RepromptingPipeline
+from aimon.reprompting_api.utils import (
+    DeadlineExceeded,
+    async_retry,
+    await_with_deadline,
+    call_with_deadline,
+    hold_slot,
+    retry,
+)
+
+INSTRUCTION = "Mention Paris"
+
+
+def get_config(**kwargs):
+    options = dict(
+        aimon_api_key="test",
+        publish=False,
+        return_telemetry=True,
+        return_aimon_summary=True,
+        application_name="api_test",
+        max_iterations=3,
+    )
+    options.update(kwargs)
+    return RepromptingConfig(**options)
+
+
+def fill(prompt_template: Template, system_prompt, context, user_query) -> str:
+    return prompt_template.safe_substitute(system_prompt=system_prompt, context=context, user_query=user_query)
+
+
+class TestDeadlineHelpers:
+    """Test suite for deadline-bounded calls and retries."""
+
+    def test_call_with_deadline_returns_result(self):
+        assert call_with_deadline(lambda x: x * 2, time.monotonic() + 1, 21) == 42
+        assert call_with_deadline(lambda: "direct", None) == "direct"
+
+    def test_call_with_deadline_re_raises_errors(self):
+        def fail():
+            raise KeyError("boom")
+
+        with pytest.raises(KeyError):
+            call_with_deadline(fail, time.monotonic() + 1)
+
+    def test_call_with_deadline_gives_up_on_slow_call(self):
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            call_with_deadline(time.sleep, start + 0.05, 1)
+        assert time.monotonic() - start < 0.5
+
+    def test_await_with_deadline_cancels(self):
+        cancelled = []
+
+        async def slow():
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def main():
+            await await_with_deadline(slow(), time.monotonic() + 0.05)
+
+        with pytest.raises(DeadlineExceeded):
+            asyncio.run(main())
+        assert cancelled == [True]
+
+    def test_retry_stops_backing_off_at_deadline(self):
+        attempts = []
+
+        @retry(exception_to_check=ValueError, tries=5, delay=1, backoff=2, deadline=time.monotonic() + 0.5)
+        def always_fails():
+            attempts.append(1)
+            raise ValueError("boom")
+
+        start = time.monotonic()
+        with pytest.raises(ValueError, match="boom"):
+            always_fails()
+        assert len(attempts) == 1
+        assert time.monotonic() - start < 0.5
+
+    def test_async_retry_stops_backing_off_at_deadline(self):
+        attempts = []
+
+        @async_retry(exception_to_check=ValueError, tries=5, delay=1, backoff=2, deadline=time.monotonic() + 0.5)
+        async def always_fails():
+            attempts.append(1)
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            asyncio.run(always_fails())
+        assert len(attempts) == 1
+
+
+    def test_hold_slot_gives_up_at_deadline(self):
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+        with pytest.raises(DeadlineExceeded):
+            with hold_slot(slots, time.monotonic() + 0.05):
+                pass
+        slots.release()
+
+        with hold_slot(slots, time.monotonic() + 1):
+            assert not slots.acquire(blocking=False)
+        assert slots.acquire(blocking=False)
+
+
+class TestPipelineDeadline:
+    """Offline tests for returning the best response so far when the latency limit expires."""
+
+    def test_slow_corrective_call_returns_best_so_far(self, fake_detect):
+        calls = []
+
+        def llm_fn(prompt_template, system_prompt, context, user_query):
+            calls.append(1)
+            if len(calls) > 1:
+                time.sleep(2)
+            return "first draft"
+
+        pipeline = RepromptingPipeline(llm_fn=llm_fn, config=get_config(latency_limit_ms=300, user_model_max_retries=1))
+        pipeline.latency_priors = LatencyEstimator()
+        fake_detect.install(pipeline.detect)
+
+        start = time.monotonic()
+        result = pipeline.run("", "France facts", "What is the capital?", [INSTRUCTION])
+
+        assert time.monotonic() - start < 1
+        assert result["best_response"] == "first draft"
+        assert result["telemetry"][-1]["stop_reason"] == StopReasons.LATENCY_LIMIT_EXCEEDED
+
+    def test_slow_first_call_returns_error_placeholder(self, fake_detect):
+        def llm_fn(prompt_template, system_prompt, context, user_query):
+            time.sleep(2)
+            return "too late"
+
+        pipeline = RepromptingPipeline(llm_fn=llm_fn, config=get_config(latency_limit_ms=100))
+        fake_detect.install(pipeline.detect)
+
+        result = pipeline.run("", "France facts", "What is the capital?", [INSTRUCTION])
+
+        assert result["best_response"] == "[ERROR: No valid response]"
+        assert result["telemetry"][-1]["stop_reason"] == StopReasons.LATENCY_LIMIT_EXCEEDED
+        assert len(fake_detect.requests) == 0
+
+    def test_async_slow_corrective_call_is_cancelled(self, fake_detect):
+        calls = []
+
+        async def llm_fn(prompt_template, system_prompt, context, user_query):
+            calls.append(1)
+            if len(calls) > 1:
+                await asyncio.sleep(2)
+            return "first draft"
+
+        pipeline = RepromptingPipeline(llm_fn=llm_fn, config=get_config(latency_limit_ms=300, user_model_max_retries=1))
+        pipeline.latency_priors = LatencyEstimator()
+        fake_detect.install(pipeline.detect)
+
+        start = time.monotonic()
+        result = asyncio.run(pipeline.arun("", "France facts", "What is the capital?", [INSTRUCTION]))
+
+        assert time.monotonic() - start < 1
+        assert result["best_response"] == "first draft"
+        assert result["telemetry"][-1]["stop_reason"] == StopReasons.LATENCY_LIMIT_EXCEEDED
+
+    def test_concurrency_limit_holds_when_calls_overrun_the_deadline(self, monkeypatch, fake_detect):
+        lock = threading.Lock()
+        in_flight, peak, done = [], [], threading.Event()
+
+        def slow_llm(prompt_template, system_prompt, context, user_query):
+            with lock:
+                in_flight.append(1)
+                peak.append(len(in_flight))
+            time.sleep(0.3)
+            with lock:
+                in_flight.pop()
+                if not in_flight:
+                    done.set()
+            return "too late"
+
+        class FakePipeline(RepromptingPipeline):
+            def __init__(self, llm_fn, config):
+                super().__init__(llm_fn, config)
+                fake_detect.install(self.detect)
+
+        monkeypatch.setattr(runner, "RepromptingPipeline", FakePipeline)
+        config = get_config(latency_limit_ms=100, max_concurrent_llm_calls=2)
+        items = [(f"query {i}", None, None) for i in range(8)]
+
+        for _ in range(2):
+            results = list(runner.run_reprompting_batch(slow_llm, items, reprompting_config=config, max_concurrent_sessions=8))
+            assert all(r["telemetry"][-1]["stop_reason"] == StopReasons.LATENCY_LIMIT_EXCEEDED for r in results)
+            assert done.wait(2)
+            done.clear()
+
+        # abandoned calls keep their slots, and sessions that never got one did not call the LLM
+        assert max(peak) <= 2
+        assert len(peak) <= 4
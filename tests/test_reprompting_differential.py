@@ -0,0 +1,109 @@
+import asyncio
+
+from aimon.reprompting_api.config import RepromptingConfig, NO_CONTEXT_PLACEHOLDER
+from aimon.reprompting_api.pipeline import RepromptingPipeline
+from aimon.reprompting_api.utils import get_failed_instructions_count
+
+INSTRUCTIONS = ["Mention Paris", "Mention the Seine", "Mention the Louvre"]
+
+
+def get_config(**kwargs):
+    options = dict(
+        aimon_api_key="test",
+        publish=False,
+        return_telemetry=True,
+        return_aimon_summary=True,
+        application_name="api_test",
+        max_iterations=3,
+        differential_evaluation=True,
+    )
+    options.update(kwargs)
+    return RepromptingConfig(**options)
+
+
+def scripted_llm(*responses):
+    """LLM stand-in returning the given responses in order, then repeating the last one."""
+    remaining = list(responses)
+
+    def llm_fn(prompt_template, system_prompt, context, user_query):
+        return remaining.pop(0) if len(remaining) > 1 else remaining[0]
+
+    return llm_fn
+
+
+class TestDifferentialEvaluation:
+    """Offline tests for re-checking only failed instructions after the first iteration."""
+
+    def test_later_iterations_recheck_failed_instructions_and_one_pass(self, fake_detect):
+        llm_fn = scripted_llm("Mention Paris. Mention the Seine.", "Mention Paris. Mention the Seine. Mention the Louvre.")
+        pipeline = RepromptingPipeline(llm_fn=llm_fn, config=get_config())
+        fake_detect.install(pipeline.detect)
+
+        result = pipeline.run("", "France facts", "What is in Paris?", INSTRUCTIONS)
+
+        assert [r["instructions"] for r in fake_detect.requests] == [
+            INSTRUCTIONS,
+            ["Mention Paris", "Mention the Louvre"],
+        ]
+        assert result["summary"] == "2 iterations, 0 failed instructions remaining"
+        final_feedback = result["telemetry"][-1]
+        assert final_feedback["failed_instructions_count"] == 0
+
+    def test_cached_passes_are_merged_into_the_result(self, fake_detect):
+        pipeline = RepromptingPipeline(llm_fn=scripted_llm("x"), config=get_config(regression_check_instructions=0))
+        fake_detect.install(pipeline.detect)
+        payload = pipeline._build_aimon_payload("France facts", "query", INSTRUCTIONS, "Mention Paris. Mention the Seine.", "")
+        first = pipeline._detect_aimon_response(payload, 1)
+
+        payload = pipeline._build_aimon_payload("France facts", "query", INSTRUCTIONS, "Mention the Louvre.", "")
+        second = pipeline._detect_aimon_response(payload, 1, previous_result=first)
+
+        assert fake_detect.requests[-1]["instructions"] == ["Mention the Louvre"]
+        labels = [inst["label"] for inst in second.detect_response.instruction_adherence["instructions_list"]]
+        assert labels == [True, True, True]
+        assert get_failed_instructions_count(second) == 0
+
+    def test_adherence_score_is_the_servers_unless_merged(self, fake_detect):
+        pipeline = RepromptingPipeline(llm_fn=scripted_llm("x"), config=get_config(regression_check_instructions=0))
+        fake_detect.install(pipeline.detect)
+        payload = pipeline._build_aimon_payload("France facts", "query", INSTRUCTIONS, "Mention Paris. Mention the Seine.", "")
+        first = pipeline._detect_aimon_response(payload, 1)
+
+        payload = pipeline._build_aimon_payload("France facts", "query", INSTRUCTIONS, "Mention the Louvre.", "")
+        second = pipeline._detect_aimon_response(payload, 1, previous_result=first)
+
+        # the fake server always scores 1.0; a full evaluation keeps it
+        assert first.detect_response.instruction_adherence["score"] == 1.0
+        assert "score_source" not in first.detect_response.instruction_adherence
+        merged = second.detect_response.instruction_adherence
+        assert merged["score_source"] == "merged"
+        assert merged["score"] == sum(inst["follow_probability"] for inst in merged["instructions_list"]) / 3
+
+    def test_groundedness_skipped_without_context(self, fake_detect):
+        pipeline = RepromptingPipeline(llm_fn=scripted_llm("Mention Paris"), config=get_config())
+        fake_detect.install(pipeline.detect)
+
+        result = pipeline.run("", NO_CONTEXT_PLACEHOLDER, "What is the capital?", ["Mention Paris"])
+
+        assert "groundedness" not in fake_detect.requests[0]["config"]
+        assert result["best_response"] == "Mention Paris"
+        assert result["telemetry"][0]["scores"]["groundedness"] == 0.0
+
+    def test_async_run(self, fake_detect):
+        llm_fn = scripted_llm("Mention Paris. Mention the Seine.", "Mention Paris. Mention the Seine. Mention the Louvre.")
+        pipeline = RepromptingPipeline(llm_fn=llm_fn, config=get_config())
+        fake_detect.install(pipeline.detect)
+
+        result = asyncio.run(pipeline.arun("", "France facts", "What is in Paris?", INSTRUCTIONS))
+
+        assert fake_detect.requests[1]["instructions"] == ["Mention Paris", "Mention the Louvre"]
+        assert result["summary"] == "2 iterations, 0 failed instructions remaining"
+
+    def test_full_evaluation_by_default(self, fake_detect):
+        llm_fn = scripted_llm("Mention Paris. Mention the Seine.", "Mention Paris. Mention the Seine. Mention the Louvre.")
+        pipeline = RepromptingPipeline(llm_fn=llm_fn, config=get_config(differential_evaluation=False))
+        fake_detect.install(pipeline.detect)
+
+        pipeline.run("", "France facts", "What is in Paris?", INSTRUCTIONS)
+
+        assert [r["instructions"] for r in fake_detect.requests] == [INSTRUCTIONS, INSTRUCTIONS]
@@ -0,0 +1,99 @@
+import time
+from string import Template
+
+import pytest
+
+from aimon.reprompting_api.config import RepromptingConfig, StopReasons
+from aimon.reprompting_api.latency import DETECT_STAGE, LLM_STAGE, LatencyEstimator
+from aimon.reprompting_api.pipeline import RepromptingPipeline
+
+INSTRUCTION = "Mention Paris"
+
+
+def get_config(**kwargs):
+    options = dict(
+        aimon_api_key="test",
+        publish=False,
+        return_telemetry=True,
+        return_aimon_summary=True,
+        application_name="api_test",
+        max_iterations=5,
+    )
+    options.update(kwargs)
+    return RepromptingConfig(**options)
+
+
+def fill(prompt_template: Template, system_prompt, context, user_query) -> str:
+    return prompt_template.safe_substitute(system_prompt=system_prompt, context=context, user_query=user_query)
+
+
+class TestLatencyEstimator:
+    """Test suite for the per-stage EWMA latency estimator."""
+
+    def test_ewma_update(self):
+        estimator = LatencyEstimator(alpha=0.5)
+        estimator.record(LLM_STAGE, 100)
+        estimator.record(LLM_STAGE, 200)
+        assert estimator.estimate(LLM_STAGE) == pytest.approx(150)
+
+    def test_prediction_needs_both_stages(self):
+        estimator = LatencyEstimator()
+        estimator.record(LLM_STAGE, 100)
+        assert estimator.predict_iteration_ms() is None
+        estimator.record(DETECT_STAGE, 50)
+        assert estimator.predict_iteration_ms() == pytest.approx(150)
+
+    def test_falls_back_to_prior_and_feeds_it(self):
+        prior = LatencyEstimator()
+        prior.record(DETECT_STAGE, 40)
+        estimator = LatencyEstimator(prior=prior)
+        assert estimator.estimate(DETECT_STAGE) == pytest.approx(40)
+
+        estimator.record(LLM_STAGE, 80)
+        assert prior.estimate(LLM_STAGE) == pytest.approx(80)
+
+    def test_invalid_alpha(self):
+        with pytest.raises(ValueError):
+            LatencyEstimator(alpha=0)
+
+
+class TestLatencyScheduling:
+    """Offline tests for stopping on a predicted latency budget overrun."""
+
+    def test_stops_before_iteration_predicted_to_overrun(self, fake_detect):
+        def slow_llm(prompt_template, system_prompt, context, user_query):
+            time.sleep(0.15)
+            return "no instructions followed"
+
+        # One iteration takes ~150ms, so a second one would exceed the 250ms budget even
+        # though less than 75% of it is spent when the decision is made.
+        pipeline = RepromptingPipeline(llm_fn=slow_llm, config=get_config(latency_limit_ms=250))
+        pipeline.latency_priors = LatencyEstimator()
+        fake_detect.install(pipeline.detect)
+
+        result = pipeline.run("", "France facts", "What is the capital?", [INSTRUCTION])
+
+        assert len(result["telemetry"]) == 1
+        assert result["telemetry"][0]["stop_reason"] == StopReasons.LATENCY_LIMIT_EXCEEDED
+        assert result["telemetry"][0]["predicted_iteration_latency_ms"] >= 150
+
+    def test_continues_when_iteration_fits(self, fake_detect):
+        pipeline = RepromptingPipeline(llm_fn=fill, config=get_config(latency_limit_ms=60_000))
+        pipeline.latency_priors = LatencyEstimator()
+        fake_detect.install(pipeline.detect)
+
+        result = pipeline.run("", "France facts", "What is the capital?", [INSTRUCTION])
+
+        assert INSTRUCTION in result["best_response"]
+        assert result["telemetry"][-1]["stop_reason"] == StopReasons.ALL_INSTRUCTIONS_ADHERED
+        assert result["telemetry"][0]["predicted_iteration_latency_ms"] is not None
+
+    def test_falls_back_to_fraction_of_budget_without_prediction(self, fake_detect):
+        pipeline = RepromptingPipeline(llm_fn=fill, config=get_config(latency_limit_ms=100))
+        fake_detect.install(pipeline.detect)
+
+        time_start = time.time() - 0.09
+        should_stop, reason = pipeline._should_stop_reprompting(None, 1, time_start, None)
+
+        assert should_stop
+        assert reason == StopReasons.LATENCY_LIMIT_EXCEEDED
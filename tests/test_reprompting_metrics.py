@@ -0,0 +1,96 @@
+import random
+
+import pytest
+
+from aimon.reprompting_api.config import RepromptingConfig, StopReasons
+from aimon.reprompting_api.latency import DETECT_STAGE, LLM_STAGE
+from aimon.reprompting_api.metrics import QuantileSketch, RepromptingMetrics
+from aimon.reprompting_api.pipeline import RepromptingPipeline
+
+
+class TestQuantileSketch:
+    """Test suite for the streaming quantile sketch."""
+
+    def test_quantiles_within_relative_accuracy(self):
+        rng = random.Random(0)
+        values = [rng.lognormvariate(5, 1) for _ in range(20_000)]
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        values.sort()
+        for q in (0.5, 0.9, 0.99):
+            exact = values[int(q * (len(values) - 1))]
+            assert sketch.quantile(q) == pytest.approx(exact, rel=0.02)
+        assert sketch.count == len(values)
+        assert sketch.max == values[-1]
+
+    def test_memory_is_bounded(self):
+        sketch = QuantileSketch(relative_accuracy=0.01, max_buckets=50)
+        for exponent in range(-20, 20):
+            for step in range(50):
+                sketch.add(10 ** exponent * (1 + step / 50))
+        assert len(sketch._buckets) <= 50
+        assert sketch.quantile(1.0) == sketch.max
+
+    def test_zero_values(self):
+        sketch = QuantileSketch()
+        for value in (0.0, 0.0, 0.5, 0.5):
+            sketch.add(value)
+        assert sketch.quantile(0.25) == 0.0
+        assert sketch.quantile(0.9) == pytest.approx(0.5, rel=0.01)
+
+    def test_empty_sketch(self):
+        assert QuantileSketch().quantile(0.5) is None
+        assert QuantileSketch().summary()["min"] is None
+
+
+class TestRepromptingMetrics:
+    """Test suite for the run statistics aggregator."""
+
+    def test_snapshot_and_prometheus_export(self):
+        metrics = RepromptingMetrics()
+        metrics.record_run(iterations=1, stop_reason=StopReasons.ALL_INSTRUCTIONS_ADHERED, latency_ms=100, residual_error=0.0)
+        metrics.record_run(iterations=3, stop_reason=StopReasons.MAX_ITERATIONS_REACHED, latency_ms=300, residual_error=0.4)
+        metrics.record_stage(LLM_STAGE, 80)
+        metrics.record_stage(DETECT_STAGE, 20)
+
+        snapshot = metrics.snapshot()
+        assert snapshot["runs_by_stop_reason"] == {
+            StopReasons.ALL_INSTRUCTIONS_ADHERED: 1,
+            StopReasons.MAX_ITERATIONS_REACHED: 1,
+        }
+        assert snapshot["iterations"]["count"] == 2
+        assert snapshot["iterations"]["max"] == 3
+        assert snapshot["stage_latency_ms"][LLM_STAGE]["p50"] == pytest.approx(80, rel=0.01)
+
+        text = metrics.to_prometheus()
+        assert 'aimon_reprompting_runs_total{stop_reason="max_iterations_reached"} 1' in text
+        assert 'aimon_reprompting_stage_latency_ms{stage="detect",quantile="0.5"}' in text
+        assert 'aimon_reprompting_stage_latency_ms_count{stage="llm"} 1' in text
+        assert "aimon_reprompting_iterations_sum 4.0" in text
+
+    def test_reset(self):
+        metrics = RepromptingMetrics()
+        metrics.record_stage(LLM_STAGE, 1)
+        metrics.reset()
+        assert metrics.snapshot()["stage_latency_ms"] == {}
+
+
+def test_pipeline_feeds_metrics(fake_detect):
+    def llm_fn(prompt_template, system_prompt, context, user_query):
+        return "Mention Paris"
+
+    config = RepromptingConfig(aimon_api_key="test", publish=False, application_name="api_test")
+    pipeline = RepromptingPipeline(llm_fn=llm_fn, config=config)
+    pipeline.metrics = RepromptingMetrics()
+    fake_detect.install(pipeline.detect)
+
+    for _ in range(3):
+        pipeline.run("", "France facts", "What is the capital?", ["Mention Paris"])
+
+    snapshot = pipeline.metrics.snapshot()
+    assert snapshot["runs_by_stop_reason"] == {StopReasons.ALL_INSTRUCTIONS_ADHERED: 3}
+    assert snapshot["residual_error"]["max"] == 0.0
+    assert snapshot["stage_latency_ms"][LLM_STAGE]["count"] == 3
+    assert snapshot["stage_latency_ms"][DETECT_STAGE]["count"] == 3
@@ -0,0 +1,145 @@
+import gc
+import json
+import queue
+import weakref
+
+import pytest
+
+from aimon.reprompting_api.config import RepromptingConfig
+from aimon.reprompting_api.pipeline import RepromptingPipeline
+from aimon.reprompting_api.telemetry import (
+    CallbackSink,
+    JSONLFileSink,
+    RingBufferSink,
+    TelemetryLogger,
+    TelemetrySink,
+    shrink_text,
+)
+from aimon.reprompting_api import telemetry
+
+
+def emit(logger, iteration=1, prompt="prompt", response_text="response"):
+    logger.emit(
+        iteration=iteration,
+        cumulative_latency_ms=1.0,
+        scores={},
+        response_feedback=[],
+        residual_error=0.0,
+        failed_instructions_count=0,
+        stop_reason="done",
+        response_text=response_text,
+        prompt=prompt,
+    )
+
+
+class TestTelemetrySinks:
+    """Test suite for telemetry sinks and bounded text fields."""
+
+    def test_ring_buffer_keeps_most_recent_entries(self):
+        sink = RingBufferSink(maxlen=3)
+        logger = TelemetryLogger(sinks=[sink])
+        for i in range(10):
+            emit(logger, iteration=i)
+        assert [entry["iteration"] for entry in sink.get_all()] == [7, 8, 9]
+
+    def test_jsonl_sink_buffers_writes(self, tmp_path):
+        path = tmp_path / "telemetry.jsonl"
+        sink = JSONLFileSink(str(path), buffer_size=2)
+        logger = TelemetryLogger(sinks=[sink])
+
+        emit(logger, iteration=1)
+        assert not path.exists()
+        emit(logger, iteration=2)
+        emit(logger, iteration=3)
+        sink.flush()
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["iteration"] for line in lines] == [1, 2, 3]
+        assert lines[0]["_session_id"] == logger.session_id
+
+    def test_jsonl_sink_is_not_kept_alive_until_exit(self, tmp_path):
+        path = tmp_path / "telemetry.jsonl"
+        with JSONLFileSink(str(path)) as sink:
+            emit(TelemetryLogger(sinks=[sink]))
+            assert sink in telemetry._OPEN_FILE_SINKS
+        assert sink not in telemetry._OPEN_FILE_SINKS
+        assert len(path.read_text().splitlines()) == 1
+
+        sink = JSONLFileSink(str(path))
+        emit(TelemetryLogger(sinks=[sink]))
+        ref = weakref.ref(sink)
+        del sink
+        gc.collect()
+        assert ref() is None
+        assert len(path.read_text().splitlines()) == 2
+
+    def test_sinks_must_implement_write(self):
+        with pytest.raises(TypeError):
+            TelemetrySink()
+
+    def test_callback_sink_with_queue(self):
+        entries = queue.Queue()
+        logger = TelemetryLogger(sinks=[CallbackSink(entries.put_nowait)])
+        emit(logger)
+        assert entries.get_nowait()["response_text"] == "response"
+
+    def test_failing_sink_does_not_stop_other_sinks(self):
+        def broken(entry):
+            raise RuntimeError("down")
+
+        ring = RingBufferSink()
+        logger = TelemetryLogger(sinks=[CallbackSink(broken), ring])
+        emit(logger)
+        assert len(ring.get_all()) == 1
+
+    def test_text_fields_are_truncated(self):
+        logger = TelemetryLogger(max_text_chars=5)
+        emit(logger, prompt="p" * 8, response_text="short")
+        entry = logger.get_all()[0]
+        assert entry["prompt_template"] == "ppppp...[3 more chars]"
+        assert entry["response_text"] == "short"
+
+    def test_text_fields_are_hashed(self):
+        assert shrink_text("abc", hash_text=True) == (
+            "sha256:ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad"
+        )
+        assert shrink_text(None, max_chars=1) is None
+
+    def test_memory_store_is_bounded(self):
+        ring = RingBufferSink()
+        logger = TelemetryLogger(sinks=[ring], max_entries=2)
+        for iteration in range(1, 4):
+            emit(logger, iteration=iteration)
+        assert [entry["iteration"] for entry in logger.get_all(include_meta=True)] == [2, 3]
+        assert len(ring.get_all()) == 3
+        with pytest.raises(ValueError):
+            TelemetryLogger(max_entries=-1)
+
+    def test_invalid_ring_size(self):
+        with pytest.raises(ValueError):
+            RingBufferSink(maxlen=0)
+
+
+def test_pipeline_writes_to_configured_sinks(fake_detect):
+    def llm_fn(prompt_template, system_prompt, context, user_query):
+        return "Mention Paris"
+
+    ring = RingBufferSink(maxlen=100)
+    config = RepromptingConfig(
+        aimon_api_key="test",
+        publish=False,
+        return_telemetry=True,
+        application_name="api_test",
+        telemetry_sinks=[ring],
+        telemetry_hash_text=True,
+    )
+    pipeline = RepromptingPipeline(llm_fn=llm_fn, config=config)
+    fake_detect.install(pipeline.detect)
+
+    pipeline.run("", "France facts", "What is the capital?", ["Mention Paris"])
+    pipeline.run("", "France facts", "What is the capital?", ["Mention Paris"])
+
+    entries = ring.get_all()
+    assert len(entries) == 2
+    assert len({entry["_session_id"] for entry in entries}) == 2
+    assert all(entry["response_text"].startswith("sha256:") for entry in entries)
@@ -8,8 +8,16 @@ from aimon.reprompting_api.utils import (
     get_failed_instructions_count,
     get_residual_error_score,
     penalized_average,
+    batch_toxicity_check,
+    batch_failed_instructions_count,
+    batch_penalized_average,
+    batch_residual_error_score,
+    flatten_detection_results,
     TOXICITY_THRESHOLD
 )
+import random
+from types import SimpleNamespace
+from aimon.reprompting_api import utils
 
 
 class TestToxicityThreshold:
@@ -453,6 +461,64 @@ class TestEdgeCases:
         assert _count_toxicity_failures(result) == 1
 
 
+def _random_result(rng):
+    def instructions(n, labelled=True):
+        items = []
+        for _ in range(n):
+            item = {"instruction": "x", "follow_probability": round(rng.random(), rng.choice([1, 2, 3]))}
+            if labelled and rng.random() < 0.8:
+                item["label"] = item["follow_probability"] >= 0.5
+            items.append(item)
+        return {"instructions_list": items}
+
+    return SimpleNamespace(detect_response=SimpleNamespace(
+        instruction_adherence=instructions(rng.randint(0, 4)),
+        groundedness=instructions(rng.randint(0, 2)),
+        toxicity=instructions(rng.randint(0, 2), labelled=False),
+    ))
+
+
+@pytest.fixture(params=["numpy", "python"])
+def batch_backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(utils, "np", None)
+    return request.param
+
+
+class TestBatchScoring:
+    """Test suite for the batch scoring functions, with and without NumPy."""
+
+    def test_matches_scalar_functions(self, batch_backend):
+        rng = random.Random(7)
+        results = [_random_result(rng) for _ in range(500)]
+        flat = flatten_detection_results(results)
+
+        assert batch_residual_error_score(flat) == [get_residual_error_score(r) for r in results]
+        assert batch_failed_instructions_count(flat) == [get_failed_instructions_count(r) for r in results]
+        assert batch_toxicity_check(results) == [toxicity_check(r) for r in results]
+
+    def test_penalized_average_matches_scalar(self, batch_backend):
+        prob_lists = [[0.1, 0.9], [], [0.5], [0.3, 0.2, 0.7], [0.45] * 10, [0.1, 0.45] * 7]
+        expected = [penalized_average(p) for p in prob_lists]
+        assert batch_penalized_average(prob_lists) == pytest.approx(expected, rel=1e-15)
+
+    def test_empty_batch(self, batch_backend):
+        assert batch_residual_error_score([]) == []
+        assert batch_failed_instructions_count([]) == []
+        assert batch_toxicity_check([]) == []
+
+    def test_missing_toxicity_probability_is_a_failure(self, batch_backend):
+        result = SimpleNamespace(detect_response=SimpleNamespace(
+            instruction_adherence={}, groundedness={}, toxicity={"instructions_list": [{"instruction": "x"}]},
+        ))
+        assert batch_toxicity_check([result]) == [True]
+        assert batch_failed_instructions_count([result]) == [1]
+        with pytest.raises(KeyError):
+            batch_residual_error_score([result])
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 
@@ -0,0 +1,122 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from aimon import Client, RequestCompression
+
+PAYLOAD = [{"context": "Paris is the capital and most populous city of France. " * 2000, "generated_text": "Paris."}]
+
+
+class StandInServer:
+    """Local HTTP server decoding request bodies like the API would, recording wire sizes."""
+
+    def __init__(self, fail_first=0):
+        self.wire_sizes = []
+        self.encodings = []
+        self.bodies = []
+        self.fail_first = fail_first
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers["Content-Length"]))
+                encoding = self.headers.get("Content-Encoding")
+                server.wire_sizes.append(len(raw))
+                server.encodings.append(encoding)
+                server.bodies.append(json.loads(gzip.decompress(raw) if encoding == "gzip" else raw))
+                status = 500 if len(server.wire_sizes) <= server.fail_first else 200
+                body = b'{"ok": true}'
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def client(self, **kwargs):
+        host, port = self.httpd.server_address
+        return Client(auth_header="Bearer test", base_url=f"http://{host}:{port}", **kwargs)
+
+
+class TestRequestCompression:
+    def test_reduces_bytes_on_the_wire(self):
+        with StandInServer() as server:
+            server.client().post("/v2/detect", cast_to=object, body=PAYLOAD)
+            server.client(compression=RequestCompression("gzip")).post("/v2/detect", cast_to=object, body=PAYLOAD)
+
+        plain, compressed = server.wire_sizes
+        assert server.encodings == [None, "gzip"]
+        assert server.bodies[0] == server.bodies[1] == PAYLOAD
+        assert compressed * 10 < plain
+
+    def test_small_bodies_are_not_compressed(self):
+        with StandInServer() as server:
+            server.client(compression=RequestCompression("gzip", threshold=1024)).post(
+                "/v2/detect", cast_to=object, body={"user_query": "hi"}
+            )
+
+        assert server.encodings == [None]
+
+    def test_compressed_once_across_retries(self, monkeypatch):
+        compression = RequestCompression("gzip", threshold=0)
+        calls = []
+        original = compression.compress
+        monkeypatch.setattr(compression, "compress", lambda body: calls.append(1) or original(body))
+
+        with StandInServer(fail_first=2) as server:
+            client = server.client(compression=compression, max_retries=2)
+            client._calculate_retry_timeout = lambda *args, **kwargs: 0
+            client.post("/v2/detect", cast_to=object, body=PAYLOAD)
+
+        assert len(server.wire_sizes) == 3
+        assert server.encodings == ["gzip"] * 3
+        assert len(calls) == 1
+
+    def test_explicit_content_encoding_is_respected(self):
+        seen = []
+
+        def handler(request):
+            seen.append((request.headers.get("content-encoding"), request.read()))
+            return httpx.Response(200, json={})
+
+        client = Client(
+            auth_header="Bearer test",
+            base_url="http://aimon.test",
+            http_client=httpx.Client(transport=httpx.MockTransport(handler)),
+            compression=RequestCompression("gzip", threshold=0),
+            default_headers={"Content-Encoding": "identity"},
+        )
+        client.post("/v2/detect", cast_to=object, body={"a": 1})
+
+        assert seen == [("identity", b'{"a":1}')]
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            RequestCompression("brotli")
+        with pytest.raises(ValueError):
+            RequestCompression(threshold=-1)
+
+    def test_zstd(self):
+        try:
+            compression = RequestCompression("zstd", threshold=0)
+        except ImportError:
+            pytest.skip("zstd is not available")
+        assert compression.content_encoding == "zstd"
+        assert len(compression.compress(json.dumps(PAYLOAD).encode())) < 10000
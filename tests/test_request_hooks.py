@@ -0,0 +1,190 @@
+import time
+import asyncio
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from aimon import APIConnectionError, AsyncClient, BadRequestError, Client, RequestHooks, RequestTimings
+
+BODY = [{"context": "Paris is the capital of France.", "generated_text": "Paris."}]
+
+
+class RecordingHooks(RequestHooks):
+    def __init__(self):
+        self.events = []
+
+    def on_request(self, request, *, retries_taken):
+        self.events.append(("request", retries_taken))
+
+    def on_response(self, response, *, timings, retries_taken):
+        self.events.append(("response", response.status_code, retries_taken))
+        self.timings = timings
+
+    def on_retry(self, request, *, retries_taken, delay, response, error):
+        self.events.append(("retry", retries_taken, response.status_code if response is not None else type(error)))
+
+    def on_error(self, request, error, *, timings, retries_taken):
+        self.events.append(("error", type(error), retries_taken))
+        self.timings = timings
+
+
+class SlowServer:
+    """Local HTTP server answering every request after `delay` seconds."""
+
+    def __init__(self, delay=0.05):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                time.sleep(delay)
+                body = b'[{"result": {"groundedness": {"score": 0.9}}}]'
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        host, port = self.httpd.server_address
+        self.base_url = f"http://{host}:{port}"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = SlowServer()
+    yield server
+    server.close()
+
+
+def mock_client(handler, cls=Client, http_cls=httpx.Client, **kwargs):
+    client = cls(
+        auth_header="Bearer test",
+        base_url="http://aimon.test",
+        http_client=http_cls(transport=httpx.MockTransport(handler)),
+        **kwargs,
+    )
+    client._calculate_retry_timeout = lambda *args, **kwargs: 0
+    return client
+
+
+def assert_phases(timings, *, new_connection):
+    assert timings.transform is not None and timings.transform > 0
+    assert timings.serialize is not None and timings.serialize > 0
+    assert timings.pool_wait is not None and timings.pool_wait >= 0
+    assert (timings.connect is not None) == new_connection
+    assert timings.tls is None
+    assert timings.server >= 0.04
+    assert timings.network >= timings.server
+    assert timings.parse is not None and timings.construct is not None
+
+
+class TestTimings:
+    def test_phases_of_a_detect_call(self, server):
+        hooks = RecordingHooks()
+        client = Client(auth_header="Bearer test", base_url=server.base_url, hooks=[hooks])
+
+        client.inference.detect(body=BODY)
+        assert_phases(hooks.timings, new_connection=True)
+
+        client.inference.detect(body=BODY)
+        assert_phases(hooks.timings, new_connection=False)
+        assert hooks.events == [("request", 0), ("response", 200, 0)] * 2
+
+    def test_async_client(self, server):
+        hooks = RecordingHooks()
+
+        async def main():
+            async with AsyncClient(auth_header="Bearer test", base_url=server.base_url, hooks=[hooks]) as client:
+                await client.inference.detect(body=BODY)
+
+        asyncio.run(main())
+        assert_phases(hooks.timings, new_connection=True)
+
+    def test_exposed_on_raw_responses(self, server):
+        client = Client(auth_header="Bearer test", base_url=server.base_url)
+
+        response = client.inference.with_raw_response.detect(body=BODY)
+        assert isinstance(response.timings, RequestTimings)
+        assert response.timings.network is not None
+        assert response.timings.parse is None
+
+        response.parse()
+        assert response.timings.parse is not None
+        assert set(response.timings.as_dict()) == {
+            "transform", "serialize", "pool_wait", "connect", "tls", "server", "network", "parse", "construct", "total"
+        }
+
+    def test_transports_without_trace_events(self):
+        hooks = RecordingHooks()
+        client = mock_client(lambda request: httpx.Response(200, json={"ok": True}), hooks=[hooks])
+
+        client.post("/v1/thing", cast_to=object, body={})
+        assert hooks.timings.network is not None
+        assert hooks.timings.pool_wait is None and hooks.timings.server is None
+        assert hooks.timings.transform is None
+
+
+class TestHooks:
+    def test_retries_and_success(self):
+        responses = iter([httpx.Response(503, json={}), httpx.Response(200, json={"ok": True})])
+        hooks = RecordingHooks()
+        client = mock_client(lambda request: next(responses), hooks=[hooks], max_retries=1)
+
+        client.post("/v1/thing", cast_to=object, body={})
+        assert hooks.events == [("request", 0), ("retry", 0, 503), ("request", 1), ("response", 200, 1)]
+
+    def test_status_error(self):
+        hooks = RecordingHooks()
+        client = mock_client(lambda request: httpx.Response(400, json={}), hooks=[hooks])
+
+        with pytest.raises(BadRequestError):
+            client.post("/v1/thing", cast_to=object, body={})
+        assert hooks.events == [("request", 0), ("error", BadRequestError, 0)]
+
+    def test_connection_error_after_retries(self):
+        def handler(request):
+            raise httpx.ConnectError("refused")
+
+        hooks = RecordingHooks()
+        client = mock_client(handler, hooks=[hooks], max_retries=1)
+
+        with pytest.raises(APIConnectionError):
+            client.post("/v1/thing", cast_to=object, body={})
+        assert hooks.events == [
+            ("request", 0),
+            ("retry", 0, httpx.ConnectError),
+            ("request", 1),
+            ("error", APIConnectionError, 1),
+        ]
+        assert hooks.timings.network is not None
+
+    def test_failing_hook_does_not_fail_the_request(self, caplog):
+        class Broken(RequestHooks):
+            def on_response(self, response, *, timings, retries_taken):
+                raise ValueError("boom")
+
+        hooks = RecordingHooks()
+        client = mock_client(lambda request: httpx.Response(200, json={"ok": True}), hooks=[Broken(), hooks])
+
+        with caplog.at_level(logging.ERROR, logger="aimon._base_client"):
+            assert client.post("/v1/thing", cast_to=object, body={}) == {"ok": True}
+        assert "boom" in caplog.text
+        assert hooks.events[-1] == ("response", 200, 0)
+
+    def test_hooks_are_kept_by_copies(self):
+        hooks = RecordingHooks()
+        client = mock_client(lambda request: httpx.Response(200, json={}), hooks=[hooks])
+        assert client.with_options(max_retries=0).hooks == (hooks,)
+        assert client.copy(hooks=[]).hooks == ()
@@ -0,0 +1,112 @@
+import asyncio
+
+import httpx
+
+from aimon import AsyncClient, Client
+from aimon._models import FinalRequestOptions
+
+
+class RecordingServer:
+    """Fails the first `fail_first` requests with a 500, then returns 200."""
+
+    def __init__(self, fail_first=0):
+        self.fail_first = fail_first
+        self.requests = []
+
+    def handler(self, request):
+        self.requests.append(request)
+        if len(self.requests) <= self.fail_first:
+            return httpx.Response(500, json={"message": "try again"})
+        return httpx.Response(200, json={"ok": True})
+
+
+def make_client(server, cls=Client, http_cls=httpx.Client, **kwargs):
+    client = cls(
+        auth_header="Bearer test",
+        base_url="http://aimon.test/api",
+        http_client=http_cls(transport=httpx.MockTransport(server.handler)),
+        **kwargs,
+    )
+    client._calculate_retry_timeout = lambda *args, **kwargs: 0
+    return client
+
+
+class TestRequestHotPath:
+    def test_retries_get_fresh_retry_count_headers(self):
+        server = RecordingServer(fail_first=2)
+        make_client(server, max_retries=2).post("/v1/thing", cast_to=object, body={})
+
+        assert [r.headers["x-stainless-retry-count"] for r in server.requests] == ["0", "1", "2"]
+        assert all(str(r.url) == "http://aimon.test/api/v1/thing" for r in server.requests)
+
+    def test_cached_default_headers_are_not_mutated(self):
+        server = RecordingServer()
+        client = make_client(server)
+        client.post("/v1/thing", cast_to=object, body={}, options={"headers": {"X-Extra": "1"}})
+        client.post("/v1/thing", cast_to=object, body={})
+
+        assert server.requests[0].headers["x-extra"] == "1"
+        assert "x-extra" not in server.requests[1].headers
+        assert client._build_default_headers().get("x-stainless-retry-count") is None
+
+    def test_default_header_changes_are_picked_up(self):
+        server = RecordingServer()
+        client = make_client(server)
+        client.post("/v1/thing", cast_to=object, body={})
+        client.auth_header = "Bearer rotated"
+        client.post("/v1/thing", cast_to=object, body={})
+
+        assert [r.headers["authorization"] for r in server.requests] == ["Bearer test", "Bearer rotated"]
+
+    def test_default_headers_are_only_rebuilt_after_a_change(self):
+        builds = []
+
+        class CountingClient(Client):
+            @property
+            def default_headers(self):
+                builds.append(1)
+                return super().default_headers
+
+        server = RecordingServer()
+        client = make_client(server, cls=CountingClient)
+        builds.clear()
+        for _ in range(3):
+            client.post("/v1/thing", cast_to=object, body={})
+        assert len(builds) == 1
+
+        client._custom_headers = {"X-Team": "search"}
+        client.post("/v1/thing", cast_to=object, body={})
+        assert len(builds) == 2
+        assert server.requests[-1].headers["x-team"] == "search"
+
+    def test_base_url_changes_are_picked_up(self):
+        server = RecordingServer()
+        client = make_client(server)
+        client.post("/v1/thing", cast_to=object, body={})
+        client.base_url = "http://other.test/v2"
+        client.post("/v1/thing", cast_to=object, body={})
+
+        assert [str(r.url) for r in server.requests] == ["http://aimon.test/api/v1/thing", "http://other.test/v2/v1/thing"]
+
+    def test_prepare_options_override_gets_a_fresh_copy_per_attempt(self):
+        seen = []
+
+        class MutatingClient(Client):
+            def _prepare_options(self, options: FinalRequestOptions) -> FinalRequestOptions:
+                seen.append(options.headers)
+                options.headers = {"X-Attempt": str(len(seen))}
+                return options
+
+        server = RecordingServer(fail_first=1)
+        make_client(server, cls=MutatingClient, max_retries=1).post("/v1/thing", cast_to=object, body={})
+
+        assert len(seen) == 2
+        assert all(not headers for headers in seen)
+        assert [r.headers["x-attempt"] for r in server.requests] == ["1", "2"]
+
+    def test_async_client(self):
+        server = RecordingServer(fail_first=1)
+        client = make_client(server, cls=AsyncClient, http_cls=httpx.AsyncClient, max_retries=1)
+        asyncio.run(client.post("/v1/thing", cast_to=object, body={}))
+
+        assert [r.headers["x-stainless-retry-count"] for r in server.requests] == ["0", "1"]
@@ -0,0 +1,87 @@
+import json
+
+import httpx
+import pytest
+
+from aimon import Client, RerankCache
+
+TASK = "Grade the relevance of the context document against the user query."
+
+
+def make_client(cache, requests):
+    """Client backed by a mock transport that scores each pair as len(query) + len(doc)."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        requests.append(body)
+        scores = [[float(len(q) + len(d)) for d in body["context_docs"]] for q in body["queries"]]
+        return httpx.Response(200, json=scores)
+
+    return Client(
+        auth_header="Bearer test",
+        base_url="http://localhost",
+        http_client=httpx.Client(transport=httpx.MockTransport(handler)),
+        rerank_cache=cache,
+    )
+
+
+class TestRerankCache:
+    """Test suite for the client-side rerank score cache."""
+
+    def test_full_hit_skips_the_api(self):
+        requests = []
+        client = make_client(RerankCache(), requests)
+        first = client.retrieval.rerank(queries=["q1"], context_docs=["a", "bb"], task_definition=TASK)
+        second = client.retrieval.rerank(queries=["q1"], context_docs=["a", "bb"], task_definition=TASK)
+        assert first == second == [[3.0, 4.0]]
+        assert len(requests) == 1
+
+    def test_partial_hit_only_sends_uncached_docs(self):
+        requests = []
+        client = make_client(RerankCache(), requests)
+        client.retrieval.rerank(queries=["q1"], context_docs=["a", "bb"], task_definition=TASK)
+        scores = client.retrieval.rerank(queries=["q1"], context_docs=["ccc", "a", "bb"], task_definition=TASK)
+        assert scores == [[5.0, 3.0, 4.0]]
+        assert requests[-1]["context_docs"] == ["ccc"]
+        assert requests[-1]["queries"] == ["q1"]
+
+    def test_key_includes_task_definition_and_model_type(self):
+        requests = []
+        client = make_client(RerankCache(), requests)
+        client.retrieval.rerank(queries=["q1"], context_docs=["a"], task_definition=TASK)
+        client.retrieval.rerank(queries=["q1"], context_docs=["a"], task_definition="other task")
+        client.retrieval.rerank(queries=["q1"], context_docs=["a"], task_definition=TASK, model_type="m")
+        assert len(requests) == 3
+
+    def test_raw_response_bypasses_the_cache(self):
+        requests = []
+        client = make_client(RerankCache(), requests)
+        client.retrieval.rerank(queries=["q1"], context_docs=["a"], task_definition=TASK)
+        raw = client.retrieval.with_raw_response.rerank(queries=["q1"], context_docs=["a"], task_definition=TASK)
+        assert raw.parse() == [[3.0]]
+        assert len(requests) == 2
+
+    def test_lru_eviction(self):
+        requests = []
+        client = make_client(RerankCache(maxsize=2), requests)
+        client.retrieval.rerank(queries=["q1"], context_docs=["a", "b", "c"], task_definition=TASK)
+        assert len(client.rerank_cache) == 2
+        client.retrieval.rerank(queries=["q1"], context_docs=["a"], task_definition=TASK)
+        assert requests[-1]["context_docs"] == ["a"]
+
+    def test_persistence_round_trip(self, tmp_path):
+        path = tmp_path / "rerank.json"
+        requests = []
+        cache = RerankCache(path=path)
+        make_client(cache, requests).retrieval.rerank(queries=["q1"], context_docs=["a"], task_definition=TASK)
+        cache.save()
+
+        reloaded = RerankCache(path=path)
+        scores = make_client(reloaded, requests).retrieval.rerank(
+            queries=["q1"], context_docs=["a"], task_definition=TASK
+        )
+        assert scores == [[3.0]]
+        assert len(requests) == 1
+
+    def test_invalid_maxsize(self):
+        with pytest.raises(ValueError):
+            RerankCache(maxsize=0)
@@ -0,0 +1,167 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from aimon import AsyncClient, Client, InternalServerError, RetryBudget, RetryPolicy
+from aimon.reprompting_api.utils import async_retry, retry
+
+
+def fast_policy(**kwargs):
+    options = dict(initial_delay=0.001, max_delay=0.01)
+    options.update(kwargs)
+    return RetryPolicy(**options)
+
+
+class FailingServer:
+    """Answers every request with the given status and headers, counting the requests."""
+
+    def __init__(self, status_code=500, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.requests = 0
+
+    def handler(self, request):
+        self.requests += 1
+        return httpx.Response(self.status_code, json={"message": "unavailable"}, headers=self.headers)
+
+    def client(self, **kwargs):
+        return Client(
+            auth_header="Bearer test",
+            base_url="http://aimon.test",
+            http_client=httpx.Client(transport=httpx.MockTransport(self.handler)),
+            **kwargs,
+        )
+
+    def async_client(self, **kwargs):
+        return AsyncClient(
+            auth_header="Bearer test",
+            base_url="http://aimon.test",
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(self.handler)),
+            **kwargs,
+        )
+
+
+class TestRetryBudget:
+    def test_withdraw_until_exhausted(self):
+        budget = RetryBudget(max_tokens=2, retry_ratio=0.5)
+        assert budget.try_withdraw()
+        assert budget.try_withdraw()
+        assert not budget.try_withdraw()
+        budget.deposit()
+        budget.deposit()
+        assert budget.try_withdraw()
+
+    def test_deposits_are_capped(self):
+        budget = RetryBudget(max_tokens=2, retry_ratio=1)
+        for _ in range(10):
+            budget.deposit()
+        assert budget.tokens == 2
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            RetryBudget(max_tokens=0)
+        with pytest.raises(ValueError):
+            RetryBudget(retry_ratio=-1)
+
+
+class TestRetryPolicy:
+    def test_decorrelated_jitter_bounds(self):
+        policy = RetryPolicy(initial_delay=1, max_delay=10)
+        state = policy.start()
+        previous = 1
+        for _ in range(20):
+            delay = state.next_delay()
+            assert 1 <= delay <= min(10, previous * 3)
+            previous = delay
+
+    def test_retry_after_takes_precedence(self):
+        state = RetryPolicy(initial_delay=1).start()
+        assert state.next_delay(retry_after=2.5) == 2.5
+
+    def test_refuses_retry_past_deadline(self):
+        state = RetryPolicy(initial_delay=1).start(deadline=time.monotonic() + 0.5)
+        assert state.next_delay() is None
+
+    def test_timeout_sets_deadline(self):
+        state = RetryPolicy(timeout=5).start()
+        assert state.deadline == pytest.approx(time.monotonic() + 5, abs=0.1)
+
+    def test_budget_refusal(self):
+        policy = fast_policy(budget=RetryBudget(max_tokens=1, retry_ratio=0))
+        state = policy.start()
+        assert state.next_delay() is not None
+        assert state.next_delay() is None
+        assert state.retries == 1
+
+
+class TestClientRetryPolicy:
+    def test_budget_caps_client_retries(self):
+        server = FailingServer()
+        client = server.client(max_retries=5, retry_policy=fast_policy(budget=RetryBudget(max_tokens=2, retry_ratio=0)))
+
+        with pytest.raises(InternalServerError):
+            client.post("/v1/thing", cast_to=object, body={})
+        with pytest.raises(InternalServerError):
+            client.post("/v1/thing", cast_to=object, body={})
+
+        # 2 first attempts plus the 2 retries the budget allows
+        assert server.requests == 4
+
+    def test_max_retries_still_applies(self):
+        server = FailingServer()
+        client = server.client(max_retries=2, retry_policy=fast_policy())
+
+        with pytest.raises(InternalServerError):
+            client.post("/v1/thing", cast_to=object, body={})
+
+        assert server.requests == 3
+
+    def test_policy_is_kept_by_copy(self):
+        policy = fast_policy()
+        client = FailingServer().client(retry_policy=policy)
+        assert client.with_options(max_retries=1).retry_policy is policy
+        assert client.copy(retry_policy=None).retry_policy is None
+
+    def test_async_client_respects_deadline(self):
+        server = FailingServer(headers={"retry-after": "1"})
+        client = server.async_client(max_retries=5, retry_policy=fast_policy(timeout=0.5))
+
+        with pytest.raises(InternalServerError):
+            asyncio.run(client.post("/v1/thing", cast_to=object, body={}))
+
+        # The server asks for a 1s wait, which does not fit the 0.5s deadline
+        assert server.requests == 1
+
+
+class TestSharedBudget:
+    def test_pipeline_and_client_retries_share_the_budget(self):
+        budget = RetryBudget(max_tokens=3, retry_ratio=0)
+        policy = fast_policy(budget=budget)
+        server = FailingServer()
+        client = server.client(max_retries=5, retry_policy=policy)
+
+        @retry(exception_to_check=InternalServerError, tries=5, delay=0, logger=None, policy=policy)
+        def call():
+            return client.post("/v1/thing", cast_to=object, body={})
+
+        with pytest.raises(InternalServerError):
+            call()
+
+        # 3 retries in total across both layers instead of 5 x 6 requests
+        assert server.requests == 4
+        assert budget.tokens == 0
+
+    def test_async_retry_uses_policy(self):
+        attempts = []
+        policy = fast_policy(budget=RetryBudget(max_tokens=1, retry_ratio=0))
+
+        @async_retry(exception_to_check=RuntimeError, tries=5, delay=0, logger=None, policy=policy)
+        async def flaky():
+            attempts.append(1)
+            raise RuntimeError("down")
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(flaky())
+        assert len(attempts) == 2
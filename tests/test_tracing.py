@@ -0,0 +1,193 @@
+import time
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+import aimon
+from aimon import Detect, Client, AsyncClient, SpanRecorder, BadRequestError
+from aimon._tracing import start_span
+from aimon.reprompting_api.utils import call_with_deadline
+from aimon.reprompting_api.config import RepromptingConfig
+from aimon.reprompting_api.pipeline import RepromptingPipeline
+
+BODY = [{"context": "Paris is the capital of France.", "generated_text": "Paris."}]
+
+
+@pytest.fixture
+def recorder():
+    previous = aimon.get_tracer()
+    recorder = SpanRecorder()
+    aimon.set_tracer(recorder)
+    yield recorder
+    aimon.set_tracer(previous)
+
+
+def mock_client(handler, cls=Client, http_cls=httpx.Client, **kwargs):
+    client = cls(
+        auth_header="Bearer test",
+        base_url="http://aimon.test",
+        http_client=http_cls(transport=httpx.MockTransport(handler)),
+        **kwargs,
+    )
+    client._calculate_retry_timeout = lambda *args, **kwargs: 0
+    return client
+
+
+def by_name(recorder, name):
+    return [span for span in recorder.get_finished_spans() if span.name == name]
+
+
+class TestRequestSpans:
+    def test_request_and_attempt_spans(self, recorder):
+        responses = iter([httpx.Response(503, json={}), httpx.Response(200, json=[{"result": {}}])])
+        client = mock_client(lambda request: next(responses))
+
+        client.inference.detect(body=BODY)
+
+        (request_span,) = by_name(recorder, "aimon.request")
+        first, second = by_name(recorder, "POST /v2/detect")
+        assert request_span.attributes == {
+            "http.request.method": "POST",
+            "url.template": "/v2/detect",
+            "http.response.status_code": 200,
+            "aimon.retry_count": 1,
+        }
+        assert first.parent_id == second.parent_id == request_span.span_id
+        assert first.trace_id == request_span.trace_id
+        assert first.attributes["error.type"] == "503"
+        assert "http.request.resend_count" not in first.attributes
+        assert second.attributes["http.request.resend_count"] == 1
+        assert second.attributes["http.request.body.size"] > 0
+        assert second.attributes["http.response.status_code"] == 200
+        assert request_span.status == "unset"
+
+    def test_failed_request(self, recorder):
+        client = mock_client(lambda request: httpx.Response(400, json={"error": "bad"}))
+
+        with pytest.raises(BadRequestError):
+            client.post("/v1/custom-metric/0a1b2c3d-4e5f", cast_to=object, body={})
+
+        (request_span,) = by_name(recorder, "aimon.request")
+        (attempt,) = by_name(recorder, "POST /v1/custom-metric/{id}")
+        assert request_span.status == attempt.status == "error"
+        assert isinstance(request_span.error, BadRequestError)
+        assert request_span.attributes["error.type"] == "BadRequestError"
+        assert request_span.attributes["http.response.status_code"] == 400
+
+    def test_async_requests_nest_in_the_current_span(self, recorder):
+        client = mock_client(lambda request: httpx.Response(200, json={}), cls=AsyncClient, http_cls=httpx.AsyncClient)
+
+        async def main():
+            with start_span("app") as parent:
+                await asyncio.gather(client.get("/v1/user", cast_to=object), client.get("/v1/user", cast_to=object))
+            return parent
+
+        parent = asyncio.run(main())
+        request_spans = by_name(recorder, "aimon.request")
+        assert len(request_spans) == 2
+        assert {span.parent_id for span in request_spans} == {parent.span_id}
+        attempts = by_name(recorder, "GET /v1/user")
+        assert {span.parent_id for span in attempts} == {span.span_id for span in request_spans}
+
+    def test_disabled(self, recorder):
+        aimon.set_tracer(None)
+        client = mock_client(lambda request: httpx.Response(200, json={}))
+
+        assert client.get("/v1/user", cast_to=object) == {}
+        assert recorder.get_finished_spans() == []
+
+
+class TestDecoratorSpans:
+    def test_detect_span_wraps_the_request(self, recorder, fake_detect):
+        detect = Detect(values_returned=["context", "generated_text"], api_key="test", config={"groundedness": {"detector_name": "default"}})
+        fake_detect.install(detect)
+
+        @detect
+        def answer():
+            return "Paris is the capital of France.", "Paris."
+
+        answer()
+
+        (detect_span,) = by_name(recorder, "aimon.detect")
+        (request_span,) = by_name(recorder, "aimon.request")
+        assert request_span.parent_id == detect_span.span_id
+        assert detect_span.attributes["aimon.detectors"] == ["groundedness"]
+        assert detect_span.attributes["code.function"].endswith("answer")
+        assert "aimon.application_name" not in detect_span.attributes
+
+
+class TestRepromptingSpans:
+    def test_iterations_with_llm_and_detect_calls(self, recorder, fake_detect):
+        config = RepromptingConfig(aimon_api_key="test", publish=False, application_name="api_test", max_iterations=2)
+        pipeline = RepromptingPipeline(llm_fn=lambda *args: "no instructions followed", config=config)
+        fake_detect.install(pipeline.detect)
+
+        pipeline.run("", "France facts", "What is the capital?", ["Mention Paris"])
+
+        (run,) = by_name(recorder, "aimon.reprompting.run")
+        iterations = by_name(recorder, "aimon.reprompting.iteration")
+        assert [span.attributes["aimon.reprompting.iteration"] for span in iterations] == [1, 2]
+        assert {span.parent_id for span in iterations} == {run.span_id}
+        assert run.attributes["aimon.reprompting.iterations"] == 2
+        assert run.attributes["aimon.reprompting.llm_calls"] == 2
+
+        for iteration in iterations:
+            children = [span for span in recorder.get_finished_spans() if span.parent_id == iteration.span_id]
+            assert [span.attributes["aimon.reprompting.stage"] for span in children] == ["llm", "detect"]
+            detect_call = children[1]
+            assert "instruction_adherence" in detect_call.attributes["aimon.detectors"]
+            (decorator_span,) = [span for span in by_name(recorder, "aimon.detect") if span.parent_id == detect_call.span_id]
+            assert [span.parent_id for span in by_name(recorder, "aimon.request")].count(decorator_span.span_id) == 1
+
+    def test_calls_with_a_deadline_keep_the_trace(self, recorder):
+        def work():
+            with start_span("callee"):
+                pass
+
+        with start_span("caller") as caller:
+            call_with_deadline(work, deadline=time.monotonic() + 10)
+
+        (callee,) = by_name(recorder, "callee")
+        assert callee.parent_id == caller.span_id
+
+
+class TestSpanRecorder:
+    def test_bounded(self):
+        recorder = SpanRecorder(maxlen=2)
+        for name in "abc":
+            with recorder.start_as_current_span(name):
+                pass
+
+        assert [span.name for span in recorder.get_finished_spans()] == ["b", "c"]
+        recorder.clear()
+        assert recorder.get_finished_spans() == []
+
+    def test_spans_of_other_threads_are_not_children(self):
+        recorder = SpanRecorder()
+        spans = []
+
+        with recorder.start_as_current_span("main"):
+            thread = threading.Thread(target=lambda: spans.append(recorder.start_span("worker")))
+            thread.start()
+            thread.join()
+
+        assert spans[0].parent_id is None
+
+    def test_exceptions_are_recorded(self):
+        recorder = SpanRecorder()
+        with pytest.raises(ValueError):
+            with recorder.start_as_current_span("failing"):
+                raise ValueError("boom")
+
+        (span,) = recorder.get_finished_spans()
+        assert span.status == "error" and isinstance(span.error, ValueError)
+        assert span.duration is not None and span.end_time >= span.start_time
+
+
+def test_opentelemetry_is_used_when_installed():
+    trace = pytest.importorskip("opentelemetry.trace")
+    from aimon._tracing import _default_tracer
+
+    assert isinstance(_default_tracer(), trace.Tracer)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List, Union, Iterable, Optional
+from datetime import date, datetime
+from typing_extensions import Literal, Required, Annotated, TypedDict
+
+import pydantic
+import pytest
+
+from aimon._types import NOT_GIVEN
+from aimon._utils import PropertyInfo, transform, async_transform
+from aimon._utils._transform import _get_typeddict_plan, _no_transform_needed
+from aimon.types import inference_detect_params
+
+
+class Nested(TypedDict, total=False):
+    created_at: Annotated[date, PropertyInfo(format="iso8601")]
+    label: Annotated[str, PropertyInfo(alias="Label")]
+
+
+class Params(TypedDict, total=False):
+    name: Required[Annotated[str, PropertyInfo(alias="fullName")]]
+    tags: List[str]
+    context: Union[List[str], str]
+    mode: Literal["fast", "slow"]
+    scores: Dict[str, float]
+    nested: Nested
+    items: Iterable[Nested]
+    dates: Annotated[List[date], PropertyInfo(format="iso8601")]
+    when: Annotated[Optional[datetime], PropertyInfo(format="custom", format_template="%Y")]
+    anything: object
+
+
+@pytest.fixture(params=["sync", "async"])
+def run_transform(request):
+    if request.param == "sync":
+        return transform
+    return lambda data, type_: asyncio.run(async_transform(data, type_))
+
+
+class Model(pydantic.BaseModel):
+    foo: int = 1
+
+
+class TestTransform:
+    def test_aliases_and_formats(self, run_transform):
+        data: Any = {
+            "name": "Ada",
+            "nested": {"created_at": date(2024, 1, 2), "label": "x"},
+            "items": ({"label": "y"} for _ in range(2)),
+            "dates": [date(2024, 1, 1)],
+            "when": datetime(2023, 5, 1),
+            "anything": Model(foo=2),
+            "unknown": 1,
+        }
+        assert run_transform(data, Params) == {
+            "fullName": "Ada",
+            "nested": {"created_at": "2024-01-02", "Label": "x"},
+            "items": [{"Label": "y"}, {"Label": "y"}],
+            "dates": ["2024-01-01"],
+            "when": "2023",
+            "anything": {"foo": 2},
+            "unknown": 1,
+        }
+
+    def test_not_given_values_are_dropped(self, run_transform):
+        assert run_transform({"name": "Ada", "tags": NOT_GIVEN}, Params) == {"fullName": "Ada"}
+
+    def test_passthrough_fields_are_not_walked(self, run_transform):
+        tags = ["a", "b"]
+        context = ["c"] * 1000
+        scores = {"x": 1.0}
+        result = run_transform({"name": "Ada", "tags": tags, "context": context, "scores": scores}, Params)
+        assert result["tags"] is tags
+        assert result["context"] is context
+        assert result["scores"] is scores
+
+    def test_top_level_list(self, run_transform):
+        body: Any = [{"context": ["a", "b"], "config": {"hallucination_v0_2": {"detector_name": "default"}}}]
+        result = run_transform(body, Iterable[inference_detect_params.Body])
+        assert result == [{"context": ["a", "b"], "config": {"hallucination_v0.2": {"detector_name": "default"}}}]
+        assert result[0]["context"] is body[0]["context"]
+
+
+class TestTransformPlans:
+    @pytest.mark.parametrize(
+        "type_",
+        [str, int, List[str], Union[List[str], str], Optional[str], Dict[str, List[int]], Literal["a"]],
+    )
+    def test_passthrough_types(self, type_):
+        assert _no_transform_needed(type_)
+
+    @pytest.mark.parametrize(
+        "type_",
+        [object, Any, date, Nested, List[Nested], Iterable[str], Annotated[str, PropertyInfo(format="base64")]],
+    )
+    def test_types_needing_transform(self, type_):
+        assert not _no_transform_needed(type_)
+
+    def test_typeddict_plan_is_cached(self):
+        plan = _get_typeddict_plan(Params)
+        assert plan is _get_typeddict_plan(Params)
+        assert plan["name"].key == "fullName"
+        assert plan["tags"].passthrough
+        assert not plan["nested"].passthrough